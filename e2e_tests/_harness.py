@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import re
 from dataclasses import replace
 from pathlib import Path
 from typing import Any, Mapping, Sequence
@@ -8,6 +9,7 @@ from typing import Any, Mapping, Sequence
 from openagentic_sdk.hooks.engine import HookEngine
 from openagentic_sdk.options import AgentDefinition, OpenAgenticOptions
 from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers.cache import CACHE_MODES, CachingProvider
 from openagentic_sdk.providers.openai_responses import OpenAIResponsesProvider
 from openagentic_sdk.sessions.store import FileSessionStore
 
@@ -52,6 +54,35 @@ def make_provider() -> OpenAIResponsesProvider:
     )
 
 
+# The system prompt embeds today's date (e.g. "Mon Jan 05 2026"); keep it out of cache keys.
+_DATE_RE = r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) [A-Z][a-z]{2} \d{2} \d{4}"
+
+
+def _cache_mode() -> str:
+    mode = _env_str("RIGHTCODE_CACHE_MODE", "readwrite")
+    if mode not in CACHE_MODES:
+        raise RuntimeError(f"RIGHTCODE_CACHE_MODE must be one of {', '.join(CACHE_MODES)}; got {mode!r}")
+    return mode
+
+
+def make_cached_provider(root: Path) -> Any:
+    """`make_provider()`, wrapped in a response cache when RIGHTCODE_CACHE_DIR is set.
+
+    Each test runs in its own temp directory, so `root` is redacted from cache keys.
+    """
+
+    provider = make_provider()
+    cache_dir = os.environ.get("RIGHTCODE_CACHE_DIR")
+    if not cache_dir:
+        return provider
+    return CachingProvider(
+        provider,
+        cache=Path(cache_dir),
+        mode=_cache_mode(),  # type: ignore[arg-type]
+        redact=(re.escape(str(root)), re.escape(str(root.resolve())), _DATE_RE),
+    )
+
+
 def make_options(
     root: Path,
     *,
@@ -61,12 +92,16 @@ def make_options(
     mcp_servers: Mapping[str, Any] | None = None,
     agents: Mapping[str, AgentDefinition] | None = None,
 ) -> OpenAgenticOptions:
-    api_key = require_env("RIGHTCODE_API_KEY")
+    if os.environ.get("RIGHTCODE_CACHE_DIR") and _cache_mode() == "replay":
+        # Replays never reach the network.
+        api_key = _env_str("RIGHTCODE_API_KEY", "replay")
+    else:
+        api_key = require_env("RIGHTCODE_API_KEY")
     model = _env_str("RIGHTCODE_MODEL", "gpt-5.2")
     store = FileSessionStore(root_dir=root)
 
     opts = OpenAgenticOptions(
-        provider=make_provider(),
+        provider=make_cached_provider(root),
         model=model,
         api_key=api_key,
         cwd=str(root),
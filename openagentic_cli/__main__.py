@@ -12,8 +12,9 @@ from openagentic_sdk.server.http_server import serve_http
 from .auth_cmd import cmd_auth_list, cmd_auth_remove, cmd_auth_set
 from .args import build_parser
 from .config import build_options
-from .logs_cmd import summarize_events
+from .logs_cmd import SUMMARY_FIELDS, TIMING_FIELDS, summarize_events, summarize_timings
 from .mcp_cmd import cmd_mcp_auth, cmd_mcp_list, cmd_mcp_logout
+from .sessions_cmd import cmd_sessions_migrate, cmd_sessions_reindex, cmd_sessions_strip_deltas
 from .share_cmd import cmd_share, cmd_shared, cmd_unshare
 from .repl import run_chat
 from .run_cmd import run_once
@@ -93,12 +94,47 @@ def main(argv: list[str] | None = None) -> int:
             root_dir = default_session_root()
         store = FileSessionStore(root_dir=root_dir)
         sid = str(getattr(ns, "session_id", "") or "")
-        events = store.read_events(sid)
-        text = summarize_events(events, color_config=style, isatty=sys.stdout.isatty(), platform=sys.platform)
+        if getattr(ns, "timings", False):
+            sids = [sid] if sid else [str(m["session_id"]) for m in store.list_sessions()]
+            timing_events = (e for s in sids for e in store.iter_events(s, types=("step.timing",), fields=TIMING_FIELDS))
+            text = summarize_timings(timing_events, color_config=style, isatty=sys.stdout.isatty(), platform=sys.platform)
+        elif not sid:
+            parser.error("logs needs a session id (or --timings)")
+            return 2
+        else:
+            events = store.iter_events(sid, fields=SUMMARY_FIELDS)
+            text = summarize_events(events, color_config=style, isatty=sys.stdout.isatty(), platform=sys.platform)
         sys.stdout.write(text)
         sys.stdout.flush()
         return 0
 
+    if ns.command == "sessions":
+        sub = getattr(ns, "sessions_command", None)
+        root = getattr(ns, "session_root", None)
+        root_dir = Path(str(root)).expanduser() if root else default_session_root()
+        if sub == "strip-deltas":
+            sid = getattr(ns, "session_id", None)
+            all_sessions = bool(getattr(ns, "all_sessions", False))
+            if bool(sid) == all_sessions:
+                parser.error("sessions strip-deltas needs a session id or --all")
+                return 2
+            sys.stdout.write(cmd_sessions_strip_deltas(root_dir=root_dir, session_id=sid, all_sessions=all_sessions) + "\n")
+            sys.stdout.flush()
+            return 0
+        if sub == "migrate":
+            db = getattr(ns, "db", None)
+            db_path = Path(str(db)).expanduser() if db else None
+            to = str(getattr(ns, "to", "") or "")
+            sys.stdout.write(cmd_sessions_migrate(root_dir=root_dir, to=to, db_path=db_path) + "\n")
+            sys.stdout.flush()
+            return 0
+        if sub == "reindex":
+            sys.stdout.write(cmd_sessions_reindex(root_dir=root_dir) + "\n")
+            sys.stdout.flush()
+            return 0
+        parser.error("missing or unknown sessions subcommand")
+        return 2
+
     if ns.command == "share":
         sid = str(getattr(ns, "session_id", "") or "")
         root = getattr(ns, "session_root", None)
@@ -24,8 +24,41 @@ def build_parser() -> argparse.ArgumentParser:
     p_resume.add_argument("session_id", help="Session id to resume")
 
     p_logs = sub.add_parser("logs", help="Summarize session events")
-    p_logs.add_argument("session_id", help="Session id to summarize")
+    p_logs.add_argument("session_id", nargs="?", default=None, help="Session id to summarize (optional with --timings)")
     p_logs.add_argument(
+        "--timings",
+        action="store_true",
+        help="Show per-step latency percentiles (over every session unless a session id is given)",
+    )
+    p_logs.add_argument(
+        "--session-root",
+        default=None,
+        help="Session root directory (default: ~/.openagentic-sdk; env: OPENAGENTIC_SDK_HOME)",
+    )
+
+    p_sessions = sub.add_parser("sessions", help="Maintain stored session logs")
+    sessions_sub = p_sessions.add_subparsers(dest="sessions_command")
+
+    p_strip = sessions_sub.add_parser("strip-deltas", help="Remove persisted assistant.delta events from session logs")
+    p_strip.add_argument("session_id", nargs="?", default=None, help="Session id to compact (omit with --all)")
+    p_strip.add_argument("--all", dest="all_sessions", action="store_true", help="Compact every session under the root")
+    p_strip.add_argument(
+        "--session-root",
+        default=None,
+        help="Session root directory (default: ~/.openagentic-sdk; env: OPENAGENTIC_SDK_HOME)",
+    )
+
+    p_migrate = sessions_sub.add_parser("migrate", help="Copy sessions between the JSONL and SQLite stores")
+    p_migrate.add_argument("--to", required=True, choices=["sqlite", "files"], help="Destination store")
+    p_migrate.add_argument("--db", default=None, help="SQLite database path (default: <session-root>/sessions.sqlite3)")
+    p_migrate.add_argument(
+        "--session-root",
+        default=None,
+        help="Session root directory (default: ~/.openagentic-sdk; env: OPENAGENTIC_SDK_HOME)",
+    )
+
+    p_reindex = sessions_sub.add_parser("reindex", help="Rebuild the session catalog from session directories")
+    p_reindex.add_argument(
         "--session-root",
         default=None,
         help="Session root directory (default: ~/.openagentic-sdk; env: OPENAGENTIC_SDK_HOME)",
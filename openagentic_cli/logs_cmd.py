@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 from collections import Counter, deque
 from typing import Iterable, Mapping
 
@@ -7,6 +8,23 @@ from openagentic_sdk.events import Event
 
 from .style import StyleConfig, bold, dim, fg_green, fg_red, should_colorize
 
+# Event fields `summarize_events` reads; `oa logs` decodes only these.
+SUMMARY_FIELDS = ("tool_use_id", "name", "is_error", "stop_reason", "provider_metadata")
+
+# `step.timing` fields summarised by `summarize_timings`, in display order.
+TIMING_FIELDS = (
+    "build_ms",
+    "ttfb_ms",
+    "ttft_ms",
+    "stream_ms",
+    "hook_ms",
+    "permission_ms",
+    "tool_ms",
+    "total_ms",
+    "tokens_per_s",
+)
+_PERCENTILES = (50, 90, 99)
+
 
 def summarize_events(
     events: Iterable[Event],
@@ -80,3 +98,54 @@ def summarize_events(
         lines.append(dim("Protocol: ", enabled=enable_color) + fg_green(last_protocol, enabled=enable_color))
 
     return "\n".join(lines).rstrip() + "\n"
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    # Nearest-rank: the smallest value with at least pct% of samples at or below it.
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_timings(
+    events: Iterable[Event],
+    *,
+    color_config: StyleConfig | None = None,
+    isatty: bool = False,
+    platform: str = "linux",
+) -> str:
+    """Percentiles of the `step.timing` phases over `events` (any number of sessions)."""
+
+    cfg = color_config or StyleConfig(color="auto")
+    enable_color = should_colorize(cfg, isatty=isatty, platform=platform)
+
+    samples: dict[str, list[float]] = {k: [] for k in TIMING_FIELDS}
+    steps = 0
+    for e in events:
+        if getattr(e, "type", None) != "step.timing":
+            continue
+        steps += 1
+        for k in TIMING_FIELDS:
+            v = getattr(e, k, None)
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                samples[k].append(float(v))
+
+    lines: list[str] = [bold(f"Step timings ({steps} steps):", enabled=enable_color)]
+    if not steps:
+        lines.append(dim("No step.timing events recorded.", enabled=enable_color))
+        return "\n".join(lines) + "\n"
+
+    header = ["phase", "n", *(f"p{p}" for p in _PERCENTILES), "max"]
+    rows: list[list[str]] = []
+    for k in TIMING_FIELDS:
+        values = sorted(samples[k])
+        if not values:
+            continue
+        rows.append([k, str(len(values)), *(f"{_percentile(values, p):.1f}" for p in _PERCENTILES), f"{values[-1]:.1f}"])
+    widths = [max(len(r[i]) for r in [header, *rows]) for i in range(len(header))]
+
+    def fmt(row: list[str]) -> str:
+        return "  ".join(cell.ljust(widths[i]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row))
+
+    lines.append(dim(fmt(header), enabled=enable_color))
+    lines.extend(fmt(r) for r in rows)
+    return "\n".join(lines).rstrip() + "\n"
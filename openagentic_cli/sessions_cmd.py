@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from openagentic_sdk.sessions.migrate import migrate_sessions
+from openagentic_sdk.sessions.sqlite_store import SqliteSessionStore
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+def _iter_session_ids(root_dir: Path) -> list[str]:
+    base = root_dir / "sessions"
+    if not base.is_dir():
+        return []
+    return sorted(p.name for p in base.iterdir() if p.is_dir() and re.fullmatch(r"[0-9a-f]{32}", p.name))
+
+
+def cmd_sessions_strip_deltas(*, root_dir: Path, session_id: str | None = None, all_sessions: bool = False) -> str:
+    store = FileSessionStore(root_dir=root_dir)
+    if all_sessions:
+        sids = _iter_session_ids(root_dir)
+    else:
+        sid = str(session_id or "").strip()
+        if not sid:
+            raise ValueError("session_id must be non-empty")
+        sids = [sid]
+    total = 0
+    touched = 0
+    for sid in sids:
+        removed = store.strip_deltas(sid)
+        total += removed
+        if removed:
+            touched += 1
+    return f"Removed {total} assistant.delta events from {touched} of {len(sids)} sessions."
+
+
+def cmd_sessions_migrate(*, root_dir: Path, to: str, db_path: Path | None = None) -> str:
+    files = FileSessionStore(root_dir=root_dir)
+    db = SqliteSessionStore(root_dir=root_dir, db_path=db_path)
+    try:
+        if to == "sqlite":
+            copied = migrate_sessions(files, db)
+        elif to == "files":
+            copied = migrate_sessions(db, files)
+        else:
+            raise ValueError("to must be 'sqlite' or 'files'")
+    finally:
+        db.close()
+    return f"Migrated {len(copied)} sessions to {to}."
+
+
+def cmd_sessions_reindex(*, root_dir: Path) -> str:
+    n = FileSessionStore(root_dir=root_dir).rebuild_catalog()
+    return f"Rebuilt session catalog ({n} sessions)."
@@ -5,11 +5,14 @@ import os
 import time
 from dataclasses import replace
 from pathlib import Path
+from typing import Any
 
 from openagentic_sdk.options import OpenAgenticOptions
 from openagentic_sdk.paths import default_session_root
 from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers.governor import ProviderGovernor
 from openagentic_sdk.providers.openai_responses import OpenAIResponsesProvider
+from openagentic_sdk.providers.pool import ProviderPool
 from openagentic_sdk.sessions.store import FileSessionStore
 
 from .reply.engine import ReplyEngine
@@ -52,13 +55,33 @@ def build_gateway_options(*, cwd: str) -> OpenAgenticOptions:
     max_retries = _env_int("RIGHTCODE_MAX_RETRIES", 2)
     retry_backoff_s = _env_float("RIGHTCODE_RETRY_BACKOFF_S", 0.5)
 
-    provider = OpenAIResponsesProvider(
-        name="openai-compatible",
-        base_url=base_url,
-        timeout_s=timeout_s,
-        max_retries=max_retries,
-        retry_backoff_s=retry_backoff_s,
-    )
+    # Every session shares one API key: coordinate them so a 429 storm slows all
+    # of them down instead of multiplying retries.
+    rpm = _env_float("RIGHTCODE_REQUESTS_PER_MINUTE", 0.0)
+    tpm = _env_float("RIGHTCODE_TOKENS_PER_MINUTE", 0.0)
+
+    # A comma-separated RIGHTCODE_BASE_URL spreads calls over several endpoints,
+    # each with its own limits.
+    endpoints = [
+        OpenAIResponsesProvider(
+            name="openai-compatible",
+            base_url=url,
+            timeout_s=timeout_s,
+            max_retries=max_retries,
+            retry_backoff_s=retry_backoff_s,
+            governor=ProviderGovernor(
+                max_in_flight=_env_int("RIGHTCODE_MAX_IN_FLIGHT", 8),
+                requests_per_minute=rpm or None,
+                tokens_per_minute=tpm or None,
+            ),
+        )
+        for url in (u.strip() for u in base_url.split(","))
+        if url
+    ]
+    provider: Any = endpoints[0]
+    if len(endpoints) > 1:
+        hedge_after_s = _env_float("RIGHTCODE_HEDGE_AFTER_S", 0.0)
+        provider = ProviderPool(endpoints, hedge_after_s=hedge_after_s or None)
 
     permission_mode = os.getenv("OA_PERMISSION_MODE", "default")
     gate = PermissionGate(permission_mode=permission_mode, interactive=False)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, replace
+from typing import Any
 
 from openagentic_sdk.api import run as sdk_run
 from openagentic_sdk.options import OpenAgenticOptions
+from openagentic_sdk.providers.pool import ProviderPool
 
 from ..routing.resolve_route import resolve_route
 from ..sessions.session_map import SessionMap
@@ -22,6 +24,15 @@ class ReplyEngine:
         self._session_map = session_map
         self._agent_id = agent_id
 
+    def provider_stats(self) -> dict[str, Any] | None:
+        """Provider governor (per API key/model lane) and endpoint pool metrics, if any."""
+
+        provider = self._options.provider
+        if isinstance(provider, ProviderPool):
+            return {"pool": provider.snapshot()}
+        governor = getattr(provider, "governor", None)
+        return {"governor": governor.snapshot()} if governor is not None else None
+
     async def get_reply(self, env: InboundEnvelope) -> ReplyResult:
         route = resolve_route(
             agent_id=self._agent_id,
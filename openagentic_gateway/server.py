@@ -78,7 +78,13 @@ class GatewayServer:
                     return
 
                 if self.path == "/v1/gateway/status":
-                    raw = json.dumps({"ok": True}, separators=(",", ":")).encode("utf-8")
+                    status: dict[str, Any] = {"ok": True}
+                    engine = getattr(self.server, "_reply_engine", None)  # type: ignore[attr-defined]
+                    provider_stats = getattr(engine, "provider_stats", None)
+                    stats = provider_stats() if callable(provider_stats) else None
+                    if stats is not None:
+                        status["provider"] = stats
+                    raw = json.dumps(status, separators=(",", ":")).encode("utf-8")
                     self.send_response(200)
                     self.send_header("Content-Type", "application/json; charset=utf-8")
                     self.send_header("Content-Length", str(len(raw)))
@@ -36,6 +36,19 @@ COMPACTION_USER_INSTRUCTION = (
 TOOL_OUTPUT_PLACEHOLDER = "[Old tool result content cleared]"
 
 
+# The only event types and fields `select_tool_outputs_to_prune` reads, so
+# callers can hand it a projection of the log (`store.iter_events`).
+PRUNE_EVENT_TYPES = (
+    "user.message",
+    "user.compaction",
+    "assistant.message",
+    "tool.use",
+    "tool.result",
+    "tool.output_compacted",
+)
+PRUNE_EVENT_FIELDS = ("is_summary", "tool_use_id", "name", "output")
+
+
 @dataclass(frozen=True, slots=True)
 class UsageTotals:
     input_tokens: int
@@ -125,6 +125,30 @@ class Result(EventBase):
     agent_name: str | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class StepTiming(EventBase):
+    """Where one runtime step's wall time went (milliseconds).
+
+    `ttfb_ms`/`ttft_ms` (first provider event / first text delta) are only set
+    for streaming providers. `stream_ms` is the whole provider call.
+    """
+
+    type: Literal["step.timing"] = "step.timing"
+    step: int = 0
+    build_ms: float = 0.0
+    ttfb_ms: float | None = None
+    ttft_ms: float | None = None
+    stream_ms: float = 0.0
+    hook_ms: float = 0.0
+    permission_ms: float = 0.0
+    tool_ms: float = 0.0
+    total_ms: float = 0.0
+    output_tokens: int | None = None
+    tokens_per_s: float | None = None
+    parent_tool_use_id: str | None = None
+    agent_name: str | None = None
+
+
 @dataclass(frozen=True, slots=True)
 class HookEvent(EventBase):
     type: Literal["hook.event"] = "hook.event"
@@ -189,6 +213,7 @@ Event = (
     | ToolResult
     | ToolOutputCompacted
     | HookEvent
+    | StepTiming
     | SessionCheckpoint
     | SessionSetHead
     | SessionUndo
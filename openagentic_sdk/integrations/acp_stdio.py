@@ -224,7 +224,7 @@ class AcpStdioServer:
                 self._sessions[sid].cwd = cwd2
 
             # Replay persisted history as session/update notifications.
-            for ev in self._store.read_events(sid):
+            for ev in self._store.iter_events(sid):
                 await self._emit_event_update(session_id=sid, ev=ev)
             return {}
 
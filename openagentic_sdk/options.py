@@ -8,6 +8,7 @@ from typing import Any, Mapping, Optional, Sequence
 from .hooks.engine import HookEngine
 from .permissions.gate import PermissionGate
 from .providers.base import Provider
+from .sessions.sqlite_store import SqliteSessionStore
 from .sessions.store import FileSessionStore
 from .tools.defaults import default_tool_registry
 from .tools.registry import ToolRegistry
@@ -44,6 +45,19 @@ class CompactionOptions:
     min_prune_tokens: int = 20_000
 
 
+@dataclass(frozen=True, slots=True)
+class DeltaPersistenceOptions:
+    # How streamed `assistant.delta` events are written to the session log.
+    # Live consumers of `query()` always receive every delta; the final
+    # `assistant.message` carries the full text either way.
+    # - "off": do not persist deltas.
+    # - "coalesce": persist merged deltas every `coalesce_ms` or `coalesce_bytes`.
+    # - "full": persist every delta as streamed.
+    mode: str = "off"
+    coalesce_ms: int = 250
+    coalesce_bytes: int = 4096
+
+
 @dataclass(frozen=True, slots=True)
 class OpenAgenticOptions:
     provider: Provider
@@ -62,7 +76,7 @@ class OpenAgenticOptions:
     permission_gate: PermissionGate = field(default_factory=lambda: PermissionGate(permission_mode="deny"))
     hooks: HookEngine = field(default_factory=HookEngine)
 
-    session_store: FileSessionStore | None = None
+    session_store: FileSessionStore | SqliteSessionStore | None = None
     session_root: Path | None = None
     resume: str | None = None
     resume_max_events: int = 1000
@@ -84,6 +98,20 @@ class OpenAgenticOptions:
     # `context_limit`.
     compaction: CompactionOptions = field(default_factory=CompactionOptions)
 
+    # Streaming text deltas are not persisted by default (see DeltaPersistenceOptions).
+    delta_persistence: DeltaPersistenceOptions = field(default_factory=DeltaPersistenceOptions)
+
+    # Start read-only tools (Read, Glob, Grep, List) as soon as a streaming
+    # provider finalises their call, overlapping them with the rest of the
+    # model response. Tool events are still emitted in call order.
+    early_tool_dispatch: bool = False
+
+    # Upper bound on tool calls from one model response that run at the same
+    # time. Read-only tools run concurrently, writes are serialised per file,
+    # other tools run alone; events are still emitted in call order. 1 runs
+    # every call sequentially.
+    max_parallel_tools: int = 4
+
     agents: Mapping[str, AgentDefinition] = field(default_factory=dict)
 
     # MCP placeholders (not implemented yet)
@@ -13,6 +13,7 @@ from .project.claude import load_claude_project_settings
 from .opencode_config import load_merged_config
 from .opencode_prompts import load_prompt_text
 from .options import OpenAgenticOptions
+from .tools.file_index import index_for
 
 
 @dataclass(frozen=True, slots=True)
@@ -95,12 +96,32 @@ def _walk_files(cwd: Path) -> Iterable[Path]:
             yield Path(root) / f
 
 
-def _glob_in_dir(cwd: Path, pattern: str) -> list[Path]:
-    """Glob like Bun.Glob(scan dot+symlink) relative to cwd."""
+def _glob_in_dir(cwd: Path, pattern: str, *, root: Path | None = None) -> list[Path]:
+    """Glob like Bun.Glob(scan dot+symlink) relative to cwd.
+
+    With `root` (a project directory containing cwd), wildcard patterns are
+    answered from its workspace file index instead of walking the tree, unless
+    the subtree holds directories the index does not descend into (symlinked or
+    `_IGNORE_PREFIXES` directories).
+    """
 
     pat = (pattern or "").strip()
     if not pat:
         return []
+    if not any(c in pat for c in "*?["):
+        # Without wildcards only cwd/pattern itself can match.
+        p = cwd / pat
+        return [p] if p.is_file() else []
+    hit = index_for(cwd, root) if root is not None else None
+    if hit is not None:
+        index, under = hit
+        try:
+            if index.covers(under, include_ignored=True, include_pruned=True):
+                cut = len(under) + 1 if under else 0
+                rels = [e.path[cut:] for e in index.entries(under, include_ignored=True)]
+                return [cwd / rel for rel in rels if fnmatch.fnmatch(rel, pat)]
+        except (OSError, RuntimeError):
+            pass
     out: list[Path] = []
     for p in _walk_files(cwd):
         try:
@@ -115,7 +136,7 @@ def _glob_in_dir(cwd: Path, pattern: str) -> list[Path]:
 def _glob_up(pattern: str, *, start: Path, stop: Path) -> list[Path]:
     out: list[Path] = []
     for d in _iter_up(start, stop):
-        out.extend(_glob_in_dir(d, pattern))
+        out.extend(_glob_in_dir(d, pattern, root=stop))
     # Deterministic ordering.
     return sorted({p.resolve() for p in out}, key=lambda p: str(p))
 
@@ -257,7 +278,7 @@ def _custom_instruction_blocks(*, options: OpenAgenticOptions, instance_dir: Pat
         if not isinstance(pat, str) or not pat.strip():
             continue
         base = Path(options.project_dir or options.cwd).expanduser().resolve()
-        for m in _glob_in_dir(base, pat.strip()):
+        for m in _glob_in_dir(base, pat.strip(), root=base):
             sp = str(m)
             if sp not in paths:
                 paths.append(sp)
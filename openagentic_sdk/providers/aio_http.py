@@ -0,0 +1,501 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+import time
+import urllib.parse
+import urllib.request
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Mapping
+
+_RETRYABLE_HTTP_STATUS: set[int] = {408, 409, 425, 429, 500, 502, 503, 504}
+
+_MAX_LINE = 64 * 1024
+_READ_SIZE = 64 * 1024
+# When a consumer stops reading early (e.g. after the final SSE event), the rest
+# of the body is usually already in flight: drain up to this much so the
+# connection can be reused instead of closed.
+_DRAIN_MAX_BYTES = 256 * 1024
+_DRAIN_TIMEOUT_S = 0.5
+
+
+class ProviderHttpError(RuntimeError):
+    """A non-2xx provider response; keeps the status and (lower-cased) headers for retry policy."""
+
+    def __init__(self, message: str, *, status: int, headers: Mapping[str, str] | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers: dict[str, str] = {k.lower(): v for k, v in (headers or {}).items()}
+
+
+# Called with the status and headers of every response (including retried ones).
+ResponseObserver = Callable[[int, Mapping[str, str]], None]
+
+
+def _backoff_seconds(attempt_index: int, base: float) -> float:
+    # attempt_index: 0 for first retry, 1 for second retry, ...
+    if attempt_index < 0:
+        return 0.0
+    return max(0.0, base) * (2**attempt_index)
+
+
+_ssl_context: ssl.SSLContext | None = None
+
+
+def _default_ssl_context() -> ssl.SSLContext:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def proxy_for(url: str) -> str | None:
+    """Return the environment proxy urllib would use for `url`, if any."""
+
+    parts = urllib.parse.urlsplit(url)
+    proxy = urllib.request.getproxies().get(parts.scheme)
+    if not proxy:
+        return None
+    if urllib.request.proxy_bypass(parts.hostname or ""):
+        return None
+    return proxy
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "idle_since", "requests")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = time.monotonic()
+        self.requests = 0
+
+    def is_usable(self, *, idle_timeout_s: float) -> bool:
+        if self.writer.is_closing() or self.reader.at_eof():
+            return False
+        return time.monotonic() - self.idle_since < idle_timeout_s
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+class _Pool:
+    """Keep-alive connections to one origin (scheme, host, port)."""
+
+    def __init__(self, *, scheme: str, host: str, port: int, max_connections: int, idle_timeout_s: float) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.idle_timeout_s = idle_timeout_s
+        self._idle: list[_Connection] = []
+        self._slots = asyncio.Semaphore(max(1, int(max_connections)))
+        self.opened = 0
+
+    async def acquire(self, *, timeout_s: float, fresh: bool = False) -> tuple[_Connection, bool]:
+        """Return (connection, reused). The caller must `release()` it exactly once."""
+
+        await self._slots.acquire()
+        try:
+            while self._idle and not fresh:
+                conn = self._idle.pop()
+                if conn.is_usable(idle_timeout_s=self.idle_timeout_s):
+                    return conn, True
+                conn.close()
+            ctx = _default_ssl_context() if self.scheme == "https" else None
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    self.host,
+                    self.port,
+                    ssl=ctx,
+                    server_hostname=self.host if ctx is not None else None,
+                    limit=_MAX_LINE,
+                ),
+                timeout=timeout_s,
+            )
+            self.opened += 1
+            return _Connection(reader, writer), False
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: _Connection, *, reusable: bool) -> None:
+        if reusable and not conn.writer.is_closing():
+            conn.idle_since = time.monotonic()
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self) -> None:
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+class HttpResponse:
+    """A response whose body is read incrementally from a pooled connection."""
+
+    def __init__(
+        self,
+        *,
+        pool: _Pool,
+        conn: _Connection,
+        status: int,
+        headers: dict[str, str],
+        timeout_s: float,
+        has_body: bool,
+    ) -> None:
+        self.status = status
+        self.headers = headers
+        self._pool = pool
+        self._conn: _Connection | None = conn
+        self._timeout_s = timeout_s
+        te = headers.get("transfer-encoding", "").lower()
+        self._chunked = "chunked" in te
+        cl = headers.get("content-length")
+        self._remaining: int | None = int(cl) if cl is not None and cl.strip().isdigit() else None
+        self._keep_alive = headers.get("connection", "").lower() != "close" and (
+            self._chunked or self._remaining is not None or not has_body
+        )
+        if not has_body:
+            self._remaining = 0
+            self._chunked = False
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        """Yield body bytes as they arrive; the connection returns to the pool at the end."""
+
+        conn = self._conn
+        if conn is None:
+            return
+        complete = False
+        try:
+            async for data in self._body(conn.reader):
+                yield data
+            complete = True
+        except GeneratorExit:
+            if self._keep_alive:
+                complete = await self._drain(conn.reader)
+            raise
+        finally:
+            self._finish(reusable=complete and self._keep_alive)
+
+    async def _body(self, reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+        if self._chunked:
+            while True:
+                size_line = await self._io(reader.readuntil(b"\r\n"))
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailers, then the terminating blank line.
+                    while (await self._io(reader.readuntil(b"\r\n"))) != b"\r\n":
+                        pass
+                    return
+                data = await self._io(reader.readexactly(size))
+                await self._io(reader.readexactly(2))
+                yield data
+        elif self._remaining is not None:
+            while self._remaining > 0:
+                data = await self._io(reader.read(min(self._remaining, _READ_SIZE)))
+                if not data:
+                    raise ConnectionError("connection closed before the response body was complete")
+                self._remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await self._io(reader.read(_READ_SIZE))
+                if not data:
+                    return
+                yield data
+
+    async def _drain(self, reader: asyncio.StreamReader) -> bool:
+        async def consume() -> bool:
+            seen = 0
+            async for data in self._body(reader):
+                seen += len(data)
+                if seen > _DRAIN_MAX_BYTES:
+                    return False
+            return True
+
+        try:
+            return await asyncio.wait_for(consume(), timeout=_DRAIN_TIMEOUT_S)
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return False
+
+    async def read(self) -> bytes:
+        parts = [chunk async for chunk in self.aiter_bytes()]
+        return b"".join(parts)
+
+    async def aclose(self) -> None:
+        self._finish(reusable=False)
+
+    async def _io(self, aw: Any) -> Any:
+        return await asyncio.wait_for(aw, timeout=self._timeout_s)
+
+    def _finish(self, *, reusable: bool) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn, reusable=reusable)
+
+
+@dataclass(slots=True)
+class AsyncHttpClient:
+    """Minimal asyncio HTTP/1.1 client with per-origin keep-alive pools.
+
+    Connections belong to the event loop they were opened on, so use one client
+    per loop (`default_client()` does this).
+    """
+
+    max_connections_per_origin: int = 32
+    idle_timeout_s: float = 30.0
+    _pools: dict[tuple[str, str, int], _Pool] = field(default_factory=dict, init=False, repr=False)
+
+    def pool_stats(self) -> dict[str, int]:
+        """Connections opened so far, per origin (`scheme://host:port`)."""
+
+        return {f"{s}://{h}:{p}": pool.opened for (s, h, p), pool in self._pools.items()}
+
+    def close(self) -> None:
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        body: bytes | None = None,
+        timeout_s: float = 60.0,
+    ) -> HttpResponse:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _Pool(
+                scheme=scheme,
+                host=parts.hostname,
+                port=port,
+                max_connections=self.max_connections_per_origin,
+                idle_timeout_s=self.idle_timeout_s,
+            )
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"host: {host_header}"]
+        names = {k.lower() for k in (headers or {})}
+        for k, v in (headers or {}).items():
+            lines.append(f"{k}: {v}")
+        if "accept-encoding" not in names:
+            lines.append("accept-encoding: identity")
+        if body is not None and "content-length" not in names:
+            lines.append(f"content-length: {len(body)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        fresh = False
+        while True:
+            conn, reused = await pool.acquire(timeout_s=timeout_s, fresh=fresh)
+            try:
+                conn.writer.write(head + (body or b""))
+                await asyncio.wait_for(conn.writer.drain(), timeout=timeout_s)
+                status, resp_headers = await asyncio.wait_for(_read_head(conn.reader), timeout=timeout_s)
+            except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError) as e:
+                pool.release(conn, reusable=False)
+                if reused and not fresh:
+                    # The server closed an idle keep-alive connection; retry once on a new one.
+                    fresh = True
+                    continue
+                raise ConnectionError(str(e) or type(e).__name__) from e
+            except BaseException:
+                pool.release(conn, reusable=False)
+                raise
+            conn.requests += 1
+            return HttpResponse(
+                pool=pool,
+                conn=conn,
+                status=status,
+                headers=resp_headers,
+                timeout_s=timeout_s,
+                has_body=method.upper() != "HEAD" and status not in (204, 304) and not 100 <= status < 200,
+            )
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[int, dict[str, str]]:
+    while True:
+        status_line = await reader.readuntil(b"\r\n")
+        parts = status_line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ConnectionError(f"malformed status line: {status_line[:100]!r}")
+        status = int(parts[1])
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        if status == 100:
+            continue  # Interim response.
+        return status, headers
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHttpClient]" = weakref.WeakKeyDictionary()
+
+
+def default_client() -> AsyncHttpClient:
+    """Return the shared client for the running event loop."""
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncHttpClient()
+    return client
+
+
+def _runtime_http_error(
+    url: str, status: int, body: bytes, headers: Mapping[str, str] | None = None
+) -> ProviderHttpError:
+    hint = " (transient upstream error; try again)" if status in _RETRYABLE_HTTP_STATUS else ""
+    text = body.decode("utf-8", errors="replace")
+    return ProviderHttpError(f"HTTP {status} from {url}{hint}: {text}".strip(), status=status, headers=headers)
+
+
+async def _open_with_retries(
+    client: AsyncHttpClient,
+    url: str,
+    headers: Mapping[str, str],
+    payload: Mapping[str, Any] | bytes,
+    *,
+    timeout_s: float,
+    max_retries: int,
+    retry_backoff_s: float,
+    on_response: ResponseObserver | None = None,
+) -> HttpResponse:
+    # Pre-encoded bodies (see request_body.RequestBodyEncoder) are sent as-is.
+    data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+    max_retries = max(0, int(max_retries))
+    for attempt in range(max_retries + 1):
+        try:
+            resp = await client.request("POST", url, headers=headers, body=data, timeout_s=timeout_s)
+        except (OSError, asyncio.TimeoutError) as e:
+            if attempt < max_retries:
+                await asyncio.sleep(_backoff_seconds(attempt, retry_backoff_s))
+                continue
+            raise RuntimeError(f"Request failed to {url}: {e}".strip()) from e
+        if on_response is not None:
+            on_response(resp.status, resp.headers)
+        if 200 <= resp.status < 300:
+            return resp
+        body = await resp.read()
+        if attempt < max_retries and resp.status in _RETRYABLE_HTTP_STATUS:
+            await asyncio.sleep(_backoff_seconds(attempt, retry_backoff_s))
+            continue
+        raise _runtime_http_error(url, resp.status, body, resp.headers)
+    raise RuntimeError(f"Request failed to {url}".strip())  # pragma: no cover
+
+
+async def post_json(
+    url: str,
+    headers: Mapping[str, str],
+    payload: Mapping[str, Any] | bytes,
+    *,
+    timeout_s: float,
+    max_retries: int = 0,
+    retry_backoff_s: float = 0.5,
+    client: AsyncHttpClient | None = None,
+    on_response: ResponseObserver | None = None,
+) -> Mapping[str, Any]:
+    """POST `payload` as JSON and decode the JSON response, without blocking the loop."""
+
+    resp = await _open_with_retries(
+        client or default_client(),
+        url,
+        headers,
+        payload,
+        timeout_s=timeout_s,
+        max_retries=max_retries,
+        retry_backoff_s=retry_backoff_s,
+        on_response=on_response,
+    )
+    try:
+        raw = await resp.read()
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+        raise RuntimeError(f"Request failed to {url}: {e}".strip()) from e
+    return json.loads(raw.decode("utf-8"))
+
+
+async def post_stream(
+    url: str,
+    headers: Mapping[str, str],
+    payload: Mapping[str, Any] | bytes,
+    *,
+    timeout_s: float,
+    max_retries: int = 0,
+    retry_backoff_s: float = 0.5,
+    client: AsyncHttpClient | None = None,
+    on_response: ResponseObserver | None = None,
+) -> AsyncIterator[bytes]:
+    """POST `payload` as JSON and yield the response body (e.g. SSE) as it arrives."""
+
+    resp = await _open_with_retries(
+        client or default_client(),
+        url,
+        headers,
+        payload,
+        timeout_s=timeout_s,
+        max_retries=max_retries,
+        retry_backoff_s=retry_backoff_s,
+        on_response=on_response,
+    )
+    body = resp.aiter_bytes()
+    try:
+        async for chunk in body:
+            yield chunk
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+        raise RuntimeError(f"Request failed to {url}: {e}".strip()) from e
+    finally:
+        await body.aclose()
+
+
+async def aiter_chunks(chunks: Iterable[bytes] | AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Adapt a sync or async chunk source (custom `stream_transport` hooks) to async."""
+
+    if hasattr(chunks, "__aiter__"):
+        try:
+            async for chunk in chunks:  # type: ignore[union-attr]
+                yield chunk
+        finally:
+            aclose = getattr(chunks, "aclose", None)
+            if callable(aclose):
+                await aclose()
+        return
+    for chunk in chunks:  # type: ignore[union-attr]
+        yield chunk
+
+
+async def aiter_in_thread(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """Drive a blocking chunk iterator from a worker thread (e.g. urllib via a proxy)."""
+
+    it = iter(chunks)
+    sentinel = object()
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, it, sentinel)
+            if chunk is sentinel:
+                break
+            yield chunk  # type: ignore[misc]
+    finally:
+        close = getattr(it, "close", None)
+        if callable(close):
+            await asyncio.to_thread(close)
@@ -1,17 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, AsyncIterator, Callable, Iterable, Mapping, Sequence
+from typing import Any, AsyncIterator, Mapping, Sequence
 
 from .base import ModelOutput
+from .governor import ProviderGovernor
+from .openai_compatible import StreamTransport, Transport
 from .openai_responses import OpenAIResponsesProvider
+from .request_body import RequestBodyEncoder
 from .stream_events import StreamEvent
 
 
-Transport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Mapping[str, Any]]
-StreamTransport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Iterable[bytes]]
-
-
 @dataclass(frozen=True, slots=True)
 class ResponsesProviderAlias:
     """A provider wrapper with a distinct name/default base_url.
@@ -28,6 +27,8 @@ class ResponsesProviderAlias:
     retry_backoff_s: float = 0.5
     transport: Transport | None = None
     stream_transport: StreamTransport | None = None
+    # Shared rate/concurrency/failure control for the default transports.
+    governor: ProviderGovernor | None = None
 
     async def complete(
         self,
@@ -40,6 +41,7 @@ class ResponsesProviderAlias:
         previous_response_id: str | None = None,
         store: bool = True,
         include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
     ) -> ModelOutput:
         inner = OpenAIResponsesProvider(
             name=self.name,
@@ -50,6 +52,7 @@ class ResponsesProviderAlias:
             retry_backoff_s=self.retry_backoff_s,
             transport=self.transport,
             stream_transport=self.stream_transport,
+            governor=self.governor,
         )
         return await inner.complete(
             model=model,
@@ -60,6 +63,7 @@ class ResponsesProviderAlias:
             previous_response_id=previous_response_id,
             store=store,
             include=include,
+            body_encoder=body_encoder,
         )
 
     async def stream(
@@ -73,6 +77,7 @@ class ResponsesProviderAlias:
         previous_response_id: str | None = None,
         store: bool = True,
         include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
     ) -> AsyncIterator[StreamEvent]:
         inner = OpenAIResponsesProvider(
             name=self.name,
@@ -83,6 +88,7 @@ class ResponsesProviderAlias:
             retry_backoff_s=self.retry_backoff_s,
             transport=self.transport,
             stream_transport=self.stream_transport,
+            governor=self.governor,
         )
         async for ev in inner.stream(
             model=model,
@@ -93,6 +99,7 @@ class ResponsesProviderAlias:
             previous_response_id=previous_response_id,
             store=store,
             include=include,
+            body_encoder=body_encoder,
         ):
             yield ev
 
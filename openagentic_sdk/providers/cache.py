@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, is_dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Literal, Mapping, Sequence
+
+from .base import ModelOutput, ToolCall
+from .stream_events import DoneEvent, TextDeltaEvent, ToolCallEvent
+
+CacheMode = Literal["readwrite", "replay", "record"]
+CACHE_MODES: tuple[str, ...] = ("readwrite", "replay", "record")
+
+_FORMAT_VERSION = 1
+
+
+def _canonical(obj: Any) -> Any:
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return _canonical(asdict(obj))
+    if isinstance(obj, Mapping):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def request_key(request: Mapping[str, Any], *, redact: Sequence[str] = ()) -> str:
+    """Canonical hash of a provider request (`api_key` excluded).
+
+    `redact` holds regexes removed from the canonical JSON before hashing, for
+    run-specific text such as temp directories or the date in the system prompt.
+    """
+
+    material = {k: v for k, v in request.items() if k != "api_key"}
+    text = json.dumps(_canonical(material), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    for pattern in redact:
+        text = re.sub(pattern, "<redacted>", text)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Disk-backed cache of recorded provider outputs, one JSON file per key.
+
+    Entries are evicted least-recently-used first once there are more than
+    `max_entries` or they take more than `max_bytes`. Recency is the file mtime
+    (touched on every hit), so it survives restarts and is shared by processes
+    using the same directory.
+    """
+
+    def __init__(self, root_dir: str | Path, *, max_entries: int = 10_000, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.root_dir = Path(root_dir)
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._lock = threading.Lock()
+        # key -> size, least recently used first; loaded from disk on first use.
+        self._lru: OrderedDict[str, int] | None = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root_dir / f"{key}.json"
+
+    def _load_lru(self) -> OrderedDict[str, int]:
+        if self._lru is None:
+            entries: list[tuple[float, str, int]] = []
+            if self.root_dir.is_dir():
+                for p in self.root_dir.glob("*.json"):
+                    try:
+                        st = p.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, p.stem, st.st_size))
+            entries.sort()
+            self._lru = OrderedDict((key, size) for _, key, size in entries)
+            self._bytes = sum(size for _, _, size in entries)
+        return self._lru
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            lru = self._load_lru()
+            path = self._path(key)
+            try:
+                record = json.loads(path.read_bytes())
+            except (OSError, ValueError):
+                record = None
+            if not isinstance(record, dict) or record.get("version") != _FORMAT_VERSION:
+                self.misses += 1
+                return None
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            if key in lru:
+                lru.move_to_end(key)
+            self.hits += 1
+            return record
+
+    def put(self, key: str, record: Mapping[str, Any]) -> None:
+        data = json.dumps({"version": _FORMAT_VERSION, **record}, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            lru = self._load_lru()
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._bytes += len(data) - lru.pop(key, 0)
+            lru[key] = len(data)
+            while len(lru) > 1 and (len(lru) > self.max_entries or self._bytes > self.max_bytes):
+                old, size = lru.popitem(last=False)
+                self._bytes -= size
+                try:
+                    self._path(old).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_lru())
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in self._load_lru():
+                try:
+                    self._path(key).unlink()
+                except FileNotFoundError:
+                    pass
+            self._lru = OrderedDict()
+            self._bytes = 0
+
+
+def _supported_kwargs(fn: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return kwargs
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in params.values()):
+        return kwargs
+    return {k: v for k, v in kwargs.items() if k in params}
+
+
+def _tool_call_to_dict(tc: ToolCall) -> dict[str, Any]:
+    return {"tool_use_id": tc.tool_use_id, "name": tc.name, "arguments": dict(tc.arguments)}
+
+
+def _tool_call_from_dict(obj: Mapping[str, Any]) -> ToolCall:
+    return ToolCall(tool_use_id=str(obj["tool_use_id"]), name=str(obj["name"]), arguments=dict(obj.get("arguments") or {}))
+
+
+def _output_to_dict(out: ModelOutput) -> dict[str, Any]:
+    return {
+        "assistant_text": out.assistant_text,
+        "tool_calls": [_tool_call_to_dict(tc) for tc in out.tool_calls],
+        "usage": _canonical(out.usage),
+        "raw": _canonical(out.raw),
+        "response_id": out.response_id,
+        "provider_metadata": _canonical(out.provider_metadata),
+    }
+
+
+def _output_from_dict(obj: Mapping[str, Any]) -> ModelOutput:
+    return ModelOutput(
+        assistant_text=obj.get("assistant_text"),
+        tool_calls=[_tool_call_from_dict(tc) for tc in obj.get("tool_calls") or []],
+        usage=obj.get("usage"),
+        raw=obj.get("raw"),
+        response_id=obj.get("response_id"),
+        provider_metadata=obj.get("provider_metadata"),
+    )
+
+
+def _event_to_dict(ev: Any) -> dict[str, Any]:
+    # Providers yield the stream_events dataclasses or plain dicts; the runtime accepts both.
+    get = ev.get if isinstance(ev, Mapping) else (lambda k, d=None: getattr(ev, k, d))
+    typ = get("type")
+    if typ == "text_delta":
+        return {"type": "text_delta", "delta": get("delta") or ""}
+    if typ == "tool_call":
+        tc = get("tool_call")
+        return {"type": "tool_call", "tool_call": _tool_call_to_dict(tc) if isinstance(tc, ToolCall) else None}
+    if typ == "done":
+        return {"type": "done", "response_id": get("response_id"), "usage": _canonical(get("usage"))}
+    return {"raw": _canonical(ev)}
+
+
+def _event_from_dict(obj: Mapping[str, Any]) -> Any:
+    typ = obj.get("type")
+    if typ == "text_delta":
+        return TextDeltaEvent(delta=str(obj.get("delta") or ""))
+    if typ == "tool_call":
+        tc = obj.get("tool_call")
+        return ToolCallEvent(tool_call=_tool_call_from_dict(tc) if isinstance(tc, Mapping) else None)
+    if typ == "done":
+        return DoneEvent(response_id=obj.get("response_id"), usage=obj.get("usage"))
+    return obj.get("raw")
+
+
+@dataclass(frozen=True, slots=True)
+class _CachingProviderBase:
+    inner: Any
+    cache: ResponseCache
+    # readwrite: replay hits, call through and record misses.
+    # replay: never call the inner provider; a miss raises RuntimeError.
+    # record: always call through and overwrite the entry.
+    mode: CacheMode = "readwrite"
+    # Multiplier on the recorded latencies: 0 replays instantly, 1.0 at recorded speed.
+    pacing: float = 0.0
+    redact: Sequence[str] = ()
+
+    def __post_init__(self) -> None:
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(CACHE_MODES)}")
+
+    @property
+    def name(self) -> str:
+        return str(getattr(self.inner, "name", "unknown"))
+
+    def _key(self, kind: str, request: Mapping[str, Any]) -> str:
+        return request_key({"kind": kind, "provider": self.name, **request}, redact=self.redact)
+
+    def _lookup(self, key: str) -> dict[str, Any] | None:
+        if self.mode == "record":
+            return None
+        record = self.cache.get(key)
+        if record is None and self.mode == "replay":
+            raise RuntimeError(f"provider cache miss in replay mode (key {key})")
+        return record
+
+    async def _pace(self, seconds: Any) -> None:
+        if self.pacing > 0 and isinstance(seconds, (int, float)) and seconds > 0:
+            await asyncio.sleep(float(seconds) * self.pacing)
+
+    async def _complete(self, request: dict[str, Any]) -> ModelOutput:
+        key = self._key("complete", request)
+        record = self._lookup(key)
+        if record is not None:
+            await self._pace(record.get("latency_s"))
+            return _output_from_dict(record["output"])
+        t0 = time.monotonic()
+        fn = self.inner.complete
+        out = await fn(**_supported_kwargs(fn, request))
+        self.cache.put(key, {"kind": "complete", "latency_s": time.monotonic() - t0, "output": _output_to_dict(out)})
+        return out
+
+    async def _stream(self, request: dict[str, Any]) -> AsyncIterator[Any]:
+        key = self._key("stream", request)
+        record = self._lookup(key)
+        if record is not None:
+            for item in record.get("events") or []:
+                await self._pace(item.get("dt"))
+                yield _event_from_dict(item["event"])
+            return
+        events: list[dict[str, Any]] = []
+        last = time.monotonic()
+        fn = self.inner.stream
+        async for ev in fn(**_supported_kwargs(fn, request)):
+            now = time.monotonic()
+            item = {"dt": now - last, "event": _event_to_dict(ev)}
+            last = now
+            events.append(item)
+            if item["event"].get("type") == "done":
+                # The runtime stops reading at `done`, so record before handing it over.
+                self.cache.put(key, {"kind": "stream", "events": events})
+            yield ev
+
+
+@dataclass(frozen=True, slots=True)
+class CachingResponsesProvider(_CachingProviderBase):
+    """Caching wrapper for Responses-style providers without `stream()`."""
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        input: Sequence[Mapping[str, Any]],
+        instructions: str | None = None,
+        tools: Sequence[Mapping[str, Any]] = (),
+        api_key: str | None = None,
+        previous_response_id: str | None = None,
+        store: bool = True,
+        include: Sequence[str] = (),
+    ) -> ModelOutput:
+        request = {
+            "model": model,
+            "input": input,
+            "instructions": instructions,
+            "tools": tools,
+            "api_key": api_key,
+            "previous_response_id": previous_response_id,
+            "store": store,
+            "include": include,
+        }
+        return await self._complete(request)
+
+
+@dataclass(frozen=True, slots=True)
+class CachingStreamingResponsesProvider(CachingResponsesProvider):
+    """Caching wrapper for Responses-style providers with `stream()`."""
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        input: Sequence[Mapping[str, Any]],
+        instructions: str | None = None,
+        tools: Sequence[Mapping[str, Any]] = (),
+        api_key: str | None = None,
+        previous_response_id: str | None = None,
+        store: bool = True,
+        include: Sequence[str] = (),
+    ) -> AsyncIterator[Any]:
+        request = {
+            "model": model,
+            "input": input,
+            "instructions": instructions,
+            "tools": tools,
+            "api_key": api_key,
+            "previous_response_id": previous_response_id,
+            "store": store,
+            "include": include,
+        }
+        async for ev in self._stream(request):
+            yield ev
+
+
+@dataclass(frozen=True, slots=True)
+class CachingLegacyProvider(_CachingProviderBase):
+    """Caching wrapper for chat-completions style providers without `stream()`."""
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        messages: Sequence[Mapping[str, Any]],
+        tools: Sequence[Mapping[str, Any]] = (),
+        api_key: str | None = None,
+    ) -> ModelOutput:
+        return await self._complete({"model": model, "messages": messages, "tools": tools, "api_key": api_key})
+
+
+@dataclass(frozen=True, slots=True)
+class CachingStreamingLegacyProvider(CachingLegacyProvider):
+    """Caching wrapper for chat-completions style providers with `stream()`."""
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        messages: Sequence[Mapping[str, Any]],
+        tools: Sequence[Mapping[str, Any]] = (),
+        api_key: str | None = None,
+    ) -> AsyncIterator[Any]:
+        async for ev in self._stream({"model": model, "messages": messages, "tools": tools, "api_key": api_key}):
+            yield ev
+
+
+def _is_legacy(provider: Any) -> bool:
+    for attr in ("complete", "stream"):
+        fn = getattr(provider, attr, None)
+        if fn is None:
+            continue
+        try:
+            params = inspect.signature(fn).parameters
+        except (TypeError, ValueError):
+            continue
+        if "input" in params:
+            return False
+        if "messages" in params:
+            return True
+    return False
+
+
+def CachingProvider(
+    inner: Any,
+    *,
+    cache: ResponseCache | str | Path,
+    mode: CacheMode = "readwrite",
+    pacing: float = 0.0,
+    redact: Sequence[str] = (),
+) -> _CachingProviderBase:
+    """Wrap `inner` so identical requests replay recorded outputs.
+
+    The wrapper mirrors the inner provider's protocol (Responses or legacy
+    messages) and whether it has `stream()`, so the runtime drives it exactly
+    as it would drive `inner`. Requests forward only the keywords the runtime
+    would have passed; `api_key` is never part of the cache key.
+    """
+
+    if not isinstance(cache, ResponseCache):
+        cache = ResponseCache(cache)
+    streams = callable(getattr(inner, "stream", None))
+    if _is_legacy(inner):
+        cls: type[_CachingProviderBase] = CachingStreamingLegacyProvider if streams else CachingLegacyProvider
+    else:
+        cls = CachingStreamingResponsesProvider if streams else CachingResponsesProvider
+    return cls(inner=inner, cache=cache, mode=mode, pacing=float(pacing), redact=tuple(redact))
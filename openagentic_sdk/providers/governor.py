@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Literal, Mapping
+
+from .aio_http import _RETRYABLE_HTTP_STATUS
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: str) -> float | None:
+    """Parse `x-ratelimit-reset-*` values: `"20ms"`, `"1s"`, `"6m0s"`, `"1h2m3.5s"` or plain seconds."""
+
+    text = value.strip()
+    if not text:
+        return None
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    total = 0.0
+    pos = 0
+    for m in _DURATION_RE.finditer(text):
+        if m.start() != pos:
+            return None
+        n = float(m.group(1))
+        total += {"ms": n / 1000.0, "s": n, "m": n * 60.0, "h": n * 3600.0}[m.group(2)]
+        pos = m.end()
+    return total if pos == len(text) else None
+
+
+def parse_retry_after(headers: Mapping[str, str], *, now: float | None = None) -> float | None:
+    """Seconds to wait from `retry-after-ms` or `retry-after` (delta-seconds or HTTP date)."""
+
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000.0)
+        except ValueError:
+            pass
+    raw = headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> int | None:
+    raw = headers.get(name)
+    if raw is None:
+        return None
+    try:
+        return int(float(raw))
+    except ValueError:
+        return None
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without contacting the provider while its circuit breaker is open."""
+
+
+@dataclass(slots=True)
+class _TokenBucket:
+    # Units per second; None = unlimited until the provider announces a limit.
+    rate: float | None
+    capacity: float
+    level: float
+    updated: float
+
+    def refill(self, now: float) -> None:
+        if self.rate is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        if self.rate is None or self.level >= amount:
+            return 0.0
+        # A request bigger than the bucket waits for a full bucket, then overdraws it.
+        need = min(amount, self.capacity) - self.level
+        return max(0.0, need / self.rate)
+
+    def set_limit(self, per_minute: float, now: float) -> None:
+        unlimited = self.rate is None
+        self.refill(now)
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute if unlimited else min(self.level, per_minute)
+
+
+@dataclass(slots=True, eq=False)
+class _Waiter:
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future[None]
+
+
+@dataclass(slots=True)
+class _Lane:
+    """Limits and state for one (API key, model) pair."""
+
+    name: str
+    limit: int
+    requests: _TokenBucket
+    tokens: _TokenBucket
+    in_flight: int = 0
+    waiters: deque[_Waiter] = field(default_factory=deque)
+    blocked_until: float = 0.0
+    breaker: BreakerState = "closed"
+    failures: int = 0
+    opened_at: float = 0.0
+    probing: bool = False
+    # Counters.
+    started: int = 0
+    throttled: int = 0
+    failed: int = 0
+    rejected: int = 0
+
+
+@dataclass(slots=True)
+class Lease:
+    """One admitted request attempt; `observe` responses, then `release` exactly once."""
+
+    governor: ProviderGovernor
+    lane: _Lane
+    status: int | None = None
+    headers: Mapping[str, str] | None = None
+    released: bool = False
+
+    def observe(self, status: int, headers: Mapping[str, str]) -> None:
+        self.status = status
+        self.headers = headers
+
+    def release(self, *, error: bool = False) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.governor._finish(self.lane, status=self.status, headers=self.headers, error=error)
+
+
+class ProviderGovernor:
+    """Rate, concurrency and failure control shared by every request to a provider.
+
+    Requests are grouped into lanes by (API key, model). Each lane has:
+
+    - request and token buckets (`requests_per_minute`/`tokens_per_minute`),
+      re-tuned from `x-ratelimit-*` response headers;
+    - a cooldown from `Retry-After` or an exhausted `x-ratelimit-remaining-*`,
+      which holds every caller of the lane, not just the one that was throttled;
+    - an in-flight limit with a FIFO queue. It halves on each 429 and grows
+      back by one per success (up to `max_in_flight`);
+    - a circuit breaker that opens after `failure_threshold` consecutive
+      5xx/network failures and lets one probe through after `reset_timeout_s`.
+
+    Thread-safe, and usable from several event loops (the gateway runs one per
+    request thread). `snapshot()` reports the state as metrics.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = 8,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+        max_wait_s: float = 120.0,
+    ) -> None:
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout_s = reset_timeout_s
+        # A cooldown or bucket wait longer than this fails the request instead.
+        self.max_wait_s = max_wait_s
+        self._lanes: dict[tuple[str, str], _Lane] = {}
+        self._lock = threading.Lock()
+
+    def _lane(self, api_key: str | None, model: str | None) -> _Lane:
+        key_id = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:8]
+        k = (key_id, model or "")
+        lane = self._lanes.get(k)
+        if lane is None:
+            now = time.monotonic()
+            rpm = self.requests_per_minute
+            tpm = self.tokens_per_minute
+            lane = self._lanes[k] = _Lane(
+                name=f"{key_id}/{model or '*'}",
+                limit=self.max_in_flight,
+                requests=_TokenBucket(rpm / 60.0 if rpm else None, rpm or 0.0, rpm or 0.0, now),
+                tokens=_TokenBucket(tpm / 60.0 if tpm else None, tpm or 0.0, tpm or 0.0, now),
+            )
+        return lane
+
+    async def acquire(self, api_key: str | None, model: str | None, *, tokens: int = 0) -> Lease:
+        """Wait for a slot and the rate limits; raises `CircuitOpenError` when the lane is open."""
+
+        with self._lock:
+            lane = self._lane(api_key, model)
+            self._check_breaker(lane, time.monotonic())
+            # Past the breaker while half-open: this request is the probe.
+            probe = lane.breaker == "half_open"
+            waiter: _Waiter | None = None
+            if lane.in_flight < lane.limit and not lane.waiters:
+                lane.in_flight += 1
+            else:
+                loop = asyncio.get_running_loop()
+                waiter = _Waiter(loop, loop.create_future())
+                lane.waiters.append(waiter)
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if probe:
+                        lane.probing = False
+                    if waiter in lane.waiters:
+                        lane.waiters.remove(waiter)
+                    elif waiter.future.done() and not waiter.future.cancelled():
+                        self._release_slot(lane)
+                    # Otherwise a hand-off is pending; _deliver sees the cancellation and releases.
+                raise
+        lease = Lease(self, lane)
+        try:
+            await self._wait_for_rate(lane, tokens)
+        except BaseException:
+            with self._lock:
+                if lane.probing:
+                    lane.probing = False
+                self._release_slot(lane)
+            raise
+        return lease
+
+    async def _wait_for_rate(self, lane: _Lane, tokens: int) -> None:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                lane.requests.refill(now)
+                lane.tokens.refill(now)
+                delay = max(
+                    lane.blocked_until - now,
+                    lane.requests.delay_for(1.0),
+                    lane.tokens.delay_for(float(tokens)),
+                )
+                if delay <= 0:
+                    if lane.requests.rate is not None:
+                        lane.requests.level -= 1.0
+                    if lane.tokens.rate is not None:
+                        lane.tokens.level -= float(tokens)
+                    lane.started += 1
+                    return
+            if waited + delay > self.max_wait_s:
+                raise RuntimeError(
+                    f"provider rate limit for {lane.name}: would wait {delay:.1f}s (max_wait_s={self.max_wait_s:g})"
+                )
+            waited += delay
+            await asyncio.sleep(delay)
+
+    def _check_breaker(self, lane: _Lane, now: float) -> None:
+        if lane.breaker == "closed":
+            return
+        if lane.breaker == "open" and now - lane.opened_at >= self.reset_timeout_s:
+            lane.breaker = "half_open"
+        if lane.breaker == "half_open" and not lane.probing:
+            lane.probing = True
+            return
+        lane.rejected += 1
+        retry_in = max(0.0, self.reset_timeout_s - (now - lane.opened_at))
+        raise CircuitOpenError(f"provider circuit open for {lane.name} after repeated failures; retry in {retry_in:.0f}s")
+
+    def _finish(self, lane: _Lane, *, status: int | None, headers: Mapping[str, str] | None, error: bool) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if headers:
+                self._apply_headers(lane, headers, now)
+            if status == 429:
+                lane.throttled += 1
+                lane.limit = max(1, lane.limit // 2)
+                if lane.blocked_until <= now:
+                    # No Retry-After: a short lane-wide pause still stops every caller retrying at once.
+                    lane.blocked_until = now + 1.0
+                self._settle_probe(lane, now, failed=False)
+            elif error or (status is not None and status in _RETRYABLE_HTTP_STATUS):
+                lane.failed += 1
+                lane.failures += 1
+                self._settle_probe(lane, now, failed=True)
+            else:
+                lane.failures = 0
+                lane.limit = min(self.max_in_flight, lane.limit + 1)
+                self._settle_probe(lane, now, failed=False)
+            self._release_slot(lane)
+
+    def _settle_probe(self, lane: _Lane, now: float, *, failed: bool) -> None:
+        probing = lane.probing
+        lane.probing = False
+        if failed and (probing or lane.failures >= self.failure_threshold):
+            lane.breaker = "open"
+            lane.opened_at = now
+        elif not failed and lane.breaker != "closed":
+            lane.breaker = "closed"
+            lane.failures = 0
+
+    def _apply_headers(self, lane: _Lane, headers: Mapping[str, str], now: float) -> None:
+        h = {k.lower(): v for k, v in headers.items()}
+        retry_after = parse_retry_after(h)
+        if retry_after is not None:
+            lane.blocked_until = max(lane.blocked_until, now + retry_after)
+        for kind, bucket in (("requests", lane.requests), ("tokens", lane.tokens)):
+            limit = _int_header(h, f"x-ratelimit-limit-{kind}")
+            if limit is not None and limit > 0 and bucket.capacity != limit:
+                bucket.set_limit(float(limit), now)
+            remaining = _int_header(h, f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            if bucket.rate is not None:
+                bucket.level = min(bucket.level, float(remaining))
+            if remaining <= 0:
+                reset = parse_duration(h.get(f"x-ratelimit-reset-{kind}", ""))
+                if reset is not None:
+                    lane.blocked_until = max(lane.blocked_until, now + reset)
+
+    def _release_slot(self, lane: _Lane) -> None:
+        # Caller holds the lock.
+        lane.in_flight -= 1
+        while lane.waiters and lane.in_flight < lane.limit:
+            waiter = lane.waiters.popleft()
+            if waiter.future.cancelled():
+                continue
+            lane.in_flight += 1
+            try:
+                waiter.loop.call_soon_threadsafe(self._deliver, lane, waiter)
+            except RuntimeError:  # the waiter's loop is closed
+                lane.in_flight -= 1
+
+    def _deliver(self, lane: _Lane, waiter: _Waiter) -> None:
+        if waiter.future.done():
+            with self._lock:
+                self._release_slot(lane)
+            return
+        waiter.future.set_result(None)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per-lane state and counters, keyed `"<api key hash>/<model>"`."""
+
+        out: dict[str, Any] = {}
+        with self._lock:
+            now = time.monotonic()
+            for lane in self._lanes.values():
+                lane.requests.refill(now)
+                lane.tokens.refill(now)
+                out[lane.name] = {
+                    "in_flight": lane.in_flight,
+                    "queued": len(lane.waiters),
+                    "concurrency_limit": lane.limit,
+                    "cooldown_s": round(max(0.0, lane.blocked_until - now), 3),
+                    "requests_available": round(lane.requests.level, 1) if lane.requests.rate is not None else None,
+                    "tokens_available": round(lane.tokens.level, 1) if lane.tokens.rate is not None else None,
+                    "breaker": lane.breaker,
+                    "consecutive_failures": lane.failures,
+                    "started": lane.started,
+                    "throttled": lane.throttled,
+                    "failed": lane.failed,
+                    "rejected": lane.rejected,
+                }
+        return out
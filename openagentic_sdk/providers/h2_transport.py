@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import ssl
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Mapping
+
+from .aio_http import _RETRYABLE_HTTP_STATUS, _backoff_seconds, _runtime_http_error
+
+_READ_SIZE = 64 * 1024
+
+
+def _h2_modules() -> Any | None:
+    try:
+        import h2.config  # type: ignore[import-not-found]
+        import h2.connection  # type: ignore[import-not-found]
+        import h2.errors  # type: ignore[import-not-found]
+        import h2.events  # type: ignore[import-not-found]
+        import h2.exceptions  # type: ignore[import-not-found]
+
+        return h2
+    except ImportError:
+        return None
+
+
+def _ssl_context_h2() -> ssl.SSLContext:
+    ctx = ssl.create_default_context()
+    ctx.set_alpn_protocols(["h2"])
+    return ctx
+
+
+class _Stream:
+    __slots__ = ("stream_id", "headers", "chunks", "ended", "error")
+
+    def __init__(self, stream_id: int) -> None:
+        self.stream_id = stream_id
+        self.headers: asyncio.Future[list[tuple[str, str]]] = asyncio.get_running_loop().create_future()
+        self.chunks: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self.ended = False
+        self.error: BaseException | None = None
+
+    def fail(self, exc: BaseException) -> None:
+        if self.ended:
+            return
+        self.ended = True
+        self.error = exc
+        if not self.headers.done():
+            self.headers.set_exception(exc)
+        self.chunks.put_nowait(None)
+
+
+class _H2Connection:
+    """One HTTP/2 connection multiplexing many request streams."""
+
+    def __init__(self, h2: Any, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._h2 = h2
+        self._reader = reader
+        self._writer = writer
+        config = h2.config.H2Configuration(client_side=True, header_encoding="utf-8")
+        self.conn = h2.connection.H2Connection(config=config)
+        self.conn.initiate_connection()
+        self.streams: dict[int, _Stream] = {}
+        self.closed = False
+        self.goaway = False
+        self.last_used = time.monotonic()
+        self._window_changed = asyncio.Event()
+        self._pings: dict[bytes, asyncio.Future[None]] = {}
+        self._flush()
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    @property
+    def available(self) -> bool:
+        return not self.closed and not self.goaway
+
+    @property
+    def capacity(self) -> int:
+        limit = self.conn.remote_settings.max_concurrent_streams
+        return max(0, min(int(limit), 1000) - len(self.streams))
+
+    def _flush(self) -> None:
+        data = self.conn.data_to_send()
+        if data and not self._writer.is_closing():
+            self._writer.write(data)
+
+    async def _drain(self) -> None:
+        self._flush()
+        await self._writer.drain()
+
+    async def _read_loop(self) -> None:
+        ev = self._h2.events
+        try:
+            while True:
+                data = await self._reader.read(_READ_SIZE)
+                if not data:
+                    raise ConnectionError("HTTP/2 connection closed by peer")
+                for event in self.conn.receive_data(data):
+                    stream = self.streams.get(getattr(event, "stream_id", 0) or 0)
+                    if isinstance(event, ev.ResponseReceived):
+                        if stream is not None and not stream.headers.done():
+                            stream.headers.set_result(list(event.headers))
+                    elif isinstance(event, ev.DataReceived):
+                        self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                        if stream is not None and event.data:
+                            stream.chunks.put_nowait(event.data)
+                    elif isinstance(event, ev.StreamEnded):
+                        if stream is not None:
+                            stream.ended = True
+                            stream.chunks.put_nowait(None)
+                            self.streams.pop(event.stream_id, None)
+                    elif isinstance(event, ev.StreamReset):
+                        if stream is not None:
+                            stream.fail(ConnectionError(f"HTTP/2 stream reset by peer (error {event.error_code})"))
+                            self.streams.pop(event.stream_id, None)
+                    elif isinstance(event, ev.WindowUpdated):
+                        self._window_changed.set()
+                    elif isinstance(event, ev.PingAckReceived):
+                        fut = self._pings.pop(bytes(event.ping_data), None)
+                        if fut is not None and not fut.done():
+                            fut.set_result(None)
+                    elif isinstance(event, ev.ConnectionTerminated):
+                        # GOAWAY: streams above last_stream_id were never processed and can be retried.
+                        self.goaway = True
+                        last = event.last_stream_id if event.last_stream_id is not None else 0
+                        for sid, s in list(self.streams.items()):
+                            if sid > last:
+                                s.fail(ConnectionError("HTTP/2 connection is going away"))
+                                self.streams.pop(sid, None)
+                self._flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # noqa: BLE001
+            self._shutdown(e if isinstance(e, ConnectionError) else ConnectionError(str(e) or type(e).__name__))
+
+    def _shutdown(self, exc: BaseException) -> None:
+        self.closed = True
+        for s in self.streams.values():
+            s.fail(exc)
+        self.streams.clear()
+        for fut in self._pings.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        self._pings.clear()
+        self._window_changed.set()
+        try:
+            self._writer.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+    async def ping(self, timeout_s: float) -> bool:
+        """Health check: send PING and wait for the ACK."""
+
+        if not self.available:
+            return False
+        opaque = os.urandom(8)
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._pings[opaque] = fut
+        try:
+            self.conn.ping(opaque)
+            await self._drain()
+            await asyncio.wait_for(fut, timeout=timeout_s)
+            return True
+        except (OSError, asyncio.TimeoutError, self._h2.exceptions.ProtocolError):
+            self._pings.pop(opaque, None)
+            return False
+
+    async def open_stream(self, headers: list[tuple[str, str]], body: bytes) -> _Stream:
+        stream_id = self.conn.get_next_available_stream_id()
+        stream = _Stream(stream_id)
+        self.streams[stream_id] = stream
+        self.last_used = time.monotonic()
+        try:
+            self.conn.send_headers(stream_id, headers, end_stream=not body)
+            view = memoryview(body)
+            while view:
+                window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                if window <= 0:
+                    self._window_changed.clear()
+                    await self._drain()
+                    await self._window_changed.wait()
+                    if stream.ended:
+                        break
+                    continue
+                n = min(window, len(view))
+                self.conn.send_data(stream_id, view[:n].tobytes(), end_stream=n == len(view))
+                view = view[n:]
+            await self._drain()
+        except (OSError, self._h2.exceptions.ProtocolError) as e:
+            self.streams.pop(stream_id, None)
+            if isinstance(e, OSError):
+                self._shutdown(ConnectionError(str(e)))
+            raise ConnectionError(str(e) or type(e).__name__) from e
+        if stream.error is not None:
+            raise stream.error
+        return stream
+
+    def cancel(self, stream: _Stream) -> None:
+        self.last_used = time.monotonic()
+        if stream.ended or self.closed:
+            return
+        stream.ended = True
+        self.streams.pop(stream.stream_id, None)
+        try:
+            self.conn.reset_stream(stream.stream_id, error_code=self._h2.errors.ErrorCodes.CANCEL)
+            self._flush()
+        except self._h2.exceptions.ProtocolError:
+            pass
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self.conn.close_connection()
+            self._flush()
+        except Exception:  # noqa: BLE001
+            pass
+        self._reader_task.cancel()
+        self._shutdown(ConnectionError("HTTP/2 connection closed"))
+
+
+class _H2Pool:
+    def __init__(self, h2: Any, *, scheme: str, host: str, port: int, max_connections: int) -> None:
+        self._h2 = h2
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_connections = max(1, int(max_connections))
+        self.connections: list[_H2Connection] = []
+        self.opened = 0
+        self.streams = 0
+        self._opening = 0
+        self._changed = asyncio.Condition()
+
+    async def _connect(self, timeout_s: float) -> _H2Connection:
+        ctx = _ssl_context_h2() if self.scheme == "https" else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ctx, server_hostname=self.host if ctx else None),
+            timeout=timeout_s,
+        )
+        if ctx is not None:
+            sslobj = writer.get_extra_info("ssl_object")
+            if sslobj is None or sslobj.selected_alpn_protocol() != "h2":
+                writer.close()
+                raise ConnectionError(f"{self.host}:{self.port} did not negotiate HTTP/2 (ALPN)")
+        conn = _H2Connection(self._h2, reader, writer)
+        self.opened += 1
+        return conn
+
+    async def acquire(self, *, timeout_s: float, ping_after_idle_s: float, ping_timeout_s: float) -> _H2Connection:
+        """Pick the least-loaded healthy connection, opening one only when all are full."""
+
+        async with self._changed:
+            while True:
+                self.connections = [c for c in self.connections if not c.closed]
+                live = [c for c in self.connections if c.available and c.capacity > 0]
+                if live:
+                    conn = max(live, key=lambda c: c.capacity)
+                    if not conn.streams and time.monotonic() - conn.last_used >= ping_after_idle_s:
+                        if not await conn.ping(ping_timeout_s):
+                            conn.close()
+                            continue
+                    return conn
+                # One connection at a time: waiters share it once its SETTINGS arrive.
+                if not self._opening and len([c for c in self.connections if c.available]) < self.max_connections:
+                    break
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout_s)
+            self._opening += 1
+        try:
+            conn = await self._connect(timeout_s)
+        except BaseException:
+            async with self._changed:
+                self._opening -= 1
+                self._changed.notify_all()
+            raise
+        async with self._changed:
+            self._opening -= 1
+            self.connections.append(conn)
+            self._changed.notify_all()
+        return conn
+
+    async def release(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    def close(self) -> None:
+        for c in self.connections:
+            c.close()
+        self.connections.clear()
+
+
+@dataclass(slots=True)
+class Http2Transport:
+    """HTTP/2 transport for the providers' `transport` / `stream_transport` hooks.
+
+    Concurrent requests to one origin are multiplexed as streams over at most
+    `max_connections_per_origin` connections (TLS with ALPN `h2`, or cleartext
+    h2c with prior knowledge for `http://`). A connection idle for
+    `ping_after_idle_s` is health-checked with PING before it is reused.
+
+    Requires the optional `h2` package (`pip install openagentic-sdk[http2]`).
+    """
+
+    max_connections_per_origin: int = 2
+    timeout_s: float = 120.0
+    max_retries: int = 2
+    retry_backoff_s: float = 0.5
+    ping_after_idle_s: float = 15.0
+    ping_timeout_s: float = 5.0
+    _h2: Any = field(default=None, init=False, repr=False)
+    _pools: dict[tuple[str, str, int], _H2Pool] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        h2 = _h2_modules()
+        if h2 is None:
+            raise RuntimeError("Http2Transport requires the 'h2' package (pip install openagentic-sdk[http2])")
+        self._h2 = h2
+
+    def pool_stats(self) -> dict[str, dict[str, int]]:
+        """Connections opened and streams sent so far, per origin (`scheme://host:port`)."""
+
+        return {
+            f"{s}://{h}:{p}": {"connections": pool.opened, "streams": pool.streams}
+            for (s, h, p), pool in self._pools.items()
+        }
+
+    def close(self) -> None:
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+
+    async def transport(self, url: str, headers: Mapping[str, str], payload: Mapping[str, Any]) -> Mapping[str, Any]:
+        conn, stream = await self._open_with_retries(url, headers, payload)
+        parts: list[bytes] = []
+        try:
+            async for chunk in self._body(stream):
+                parts.append(chunk)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RuntimeError(f"Request failed to {url}: {e}".strip()) from e
+        finally:
+            conn.cancel(stream)
+            await self._pool_for(url).release()
+        return json.loads(b"".join(parts).decode("utf-8"))
+
+    async def stream_transport(
+        self, url: str, headers: Mapping[str, str], payload: Mapping[str, Any]
+    ) -> AsyncIterator[bytes]:
+        conn, stream = await self._open_with_retries(url, headers, payload)
+        try:
+            async for chunk in self._body(stream):
+                yield chunk
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RuntimeError(f"Request failed to {url}: {e}".strip()) from e
+        finally:
+            conn.cancel(stream)
+            await self._pool_for(url).release()
+
+    def _pool_for(self, url: str) -> _H2Pool:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _H2Pool(
+                self._h2, scheme=scheme, host=parts.hostname, port=port, max_connections=self.max_connections_per_origin
+            )
+        return pool
+
+    async def _open(
+        self, url: str, headers: Mapping[str, str], body: bytes
+    ) -> tuple[_H2Connection, _Stream, int, dict[str, str]]:
+        pool = self._pool_for(url)
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        req_headers = [
+            (":method", "POST"),
+            (":scheme", pool.scheme),
+            (":authority", parts.netloc.rpartition("@")[2]),
+            (":path", target),
+        ]
+        skip = {"host", "connection", "keep-alive", "transfer-encoding", "upgrade", "proxy-connection"}
+        req_headers.extend((k.lower(), str(v)) for k, v in headers.items() if k.lower() not in skip)
+        req_headers.append(("content-length", str(len(body))))
+        conn = await pool.acquire(
+            timeout_s=self.timeout_s, ping_after_idle_s=self.ping_after_idle_s, ping_timeout_s=self.ping_timeout_s
+        )
+        stream = await conn.open_stream(req_headers, body)
+        pool.streams += 1
+        try:
+            resp_headers = await asyncio.wait_for(asyncio.shield(stream.headers), timeout=self.timeout_s)
+        except BaseException:
+            conn.cancel(stream)
+            await pool.release()
+            raise
+        status = 0
+        fields: dict[str, str] = {}
+        for k, v in resp_headers:
+            if k == ":status":
+                status = int(v)
+            else:
+                fields[k] = v
+        return conn, stream, status, fields
+
+    async def _open_with_retries(
+        self, url: str, headers: Mapping[str, str], payload: Mapping[str, Any]
+    ) -> tuple[_H2Connection, _Stream]:
+        data = json.dumps(payload).encode("utf-8")
+        max_retries = max(0, int(self.max_retries))
+        for attempt in range(max_retries + 1):
+            try:
+                conn, stream, status, fields = await self._open(url, headers, data)
+            except (OSError, asyncio.TimeoutError) as e:
+                if attempt < max_retries:
+                    await asyncio.sleep(_backoff_seconds(attempt, self.retry_backoff_s))
+                    continue
+                raise RuntimeError(f"Request failed to {url}: {e}".strip()) from e
+            if 200 <= status < 300:
+                return conn, stream
+            try:
+                body = b"".join([c async for c in self._body(stream)])
+            except (OSError, asyncio.TimeoutError):
+                body = b""
+            finally:
+                conn.cancel(stream)
+                await self._pool_for(url).release()
+            if attempt < max_retries and status in _RETRYABLE_HTTP_STATUS:
+                await asyncio.sleep(_backoff_seconds(attempt, self.retry_backoff_s))
+                continue
+            raise _runtime_http_error(url, status, body, fields)
+        raise RuntimeError(f"Request failed to {url}".strip())  # pragma: no cover
+
+    async def _body(self, stream: _Stream) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await asyncio.wait_for(stream.chunks.get(), timeout=self.timeout_s)
+            if chunk is None:
+                if stream.error is not None:
+                    raise stream.error
+                return
+            yield chunk
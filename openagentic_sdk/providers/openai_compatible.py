@@ -1,27 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import json
 import time
 import urllib.error
 import urllib.request
+from contextlib import aclosing
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable, Mapping, Sequence
-
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
+
+from .aio_http import (
+    _RETRYABLE_HTTP_STATUS,
+    ProviderHttpError,
+    _backoff_seconds,
+    aiter_in_thread,
+    post_json,
+    post_stream,
+    proxy_for,
+)
 from .base import ModelOutput, ToolCall
-from .sse import parse_sse_events
+from .governor import CircuitOpenError, Lease, ProviderGovernor
+from .request_body import RequestBodyEncoder
+from .sse import aiter_sse_events
 from .stream_events import DoneEvent, TextDeltaEvent, ToolCallEvent
 
-Transport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Mapping[str, Any]]
-StreamTransport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Iterable[bytes]]
-
-_RETRYABLE_HTTP_STATUS: set[int] = {408, 409, 425, 429, 500, 502, 503, 504}
-
-
-def _backoff_seconds(attempt_index: int, base: float) -> float:
-    # attempt_index: 0 for first retry, 1 for second retry, ...
-    if attempt_index < 0:
-        return 0.0
-    return max(0.0, base) * (2**attempt_index)
+# Hooks may be sync (as before) or async: a transport can return an awaitable,
+# and a stream transport an async iterable of body chunks.
+Transport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Mapping[str, Any] | Awaitable[Mapping[str, Any]]]
+StreamTransport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Iterable[bytes] | AsyncIterable[bytes]]
 
 
 def _read_http_error_body(e: urllib.error.HTTPError) -> str:
@@ -31,22 +38,23 @@ def _read_http_error_body(e: urllib.error.HTTPError) -> str:
         return ""
 
 
-def _runtime_http_error(url: str, e: urllib.error.HTTPError) -> RuntimeError:
+def _runtime_http_error(url: str, e: urllib.error.HTTPError) -> ProviderHttpError:
     body = _read_http_error_body(e)
     hint = " (transient upstream error; try again)" if int(getattr(e, "code", 0)) in _RETRYABLE_HTTP_STATUS else ""
-    return RuntimeError(f"HTTP {e.code} from {url}{hint}: {body}".strip())
+    headers = dict(e.headers.items()) if e.headers is not None else None
+    return ProviderHttpError(f"HTTP {e.code} from {url}{hint}: {body}".strip(), status=int(e.code), headers=headers)
 
 
 def _default_transport(
     url: str,
     headers: Mapping[str, str],
-    payload: Mapping[str, Any],
+    payload: Mapping[str, Any] | bytes,
     *,
     timeout_s: float,
     max_retries: int = 0,
     retry_backoff_s: float = 0.5,
 ) -> Mapping[str, Any]:
-    data = json.dumps(payload).encode("utf-8")
+    data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
     req = urllib.request.Request(url, data=data, method="POST")
     for k, v in headers.items():
         req.add_header(k, v)
@@ -77,13 +85,13 @@ def _default_transport(
 def _default_stream_transport(
     url: str,
     headers: Mapping[str, str],
-    payload: Mapping[str, Any],
+    payload: Mapping[str, Any] | bytes,
     *,
     timeout_s: float,
     max_retries: int = 0,
     retry_backoff_s: float = 0.5,
 ) -> Iterable[bytes]:
-    data = json.dumps(payload).encode("utf-8")
+    data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
     req = urllib.request.Request(url, data=data, method="POST")
     for k, v in headers.items():
         req.add_header(k, v)
@@ -115,21 +123,206 @@ def _default_stream_transport(
         resp.close()
 
 
-def _iter_lines(chunks: Iterable[bytes]) -> Iterable[bytes]:
-    buf = b""
-    for chunk in chunks:
-        if not chunk:
+async def _post(
+    url: str,
+    headers: Mapping[str, str],
+    payload: Mapping[str, Any] | bytes,
+    *,
+    timeout_s: float,
+    max_retries: int,
+    retry_backoff_s: float,
+    governor: ProviderGovernor | None = None,
+    api_key: str | None = None,
+    model: str | None = None,
+) -> Mapping[str, Any]:
+    """Default transport: native asyncio, or urllib in a worker thread when a proxy is configured."""
+
+    if governor is not None:
+        return await _governed_post(
+            url,
+            headers,
+            payload,
+            timeout_s=timeout_s,
+            max_retries=max_retries,
+            retry_backoff_s=retry_backoff_s,
+            governor=governor,
+            api_key=api_key,
+            model=model,
+        )
+    if proxy_for(url):
+        return await asyncio.to_thread(
+            _default_transport,
+            url,
+            headers,
+            payload,
+            timeout_s=timeout_s,
+            max_retries=max_retries,
+            retry_backoff_s=retry_backoff_s,
+        )
+    return await post_json(url, headers, payload, timeout_s=timeout_s, max_retries=max_retries, retry_backoff_s=retry_backoff_s)
+
+
+def _open_stream(
+    url: str,
+    headers: Mapping[str, str],
+    payload: Mapping[str, Any] | bytes,
+    *,
+    timeout_s: float,
+    max_retries: int,
+    retry_backoff_s: float,
+    governor: ProviderGovernor | None = None,
+    api_key: str | None = None,
+    model: str | None = None,
+) -> AsyncIterator[bytes]:
+    """Default stream transport; same proxy fallback as `_post`."""
+
+    if governor is not None:
+        return _governed_stream(
+            url,
+            headers,
+            payload,
+            timeout_s=timeout_s,
+            max_retries=max_retries,
+            retry_backoff_s=retry_backoff_s,
+            governor=governor,
+            api_key=api_key,
+            model=model,
+        )
+    if proxy_for(url):
+        return aiter_in_thread(
+            _default_stream_transport(
+                url,
+                headers,
+                payload,
+                timeout_s=timeout_s,
+                max_retries=max_retries,
+                retry_backoff_s=retry_backoff_s,
+            )
+        )
+    return post_stream(url, headers, payload, timeout_s=timeout_s, max_retries=max_retries, retry_backoff_s=retry_backoff_s)
+
+
+def _estimated_tokens(governor: ProviderGovernor, payload: Mapping[str, Any] | bytes) -> int:
+    if governor.tokens_per_minute is None:
+        return 0
+    size = len(payload) if isinstance(payload, bytes) else len(json.dumps(payload))
+    return size // 4  # rough chars-per-token; corrected by x-ratelimit-remaining-tokens
+
+
+def _should_retry(e: RuntimeError, lease: Lease, attempt: int, max_retries: int) -> bool:
+    # The governor decides when: a 429 holds the whole lane until its cooldown ends.
+    if isinstance(e, CircuitOpenError) or attempt >= max_retries:
+        return False
+    return lease.status is None or lease.status in _RETRYABLE_HTTP_STATUS
+
+
+def _attempt_failed(e: RuntimeError, lease: Lease) -> None:
+    if isinstance(e, ProviderHttpError):
+        lease.observe(e.status, e.headers)
+    lease.release(error=not isinstance(e, ProviderHttpError))
+
+
+async def _governed_post(
+    url: str,
+    headers: Mapping[str, str],
+    payload: Mapping[str, Any] | bytes,
+    *,
+    timeout_s: float,
+    max_retries: int,
+    retry_backoff_s: float,
+    governor: ProviderGovernor,
+    api_key: str | None,
+    model: str | None,
+) -> Mapping[str, Any]:
+    """`_post` with every attempt admitted by the governor; retries are driven here, one attempt per lease."""
+
+    tokens = _estimated_tokens(governor, payload)
+    max_retries = max(0, int(max_retries))
+    for attempt in range(max_retries + 1):
+        lease = await governor.acquire(api_key, model, tokens=tokens)
+        try:
+            if proxy_for(url):
+                obj = await asyncio.to_thread(_default_transport, url, headers, payload, timeout_s=timeout_s)
+            else:
+                obj = await post_json(url, headers, payload, timeout_s=timeout_s, on_response=lease.observe)
+        except RuntimeError as e:
+            _attempt_failed(e, lease)
+            if not _should_retry(e, lease, attempt, max_retries):
+                raise
+            if lease.status != 429:
+                await asyncio.sleep(_backoff_seconds(attempt, retry_backoff_s))
+            continue
+        except BaseException:
+            lease.release(error=True)
+            raise
+        lease.release()
+        return obj
+    raise RuntimeError(f"Request failed to {url}".strip())  # pragma: no cover
+
+
+async def _governed_stream(
+    url: str,
+    headers: Mapping[str, str],
+    payload: Mapping[str, Any] | bytes,
+    *,
+    timeout_s: float,
+    max_retries: int,
+    retry_backoff_s: float,
+    governor: ProviderGovernor,
+    api_key: str | None,
+    model: str | None,
+) -> AsyncIterator[bytes]:
+    """`_open_stream` under the governor.
+
+    The lease is held until the body is done; only the request (up to the
+    first chunk) is retried.
+    """
+
+    tokens = _estimated_tokens(governor, payload)
+    max_retries = max(0, int(max_retries))
+    for attempt in range(max_retries + 1):
+        lease = await governor.acquire(api_key, model, tokens=tokens)
+        if proxy_for(url):
+            source = aiter_in_thread(_default_stream_transport(url, headers, payload, timeout_s=timeout_s))
+        else:
+            source = post_stream(url, headers, payload, timeout_s=timeout_s, on_response=lease.observe)
+        try:
+            first = await source.__anext__()
+        except StopAsyncIteration:
+            first = b""
+        except RuntimeError as e:
+            await source.aclose()
+            _attempt_failed(e, lease)
+            if not _should_retry(e, lease, attempt, max_retries):
+                raise
+            if lease.status != 429:
+                await asyncio.sleep(_backoff_seconds(attempt, retry_backoff_s))
             continue
-        buf += chunk
-        while True:
-            idx = buf.find(b"\n")
-            if idx < 0:
-                break
-            line = buf[: idx + 1]
-            buf = buf[idx + 1 :]
-            yield line
-    if buf:
-        yield buf
+        except BaseException:
+            await source.aclose()
+            lease.release(error=True)
+            raise
+        failed = True
+        try:
+            if first:
+                yield first
+            async for chunk in source:
+                yield chunk
+            failed = False
+        except (GeneratorExit, asyncio.CancelledError):
+            failed = False  # the consumer stopped early (e.g. after the final event)
+            raise
+        finally:
+            await source.aclose()
+            lease.release(error=failed)
+        return
+
+
+async def _call_transport(transport: Transport, url: str, headers: Mapping[str, str], payload: Mapping[str, Any]) -> Mapping[str, Any]:
+    obj = transport(url, headers, payload)
+    if inspect.isawaitable(obj):
+        obj = await obj
+    return obj
 
 
 def _parse_tool_call(item: Mapping[str, Any]) -> ToolCall | None:
@@ -183,6 +376,8 @@ class OpenAICompatibleProvider:
     retry_backoff_s: float = 0.5
     transport: Transport | None = None
     stream_transport: StreamTransport | None = None
+    # Shared rate/concurrency/failure control for the default transports.
+    governor: ProviderGovernor | None = None
 
     async def complete(
         self,
@@ -195,6 +390,7 @@ class OpenAICompatibleProvider:
         previous_response_id: str | None = None,
         store: bool = True,
         include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
     ) -> ModelOutput:
         if not api_key:
             raise ValueError("OpenAICompatibleProvider: api_key is required")
@@ -217,16 +413,19 @@ class OpenAICompatibleProvider:
             payload["tools"] = list(tools)
 
         if self.transport is None:
-            obj = _default_transport(
+            obj = await _post(
                 url,
                 headers,
-                payload,
+                body_encoder.encode(payload) if body_encoder is not None else payload,
                 timeout_s=self.timeout_s,
                 max_retries=self.max_retries,
                 retry_backoff_s=self.retry_backoff_s,
+                governor=self.governor,
+                api_key=api_key,
+                model=model,
             )
         else:
-            obj = self.transport(url, headers, payload)
+            obj = await _call_transport(self.transport, url, headers, payload)
         output = obj.get("output")
         output_items: list[Mapping[str, Any]] = [x for x in (output or []) if isinstance(x, dict)]
 
@@ -257,6 +456,7 @@ class OpenAICompatibleProvider:
         previous_response_id: str | None = None,
         store: bool = True,
         include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
     ):
         if not api_key:
             raise ValueError("OpenAICompatibleProvider: api_key is required")
@@ -284,74 +484,75 @@ class OpenAICompatibleProvider:
             payload["tools"] = list(tools)
 
         if self.stream_transport is None:
-            chunks = _default_stream_transport(
+            chunks: Iterable[bytes] | AsyncIterable[bytes] = _open_stream(
                 url,
                 headers,
-                payload,
+                body_encoder.encode(payload) if body_encoder is not None else payload,
                 timeout_s=self.timeout_s,
                 max_retries=self.max_retries,
                 retry_backoff_s=self.retry_backoff_s,
+                governor=self.governor,
+                api_key=api_key,
+                model=model,
             )
         else:
             chunks = self.stream_transport(url, headers, payload)
 
         ongoing: dict[int, dict[str, Any]] = {}
-        for data in parse_sse_events(_iter_lines(chunks)):
-            if data.strip() == "[DONE]":
-                yield DoneEvent()
-                return
-            try:
-                obj = json.loads(data)
-            except json.JSONDecodeError:
-                continue
-            if not isinstance(obj, dict):
-                continue
-            typ = obj.get("type")
-            if not isinstance(typ, str):
-                continue
-
-            if typ == "response.output_text.delta":
-                delta = obj.get("delta")
-                if isinstance(delta, str) and delta:
-                    yield TextDeltaEvent(delta=delta)
-                continue
-
-            if typ == "response.output_item.added":
-                output_index = obj.get("output_index")
-                item = obj.get("item")
-                if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
-                    call_id = item.get("call_id")
-                    name = item.get("name")
-                    if isinstance(call_id, str) and call_id and isinstance(name, str) and name:
-                        ongoing[output_index] = {"call_id": call_id, "name": name, "arguments": ""}
-                continue
-
-            if typ == "response.function_call_arguments.delta":
-                output_index = obj.get("output_index")
-                delta = obj.get("delta")
-                if isinstance(output_index, int) and isinstance(delta, str) and output_index in ongoing:
-                    ongoing[output_index]["arguments"] += delta
-                continue
-
-            if typ == "response.output_item.done":
-                output_index = obj.get("output_index")
-                item = obj.get("item")
-                if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
-                    st = ongoing.get(output_index) or {}
-                    tc = _parse_tool_call(
-                        {
-                            "call_id": st.get("call_id") or item.get("call_id"),
-                            "name": st.get("name") or item.get("name"),
-                            "arguments": st.get("arguments") or item.get("arguments") or "",
-                        }
-                    )
-                    if tc is not None:
-                        yield ToolCallEvent(tool_call=tc)
-                    ongoing.pop(output_index, None)
-                continue
-
-            if typ in ("response.completed", "response.incomplete"):
-                yield DoneEvent()
-                return
+        async with aclosing(aiter_sse_events(chunks)) as events:
+            async for sse in events:
+                if sse.data.strip() == "[DONE]":
+                    yield DoneEvent()
+                    return
+                obj = sse.json()
+                if not isinstance(obj, dict):
+                    continue
+                typ = obj.get("type")
+                if not isinstance(typ, str):
+                    continue
+
+                if typ == "response.output_text.delta":
+                    delta = obj.get("delta")
+                    if isinstance(delta, str) and delta:
+                        yield TextDeltaEvent(delta=delta)
+                    continue
+
+                if typ == "response.output_item.added":
+                    output_index = obj.get("output_index")
+                    item = obj.get("item")
+                    if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
+                        call_id = item.get("call_id")
+                        name = item.get("name")
+                        if isinstance(call_id, str) and call_id and isinstance(name, str) and name:
+                            ongoing[output_index] = {"call_id": call_id, "name": name, "arguments": ""}
+                    continue
+
+                if typ == "response.function_call_arguments.delta":
+                    output_index = obj.get("output_index")
+                    delta = obj.get("delta")
+                    if isinstance(output_index, int) and isinstance(delta, str) and output_index in ongoing:
+                        ongoing[output_index]["arguments"] += delta
+                    continue
+
+                if typ == "response.output_item.done":
+                    output_index = obj.get("output_index")
+                    item = obj.get("item")
+                    if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
+                        st = ongoing.get(output_index) or {}
+                        tc = _parse_tool_call(
+                            {
+                                "call_id": st.get("call_id") or item.get("call_id"),
+                                "name": st.get("name") or item.get("name"),
+                                "arguments": st.get("arguments") or item.get("arguments") or "",
+                            }
+                        )
+                        if tc is not None:
+                            yield ToolCallEvent(tool_call=tc)
+                        ongoing.pop(output_index, None)
+                    continue
+
+                if typ in ("response.completed", "response.incomplete"):
+                    yield DoneEvent()
+                    return
 
         yield DoneEvent()
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import json
+from contextlib import aclosing
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable, Mapping, Sequence
+from typing import Any, AsyncIterable, Iterable, Mapping, Sequence
 
 from .base import ModelOutput, ToolCall
-from .openai_compatible import _default_stream_transport, _default_transport  # noqa: PLC2701
-from .sse import parse_sse_events
+from .governor import ProviderGovernor
+from .openai_compatible import (  # noqa: PLC2701
+    StreamTransport,
+    Transport,
+    _call_transport,
+    _open_stream,
+    _post,
+)
+from .request_body import RequestBodyEncoder
+from .sse import aiter_sse_events
 from .stream_events import DoneEvent, TextDeltaEvent, ToolCallEvent
 
-Transport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Mapping[str, Any]]
-StreamTransport = Callable[[str, Mapping[str, str], Mapping[str, Any]], Iterable[bytes]]
-
 
 def _build_headers(*, api_key_header: str, api_key: str) -> dict[str, str]:
     headers = {"content-type": "application/json"}
@@ -63,23 +69,6 @@ def _parse_assistant_text(output_items: Sequence[Mapping[str, Any]]) -> str | No
     return "".join(parts)
 
 
-def _iter_lines(chunks: Iterable[bytes]) -> Iterable[bytes]:
-    buf = b""
-    for chunk in chunks:
-        if not chunk:
-            continue
-        buf += chunk
-        while True:
-            idx = buf.find(b"\n")
-            if idx < 0:
-                break
-            line = buf[: idx + 1]
-            buf = buf[idx + 1 :]
-            yield line
-    if buf:
-        yield buf
-
-
 @dataclass(frozen=True, slots=True)
 class OpenAIResponsesProvider:
     name: str = "openai-responses"
@@ -90,6 +79,8 @@ class OpenAIResponsesProvider:
     retry_backoff_s: float = 0.5
     transport: Transport | None = None
     stream_transport: StreamTransport | None = None
+    # Shared rate/concurrency/failure control for the default transports.
+    governor: ProviderGovernor | None = None
 
     async def complete(
         self,
@@ -102,6 +93,7 @@ class OpenAIResponsesProvider:
         previous_response_id: str | None = None,
         store: bool = True,
         include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
     ) -> ModelOutput:
         if not api_key:
             raise ValueError("OpenAIResponsesProvider: api_key is required")
@@ -120,16 +112,19 @@ class OpenAIResponsesProvider:
             payload["tools"] = list(tools)
 
         if self.transport is None:
-            obj = _default_transport(
+            obj = await _post(
                 url,
                 headers,
-                payload,
+                body_encoder.encode(payload) if body_encoder is not None else payload,
                 timeout_s=self.timeout_s,
                 max_retries=self.max_retries,
                 retry_backoff_s=self.retry_backoff_s,
+                governor=self.governor,
+                api_key=api_key,
+                model=model,
             )
         else:
-            obj = self.transport(url, headers, payload)
+            obj = await _call_transport(self.transport, url, headers, payload)
 
         output = obj.get("output")
         output_items: list[Mapping[str, Any]] = [x for x in (output or []) if isinstance(x, dict)]
@@ -165,6 +160,7 @@ class OpenAIResponsesProvider:
         previous_response_id: str | None = None,
         store: bool = True,
         include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
     ):
         if not api_key:
             raise ValueError("OpenAIResponsesProvider: api_key is required")
@@ -183,13 +179,16 @@ class OpenAIResponsesProvider:
             payload["tools"] = list(tools)
 
         if self.stream_transport is None:
-            chunks = _default_stream_transport(
+            chunks: Iterable[bytes] | AsyncIterable[bytes] = _open_stream(
                 url,
                 headers,
-                payload,
+                body_encoder.encode(payload) if body_encoder is not None else payload,
                 timeout_s=self.timeout_s,
                 max_retries=self.max_retries,
                 retry_backoff_s=self.retry_backoff_s,
+                governor=self.governor,
+                api_key=api_key,
+                model=model,
             )
         else:
             chunks = self.stream_transport(url, headers, payload)
@@ -197,83 +196,81 @@ class OpenAIResponsesProvider:
         response_id: str | None = None
         usage: Mapping[str, Any] | None = None
         ongoing: dict[int, dict[str, Any]] = {}
-        for data in parse_sse_events(_iter_lines(chunks)):
-            if data.strip() == "[DONE]":
-                yield DoneEvent(response_id=response_id, usage=usage)
-                return
-            try:
-                obj = json.loads(data)
-            except json.JSONDecodeError:
-                continue
-            if not isinstance(obj, dict):
-                continue
-            typ = obj.get("type")
-            if not isinstance(typ, str):
-                continue
-
-            # Some gateways include `response_id` on every event (and may omit `response.created`).
-            rid0 = obj.get("response_id")
-            if isinstance(rid0, str) and rid0:
-                response_id = rid0
-
-            if typ == "response.created":
-                resp = obj.get("response")
-                if isinstance(resp, dict):
-                    rid = resp.get("id")
-                    if isinstance(rid, str) and rid:
-                        response_id = rid
-                continue
-
-            if typ == "response.output_text.delta":
-                delta = obj.get("delta")
-                if isinstance(delta, str) and delta:
-                    yield TextDeltaEvent(delta=delta)
-                continue
-
-            if typ == "response.output_item.added":
-                output_index = obj.get("output_index")
-                item = obj.get("item")
-                if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
-                    call_id = item.get("call_id")
-                    name = item.get("name")
-                    if isinstance(call_id, str) and call_id and isinstance(name, str) and name:
-                        ongoing[output_index] = {"call_id": call_id, "name": name, "arguments": ""}
-                continue
-
-            if typ == "response.function_call_arguments.delta":
-                output_index = obj.get("output_index")
-                delta = obj.get("delta")
-                if isinstance(output_index, int) and isinstance(delta, str) and output_index in ongoing:
-                    ongoing[output_index]["arguments"] += delta
-                continue
-
-            if typ == "response.output_item.done":
-                output_index = obj.get("output_index")
-                item = obj.get("item")
-                if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
-                    st = ongoing.get(output_index) or {}
-                    tc = _parse_tool_call(
-                        {
-                            "call_id": st.get("call_id") or item.get("call_id"),
-                            "name": st.get("name") or item.get("name"),
-                            "arguments": st.get("arguments") or item.get("arguments") or "",
-                        }
-                    )
-                    if tc is not None:
-                        yield ToolCallEvent(tool_call=tc)
-                    ongoing.pop(output_index, None)
-                continue
-
-            if typ in ("response.completed", "response.incomplete"):
-                resp = obj.get("response")
-                if isinstance(resp, dict):
-                    rid = resp.get("id")
-                    if isinstance(rid, str) and rid:
-                        response_id = rid
-                    u = resp.get("usage")
-                    if isinstance(u, dict):
-                        usage = u
-                yield DoneEvent(response_id=response_id, usage=usage)
-                return
+        async with aclosing(aiter_sse_events(chunks)) as events:
+            async for sse in events:
+                if sse.data.strip() == "[DONE]":
+                    yield DoneEvent(response_id=response_id, usage=usage)
+                    return
+                obj = sse.json()
+                if not isinstance(obj, dict):
+                    continue
+                typ = obj.get("type")
+                if not isinstance(typ, str):
+                    continue
+
+                # Some gateways include `response_id` on every event (and may omit `response.created`).
+                rid0 = obj.get("response_id")
+                if isinstance(rid0, str) and rid0:
+                    response_id = rid0
+
+                if typ == "response.created":
+                    resp = obj.get("response")
+                    if isinstance(resp, dict):
+                        rid = resp.get("id")
+                        if isinstance(rid, str) and rid:
+                            response_id = rid
+                    continue
+
+                if typ == "response.output_text.delta":
+                    delta = obj.get("delta")
+                    if isinstance(delta, str) and delta:
+                        yield TextDeltaEvent(delta=delta)
+                    continue
+
+                if typ == "response.output_item.added":
+                    output_index = obj.get("output_index")
+                    item = obj.get("item")
+                    if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
+                        call_id = item.get("call_id")
+                        name = item.get("name")
+                        if isinstance(call_id, str) and call_id and isinstance(name, str) and name:
+                            ongoing[output_index] = {"call_id": call_id, "name": name, "arguments": ""}
+                    continue
+
+                if typ == "response.function_call_arguments.delta":
+                    output_index = obj.get("output_index")
+                    delta = obj.get("delta")
+                    if isinstance(output_index, int) and isinstance(delta, str) and output_index in ongoing:
+                        ongoing[output_index]["arguments"] += delta
+                    continue
+
+                if typ == "response.output_item.done":
+                    output_index = obj.get("output_index")
+                    item = obj.get("item")
+                    if isinstance(output_index, int) and isinstance(item, dict) and item.get("type") == "function_call":
+                        st = ongoing.get(output_index) or {}
+                        tc = _parse_tool_call(
+                            {
+                                "call_id": st.get("call_id") or item.get("call_id"),
+                                "name": st.get("name") or item.get("name"),
+                                "arguments": st.get("arguments") or item.get("arguments") or "",
+                            }
+                        )
+                        if tc is not None:
+                            yield ToolCallEvent(tool_call=tc)
+                        ongoing.pop(output_index, None)
+                    continue
+
+                if typ in ("response.completed", "response.incomplete"):
+                    resp = obj.get("response")
+                    if isinstance(resp, dict):
+                        rid = resp.get("id")
+                        if isinstance(rid, str) and rid:
+                            response_id = rid
+                        u = resp.get("usage")
+                        if isinstance(u, dict):
+                            usage = u
+                    yield DoneEvent(response_id=response_id, usage=usage)
+                    return
 
         yield DoneEvent(response_id=response_id, usage=usage)
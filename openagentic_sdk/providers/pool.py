@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Mapping, Sequence
+
+from .aio_http import _RETRYABLE_HTTP_STATUS, ProviderHttpError
+from .base import ModelOutput, ToolCall
+from .request_body import RequestBodyEncoder
+from .stream_events import DoneEvent, StreamEvent, TextDeltaEvent, ToolCallEvent
+
+
+def _supported_kwargs(fn: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return kwargs
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in params.values()):
+        return kwargs
+    return {k: v for k, v in kwargs.items() if k in params}
+
+
+def _event_get(ev: Any, key: str) -> Any:
+    # Providers yield the stream_events dataclasses or plain dicts; the runtime accepts both.
+    return ev.get(key) if isinstance(ev, Mapping) else getattr(ev, key, None)
+
+
+def _output_items(text: str | None, tool_calls: Sequence[ToolCall]) -> list[dict[str, Any]]:
+    # Same shape the runtime uses when it rebuilds Responses history itself.
+    items: list[dict[str, Any]] = []
+    if text:
+        items.append({"role": "assistant", "content": text})
+    for tc in tool_calls:
+        items.append(
+            {
+                "type": "function_call",
+                "call_id": tc.tool_use_id,
+                "name": tc.name,
+                "arguments": json.dumps(tc.arguments, ensure_ascii=False),
+            }
+        )
+    return items
+
+
+def _events_from_output(out: ModelOutput) -> list[StreamEvent]:
+    events: list[StreamEvent] = []
+    if out.assistant_text:
+        events.append(TextDeltaEvent(delta=out.assistant_text))
+    events.extend(ToolCallEvent(tool_call=tc) for tc in out.tool_calls)
+    events.append(DoneEvent(response_id=out.response_id, usage=out.usage))
+    return events
+
+
+@dataclass(slots=True)
+class _Endpoint:
+    provider: Any
+    label: str
+    # EWMA of seconds to the first output (first stream event, or the whole `complete()`).
+    ttft_s: float | None = None
+    # EWMA of the failure rate, decayed towards 0 while the endpoint is not used.
+    error_rate: float = 0.0
+    error_at: float = 0.0
+    calls: int = 0
+    failures: int = 0
+    hedges: int = 0
+    failovers: int = 0
+    wins: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class _Thread:
+    """Where a response lives, and the conversation it continued (to replay elsewhere)."""
+
+    endpoint: _Endpoint
+    parent: _Thread | None
+    items: tuple[Mapping[str, Any], ...]
+    # False when the chain starts at a response the pool did not see.
+    replayable: bool = True
+
+    def history(self) -> list[Mapping[str, Any]]:
+        chain: list[tuple[Mapping[str, Any], ...]] = []
+        node: _Thread | None = self
+        while node is not None:
+            chain.append(node.items)
+            node = node.parent
+        return [item for items in reversed(chain) for item in items]
+
+
+@dataclass(frozen=True, slots=True)
+class _Plan:
+    endpoint: _Endpoint
+    request: dict[str, Any]
+    # The thread the request continues: `previous_response_id` on the pinned
+    # endpoint, or the replayed history on any other.
+    thread: _Thread | None
+    kind: str = "route"
+
+
+@dataclass(slots=True)
+class _Outcome:
+    plan: _Plan
+    value: Any
+    started: float = 0.0
+
+
+class ProviderPool:
+    """A Responses-style provider spread over several endpoints.
+
+    Each call goes to the endpoint with the best score. The score combines an
+    EWMA of time to first token with an EWMA error rate that decays while the
+    endpoint is idle.
+
+    - If the first output has not arrived after `hedge_after_s`, the same
+      request is also sent to the next endpoint. The first one to answer wins,
+      and the other is cancelled.
+    - A transport error, a retryable HTTP status or an open circuit before
+      any output fails over to the next endpoint.
+
+    `previous_response_id` threading is pinned to the endpoint that created
+    the response, since other endpoints do not know its id. The pool remembers
+    the input and output of every response it returned, up to `max_threads`.
+    This lets a threaded call that has to leave its endpoint be replayed there
+    as full history, without `previous_response_id`. The replayed response is
+    then pinned to its new endpoint.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Any],
+        *,
+        name: str | None = None,
+        hedge_after_s: float | None = None,
+        ewma_alpha: float = 0.3,
+        error_half_life_s: float = 30.0,
+        max_threads: int = 4096,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("ProviderPool: at least one endpoint is required")
+        self.name = name or str(getattr(endpoints[0], "name", "provider-pool"))
+        self.hedge_after_s = hedge_after_s
+        self.ewma_alpha = min(1.0, max(0.01, float(ewma_alpha)))
+        self.error_half_life_s = max(0.001, float(error_half_life_s))
+        self.max_threads = max(1, int(max_threads))
+        self._endpoints: list[_Endpoint] = []
+        for i, p in enumerate(endpoints):
+            label = str(getattr(p, "base_url", None) or getattr(p, "name", None) or "endpoint")
+            self._endpoints.append(_Endpoint(provider=p, label=f"{i}:{label}"))
+        self._threads: OrderedDict[str, _Thread] = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- routing ---------------------------------------------------------
+
+    def _error_rate(self, ep: _Endpoint, now: float) -> float:
+        return ep.error_rate * 0.5 ** ((now - ep.error_at) / self.error_half_life_s)
+
+    def _score(self, ep: _Endpoint, now: float) -> float:
+        # Unmeasured endpoints score 0, so every endpoint gets tried early.
+        return (ep.ttft_s or 0.0) / max(0.05, 1.0 - self._error_rate(ep, now))
+
+    def _ranked(self) -> list[_Endpoint]:
+        with self._lock:
+            now = time.monotonic()
+            return sorted(self._endpoints, key=lambda ep: self._score(ep, now))
+
+    def _record(self, ep: _Endpoint, *, ok: bool, ttft_s: float | None = None) -> None:
+        a = self.ewma_alpha
+        with self._lock:
+            now = time.monotonic()
+            ep.calls += 1
+            if not ok:
+                ep.failures += 1
+            ep.error_rate = self._error_rate(ep, now) * (1 - a) + (0.0 if ok else a)
+            ep.error_at = now
+            if ttft_s is not None:
+                ep.ttft_s = ttft_s if ep.ttft_s is None else ep.ttft_s * (1 - a) + ttft_s * a
+
+    def _plans(self, request: dict[str, Any]) -> list[_Plan]:
+        prev = request.get("previous_response_id")
+        ranked = self._ranked()
+        if not prev:
+            return [_Plan(endpoint=ep, request=request, thread=None) for ep in ranked]
+        with self._lock:
+            thread = self._threads.get(prev)
+            if thread is not None:
+                self._threads.move_to_end(prev)
+        if thread is None:
+            # Not created through this pool (or forgotten): route as usual and let the endpoint decide.
+            return [_Plan(endpoint=ep, request=request, thread=None) for ep in ranked]
+        plans = [_Plan(endpoint=thread.endpoint, request=request, thread=thread)]
+        if not thread.replayable:
+            return plans
+        replay = {**request, "input": [*thread.history(), *request["input"]], "previous_response_id": None}
+        for ep in ranked:
+            if ep is not thread.endpoint:
+                plans.append(_Plan(endpoint=ep, request=replay, thread=thread, kind="replay"))
+        return plans
+
+    def _remember(self, plan: _Plan, response_id: str | None, output: list[dict[str, Any]]) -> None:
+        if not response_id or not plan.request.get("store", True):
+            return
+        parent = plan.thread if plan.kind == "route" else None
+        if parent is not None:
+            replayable = parent.replayable
+        else:
+            replayable = plan.kind == "replay" or not plan.request.get("previous_response_id")
+        node = _Thread(
+            endpoint=plan.endpoint,
+            parent=parent,
+            items=(*plan.request["input"], *output),
+            replayable=replayable,
+        )
+        with self._lock:
+            self._threads[response_id] = node
+            self._threads.move_to_end(response_id)
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+
+    @staticmethod
+    def _can_fail_over(e: BaseException, plan: _Plan) -> bool:
+        if isinstance(e, ProviderHttpError):
+            # A pinned endpoint that lost the response can still be replayed elsewhere.
+            return e.status in _RETRYABLE_HTTP_STATUS or (e.status == 404 and plan.thread is not None)
+        return isinstance(e, (RuntimeError, OSError, asyncio.TimeoutError))
+
+    async def _race(
+        self,
+        plans: list[_Plan],
+        start: Callable[[_Plan], Awaitable[Any]],
+        discard: Callable[[Any], Awaitable[None]],
+    ) -> _Outcome:
+        queue = list(plans)
+        pending: dict[asyncio.Task[Any], _Outcome] = {}
+        hedges_left = 1 if self.hedge_after_s is not None else 0
+        last_error: BaseException | None = None
+
+        def launch(kind: str | None = None) -> None:
+            plan = queue.pop(0)
+            with self._lock:
+                if kind == "hedge":
+                    plan.endpoint.hedges += 1
+                elif kind == "failover":
+                    plan.endpoint.failovers += 1
+            pending[asyncio.ensure_future(start(plan))] = _Outcome(plan=plan, value=None, started=time.monotonic())
+
+        launch()
+        try:
+            while pending:
+                hedge = hedges_left > 0 and bool(queue) and len(pending) == 1
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_after_s if hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedges_left -= 1
+                    launch("hedge")
+                    continue
+                winner: _Outcome | None = None
+                for task in done:
+                    outcome = pending.pop(task)
+                    try:
+                        value = task.result()
+                    except Exception as e:
+                        self._record(outcome.plan.endpoint, ok=False)
+                        if not self._can_fail_over(e, outcome.plan):
+                            raise
+                        last_error = e
+                        continue
+                    if winner is not None:
+                        await discard(value)
+                        continue
+                    self._record(outcome.plan.endpoint, ok=True, ttft_s=time.monotonic() - outcome.started)
+                    outcome.value = value
+                    winner = outcome
+                if winner is not None:
+                    winner.plan.endpoint.wins += 1
+                    return winner
+                if not pending and queue:
+                    launch("failover")
+            assert last_error is not None
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            for task in pending:
+                try:
+                    await task
+                except BaseException:
+                    continue
+                await discard(task.result())
+
+    # --- provider surface ------------------------------------------------
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        input: Sequence[Mapping[str, Any]],
+        instructions: str | None = None,
+        tools: Sequence[Mapping[str, Any]] = (),
+        api_key: str | None = None,
+        previous_response_id: str | None = None,
+        store: bool = True,
+        include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
+    ) -> ModelOutput:
+        request = {
+            "model": model,
+            "input": list(input),
+            "instructions": instructions,
+            "tools": tools,
+            "api_key": api_key,
+            "previous_response_id": previous_response_id,
+            "store": store,
+            "include": include,
+            "body_encoder": body_encoder,
+        }
+
+        async def start(plan: _Plan) -> ModelOutput:
+            fn = plan.endpoint.provider.complete
+            return await fn(**_supported_kwargs(fn, plan.request))
+
+        async def discard(_: Any) -> None:
+            return None
+
+        won = await self._race(self._plans(request), start, discard)
+        out: ModelOutput = won.value
+        self._remember(won.plan, out.response_id, _output_items(out.assistant_text, out.tool_calls))
+        return out
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        input: Sequence[Mapping[str, Any]],
+        instructions: str | None = None,
+        tools: Sequence[Mapping[str, Any]] = (),
+        api_key: str | None = None,
+        previous_response_id: str | None = None,
+        store: bool = True,
+        include: Sequence[str] = (),
+        body_encoder: RequestBodyEncoder | None = None,
+    ) -> AsyncIterator[StreamEvent]:
+        request = {
+            "model": model,
+            "input": list(input),
+            "instructions": instructions,
+            "tools": tools,
+            "api_key": api_key,
+            "previous_response_id": previous_response_id,
+            "store": store,
+            "include": include,
+            "body_encoder": body_encoder,
+        }
+
+        async def start(plan: _Plan) -> tuple[AsyncIterator[Any], Any]:
+            provider = plan.endpoint.provider
+            if not hasattr(provider, "stream"):
+                out = await provider.complete(**_supported_kwargs(provider.complete, plan.request))
+                events = iter(_events_from_output(out))
+                return _aiter(events), next(events)
+            agen = provider.stream(**_supported_kwargs(provider.stream, plan.request))
+            try:
+                first = await agen.__anext__()
+            except BaseException:
+                await _aclose(agen)
+                raise
+            return agen, first
+
+        async def discard(value: Any) -> None:
+            await _aclose(value[0])
+
+        won = await self._race(self._plans(request), start, discard)
+        # Past the first event the caller has seen output, so errors propagate as-is.
+        agen, first = won.value
+        parts: list[str] = []
+        tool_calls: list[ToolCall] = []
+        try:
+            ev = first
+            while True:
+                typ = _event_get(ev, "type")
+                if typ == "text_delta":
+                    delta = _event_get(ev, "delta")
+                    if isinstance(delta, str):
+                        parts.append(delta)
+                elif typ == "tool_call":
+                    tc = _event_get(ev, "tool_call")
+                    if isinstance(tc, ToolCall):
+                        tool_calls.append(tc)
+                elif typ == "done":
+                    # The runtime stops reading at `done`, so remember the response first.
+                    rid = _event_get(ev, "response_id")
+                    self._remember(won.plan, rid if isinstance(rid, str) else None, _output_items("".join(parts), tool_calls))
+                yield ev
+                try:
+                    ev = await agen.__anext__()
+                except StopAsyncIteration:
+                    return
+        finally:
+            await _aclose(agen)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per-endpoint routing state and counters, in routing order."""
+
+        out: dict[str, Any] = {}
+        with self._lock:
+            now = time.monotonic()
+            ranked = sorted(self._endpoints, key=lambda ep: self._score(ep, now))
+            for ep in ranked:
+                stats: dict[str, Any] = {
+                    "ttft_s": round(ep.ttft_s, 3) if ep.ttft_s is not None else None,
+                    "error_rate": round(self._error_rate(ep, now), 3),
+                    "calls": ep.calls,
+                    "failures": ep.failures,
+                    "wins": ep.wins,
+                    "hedges": ep.hedges,
+                    "failovers": ep.failovers,
+                }
+                governor = getattr(ep.provider, "governor", None)
+                if governor is not None:
+                    stats["governor"] = governor.snapshot()
+                out[ep.label] = stats
+            out_threads = len(self._threads)
+        return {"endpoints": out, "threads": out_threads}
+
+
+async def _aiter(events: Any) -> AsyncIterator[Any]:
+    for ev in events:
+        yield ev
+
+
+async def _aclose(agen: Any) -> None:
+    aclose = getattr(agen, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
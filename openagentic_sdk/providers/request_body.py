@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+from ..serialization import _dumps
+
+# Fixed top-level order: the parts that stay the same step after step come
+# first, then the history, then per-request fields (sorted).
+_LEADING_KEYS = ("model", "instructions", "tools", "messages", "input")
+_LIST_KEYS = frozenset({"tools", "messages", "input"})
+
+
+@dataclass(frozen=True, slots=True)
+class BodyStats:
+    body_bytes: int
+    # Bytes actually run through the JSON encoder for this request; the rest
+    # was reused from the previous request.
+    serialized_bytes: int
+
+
+def _encode(obj: Any) -> bytes:
+    return _dumps(obj).encode("utf-8")
+
+
+def _same(a: Any, b: Any) -> bool:
+    """JSON equality: like `==`, but `1`, `1.0` and `True` differ (they encode differently)."""
+
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        if len(a) != len(b):
+            return False
+        for k, v in a.items():
+            if k not in b or not _same(v, b[k]):
+                return False
+        # Same keys, but insertion order is part of the encoding.
+        return list(a) == list(b)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _snapshot(item: Any) -> Any:
+    # Top-level keys of history items are routinely replaced (e.g. the system
+    # prompt); nested values are never mutated once sent.
+    return dict(item) if isinstance(item, dict) else item
+
+
+class RequestBodyEncoder:
+    """Incremental JSON encoder for provider request bodies.
+
+    Keeps the encoded bytes of the previous request's list fields (`tools`,
+    `input`/`messages`) and scalar fields. Items equal to the previous item at
+    the same position are not re-encoded, so a growing history costs only its
+    new items; the body is then built by concatenation. Keys are emitted in a
+    fixed order, so identical requests produce identical bytes.
+
+    One encoder per conversation: an unrelated request only loses reuse.
+    """
+
+    __slots__ = ("_lists", "_scalars", "last_stats")
+
+    def __init__(self) -> None:
+        self._lists: dict[str, tuple[list[Any], list[bytes]]] = {}
+        self._scalars: dict[str, tuple[Any, bytes]] = {}
+        self.last_stats: BodyStats | None = None
+
+    def encode(self, payload: Mapping[str, Any]) -> bytes:
+        keys = [k for k in _LEADING_KEYS if k in payload]
+        keys.extend(sorted(k for k in payload if k not in _LEADING_KEYS))
+        parts: list[bytes] = []
+        serialized = 0
+        for k in keys:
+            v = payload[k]
+            if k in _LIST_KEYS and isinstance(v, (list, tuple)):
+                chunk, n = self._encode_list(k, v)
+            else:
+                chunk, n = self._encode_scalar(k, v)
+            serialized += n
+            parts.append(_encode(k) + b":" + chunk)
+        body = b"{" + b",".join(parts) + b"}"
+        self.last_stats = BodyStats(body_bytes=len(body), serialized_bytes=serialized)
+        return body
+
+    def _encode_scalar(self, key: str, value: Any) -> tuple[bytes, int]:
+        prev = self._scalars.get(key)
+        if prev is not None and _same(prev[0], value):
+            return prev[1], 0
+        raw = _encode(value)
+        self._scalars[key] = (_snapshot(value), raw)
+        return raw, len(raw)
+
+    def _encode_list(self, key: str, items: Sequence[Any]) -> tuple[bytes, int]:
+        prev_items, prev_raw = self._lists.get(key, ((), ()))
+        n = min(len(items), len(prev_items))
+        i = 0
+        while i < n and _same(prev_items[i], items[i]):
+            i += 1
+        snapshots = list(prev_items[:i])
+        raws = list(prev_raw[:i])
+        serialized = 0
+        for item in items[i:]:
+            raw = _encode(item)
+            serialized += len(raw)
+            snapshots.append(_snapshot(item))
+            raws.append(raw)
+        self._lists[key] = (snapshots, raws)
+        return b"[" + b",".join(raws) + b"]", serialized
@@ -1,19 +1,184 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from ..serialization import _loads
+from .aio_http import aiter_chunks
+
+
+# Not frozen: one is built per streamed event, and a frozen __init__ costs ~3x.
+@dataclass(slots=True)
+class SseEvent:
+    data: str
+    event: str = "message"
+    # Last event id seen on the stream (it persists across events, per the SSE spec).
+    id: str | None = None
+    # Reconnection time in ms, when this event's block carried a `retry:` field.
+    retry: int | None = None
+
+    def json(self) -> Any | None:
+        """Decode `data` as JSON; None if it is not JSON (e.g. `[DONE]`)."""
+
+        try:
+            return _loads(self.data)
+        except ValueError:
+            return None
+
+
+class SseDecoder:
+    """Incremental `text/event-stream` decoder over raw byte chunks.
+
+    Chunks may split lines (and `\\r\\n` pairs) anywhere. Lines end with `\\n`,
+    `\\r\\n` or `\\r`; `data:` lines of one event are joined with `\\n`; comments
+    and unknown fields are ignored. Bytes are scanned in place in one buffer,
+    so the cost is linear in the stream size regardless of chunking.
+    """
+
+    __slots__ = ("_buf", "_data", "_event", "_id", "_retry", "_started", "_skip_lf", "_names")
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._data: list[bytes] = []
+        self._event = b""
+        self._id: str | None = None
+        self._retry: int | None = None
+        self._started = False
+        # The last line ended in a chunk-final `\r`: a leading `\n` completes that `\r\n`.
+        self._skip_lf = False
+        # Decoded `event:` names; streams reuse a handful of them.
+        self._names: dict[bytes, str] = {}
+
+    def feed(self, chunk: bytes | bytearray | memoryview) -> list[SseEvent]:
+        raw = chunk if type(chunk) is bytes else bytes(chunk)
+        if not raw:
+            return []
+        if not self._started:
+            if self._buf or len(raw) < 3:
+                self._buf += raw
+                if len(self._buf) < 3 and b"\xef\xbb\xbf".startswith(self._buf):
+                    return []
+                raw = bytes(self._buf)
+                self._buf.clear()
+            self._started = True
+            if raw.startswith(b"\xef\xbb\xbf"):
+                raw = raw[3:]
+        if self._skip_lf:
+            self._skip_lf = False
+            if raw.startswith(b"\n"):
+                raw = raw[1:]
+        end = max(raw.rfind(b"\n"), raw.rfind(b"\r")) + 1
+        if not end:
+            # No line end yet: only append, so a long line spread over many chunks stays linear.
+            self._buf += raw
+            return []
+        if self._buf:
+            self._buf += raw[:end]
+            block = bytes(self._buf)
+            self._buf.clear()
+        else:
+            block = raw[:end] if end < len(raw) else raw
+        if end < len(raw):
+            self._buf += raw[end:]
+        # Only a chunk-final `\r` can be the first half of a split `\r\n`.
+        self._skip_lf = end == len(raw) and raw[-1] == 0x0D
+        out: list[SseEvent] = []
+        data = self._data
+        # bytes.splitlines() splits on exactly the SSE line terminators: \r\n, \n and \r.
+        for line in block.splitlines():
+            if not line:
+                if data:
+                    raw = data[0] if len(data) == 1 else b"\n".join(data)
+                    out.append(SseEvent(raw.decode("utf-8", errors="replace"), self._event_name(), self._id, self._retry))
+                    data = self._data = []
+                self._event = b""
+                self._retry = None
+            elif line[:6] == b"data: ":
+                data.append(line[6:])
+            elif line[:7] == b"event: ":
+                self._event = line[7:]
+            else:
+                self._field(line)
+        return out
+
+    def flush(self) -> list[SseEvent]:
+        """End of stream: process a final unterminated line and a pending event."""
+
+        out: list[SseEvent] = []
+        if self._buf:
+            line = bytes(self._buf)
+            self._buf.clear()
+            self._field(line)
+        self._dispatch(out)
+        return out
+
+    def _dispatch(self, out: list[SseEvent]) -> None:
+        data = self._data
+        if data:
+            raw = data[0] if len(data) == 1 else b"\n".join(data)
+            out.append(SseEvent(raw.decode("utf-8", errors="replace"), self._event_name(), self._id, self._retry))
+            self._data = []
+        self._event = b""
+        self._retry = None
+
+    def _event_name(self) -> str:
+        event = self._event
+        if not event:
+            return "message"
+        name = self._names.get(event)
+        if name is None:
+            if len(self._names) >= 256:
+                self._names.clear()
+            name = self._names[event] = event.decode("utf-8", errors="replace")
+        return name
+
+    def _field(self, line: bytes) -> None:
+        name, colon, value = line.partition(b":")
+        if not name and colon:
+            return  # comment
+        if value.startswith(b" "):
+            value = value[1:]
+        if name == b"data":
+            self._data.append(value)
+        elif name == b"event":
+            self._event = value
+        elif name == b"id":
+            if b"\x00" not in value:
+                self._id = value.decode("utf-8", errors="replace")
+        elif name == b"retry":
+            if value.isdigit():
+                self._retry = int(value)
+
+
+def iter_sse_events(chunks: Iterable[bytes]) -> Iterator[SseEvent]:
+    decoder = SseDecoder()
+    for chunk in chunks:
+        if chunk:
+            yield from decoder.feed(chunk)
+    yield from decoder.flush()
+
+
+async def aiter_sse_events(chunks: Iterable[bytes] | AsyncIterable[bytes]) -> AsyncIterator[SseEvent]:
+    """Async counterpart of `iter_sse_events`; closes `chunks` when the consumer stops early."""
+
+    decoder = SseDecoder()
+    # Close the source explicitly so a pooled connection is released now rather
+    # than whenever the generator is collected.
+    source = aiter_chunks(chunks)
+    try:
+        async for chunk in source:
+            if chunk:
+                for ev in decoder.feed(chunk):
+                    yield ev
+        for ev in decoder.flush():
+            yield ev
+    finally:
+        await source.aclose()
 
 
 def parse_sse_events(lines: Iterable[bytes]) -> Iterator[str]:
-    buf: list[str] = []
-    for raw in lines:
-        line = raw.decode("utf-8", errors="replace")
-        if line in ("\n", "\r\n"):
-            if buf:
-                yield "".join(buf)
-                buf = []
-            continue
-        if line.startswith("data:"):
-            buf.append(line[len("data:") :].lstrip().rstrip("\r\n"))
-    if buf:
-        yield "".join(buf)
+    """Yield the `data` payload of each event (lines or arbitrary chunks)."""
 
+    for ev in iter_sse_events(lines):
+        yield ev.data
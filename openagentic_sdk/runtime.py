@@ -14,6 +14,7 @@ from .events import (
     AssistantDelta,
     AssistantMessage,
     Result,
+    StepTiming,
     SystemInit,
     ToolOutputCompacted,
     ToolResult,
@@ -41,17 +42,22 @@ from .compaction import (
     COMPACTION_MARKER_QUESTION,
     COMPACTION_SYSTEM_PROMPT,
     COMPACTION_USER_INSTRUCTION,
+    PRUNE_EVENT_FIELDS,
+    PRUNE_EVENT_TYPES,
     TOOL_OUTPUT_PLACEHOLDER,
     select_tool_outputs_to_prune,
     would_overflow,
 )
 from .providers.base import ModelOutput, ToolCall
+from .providers.request_body import RequestBodyEncoder
+from .sessions.incremental import IncrementalRebuilder
 from .sessions.rebuild import rebuild_messages, rebuild_responses_input
 from .sessions.store import FileSessionStore
 from .skills.index import index_skills
 from .tools.base import ToolContext
 from .tools.openai import tool_schemas_for_openai
 from .tools.openai_responses import tool_schemas_for_responses
+from .tools.registry import ToolAccess
 from .tools.task import TaskTool
 from .commands import load_command_template
 from .opencode_markdown import FILE_REGEX
@@ -71,6 +77,19 @@ def _callable_accepts_kw(fn: Any, name: str) -> bool:
     return any(p.kind == inspect.Parameter.VAR_KEYWORD for p in sig.parameters.values())
 
 
+def _callable_names_kw(fn: Any, name: str) -> bool:
+    """Like `_callable_accepts_kw`, but `**kwargs` does not count.
+
+    For runtime-side objects (not plain request fields) that a provider
+    forwarding `**kwargs` into its payload must not receive.
+    """
+
+    try:
+        return name in inspect.signature(fn).parameters
+    except Exception:  # noqa: BLE001
+        return False
+
+
 def _tool_result_payload(ev: "ToolResult") -> Any:
     # Provider protocols only get `output`, so on errors we must serialize the
     # error fields too (otherwise the model sees `null`).
@@ -84,6 +103,232 @@ def _tool_result_payload(ev: "ToolResult") -> Any:
     }
 
 
+def _read_resume_events(store: Any, session_id: str) -> list[Any]:
+    # Segmented stores can skip sealed history before the latest summary pivot.
+    read_window = getattr(store, "read_window", None)
+    if callable(read_window):
+        return read_window(session_id)
+    return store.read_events(session_id)
+
+
+def _flush_store(store: Any, session_id: str) -> None:
+    # Buffered stores group-commit events in the background; make the turn
+    # durable before handing `Result` to the caller.
+    flush = getattr(store, "flush", None)
+    if callable(flush):
+        flush(session_id)
+
+
+_DELTA_PERSISTENCE_MODES = ("off", "coalesce", "full")
+
+
+class _DeltaPersister:
+    """Applies `options.delta_persistence` to streamed `assistant.delta` events.
+
+    Live consumers always get every delta; this only decides what reaches the
+    session log. In "coalesce" mode consecutive deltas are merged and written
+    once `coalesce_bytes` or `coalesce_ms` is reached (and on `flush()`).
+    """
+
+    def __init__(self, store: Any, session_id: str, policy: Any, *, parent_tool_use_id: str | None, agent_name: str | None) -> None:
+        mode = getattr(policy, "mode", "off")
+        if mode not in _DELTA_PERSISTENCE_MODES:
+            raise ValueError(f"delta_persistence.mode must be one of {', '.join(_DELTA_PERSISTENCE_MODES)}")
+        self._store = store
+        self._session_id = session_id
+        self._mode = mode
+        self._max_bytes = max(0, int(getattr(policy, "coalesce_bytes", 0) or 0))
+        self._max_s = max(0, int(getattr(policy, "coalesce_ms", 0) or 0)) / 1000.0
+        self._parent_tool_use_id = parent_tool_use_id
+        self._agent_name = agent_name
+        self._parts: list[str] = []
+        self._bytes = 0
+        self._started = 0.0
+
+    def add(self, delta: AssistantDelta) -> None:
+        if self._mode == "off":
+            return
+        if self._mode == "full":
+            self._store.append_event(self._session_id, delta)
+            return
+        if not self._parts:
+            self._started = time.monotonic()
+        self._parts.append(delta.text_delta)
+        self._bytes += len(delta.text_delta.encode("utf-8"))
+        if self._bytes >= self._max_bytes or time.monotonic() - self._started >= self._max_s:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._parts:
+            return
+        text = "".join(self._parts)
+        self._parts = []
+        self._bytes = 0
+        self._store.append_event(
+            self._session_id,
+            AssistantDelta(text_delta=text, parent_tool_use_id=self._parent_tool_use_id, agent_name=self._agent_name),
+        )
+
+
+# Tools without side effects, safe to start before the model response (and its
+# after_model_call hook) is final. lsp is left out: it can spawn a language
+# server before the permission gate and pre_tool_use hooks have seen the call.
+_EARLY_DISPATCH_TOOLS = frozenset({"Read", "Glob", "Grep", "List"})
+
+
+class _EarlyToolRuns:
+    """Applies `options.early_tool_dispatch`: read-only tool calls start while the model is still streaming.
+
+    Only `tool.run()` starts early. Events, hooks and the permission gate still
+    happen in `_run_tool_call`, in call order, which then awaits the early run
+    if the call's final input is still the one that was started. Once any other
+    call streams in (it may change the workspace), no later call of the
+    response starts early: it has to see that change.
+    """
+
+    def __init__(self, options: OpenAgenticOptions) -> None:
+        self._options = options
+        self._runs: dict[str, tuple[str, dict[str, Any], asyncio.Future[Any]]] = {}
+        self._stopped = False
+
+    def start(self, tool_call: ToolCall) -> None:
+        options = self._options
+        name = tool_call.name
+        if self._stopped or tool_call.tool_use_id in self._runs:
+            return
+        if options.allowed_tools is not None and name not in set(options.allowed_tools):
+            return
+        if name not in _EARLY_DISPATCH_TOOLS:
+            self._stopped = True
+            return
+        try:
+            tool = options.tools.get(name)
+        except KeyError:
+            return
+        tool_input = dict(tool_call.arguments)
+        fut = asyncio.ensure_future(tool.run(tool_input, ToolContext(cwd=options.cwd, project_dir=options.project_dir)))
+        # Retrieve the exception of runs nobody takes, so they are not reported as unhandled.
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._runs[tool_call.tool_use_id] = (name, tool_input, fut)
+
+    def take(self, tool_use_id: str, name: str, tool_input: Mapping[str, Any]) -> asyncio.Future[Any] | None:
+        run = self._runs.pop(tool_use_id, None)
+        if run is None:
+            return None
+        if run[0] != name or run[1] != dict(tool_input):
+            run[2].cancel()
+            return None
+        return run[2]
+
+    def cancel(self) -> None:
+        for _, _, fut in self._runs.values():
+            fut.cancel()
+        self._runs.clear()
+        self._stopped = False
+
+
+def _output_tokens(usage: Any) -> int | None:
+    if not isinstance(usage, Mapping):
+        return None
+    for key in ("output_tokens", "completion_tokens"):
+        n = usage.get(key)
+        if isinstance(n, int) and not isinstance(n, bool):
+            return n
+    return None
+
+
+class _StepClock:
+    """Accumulates the wall-clock phases of one step for its `StepTiming` event."""
+
+    def __init__(self, step: int) -> None:
+        self.step = step
+        self.started = time.perf_counter()
+        self.build_s = 0.0
+        self.model_started: float | None = None
+        self.model_ended: float | None = None
+        self.first_event: float | None = None
+        self.first_text: float | None = None
+        self.hook_s = 0.0
+        self.permission_s = 0.0
+        self.tool_s = 0.0
+
+    def model_call(self) -> None:
+        # Retried calls keep the first start: the retry is part of the wait.
+        if self.model_started is None:
+            self.model_started = time.perf_counter()
+            # Input rebuild, compaction and tool schemas; hooks so far are counted separately.
+            self.build_s = max(0.0, self.model_started - self.started - self.hook_s)
+
+    def model_event(self, *, text: bool) -> None:
+        now = time.perf_counter()
+        if self.first_event is None:
+            self.first_event = now
+        if text and self.first_text is None:
+            self.first_text = now
+
+    def model_done(self) -> None:
+        self.model_ended = time.perf_counter()
+
+    def event(self, usage: Any, *, parent_tool_use_id: str | None, agent_name: str | None) -> StepTiming:
+        now = time.perf_counter()
+        start = self.model_started if self.model_started is not None else now
+        end = self.model_ended if self.model_ended is not None else now
+        stream_s = max(0.0, end - start)
+        tokens = _output_tokens(usage)
+
+        def ms(s: float) -> float:
+            return round(s * 1000.0, 3)
+
+        return StepTiming(
+            step=self.step,
+            build_ms=ms(self.build_s),
+            ttfb_ms=ms(self.first_event - start) if self.first_event is not None else None,
+            ttft_ms=ms(self.first_text - start) if self.first_text is not None else None,
+            stream_ms=ms(stream_s),
+            hook_ms=ms(self.hook_s),
+            permission_ms=ms(self.permission_s),
+            tool_ms=ms(self.tool_s),
+            total_ms=ms(now - self.started),
+            output_tokens=tokens,
+            tokens_per_s=round(tokens / stream_s, 2) if tokens is not None and stream_s > 0 else None,
+            parent_tool_use_id=parent_tool_use_id,
+            agent_name=agent_name,
+        )
+
+
+class _ToolEventBuffer:
+    """Stands in for the session store while a tool call runs in a parallel batch.
+
+    Appended and yielded events are queued for `_run_tool_batch`, which replays
+    them against the real store in call order. Everything else is delegated.
+    """
+
+    def __init__(self, store: Any) -> None:
+        self._store = store
+        self.queue: asyncio.Queue[tuple[str, Any]] = asyncio.Queue()
+
+    def append_event(self, session_id: str, event: Any) -> None:
+        self.queue.put_nowait(("append", (session_id, event)))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._store, name)
+
+
+class _ToolAdmission:
+    """Keeps the pre_tool_use hooks and permission prompts of a batch in call order."""
+
+    def __init__(self, previous: asyncio.Event | None, own: asyncio.Event) -> None:
+        self._previous = previous
+        self._own = own
+
+    async def wait(self) -> None:
+        if self._previous is not None:
+            await self._previous.wait()
+
+    def release(self) -> None:
+        self._own.set()
+
+
 def _filter_supported_kwargs(fn: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
     """Drop kwargs a callable doesn't accept.
 
@@ -311,6 +556,39 @@ class AgentRuntime:
             return [{"role": sys_role, "content": sys_prompt}, *items[1:]]
         return [{"role": sys_role, "content": sys_prompt}, *items]
 
+    def _sync_input_builder(
+        self,
+        *,
+        store: FileSessionStore,
+        session_id: str,
+        provider_protocol: str,
+        options: OpenAgenticOptions,
+    ) -> IncrementalRebuilder | None:
+        """Apply newly appended session events to the runtime's incremental rebuilder.
+
+        The first call per session reads the log once; later calls only read
+        events past the builder's cursor. Returns None for stores without
+        range reads (custom stores), which keep the full-rebuild path.
+        """
+
+        read_range = getattr(store, "read_events_range", None)
+        if not callable(read_range):
+            return None
+        key = (id(store), session_id, provider_protocol)
+        builder = getattr(self, "_input_builder", None)
+        if builder is None or getattr(self, "_input_builder_key", None) != key:
+            builder = IncrementalRebuilder(
+                protocol=provider_protocol,
+                max_events=options.resume_max_events,
+                max_bytes=options.resume_max_bytes,
+            )
+            builder.apply(_read_resume_events(store, session_id))
+            self._input_builder = builder
+            self._input_builder_key = key
+        else:
+            builder.apply(read_range(session_id, builder.cursor + 1))
+        return builder
+
     def _rebuild_provider_input(
         self,
         *,
@@ -319,6 +597,14 @@ class AgentRuntime:
         provider_protocol: str,
         options: OpenAgenticOptions,
     ) -> list[Mapping[str, Any]]:
+        builder = self._sync_input_builder(
+            store=store,
+            session_id=session_id,
+            provider_protocol=provider_protocol,
+            options=options,
+        )
+        if builder is not None:
+            return self._with_base_system(builder.items())
         events = store.read_events(session_id)
         if provider_protocol == "legacy":
             items = list(
@@ -343,13 +629,27 @@ class AgentRuntime:
         *,
         store: FileSessionStore,
         session_id: str,
+        provider_protocol: str,
     ) -> AsyncIterator[Any]:
         options = self._options
         if not getattr(options, "compaction", None) or not options.compaction.prune:
             return
 
         # Append-only marking of old tool results.
-        events = store.read_events(session_id)
+        builder = self._sync_input_builder(
+            store=store,
+            session_id=session_id,
+            provider_protocol=provider_protocol,
+            options=options,
+        )
+        iter_events = getattr(store, "iter_events", None)
+        if builder is not None:
+            events = builder.events
+        elif callable(iter_events):
+            events = list(iter_events(session_id, types=PRUNE_EVENT_TYPES, fields=PRUNE_EVENT_FIELDS))
+        else:
+            # Custom stores without projected reads.
+            events = [e for e in store.read_events(session_id) if getattr(e, "type", None) in PRUNE_EVENT_TYPES]
         to_prune = select_tool_outputs_to_prune(events=events, compaction=options.compaction)
         if not to_prune:
             return
@@ -383,7 +683,7 @@ class AgentRuntime:
         # compaction model sees a normal chat-style transcript.
         history = list(
             rebuild_messages(
-                store.read_events(session_id),
+                _read_resume_events(store, session_id),
                 max_events=options.resume_max_events,
                 max_bytes=options.resume_max_bytes,
             )
@@ -688,8 +988,10 @@ class AgentRuntime:
 
     async def query(self, prompt: str) -> AsyncIterator[Any]:
         options = self._options
+        self._input_builder = None
 
         mcp_clients: list[StdioMcpClient] = []
+        early_runs: _EarlyToolRuns | None = None
         remote_mcp_clients: list[RemoteMcpClient] = []
         try:
             # MCP (parity): register SDK and local-stdio MCP tools.
@@ -815,7 +1117,7 @@ class AgentRuntime:
 
             if options.resume:
                 session_id = options.resume
-                past_events = store.read_events(session_id)
+                past_events = _read_resume_events(store, session_id)
                 for e in reversed(past_events):
                     if isinstance(e, Result) and isinstance(getattr(e, "provider_metadata", None), dict):
                         pm = e.provider_metadata or {}
@@ -908,6 +1210,7 @@ class AgentRuntime:
                     agent_name=self._agent_name,
                 )
                 store.append_event(session_id, final)
+                _flush_store(store, session_id)
                 yield final
                 return
 
@@ -957,7 +1260,18 @@ class AgentRuntime:
 
             # provider_protocol is computed before first system prompt injection.
             steps = 0
+            turn_schemas: dict[tuple[Any, ...], Sequence[Mapping[str, Any]]] = {}
+            # Providers that take a `body_encoder` re-serialise only what changed since the
+            # previous step (new history items); the rest of the body is reused bytes.
+            call_fn = getattr(options.provider, "stream" if hasattr(options.provider, "stream") else "complete")
+            body_encoder = RequestBodyEncoder() if _callable_names_kw(call_fn, "body_encoder") else None
+            request_bytes: list[dict[str, int]] = []
+            if options.early_tool_dispatch and hasattr(options.provider, "stream"):
+                early_runs = _EarlyToolRuns(options)
             while steps < options.max_steps:
+                if early_runs is not None:
+                    # Early runs the previous step did not use (e.g. a hook changed the call).
+                    early_runs.cancel()
                 if options.abort_event is not None and getattr(options.abort_event, "is_set", lambda: False)():
                     for he in await options.hooks.run_session_end(
                         context={"session_id": session_id, "agent_name": self._agent_name}
@@ -973,10 +1287,12 @@ class AgentRuntime:
                         agent_name=self._agent_name,
                     )
                     store.append_event(session_id, final)
+                    _flush_store(store, session_id)
                     yield final
                     return
 
                 steps += 1
+                clock = _StepClock(steps)
                 tool_names = options.tools.names()
                 if options.agents and "Task" not in set(tool_names):
                     tool_names = [*tool_names, "Task"]
@@ -984,24 +1300,31 @@ class AgentRuntime:
                     allowed = set(options.allowed_tools)
                     tool_names = [t for t in tool_names if t in allowed]
 
-                tool_schemas: Sequence[Mapping[str, Any]] = ()
-                if provider_protocol == "legacy":
-                    tool_schemas = tool_schemas_for_openai(
-                        tool_names,
-                        registry=options.tools,
-                        context={"cwd": options.cwd, "project_dir": options.project_dir},
-                    )
-                else:
-                    tool_schemas = tool_schemas_for_responses(
-                        tool_names,
-                        registry=options.tools,
-                        context={"cwd": options.cwd, "project_dir": options.project_dir},
-                    )
+                # Steps of one turn reuse the compiled list as long as the tool set is unchanged;
+                # across turns the schema cache revalidates (date, skills on disk).
+                turn_schema_key = (tuple(tool_names), getattr(options.tools, "version", 0))
+                tool_schemas = turn_schemas.get(turn_schema_key)
+                if tool_schemas is None:
+                    if provider_protocol == "legacy":
+                        tool_schemas = tool_schemas_for_openai(
+                            tool_names,
+                            registry=options.tools,
+                            context={"cwd": options.cwd, "project_dir": options.project_dir},
+                        )
+                    else:
+                        tool_schemas = tool_schemas_for_responses(
+                            tool_names,
+                            registry=options.tools,
+                            context={"cwd": options.cwd, "project_dir": options.project_dir},
+                        )
+                    turn_schemas = {turn_schema_key: tool_schemas}
 
                 # Soft compaction (tool-output pruning) is only meaningful when we
                 # send full history (legacy or Responses fallback mode).
                 if provider_protocol == "legacy" or not supports_previous_response_id:
-                    async for ev in self._maybe_prune_tool_outputs(store=store, session_id=session_id):
+                    async for ev in self._maybe_prune_tool_outputs(
+                        store=store, session_id=session_id, provider_protocol=provider_protocol
+                    ):
                         yield ev
                     messages = self._rebuild_provider_input(
                         store=store,
@@ -1023,7 +1346,9 @@ class AgentRuntime:
                     "provider_name": getattr(options.provider, "name", "unknown"),
                     "agent_name": self._agent_name,
                 }
+                t_hook = time.perf_counter()
                 messages2, hook_events, decision = await options.hooks.run_before_model_call(messages=messages, context=model_ctx)
+                clock.hook_s += time.perf_counter() - t_hook
                 for he in hook_events:
                     store.append_event(session_id, he)
                     yield he
@@ -1040,10 +1365,12 @@ class AgentRuntime:
                         agent_name=self._agent_name,
                     )
                     store.append_event(session_id, final)
+                    _flush_store(store, session_id)
                     yield final
                     return
                 messages = list(messages2)
 
+                clock.model_call()
                 model_out: ModelOutput
                 if hasattr(options.provider, "stream"):
                     stream_fn: Any = getattr(options.provider, "stream")
@@ -1053,6 +1380,13 @@ class AgentRuntime:
                     stream_response_id: str | None = None
                     stream_usage: Mapping[str, Any] | None = None
 
+                    delta_sink = _DeltaPersister(
+                        store,
+                        session_id,
+                        options.delta_persistence,
+                        parent_tool_use_id=self._parent_tool_use_id,
+                        agent_name=self._agent_name,
+                    )
                     for attempt in range(2):
                         parts = []
                         tool_calls = []
@@ -1061,6 +1395,8 @@ class AgentRuntime:
 
                         if provider_protocol == "legacy":
                             kwargs = {"model": options.model, "messages": messages, "tools": tool_schemas, "api_key": options.api_key}
+                            if body_encoder is not None:
+                                kwargs["body_encoder"] = body_encoder
                             stream_iter = stream_fn(**_filter_supported_kwargs(stream_fn, kwargs))
                         else:
                             can_thread = supports_previous_response_id and _callable_accepts_kw(stream_fn, "previous_response_id")
@@ -1075,6 +1411,8 @@ class AgentRuntime:
                                 "store": True,
                                 "instructions": instructions,
                             }
+                            if body_encoder is not None:
+                                kwargs["body_encoder"] = body_encoder
                             stream_iter = stream_fn(**_filter_supported_kwargs(stream_fn, kwargs))
 
                         try:
@@ -1085,6 +1423,7 @@ class AgentRuntime:
                                 ev_type = getattr(ev, "type", None)
                                 if ev_type is None and isinstance(ev, dict):
                                     ev_type = ev.get("type")
+                                clock.model_event(text=ev_type == "text_delta")
                                 if ev_type == "text_delta":
                                     delta = getattr(ev, "delta", None)
                                     if delta is None and isinstance(ev, dict):
@@ -1092,7 +1431,7 @@ class AgentRuntime:
                                     if isinstance(delta, str) and delta:
                                         parts.append(delta)
                                         de = AssistantDelta(text_delta=delta, parent_tool_use_id=self._parent_tool_use_id, agent_name=self._agent_name)
-                                        store.append_event(session_id, de)
+                                        delta_sink.add(de)
                                         yield de
                                 elif ev_type == "tool_call":
                                     tc = getattr(ev, "tool_call", None)
@@ -1100,6 +1439,8 @@ class AgentRuntime:
                                         tc = ev.get("tool_call")
                                     if isinstance(tc, ToolCall):
                                         tool_calls.append(tc)
+                                        if early_runs is not None:
+                                            early_runs.start(tc)
                                 elif ev_type == "done":
                                     rid = getattr(ev, "response_id", None)
                                     if rid is None and isinstance(ev, dict):
@@ -1125,6 +1466,8 @@ class AgentRuntime:
                                 and (can_retry_prev or can_retry_link)
                             )
                             if can_retry:
+                                if early_runs is not None:
+                                    early_runs.cancel()
                                 supports_previous_response_id = False
                                 if pending_responses_tool_calls and pending_responses_history and _looks_like_outputs_without_calls(messages):
                                     outs = _extract_function_call_outputs(messages)
@@ -1133,9 +1476,12 @@ class AgentRuntime:
                                         *_prepend_function_calls_for_responses(pending_responses_tool_calls, outs),
                                     ]
                                 continue
+                            delta_sink.flush()
                             raise
                         break
 
+                    # Persist any coalesced tail before the step's next events.
+                    delta_sink.flush()
                     if interrupted:
                         for he in await options.hooks.run_session_end(context=model_ctx):
                             store.append_event(session_id, he)
@@ -1149,6 +1495,7 @@ class AgentRuntime:
                             agent_name=self._agent_name,
                         )
                         store.append_event(session_id, final)
+                        _flush_store(store, session_id)
                         yield final
                         return
 
@@ -1158,6 +1505,8 @@ class AgentRuntime:
                     complete_fn: Any = getattr(options.provider, "complete")
                     if provider_protocol == "legacy":
                         kwargs = {"model": options.model, "messages": messages, "tools": tool_schemas, "api_key": options.api_key}
+                        if body_encoder is not None:
+                            kwargs["body_encoder"] = body_encoder
                         model_out = await complete_fn(**_filter_supported_kwargs(complete_fn, kwargs))
                     else:
                         prev_id = previous_response_id if supports_previous_response_id else None
@@ -1172,6 +1521,8 @@ class AgentRuntime:
                                 "store": True,
                                 "instructions": instructions,
                             }
+                            if body_encoder is not None:
+                                kwargs["body_encoder"] = body_encoder
                             model_out = await complete_fn(**_filter_supported_kwargs(complete_fn, kwargs))
                         except RuntimeError as e:
                             can_retry_prev = supports_previous_response_id and previous_response_id is not None and _unsupported_previous_response_id_error(e)
@@ -1195,9 +1546,18 @@ class AgentRuntime:
                                 "store": True,
                                 "instructions": instructions,
                             }
+                            if body_encoder is not None:
+                                kwargs["body_encoder"] = body_encoder
                             model_out = await complete_fn(**_filter_supported_kwargs(complete_fn, kwargs))
 
+                clock.model_done()
+                if body_encoder is not None and body_encoder.last_stats is not None:
+                    stats = body_encoder.last_stats
+                    request_bytes.append({"body": stats.body_bytes, "serialized": stats.serialized_bytes})
+                    body_encoder.last_stats = None
+                t_hook = time.perf_counter()
                 model_out2, hook_events2, decision2 = await options.hooks.run_after_model_call(output=model_out, context=model_ctx)
+                clock.hook_s += time.perf_counter() - t_hook
                 for he in hook_events2:
                     store.append_event(session_id, he)
                     yield he
@@ -1214,6 +1574,7 @@ class AgentRuntime:
                         agent_name=self._agent_name,
                     )
                     store.append_event(session_id, final)
+                    _flush_store(store, session_id)
                     yield final
                     return
                 model_out = model_out2
@@ -1236,50 +1597,59 @@ class AgentRuntime:
                                 ],
                             }
                         )
-                        for tc in tool_calls:
-                            async for e in self._run_tool_call(session_id=session_id, tool_call=tc, store=store, hooks=options.hooks):
-                                yield e
-                                if isinstance(e, ToolResult):
-                                    messages.append(
-                                        {
-                                            "role": "tool",
-                                            "tool_call_id": tc.tool_use_id,
-                                            "content": json.dumps(_tool_result_payload(e), ensure_ascii=False),
-                                        }
-                                    )
+                        async for tc, e in self._run_tool_calls(
+                            session_id=session_id, tool_calls=tool_calls, store=store, hooks=options.hooks, early=early_runs, clock=clock
+                        ):
+                            yield e
+                            if isinstance(e, ToolResult):
+                                messages.append(
+                                    {
+                                        "role": "tool",
+                                        "tool_call_id": tc.tool_use_id,
+                                        "content": json.dumps(_tool_result_payload(e), ensure_ascii=False),
+                                    }
+                                )
+                        yield self._record_step_timing(store, session_id, clock, model_out.usage)
                         continue
 
                     if supports_previous_response_id:
                         tool_output_items: list[Mapping[str, Any]] = []
-                        for tc in tool_calls:
-                            async for e in self._run_tool_call(session_id=session_id, tool_call=tc, store=store, hooks=options.hooks):
-                                yield e
-                                if isinstance(e, ToolResult):
-                                    tool_output_items.append(
-                                        {
-                                            "type": "function_call_output",
-                                            "call_id": tc.tool_use_id,
-                                            "output": json.dumps(_tool_result_payload(e), ensure_ascii=False),
-                                        }
-                                    )
-                        if model_out.response_id:
-                            previous_response_id = model_out.response_id
-                        pending_responses_history = list(messages)
-                        messages = tool_output_items
-                        continue
-
-                    for tc in tool_calls:
-                        messages.append({"type": "function_call", "call_id": tc.tool_use_id, "name": tc.name, "arguments": json.dumps(tc.arguments, ensure_ascii=False)})
-                        async for e in self._run_tool_call(session_id=session_id, tool_call=tc, store=store, hooks=options.hooks):
+                        async for tc, e in self._run_tool_calls(
+                            session_id=session_id, tool_calls=tool_calls, store=store, hooks=options.hooks, early=early_runs, clock=clock
+                        ):
                             yield e
                             if isinstance(e, ToolResult):
-                                messages.append(
+                                tool_output_items.append(
                                     {
                                         "type": "function_call_output",
                                         "call_id": tc.tool_use_id,
                                         "output": json.dumps(_tool_result_payload(e), ensure_ascii=False),
                                     }
                                 )
+                        if model_out.response_id:
+                            previous_response_id = model_out.response_id
+                        pending_responses_history = list(messages)
+                        messages = tool_output_items
+                        yield self._record_step_timing(store, session_id, clock, model_out.usage)
+                        continue
+
+                    announced: set[str] = set()
+                    async for tc, e in self._run_tool_calls(
+                        session_id=session_id, tool_calls=tool_calls, store=store, hooks=options.hooks, early=early_runs, clock=clock
+                    ):
+                        if tc.tool_use_id not in announced:
+                            announced.add(tc.tool_use_id)
+                            messages.append({"type": "function_call", "call_id": tc.tool_use_id, "name": tc.name, "arguments": json.dumps(tc.arguments, ensure_ascii=False)})
+                        yield e
+                        if isinstance(e, ToolResult):
+                            messages.append(
+                                {
+                                    "type": "function_call_output",
+                                    "call_id": tc.tool_use_id,
+                                    "output": json.dumps(_tool_result_payload(e), ensure_ascii=False),
+                                }
+                            )
+                    yield self._record_step_timing(store, session_id, clock, model_out.usage)
                     continue
 
                 if model_out.assistant_text is None:
@@ -1295,12 +1665,14 @@ class AgentRuntime:
                         agent_name=self._agent_name,
                     )
                     store.append_event(session_id, final)
+                    _flush_store(store, session_id)
                     yield final
                     return
 
                 msg = AssistantMessage(text=model_out.assistant_text, parent_tool_use_id=self._parent_tool_use_id, agent_name=self._agent_name)
                 store.append_event(session_id, msg)
                 yield msg
+                yield self._record_step_timing(store, session_id, clock, model_out.usage)
 
                 if options.compaction.auto and (provider_protocol == "legacy" or not supports_previous_response_id):
                     if would_overflow(compaction=options.compaction, usage=model_out.usage if isinstance(model_out.usage, dict) else None):
@@ -1333,6 +1705,7 @@ class AgentRuntime:
                         **({"protocol": provider_protocol} if provider_protocol else {}),
                         **({"supports_previous_response_id": supports_previous_response_id} if provider_protocol == "responses" else {}),
                         **(dict(model_out.provider_metadata) if isinstance(model_out.provider_metadata, dict) else {}),
+                        **({"request_bytes": request_bytes} if request_bytes else {}),
                     }
                     or None,
                     steps=steps,
@@ -1340,6 +1713,7 @@ class AgentRuntime:
                     agent_name=self._agent_name,
                 )
                 store.append_event(session_id, final)
+                _flush_store(store, session_id)
                 yield final
                 return
 
@@ -1355,8 +1729,11 @@ class AgentRuntime:
                 store.append_event(session_id, he)
                 yield he
             store.append_event(session_id, final)
+            _flush_store(store, session_id)
             yield final
         finally:
+            if early_runs is not None:
+                early_runs.cancel()
             for c in mcp_clients:
                 try:
                     await c.close()
@@ -1704,6 +2081,144 @@ class AgentRuntime:
         store.append_event(session_id, result)
         yield result
 
+    def _record_step_timing(self, store: FileSessionStore, session_id: str, clock: _StepClock, usage: Any) -> StepTiming:
+        timing = clock.event(usage, parent_tool_use_id=self._parent_tool_use_id, agent_name=self._agent_name)
+        store.append_event(session_id, timing)
+        return timing
+
+    async def _run_tool_calls(
+        self,
+        *,
+        session_id: str,
+        tool_calls: Sequence[ToolCall],
+        store: FileSessionStore,
+        hooks: HookEngine,
+        early: _EarlyToolRuns | None = None,
+        clock: _StepClock | None = None,
+    ) -> AsyncIterator[tuple[ToolCall, Any]]:
+        """Runs the tool calls of one model response, yielding `(call, event)` in call order.
+
+        Runs of consecutive calls that are read-only or write a known file form a
+        batch (see `_run_tool_batch`); any other call runs alone once everything
+        before it has finished.
+        """
+
+        options = self._options
+        limit = max(1, int(options.max_parallel_tools or 1))
+        batch: list[tuple[ToolCall, ToolAccess]] = []
+        for tc in [*tool_calls, None]:
+            access = options.tools.access(tc.name, tc.arguments) if tc is not None else None
+            if limit > 1 and access is not None and not access.exclusive:
+                batch.append((tc, access))
+                continue
+            if len(batch) > 1:
+                async for item in self._run_tool_batch(
+                    session_id=session_id, batch=batch, store=store, hooks=hooks, early=early, clock=clock, limit=limit
+                ):
+                    yield item
+            elif batch:
+                async for ev in self._run_tool_call(
+                    session_id=session_id, tool_call=batch[0][0], store=store, hooks=hooks, early=early, clock=clock
+                ):
+                    yield batch[0][0], ev
+            batch = []
+            if tc is not None:
+                async for ev in self._run_tool_call(
+                    session_id=session_id, tool_call=tc, store=store, hooks=hooks, early=early, clock=clock
+                ):
+                    yield tc, ev
+
+    async def _run_tool_batch(
+        self,
+        *,
+        session_id: str,
+        batch: Sequence[tuple[ToolCall, ToolAccess]],
+        store: FileSessionStore,
+        hooks: HookEngine,
+        early: _EarlyToolRuns | None,
+        clock: _StepClock | None,
+        limit: int,
+    ) -> AsyncIterator[tuple[ToolCall, Any]]:
+        """Runs a batch of non-exclusive tool calls concurrently.
+
+        Reads wait for earlier writes; a write waits for earlier reads and for
+        earlier writes to the same file. At most `limit` calls run at once and
+        slots are taken in call order. Each call records into its own
+        `_ToolEventBuffer`; events reach the store and the caller in call order.
+        """
+
+        cwd = self._options.cwd
+        n = len(batch)
+        paths = [frozenset(os.path.normpath(os.path.join(cwd, p)) for p in access.paths or ()) for _, access in batch]
+        slotted = [asyncio.Event() for _ in range(n)]
+        admitted = [asyncio.Event() for _ in range(n)]
+        done = [asyncio.Event() for _ in range(n)]
+        buffers = [_ToolEventBuffer(store) for _ in range(n)]
+        slots = asyncio.Semaphore(limit)
+
+        def depends(i: int, j: int) -> bool:
+            a, b = batch[i][1], batch[j][1]
+            if a.read_only:
+                return not b.read_only
+            return b.read_only or bool(paths[i] & paths[j])
+
+        async def run(i: int) -> None:
+            tc, buf = batch[i][0], buffers[i]
+            # A run started before an earlier write in the batch would miss its effect.
+            after_write = any(depends(i, j) and not batch[j][1].read_only for j in range(i))
+            try:
+                for j in range(i):
+                    if depends(i, j):
+                        await done[j].wait()
+                if i:
+                    await slotted[i - 1].wait()
+                await slots.acquire()
+                slotted[i].set()
+                try:
+                    admission = _ToolAdmission(admitted[i - 1] if i else None, admitted[i])
+                    async for ev in self._dispatch_tool_call(
+                        session_id=session_id,
+                        tool_call=tc,
+                        store=buf,
+                        hooks=hooks,
+                        early=None if after_write else early,
+                        clock=clock,
+                        admission=admission,
+                    ):
+                        buf.queue.put_nowait(("yield", ev))
+                finally:
+                    slots.release()
+            finally:
+                slotted[i].set()
+                admitted[i].set()
+                done[i].set()
+                buf.queue.put_nowait(("end", None))
+
+        # Tool time is the batch's wall time minus what its hooks and the permission gate took.
+        if clock is not None:
+            t0, hook0, perm0 = time.perf_counter(), clock.hook_s, clock.permission_s
+        tasks = [asyncio.ensure_future(run(i)) for i in range(n)]
+        try:
+            for i, (tc, _) in enumerate(batch):
+                while True:
+                    kind, item = await buffers[i].queue.get()
+                    if kind == "end":
+                        break
+                    if kind == "append":
+                        store.append_event(*item)
+                    else:
+                        yield tc, item
+                # Surface a failed call where it would have failed when run sequentially.
+                await tasks[i]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            if clock is not None:
+                elapsed = time.perf_counter() - t0
+                clock.tool_s += max(0.0, elapsed - (clock.hook_s - hook0) - (clock.permission_s - perm0))
+
     async def _run_tool_call(
         self,
         *,
@@ -1711,6 +2226,36 @@ class AgentRuntime:
         tool_call: ToolCall,
         store: FileSessionStore,
         hooks: HookEngine,
+        early: _EarlyToolRuns | None = None,
+        clock: _StepClock | None = None,
+    ) -> AsyncIterator[Any]:
+        if clock is None:
+            async for ev in self._dispatch_tool_call(
+                session_id=session_id, tool_call=tool_call, store=store, hooks=hooks, early=early, clock=None
+            ):
+                yield ev
+            return
+        # Tool time is the call's wall time minus what its hooks and the permission gate took.
+        t0, hook0, perm0 = time.perf_counter(), clock.hook_s, clock.permission_s
+        try:
+            async for ev in self._dispatch_tool_call(
+                session_id=session_id, tool_call=tool_call, store=store, hooks=hooks, early=early, clock=clock
+            ):
+                yield ev
+        finally:
+            elapsed = time.perf_counter() - t0
+            clock.tool_s += max(0.0, elapsed - (clock.hook_s - hook0) - (clock.permission_s - perm0))
+
+    async def _dispatch_tool_call(
+        self,
+        *,
+        session_id: str,
+        tool_call: ToolCall,
+        store: FileSessionStore,
+        hooks: HookEngine,
+        early: _EarlyToolRuns | None,
+        clock: _StepClock | None,
+        admission: _ToolAdmission | None = None,
     ) -> AsyncIterator[Any]:
         options = self._options
         tool_name = tool_call.name
@@ -1742,11 +2287,16 @@ class AgentRuntime:
         yield use_event
 
         ctx = {"session_id": session_id, "tool_use_id": tool_call.tool_use_id, "agent_name": self._agent_name}
+        if admission is not None:
+            await admission.wait()
+        t_hook = time.perf_counter()
         tool_input2, hook_events, decision = await hooks.run_pre_tool_use(
             tool_name=tool_name,
             tool_input=tool_input,
             context=ctx,
         )
+        if clock is not None:
+            clock.hook_s += time.perf_counter() - t_hook
         for he in hook_events:
             store.append_event(session_id, he)
             yield he
@@ -1764,7 +2314,10 @@ class AgentRuntime:
             yield blocked
             return
 
+        t_gate = time.perf_counter()
         approval = await options.permission_gate.approve(tool_name, tool_input2, context=ctx)
+        if clock is not None:
+            clock.permission_s += time.perf_counter() - t_gate
         if approval.question is not None:
             store.append_event(session_id, approval.question)
             yield approval.question
@@ -1782,6 +2335,8 @@ class AgentRuntime:
             yield denied
             return
         tool_input2 = approval.updated_input or tool_input2
+        if admission is not None:
+            admission.release()
 
         if tool_name == "AskUserQuestion":
             async for ev in self._handle_ask_user_question(
@@ -1824,11 +2379,14 @@ class AgentRuntime:
                     "content": rendered,
                     "parts": parts,
                 }
+                t_hook = time.perf_counter()
                 output2, post_events, post_decision = await hooks.run_post_tool_use(
                     tool_name=tool_name,
                     tool_output=output,
                     context=ctx,
                 )
+                if clock is not None:
+                    clock.hook_s += time.perf_counter() - t_hook
                 for he in post_events:
                     store.append_event(session_id, he)
                     yield he
@@ -1883,13 +2441,20 @@ class AgentRuntime:
             return
 
         try:
-            tool = options.tools.get(tool_name)
-            output = await tool.run(tool_input2, ToolContext(cwd=options.cwd, project_dir=options.project_dir))
+            started = early.take(tool_call.tool_use_id, tool_name, tool_input2) if early is not None else None
+            if started is not None:
+                output = await started
+            else:
+                tool = options.tools.get(tool_name)
+                output = await tool.run(tool_input2, ToolContext(cwd=options.cwd, project_dir=options.project_dir))
+            t_hook = time.perf_counter()
             output2, post_events, post_decision = await hooks.run_post_tool_use(
                 tool_name=tool_name,
                 tool_output=output,
                 context=ctx,
             )
+            if clock is not None:
+                clock.hook_s += time.perf_counter() - t_hook
             for he in post_events:
                 store.append_event(session_id, he)
                 yield he
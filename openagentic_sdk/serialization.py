@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import inspect
 import json
-from dataclasses import asdict
-from typing import Any, Mapping, Type
+from dataclasses import asdict, fields, is_dataclass
+from typing import Any, Callable, Collection, Iterable, Mapping, Type
 
 from . import events
 from .errors import InvalidEventError, UnknownEventTypeError
@@ -19,6 +18,7 @@ _TYPE_MAP: Mapping[str, Type[events.EventBase]] = {
     "tool.result": events.ToolResult,
     "tool.output_compacted": events.ToolOutputCompacted,
     "hook.event": events.HookEvent,
+    "step.timing": events.StepTiming,
     "session.checkpoint": events.SessionCheckpoint,
     "session.set_head": events.SessionSetHead,
     "session.undo": events.SessionUndo,
@@ -27,37 +27,156 @@ _TYPE_MAP: Mapping[str, Type[events.EventBase]] = {
 }
 
 
+# Optional JSON accelerators. Output stays compact UTF-8 JSON with the same key
+# order either way, so logs written with or without them are interchangeable.
+def _select_json_codec() -> tuple[str, Callable[[Any], str], Callable[[str | bytes], Any]]:
+    def _std_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    try:
+        import orjson  # type: ignore[import-not-found]
+
+        def _orjson_dumps(obj: Any) -> str:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+            except TypeError:
+                # e.g. ints beyond 64 bits; the stdlib encoder handles them.
+                return _std_dumps(obj)
+
+        return "orjson", _orjson_dumps, orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec  # type: ignore[import-not-found]
+
+        return "msgspec", _std_dumps, msgspec.json.decode
+    except ImportError:
+        pass
+    return "json", _std_dumps, json.loads
+
+
+JSON_BACKEND, _dumps, _loads = _select_json_codec()
+
+
+class _EventCodec:
+    """Precomputed field table for one event dataclass."""
+
+    __slots__ = ("cls", "names", "allowed")
+
+    def __init__(self, cls: type) -> None:
+        self.cls = cls
+        # Declaration order, so dumps keep the `type, ts, seq, ...` prefix the
+        # session offset index relies on.
+        self.names: tuple[str, ...] = tuple(f.name for f in fields(cls))
+        self.allowed: frozenset[str] = frozenset(f.name for f in fields(cls) if f.init and f.name != "type")
+
+
+_PLAIN_TYPES = frozenset({str, int, float, bool, type(None), dict, list, tuple})
+
+_CODECS_BY_TYPE: dict[str, _EventCodec] = {t: _EventCodec(cls) for t, cls in _TYPE_MAP.items()}
+_CODECS_BY_CLASS: dict[type, _EventCodec] = {c.cls: c for c in _CODECS_BY_TYPE.values()}
+
+
+def _codec_for_class(cls: type) -> _EventCodec:
+    codec = _CODECS_BY_CLASS.get(cls)
+    if codec is None:
+        codec = _EventCodec(cls)
+        _CODECS_BY_CLASS[cls] = codec
+    return codec
+
+
 def event_to_dict(event: events.Event) -> dict[str, Any]:
-    return asdict(event)
+    """Return the event's fields as a dict (declaration order).
+
+    Unlike `dataclasses.asdict`, nested containers (tool inputs/outputs,
+    usage, metadata) are shared with the event rather than deep-copied;
+    callers that need to mutate nested values must copy them first. Nested
+    dataclass instances are still converted.
+    """
+
+    cls = type(event)
+    if not is_dataclass(cls):
+        return asdict(event)  # raises the usual TypeError
+    codec = _codec_for_class(cls)
+    out: dict[str, Any] = {}
+    for name in codec.names:
+        v = getattr(event, name)
+        if type(v) not in _PLAIN_TYPES and is_dataclass(v) and not isinstance(v, type):
+            v = asdict(v)
+        out[name] = v
+    return out
 
 
 def event_from_dict(obj: Mapping[str, Any]) -> events.Event:
     event_type = obj.get("type")
     if not isinstance(event_type, str) or not event_type:
         raise InvalidEventError("event missing valid 'type'")
-    cls = _TYPE_MAP.get(event_type)
-    if cls is None:
+    codec = _CODECS_BY_TYPE.get(event_type)
+    if codec is None:
         raise UnknownEventTypeError(event_type)
-    kwargs = dict(obj)
-    kwargs.pop("type", None)
-    allowed = set(inspect.signature(cls).parameters.keys())
-    kwargs = {k: v for k, v in kwargs.items() if k in allowed}
+    allowed = codec.allowed
+    kwargs = {k: v for k, v in obj.items() if k in allowed}
     # dataclasses with default "type" accept kwargs without it
     try:
-        return cls(**kwargs)  # type: ignore[arg-type]
+        return codec.cls(**kwargs)  # type: ignore[return-value]
     except TypeError as e:  # missing/extra fields, etc
         raise InvalidEventError(str(e)) from e
 
 
+def dumps_event_dict(obj: Mapping[str, Any]) -> str:
+    """Serialize an `event_to_dict` result as one compact JSON line (no newline)."""
+
+    return _dumps(obj)
+
+
 def dumps_event(event: events.Event) -> str:
-    return json.dumps(event_to_dict(event), ensure_ascii=False, separators=(",", ":"))
+    return _dumps(event_to_dict(event))
 
 
-def loads_event(raw: str) -> events.Event:
+def loads_event(raw: str | bytes) -> events.Event:
     try:
-        obj = json.loads(raw)
-    except json.JSONDecodeError as e:
+        obj = _loads(raw)
+    except ValueError as e:
         raise InvalidEventError(str(e)) from e
     if not isinstance(obj, dict):
         raise InvalidEventError("event must be a JSON object")
     return event_from_dict(obj)
+
+
+def loads_events(lines: Iterable[str | bytes], *, fields: Collection[str] | None = None) -> list[events.Event]:
+    """Decode a batch of JSONL lines, skipping blank ones.
+
+    With `fields`, each event is a projection: only those fields (plus `seq`)
+    are set and the rest keep their dataclass defaults.
+    """
+
+    loads = _loads
+    codecs = _CODECS_BY_TYPE
+    keep = None if fields is None else frozenset(fields) | {"seq"}
+    projected: dict[str, frozenset[str]] = {}
+    out: list[events.Event] = []
+    append = out.append
+    for raw in lines:
+        if not raw.strip():
+            continue
+        try:
+            obj = loads(raw)
+        except ValueError as e:
+            raise InvalidEventError(str(e)) from e
+        if not isinstance(obj, dict):
+            raise InvalidEventError("event must be a JSON object")
+        t = obj.get("type")
+        codec = codecs.get(t) if type(t) is str else None
+        if codec is None:
+            append(event_from_dict(obj))  # raises the appropriate error
+            continue
+        allowed = codec.allowed
+        if keep is not None:
+            allowed = projected.get(t)  # type: ignore[assignment]
+            if allowed is None:
+                allowed = projected[t] = codec.allowed & keep  # type: ignore[index]
+        try:
+            append(codec.cls(**{k: v for k, v in obj.items() if k in allowed}))
+        except TypeError as e:
+            raise InvalidEventError(str(e)) from e
+    return out
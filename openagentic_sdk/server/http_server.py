@@ -12,7 +12,7 @@ import time
 from dataclasses import dataclass, replace
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 from urllib.parse import parse_qs, urlparse
 
 from ..auth import OAuthAuth, all_auth
@@ -25,6 +25,7 @@ from ..sessions.store import FileSessionStore
 from ..sessions.todos import normalize_todos_for_api
 from ..share.local import LocalShareProvider
 from ..share.share import fetch_shared_session, share_session, unshare_session
+from ..tools.file_index import workspace_index
 from .opencode_view import build_message_v2
 
 _DEFAULT_MAX_REQUEST_BYTES = 2_000_000
@@ -211,6 +212,10 @@ def _session_info(store: FileSessionStore, session_id: str) -> dict[str, Any] |
     rec = store.read_meta_record(session_id)
     if not rec:
         return None
+    return _session_info_from_record(session_id, rec)
+
+
+def _session_info_from_record(session_id: str, rec: dict[str, Any]) -> dict[str, Any]:
     created = rec.get("created_at")
     created_ts: float | None = None
     if isinstance(created, (int, float)):
@@ -617,15 +622,22 @@ class OpenAgenticHttpServer:
                     limit = max(1, min(200, limit))
                     paths_out: list[str] = []
                     needle = q.strip().lower()
-                    for p in root_dir.rglob("*"):
+                    # The index answers when it holds everything `rglob` would find
+                    # (ignored entries included); otherwise walk the disk.
+                    found: Iterable[str]
+                    try:
+                        index = workspace_index(root_dir)
+                        if index.covers(include_ignored=True, include_pruned=True):
+                            found = [e.path for e in index.entries(include_ignored=True, dirs=True)]
+                        else:
+                            found = (p.relative_to(root_dir).as_posix() for p in root_dir.rglob("*"))
+                    except (OSError, RuntimeError):
+                        found = []
+                    for rel in found:
                         if len(paths_out) >= limit:
                             break
-                        try:
-                            rel = p.relative_to(root_dir)
-                        except Exception:
-                            continue
-                        if needle in rel.as_posix().lower():
-                            paths_out.append(rel.as_posix())
+                        if needle in rel.lower():
+                            paths_out.append(rel)
                     _write_json(self, 200, paths_out)
                     return
 
@@ -703,15 +715,12 @@ class OpenAgenticHttpServer:
 
                 if parts == ["session"]:
                     # OpenCode-like: return an array.
-                    sessions = list_sessions(store)
                     limit_raw = query.get("limit")
                     try:
                         limit = int(limit_raw) if isinstance(limit_raw, str) and limit_raw else None
                     except Exception:
                         limit = None
-                    sessions_out = sessions
-                    if isinstance(limit, int) and limit > 0:
-                        sessions_out = sessions_out[:limit]
+                    sessions_out = list_sessions(store, limit=limit if isinstance(limit, int) and limit > 0 else None)
                     _write_json(self, 200, sessions_out)
                     return
 
@@ -764,11 +773,7 @@ class OpenAgenticHttpServer:
                         if not store.read_meta_record(sid):
                             _write_json(self, 404, {"error": "not_found"})
                             return
-                        kids: list[dict[str, Any]] = []
-                        for info in list_sessions(store):
-                            md = info.get("metadata") if isinstance(info, dict) else None
-                            if isinstance(md, dict) and md.get("parent_session_id") == sid:
-                                kids.append(info)
+                        kids = list_sessions(store, parent_session_id=sid)
                         _write_json(self, 200, kids)
                         return
 
@@ -1181,28 +1186,17 @@ class OpenAgenticHttpServer:
         return httpd
 
 
-def list_sessions(store: FileSessionStore) -> list[dict[str, Any]]:
-    root = store.root_dir / "sessions"
-    if not root.exists():
-        return []
+def list_sessions(
+    store: FileSessionStore,
+    *,
+    parent_session_id: str | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
     out: list[dict[str, Any]] = []
-    for d in root.iterdir():
-        if not d.is_dir():
-            continue
-        meta = d / "meta.json"
-        if not meta.exists():
-            continue
-        try:
-            obj = json.loads(meta.read_text(encoding="utf-8", errors="replace"))
-        except Exception:  # noqa: BLE001
-            continue
-        if not isinstance(obj, dict):
-            continue
-        sid = obj.get("session_id")
+    for rec in store.list_sessions(parent_session_id=parent_session_id, limit=limit):
+        sid = rec.get("session_id")
         if isinstance(sid, str) and sid:
-            info = _session_info(store, sid)
-            if info is not None:
-                out.append(info)
+            out.append(_session_info_from_record(sid, rec))
     return out
 
 
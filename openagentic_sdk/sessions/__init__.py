@@ -1,4 +1,4 @@
+from .sqlite_store import SqliteSessionStore
 from .store import FileSessionStore
 
-__all__ = ["FileSessionStore"]
-
+__all__ = ["FileSessionStore", "SqliteSessionStore"]
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+_SortKey = tuple[float, str]
+
+
+def _sort_key(rec: dict[str, Any]) -> _SortKey:
+    # Newest first, ties broken by session id for a stable order across pages.
+    v = rec.get("created_at")
+    created = float(v) if isinstance(v, (int, float)) else 0.0
+    return (-created, str(rec.get("session_id") or ""))
+
+
+def _parent_of(rec: dict[str, Any]) -> str | None:
+    md = rec.get("metadata")
+    parent = md.get("parent_session_id") if isinstance(md, dict) else None
+    return parent if isinstance(parent, str) and parent else None
+
+
+class SessionCatalog:
+    """Persistent catalog of session meta records for one session root.
+
+    The catalog is an append-only journal (`catalog.jsonl`) of
+    `{"op": "put", "record": ...}` / `{"op": "del", "session_id": ...}` lines,
+    loaded once into memory and kept sorted (newest first) with a
+    parent -> children index. `meta.json` stays the source of truth: a missing
+    catalog is rebuilt from disk on first use, and `rebuild()` recovers from
+    drift (e.g. sessions deleted out of band). Appends by other processes are
+    picked up on the next call by reading only the journal tail.
+
+    Every call holds an exclusive `flock` on `catalog.jsonl.lock` (where fcntl
+    exists), so catalogs of the same root in other processes, or other
+    instances in this one, never append to a journal that is being replaced.
+    """
+
+    def __init__(self, *, path: Path, scan: Callable[[], Iterable[dict[str, Any]]]) -> None:
+        self._path = path
+        self._scan = scan
+        self._lock = threading.RLock()
+        self._records: dict[str, dict[str, Any]] = {}
+        self._order: list[tuple[_SortKey, str]] = []
+        self._children: dict[str, set[str]] = {}
+        self._offset = 0
+        self._journal_lines = 0
+        self._loaded = False
+        # Compaction replaces the file, so a new inode means "replay from scratch".
+        self._ino = -1
+        # Descriptor of the held lock file, so nested calls do not lock again.
+        self._lock_fd: int | None = None
+
+    def __len__(self) -> int:
+        with self._exclusive():
+            self._sync()
+            return len(self._records)
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        with self._exclusive():
+            self._sync()
+            rec = self._records.get(session_id)
+            return dict(rec) if rec is not None else None
+
+    def list(
+        self,
+        *,
+        parent_session_id: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        with self._exclusive():
+            self._sync()
+            start = max(0, int(offset))
+            stop = None if limit is None else start + max(0, int(limit))
+            if parent_session_id is None:
+                ids = [sid for _, sid in self._order[start:stop]]
+            else:
+                kids = self._children.get(parent_session_id, set())
+                ids = [sid for _, sid in sorted((_sort_key(self._records[k]), k) for k in kids)][start:stop]
+            return [dict(self._records[sid]) for sid in ids]
+
+    def put(self, record: dict[str, Any]) -> None:
+        sid = record.get("session_id")
+        if not isinstance(sid, str) or not sid:
+            return
+        with self._exclusive():
+            self._sync()
+            self._apply_put(dict(record))
+            self._append({"op": "put", "record": record})
+
+    def delete(self, session_id: str) -> None:
+        with self._exclusive():
+            self._sync()
+            self._apply_del(session_id)
+            self._append({"op": "del", "session_id": session_id})
+
+    def rebuild(self) -> int:
+        """Rebuild the catalog from the meta records on disk; returns the session count."""
+
+        with self._exclusive():
+            self._reset()
+            for rec in self._scan():
+                self._apply_put(dict(rec))
+            if self._records or self._path.parent.exists():
+                self._write_snapshot()
+            self._loaded = True
+            return len(self._records)
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        with self._lock:
+            # Without the sessions directory there is nothing to share yet.
+            if fcntl is None or self._lock_fd is not None or not self._path.parent.is_dir():
+                yield
+                return
+            fd = os.open(self._path.with_name(self._path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._lock_fd = fd
+                yield
+            finally:
+                self._lock_fd = None
+                os.close(fd)
+
+    # Internals (caller holds the lock).
+
+    def _reset(self) -> None:
+        self._records = {}
+        self._order = []
+        self._children = {}
+        self._offset = 0
+        self._journal_lines = 0
+
+    def _sync(self) -> None:
+        try:
+            st = self._path.stat()
+        except FileNotFoundError:
+            # First use (or the catalog was removed): derive it from meta.json files.
+            self.rebuild()
+            return
+        size = st.st_size
+        if not self._loaded or st.st_ino != self._ino or size < self._offset:
+            # First load, or compacted by another process: replay from scratch.
+            self._reset()
+            self._loaded = True
+            self._ino = st.st_ino
+        if size > self._offset:
+            self._replay()
+
+    def _replay(self) -> None:
+        with self._path.open("rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(op, dict):
+                continue
+            self._journal_lines += 1
+            if op.get("op") == "put" and isinstance(op.get("record"), dict):
+                self._apply_put(op["record"])
+            elif op.get("op") == "del" and isinstance(op.get("session_id"), str):
+                self._apply_del(op["session_id"])
+        self._offset += end
+
+    def _apply_put(self, rec: dict[str, Any]) -> None:
+        sid = str(rec.get("session_id") or "")
+        if not sid:
+            return
+        self._apply_del(sid)
+        self._records[sid] = rec
+        insort(self._order, (_sort_key(rec), sid))
+        parent = _parent_of(rec)
+        if parent is not None:
+            self._children.setdefault(parent, set()).add(sid)
+
+    def _apply_del(self, sid: str) -> None:
+        old = self._records.pop(sid, None)
+        if old is None:
+            return
+        entry = (_sort_key(old), sid)
+        i = bisect_left(self._order, entry)
+        if i < len(self._order) and self._order[i] == entry:
+            del self._order[i]
+        parent = _parent_of(old)
+        if parent is not None:
+            kids = self._children.get(parent)
+            if kids is not None:
+                kids.discard(sid)
+                if not kids:
+                    del self._children[parent]
+
+    def _append(self, op: dict[str, Any]) -> None:
+        line = (json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open("ab") as f:
+            # If another process appended since our last sync, leave the offset
+            # behind so the next sync replays its lines (ops are idempotent).
+            caught_up = f.tell() == self._offset
+            f.write(line)
+        if caught_up:
+            self._offset += len(line)
+            self._journal_lines += 1
+        if self._journal_lines > 2 * len(self._records) + 64:
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        out = bytearray()
+        for _, sid in self._order:
+            out += (json.dumps({"op": "put", "record": self._records[sid]}, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(f"{self._path.name}.{uuid.uuid4().hex}.tmp")
+        with tmp.open("wb") as f:
+            f.write(bytes(out))
+        os.replace(tmp, self._path)
+        self._ino = self._path.stat().st_ino
+        self._offset = len(out)
+        self._journal_lines = len(self._records)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Iterable, Mapping
+
+from ..events import AssistantMessage, Event, SessionRedo, SessionSetHead, SessionUndo, ToolOutputCompacted, ToolResult
+from .rebuild import (
+    _drop_unlinked_function_call_outputs,
+    _drop_unlinked_tool_messages,
+    _message_for_event,
+    _message_size,
+    _replay_head_controls,
+    _responses_item_for_event,
+    _responses_item_size,
+)
+
+_CONTROL_TYPES = (SessionSetHead, SessionUndo, SessionRedo)
+
+
+def _positive_seq(e: Event) -> int | None:
+    seq = getattr(e, "seq", None)
+    return seq if isinstance(seq, int) and seq > 0 else None
+
+
+def _is_summary(e: Event) -> bool:
+    return isinstance(e, AssistantMessage) and bool(getattr(e, "is_summary", False))
+
+
+class IncrementalRebuilder:
+    """Incrementally maintained equivalent of `rebuild_messages`/`rebuild_responses_input`.
+
+    Events are applied in log order as they are appended. The common cases
+    (a new event at the tip, a new summary pivot, a fresh compaction marker)
+    update the result in place; head moves that change which past events are
+    visible fall back to recomputing the window from the in-memory events,
+    which still avoids re-reading and re-decoding the log.
+
+    `items()` always equals the batch rebuild over `events`.
+    """
+
+    def __init__(self, *, protocol: str, max_events: int, max_bytes: int) -> None:
+        self._convert: Callable[[Event, set[str]], Mapping[str, Any] | None]
+        self._size: Callable[[Mapping[str, Any]], int]
+        self._drop_unlinked: Callable[[list[Mapping[str, Any]]], list[Mapping[str, Any]]]
+        if protocol == "legacy":
+            self._convert = _message_for_event
+            self._size = _message_size
+            self._drop_unlinked = _drop_unlinked_tool_messages
+        else:
+            self._convert = _responses_item_for_event
+            self._size = _responses_item_size
+            self._drop_unlinked = _drop_unlinked_function_call_outputs
+        self._max_events = max_events
+        self._max_bytes = max_bytes
+
+        self._events: list[Event] = []
+        self._controls: list[Event] = []
+        self._max_seq = 0
+        self._cursor = 0
+        self._head = 0
+
+        # Post-head, post-pivot events and the longest item suffix that fits
+        # the max_events/max_bytes budget.
+        self._window: list[Event] = []
+        self._compacted: set[str] = set()
+        self._window_result_ids: set[str] = set()
+        self._suffix: deque[tuple[Mapping[str, Any], int]] = deque()
+        self._suffix_bytes = 0
+        self._item_cache: dict[int, tuple[Mapping[str, Any], int] | None] = {}
+
+    @property
+    def events(self) -> list[Event]:
+        """All applied events in log order (including session control events)."""
+
+        return self._events
+
+    @property
+    def cursor(self) -> int:
+        """Highest log seq applied so far (line count for seq-less legacy logs)."""
+
+        return self._cursor
+
+    def apply(self, events: Iterable[Event]) -> None:
+        for e in events:
+            self._apply_one(e)
+
+    def items(self) -> list[Mapping[str, Any]]:
+        # Shallow copies: callers (hooks, the runtime loop) may mutate messages.
+        return self._drop_unlinked([dict(item) for item, _ in self._suffix])
+
+    def _effective_max_seq(self) -> int:
+        # Matches rebuild._max_seq: fall back to the event count for seq-less logs.
+        return self._max_seq if self._max_seq > 0 else len(self._events)
+
+    def _apply_one(self, e: Event) -> None:
+        old_max = self._effective_max_seq()
+        self._events.append(e)
+        seq = _positive_seq(e)
+        if seq is not None:
+            self._max_seq = max(self._max_seq, seq)
+            self._cursor = max(self._cursor, seq)
+        else:
+            self._cursor += 1
+
+        old_head = self._head
+        new_max = self._effective_max_seq()
+        if isinstance(e, _CONTROL_TYPES):
+            self._controls.append(e)
+        new_head = _replay_head_controls(self._controls, head=new_max)
+        self._head = new_head
+
+        if new_head != old_head:
+            following_tip = old_head == old_max and new_head == new_max
+            if isinstance(e, _CONTROL_TYPES) or not following_tip:
+                self._recompute_window()
+                return
+        if isinstance(e, _CONTROL_TYPES):
+            return
+        if seq is not None and seq > new_head:
+            return
+        self._push(e)
+
+    def _push(self, e: Event) -> None:
+        if _is_summary(e):
+            self._window = [e]
+            self._compacted = set()
+            self._window_result_ids = set()
+            self._rebuild_suffix()
+            return
+
+        self._window.append(e)
+        if isinstance(e, ToolOutputCompacted):
+            tid = getattr(e, "tool_use_id", "")
+            if isinstance(tid, str) and tid and tid not in self._compacted:
+                self._compacted.add(tid)
+                if tid in self._window_result_ids:
+                    # An earlier result now renders as a placeholder; sizes shift.
+                    self._rebuild_suffix()
+            return
+        if isinstance(e, ToolResult):
+            self._window_result_ids.add(e.tool_use_id)
+
+        entry = self._entry(e)
+        if entry is None:
+            return
+        self._suffix.append(entry)
+        self._suffix_bytes += entry[1]
+        while self._suffix and (len(self._suffix) > self._max_events or self._suffix_bytes > self._max_bytes):
+            _, size = self._suffix.popleft()
+            self._suffix_bytes -= size
+
+    def _entry(self, e: Event) -> tuple[Mapping[str, Any], int] | None:
+        if isinstance(e, ToolResult) and e.tool_use_id in self._compacted:
+            item = self._convert(e, self._compacted)
+            return None if item is None else (item, self._size(item))
+        key = id(e)
+        if key in self._item_cache:
+            return self._item_cache[key]
+        item = self._convert(e, set())
+        entry = None if item is None else (item, self._size(item))
+        self._item_cache[key] = entry
+        return entry
+
+    def _recompute_window(self) -> None:
+        head = self._head
+        visible: list[Event] = []
+        for e in self._events:
+            if isinstance(e, _CONTROL_TYPES):
+                continue
+            seq = _positive_seq(e)
+            if seq is None or seq <= head:
+                visible.append(e)
+        pivot = 0
+        for i, e in enumerate(visible):
+            if _is_summary(e):
+                pivot = i
+        self._window = visible[pivot:]
+        self._compacted = set()
+        self._window_result_ids = set()
+        for e in self._window:
+            if isinstance(e, ToolOutputCompacted):
+                tid = getattr(e, "tool_use_id", "")
+                if isinstance(tid, str) and tid:
+                    self._compacted.add(tid)
+            elif isinstance(e, ToolResult):
+                self._window_result_ids.add(e.tool_use_id)
+        self._rebuild_suffix()
+
+    def _rebuild_suffix(self) -> None:
+        suffix_rev: list[tuple[Mapping[str, Any], int]] = []
+        total = 0
+        for e in reversed(self._window):
+            entry = self._entry(e)
+            if entry is None:
+                continue
+            if len(suffix_rev) >= self._max_events:
+                break
+            if total + entry[1] > self._max_bytes:
+                break
+            total += entry[1]
+            suffix_rev.append(entry)
+        suffix_rev.reverse()
+        self._suffix = deque(suffix_rev)
+        self._suffix_bytes = total
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterator
+
+# One fixed-width record per event line: (seq, start offset, end offset).
+# The last record therefore also carries the last seq and the indexed file size.
+_RECORD_FIELDS = 3
+_RECORD_BYTES = 8 * _RECORD_FIELDS
+
+# Lines written by FileSessionStore start with the EventBase fields in order, so
+# the seq can usually be read without decoding the whole line.
+_SEQ_PREFIX_RE = re.compile(rb'^\{"type":"[^"\\]*","ts":[^,]*,"seq":(\d+)[,}]')
+_TYPE_PREFIX_RE = re.compile(rb'^\{"type":"([^"\\]*)"')
+
+
+def _line_seq(line: bytes) -> int | None:
+    m = _SEQ_PREFIX_RE.match(line)
+    if m is not None:
+        return int(m.group(1))
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+    seq = obj.get("seq")
+    return seq if isinstance(seq, int) else None
+
+
+def _line_type(line: bytes) -> str | None:
+    """Read the event type from the line prefix; None if it needs a full decode."""
+
+    m = _TYPE_PREFIX_RE.match(line)
+    return m.group(1).decode("ascii", "replace") if m is not None else None
+
+
+def scan_log(path: Path, *, start: int = 0, stop: int | None = None, last_seq: int = 0) -> Iterator[tuple[int, int, int]]:
+    """Yield (seq, offset, end) for complete lines in `path[start:stop]`.
+
+    Back-compat: lines without a `seq` get the previous seq + 1 (matching the
+    line-count fallback in `FileSessionStore._infer_next_seq`). Undecodable
+    lines are skipped.
+    """
+
+    with path.open("rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            end = offset + len(line)
+            if stop is not None and end > stop:
+                break
+            if not line.endswith(b"\n"):
+                # Partial trailing write; index it once it is complete.
+                break
+            if line.strip():
+                seq = _line_seq(line)
+                if seq is None and line.lstrip().startswith(b"{"):
+                    seq = last_seq + 1
+                if seq is not None:
+                    last_seq = seq
+                    yield seq, offset, end
+            offset = end
+
+
+class EventLogIndex:
+    """Sidecar seq -> byte offset index for one session's `events.jsonl`.
+
+    Records are persisted to `events.idx` as little-endian int64 triples
+    (seq, offset, end). The file is append-only: the store writes one record
+    per appended event, after the log line itself, so a crash can only leave
+    the index behind the log. `refresh()` catches up from the log tail and
+    rebuilds the index if the log shrank underneath it.
+    """
+
+    def __init__(self, *, log_path: Path, idx_path: Path, base_seq: int = 0) -> None:
+        self._log_path = log_path
+        self._idx_path = idx_path
+        # Last seq of earlier (sealed) segments when `log_path` is the live segment.
+        self._base_seq = base_seq
+        self._seqs = array("q")
+        self._offsets = array("q")
+        self._ends = array("q")
+        self._loaded = False
+
+    @property
+    def last_seq(self) -> int:
+        return self._seqs[-1] if self._seqs else self._base_seq
+
+    @property
+    def size(self) -> int:
+        """Logical end of the indexed log (includes buffered, uncommitted lines)."""
+
+        return self._ends[-1] if self._ends else 0
+
+    def __len__(self) -> int:
+        return len(self._seqs)
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = self._idx_path.read_bytes()
+        except FileNotFoundError:
+            data = b""
+        data = data[: len(data) - (len(data) % _RECORD_BYTES)]
+        flat = array("q")
+        flat.frombytes(data)
+        if sys.byteorder != "little":
+            flat.byteswap()
+        self._seqs = flat[0::_RECORD_FIELDS]
+        self._offsets = flat[1::_RECORD_FIELDS]
+        self._ends = flat[2::_RECORD_FIELDS]
+        if len(data) != self._idx_size_on_disk():
+            # Torn trailing record: rewrite so later appends stay aligned.
+            self._rewrite()
+        self.refresh()
+
+    def refresh(self, *, upto: int | None = None) -> None:
+        """Bring the index in sync with the log file on disk (or up to `upto`)."""
+
+        self.load()
+        try:
+            disk_size = self._log_path.stat().st_size
+        except FileNotFoundError:
+            disk_size = 0
+        target = disk_size if upto is None else min(upto, disk_size)
+        if target < self.size:
+            self._reset()
+            self._catch_up(0, target)
+            self._rewrite()
+            return
+        if target > self.size:
+            self._catch_up(self.size, target, persist=True)
+
+    def add(self, seq: int, offset: int, end: int) -> bytes:
+        """Record a new line in memory and return the record bytes to persist."""
+
+        self._seqs.append(seq)
+        self._offsets.append(offset)
+        self._ends.append(end)
+        return self.encode(seq, offset, end)
+
+    @staticmethod
+    def encode(seq: int, offset: int, end: int) -> bytes:
+        rec = array("q", (seq, offset, end))
+        if sys.byteorder != "little":
+            rec.byteswap()
+        return rec.tobytes()
+
+    def byte_range(self, start_seq: int | None = None, end_seq: int | None = None) -> tuple[int, int] | None:
+        """Return the (offset, end) byte span covering seqs in [start_seq, end_seq]."""
+
+        lo = 0 if start_seq is None else bisect_left(self._seqs, start_seq)
+        hi = len(self._seqs) if end_seq is None else bisect_right(self._seqs, end_seq)
+        if lo >= hi:
+            return None
+        return self._offsets[lo], self._ends[hi - 1]
+
+    def tail_range(self, n: int) -> tuple[int, int] | None:
+        if n <= 0 or not self._seqs:
+            return None
+        lo = max(0, len(self._seqs) - n)
+        return self._offsets[lo], self._ends[-1]
+
+    def _idx_size_on_disk(self) -> int:
+        try:
+            return self._idx_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _reset(self) -> None:
+        self._seqs = array("q")
+        self._offsets = array("q")
+        self._ends = array("q")
+
+    def _catch_up(self, start: int, stop: int, *, persist: bool = False) -> None:
+        if not self._log_path.exists():
+            return
+        out = bytearray()
+        for seq, offset, end in scan_log(self._log_path, start=start, stop=stop, last_seq=self.last_seq):
+            out += self.add(seq, offset, end)
+        if persist and out:
+            with self._idx_path.open("ab") as f:
+                f.write(out)
+
+    def _rewrite(self) -> None:
+        flat = array("q")
+        for i in range(len(self._seqs)):
+            flat.extend((self._seqs[i], self._offsets[i], self._ends[i]))
+        if sys.byteorder != "little":
+            flat.byteswap()
+        # Rewrite in place (not via rename) so long-lived "ab" handles held by a
+        # buffered writer keep pointing at the live file. A torn rewrite is
+        # detected and repaired by the next load().
+        with self._idx_path.open("wb") as f:
+            f.write(flat.tobytes())
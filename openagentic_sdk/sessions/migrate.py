@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import shutil
+from typing import Any, Iterable
+
+# Per-session sidecar files that live next to the log in both store kinds.
+_SIDECAR_FILES = ("todos.json",)
+
+
+def migrate_sessions(source: Any, dest: Any, *, session_ids: Iterable[str] | None = None) -> list[str]:
+    """Copy sessions between stores (FileSessionStore <-> SqliteSessionStore).
+
+    Events keep their seq and ts, meta records are copied verbatim and the
+    transcript is regenerated. Sessions that already exist in `dest` are
+    skipped, so an interrupted migration can simply be re-run. Returns the ids
+    that were copied.
+    """
+
+    if session_ids is None:
+        ids = [str(r.get("session_id") or "") for r in source.list_sessions()]
+    else:
+        ids = [str(s) for s in session_ids]
+    copied: list[str] = []
+    for sid in ids:
+        rec = source.read_meta_record(sid)
+        if not rec or dest.read_meta_record(sid):
+            continue
+        dest.import_session(sid, meta_record=rec, events=source.iter_events(sid))
+        for name in _SIDECAR_FILES:
+            src = source.session_dir(sid) / name
+            if src.is_file():
+                shutil.copyfile(src, dest.session_dir(sid) / name)
+        copied.append(sid)
+    return copied
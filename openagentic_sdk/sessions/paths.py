@@ -17,3 +17,19 @@ def meta_path(root_dir: Path, session_id: str) -> Path:
 
 def transcript_path(root_dir: Path, session_id: str) -> Path:
     return session_dir(root_dir, session_id) / "transcript.jsonl"
+
+
+def index_path(root_dir: Path, session_id: str) -> Path:
+    return session_dir(root_dir, session_id) / "events.idx"
+
+
+def segments_dir(root_dir: Path, session_id: str) -> Path:
+    return session_dir(root_dir, session_id) / "segments"
+
+
+def segments_manifest_path(root_dir: Path, session_id: str) -> Path:
+    return session_dir(root_dir, session_id) / "segments.json"
+
+
+def catalog_path(root_dir: Path) -> Path:
+    return root_dir / "sessions" / "catalog.jsonl"
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 
 from ..events import (
     AssistantMessage,
@@ -44,7 +44,10 @@ def _max_seq(events: list[Event]) -> int:
 def _effective_head_seq(events: list[Event]) -> int:
     """Compute the effective head pointer after applying session control events."""
 
-    head = _max_seq(events)
+    return _replay_head_controls(events, head=_max_seq(events))
+
+
+def _replay_head_controls(events: Iterable[Event], *, head: int) -> int:
     undo_stack: list[int] = []
     redo_stack: list[int] = []
 
@@ -97,58 +100,43 @@ def _collect_compacted_tool_ids(events: list[Event]) -> set[str]:
     return compacted
 
 
-def rebuild_messages(events: list[Event], *, max_events: int, max_bytes: int) -> list[Mapping[str, Any]]:
-    events2 = _filter_to_latest_summary_pivot(_filter_to_head(events))
-    compacted_ids = _collect_compacted_tool_ids(events2)
-
-    messages_rev: list[Mapping[str, Any]] = []
-    total_bytes = 0
-
-    for e in reversed(events2):
-        msg: Mapping[str, Any] | None = None
-        if isinstance(e, UserMessage):
-            msg = {"role": "user", "content": e.text}
-        elif isinstance(e, UserCompaction):
-            msg = {"role": "user", "content": COMPACTION_MARKER_QUESTION}
-        elif isinstance(e, AssistantMessage):
-            msg = {"role": "assistant", "content": e.text}
-        elif isinstance(e, ToolUse):
-            # Rebuild an assistant tool-call message so future provider calls that include tool results
-            # remain valid for OpenAI-compatible gateways that require tool_call_id linkage.
-            msg = {
-                "role": "assistant",
-                "content": "",
-                "tool_calls": [
-                    {
-                        "id": e.tool_use_id,
-                        "type": "function",
-                        "function": {"name": e.name, "arguments": json.dumps(dict(e.input or {}), ensure_ascii=False)},
-                    }
-                ],
-            }
-        elif isinstance(e, ToolResult):
-            content = _TOOL_OUTPUT_PLACEHOLDER if e.tool_use_id in compacted_ids else json.dumps(e.output, ensure_ascii=False)
-            msg = {
-                "role": "tool",
-                "tool_call_id": e.tool_use_id,
-                "content": content,
-            }
-
-        if msg is None:
-            continue
-
-        content = msg.get("content") or ""
-        size = len(str(content).encode("utf-8"))
-        if len(messages_rev) >= max_events:
-            break
-        if total_bytes + size > max_bytes:
-            break
-
-        total_bytes += size
-        messages_rev.append(msg)
-
-    messages = list(reversed(messages_rev))
-
+def _message_for_event(e: Event, compacted_ids: set[str]) -> Mapping[str, Any] | None:
+    if isinstance(e, UserMessage):
+        return {"role": "user", "content": e.text}
+    if isinstance(e, UserCompaction):
+        return {"role": "user", "content": COMPACTION_MARKER_QUESTION}
+    if isinstance(e, AssistantMessage):
+        return {"role": "assistant", "content": e.text}
+    if isinstance(e, ToolUse):
+        # Rebuild an assistant tool-call message so future provider calls that include tool results
+        # remain valid for OpenAI-compatible gateways that require tool_call_id linkage.
+        return {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [
+                {
+                    "id": e.tool_use_id,
+                    "type": "function",
+                    "function": {"name": e.name, "arguments": json.dumps(dict(e.input or {}), ensure_ascii=False)},
+                }
+            ],
+        }
+    if isinstance(e, ToolResult):
+        content = _TOOL_OUTPUT_PLACEHOLDER if e.tool_use_id in compacted_ids else json.dumps(e.output, ensure_ascii=False)
+        return {
+            "role": "tool",
+            "tool_call_id": e.tool_use_id,
+            "content": content,
+        }
+    return None
+
+
+def _message_size(msg: Mapping[str, Any]) -> int:
+    content = msg.get("content") or ""
+    return len(str(content).encode("utf-8"))
+
+
+def _drop_unlinked_tool_messages(messages: list[Mapping[str, Any]]) -> list[Mapping[str, Any]]:
     # Safety: drop any tool results that don't have a preceding tool_calls entry in the reconstructed messages.
     # Some providers reject histories with unmatched tool_call_id.
     seen_tool_call_ids: set[str] = set()
@@ -168,10 +156,81 @@ def rebuild_messages(events: list[Event], *, max_events: int, max_bytes: int) ->
                 filtered.append(m)
             continue
         filtered.append(m)
+    return filtered
+
 
+def _responses_item_for_event(e: Event, compacted_ids: set[str]) -> Mapping[str, Any] | None:
+    if isinstance(e, UserMessage):
+        return {"role": "user", "content": e.text}
+    if isinstance(e, UserCompaction):
+        return {"role": "user", "content": COMPACTION_MARKER_QUESTION}
+    if isinstance(e, AssistantMessage):
+        return {"role": "assistant", "content": e.text}
+    if isinstance(e, ToolUse):
+        return {
+            "type": "function_call",
+            "call_id": e.tool_use_id,
+            "name": e.name,
+            "arguments": json.dumps(dict(e.input or {}), ensure_ascii=False),
+        }
+    if isinstance(e, ToolResult):
+        output = _TOOL_OUTPUT_PLACEHOLDER if e.tool_use_id in compacted_ids else json.dumps(e.output, ensure_ascii=False)
+        return {
+            "type": "function_call_output",
+            "call_id": e.tool_use_id,
+            "output": output,
+        }
+    return None
+
+
+def _responses_item_size(item: Mapping[str, Any]) -> int:
+    content = item.get("content") or item.get("output") or ""
+    return len(str(content).encode("utf-8"))
+
+
+def _drop_unlinked_function_call_outputs(items: list[Mapping[str, Any]]) -> list[Mapping[str, Any]]:
+    seen_call_ids: set[str] = set()
+    filtered: list[Mapping[str, Any]] = []
+    for it in items:
+        if it.get("type") == "function_call":
+            call_id = it.get("call_id")
+            if isinstance(call_id, str) and call_id:
+                seen_call_ids.add(call_id)
+            filtered.append(it)
+            continue
+        if it.get("type") == "function_call_output":
+            call_id = it.get("call_id")
+            if isinstance(call_id, str) and call_id and call_id in seen_call_ids:
+                filtered.append(it)
+            continue
+        filtered.append(it)
     return filtered
 
 
+def rebuild_messages(events: list[Event], *, max_events: int, max_bytes: int) -> list[Mapping[str, Any]]:
+    events2 = _filter_to_latest_summary_pivot(_filter_to_head(events))
+    compacted_ids = _collect_compacted_tool_ids(events2)
+
+    messages_rev: list[Mapping[str, Any]] = []
+    total_bytes = 0
+
+    for e in reversed(events2):
+        msg = _message_for_event(e, compacted_ids)
+        if msg is None:
+            continue
+
+        size = _message_size(msg)
+        if len(messages_rev) >= max_events:
+            break
+        if total_bytes + size > max_bytes:
+            break
+
+        total_bytes += size
+        messages_rev.append(msg)
+
+    return _drop_unlinked_tool_messages(list(reversed(messages_rev)))
+
+
 def rebuild_responses_input(events: list[Event], *, max_events: int, max_bytes: int) -> list[Mapping[str, Any]]:
     events2 = _filter_to_latest_summary_pivot(_filter_to_head(events))
     compacted_ids = _collect_compacted_tool_ids(events2)
@@ -180,33 +239,11 @@ def rebuild_responses_input(events: list[Event], *, max_events: int, max_bytes:
     total_bytes = 0
 
     for e in reversed(events2):
-        item: Mapping[str, Any] | None = None
-        if isinstance(e, UserMessage):
-            item = {"role": "user", "content": e.text}
-        elif isinstance(e, UserCompaction):
-            item = {"role": "user", "content": COMPACTION_MARKER_QUESTION}
-        elif isinstance(e, AssistantMessage):
-            item = {"role": "assistant", "content": e.text}
-        elif isinstance(e, ToolUse):
-            item = {
-                "type": "function_call",
-                "call_id": e.tool_use_id,
-                "name": e.name,
-                "arguments": json.dumps(dict(e.input or {}), ensure_ascii=False),
-            }
-        elif isinstance(e, ToolResult):
-            output = _TOOL_OUTPUT_PLACEHOLDER if e.tool_use_id in compacted_ids else json.dumps(e.output, ensure_ascii=False)
-            item = {
-                "type": "function_call_output",
-                "call_id": e.tool_use_id,
-                "output": output,
-            }
-
+        item = _responses_item_for_event(e, compacted_ids)
         if item is None:
             continue
 
-        content = item.get("content") or item.get("output") or ""
-        size = len(str(content).encode("utf-8"))
+        size = _responses_item_size(item)
         if len(items_rev) >= max_events:
             break
         if total_bytes + size > max_bytes:
@@ -215,22 +252,4 @@ def rebuild_responses_input(events: list[Event], *, max_events: int, max_bytes:
         total_bytes += size
         items_rev.append(item)
 
-    items = list(reversed(items_rev))
-
-    seen_call_ids: set[str] = set()
-    filtered: list[Mapping[str, Any]] = []
-    for it in items:
-        if it.get("type") == "function_call":
-            call_id = it.get("call_id")
-            if isinstance(call_id, str) and call_id:
-                seen_call_ids.add(call_id)
-            filtered.append(it)
-            continue
-        if it.get("type") == "function_call_output":
-            call_id = it.get("call_id")
-            if isinstance(call_id, str) and call_id and call_id in seen_call_ids:
-                filtered.append(it)
-            continue
-        filtered.append(it)
-
-    return filtered
+    return _drop_unlinked_function_call_outputs(list(reversed(items_rev)))
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from .index import _line_seq
+
+SEGMENT_CODECS = ("none", "gzip", "zstd")
+
+_SUFFIXES = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+_CONTROL_TYPES = (b'"type":"session.set_head"', b'"type":"session.undo"', b'"type":"session.redo"')
+
+
+def _zstd_module() -> Any | None:
+    try:
+        from compression import zstd  # type: ignore[import-not-found]  # Python 3.14+
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+def validate_codec(codec: str) -> str:
+    if codec not in SEGMENT_CODECS:
+        raise ValueError(f"segment_compression must be one of {', '.join(SEGMENT_CODECS)}")
+    if codec == "zstd" and _zstd_module() is None:
+        raise RuntimeError("zstd segment compression requires Python 3.14+ or the 'zstandard' package")
+    return codec
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        # mtime=0 keeps sealed segments byte-stable for identical content.
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == "zstd":
+        mod = _zstd_module()
+        if mod is None:
+            raise RuntimeError("zstd segment compression requires Python 3.14+ or the 'zstandard' package")
+        if hasattr(mod, "ZstdCompressor") and not hasattr(mod, "compress"):
+            return mod.ZstdCompressor().compress(data)
+        return mod.compress(data)
+    return data
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        mod = _zstd_module()
+        if mod is None:
+            raise RuntimeError("reading zstd segments requires Python 3.14+ or the 'zstandard' package")
+        if hasattr(mod, "ZstdDecompressor") and not hasattr(mod, "decompress"):
+            return mod.ZstdDecompressor().decompress(data)
+        return mod.decompress(data)
+    return data
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentInfo:
+    file: str
+    codec: str
+    first_seq: int
+    last_seq: int
+    # Uncompressed size of the sealed log lines.
+    raw_bytes: int
+    # Seq of the last summary pivot (`assistant.message` with is_summary) in the segment.
+    summary_seq: int | None = None
+    # Number of session head-control events (set_head/undo/redo) in the segment.
+    controls: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "file": self.file,
+            "codec": self.codec,
+            "first_seq": self.first_seq,
+            "last_seq": self.last_seq,
+            "raw_bytes": self.raw_bytes,
+            "summary_seq": self.summary_seq,
+            "controls": self.controls,
+        }
+
+    @staticmethod
+    def from_dict(obj: dict[str, Any]) -> "SegmentInfo":
+        summary = obj.get("summary_seq")
+        return SegmentInfo(
+            file=str(obj["file"]),
+            codec=str(obj.get("codec") or "none"),
+            first_seq=int(obj["first_seq"]),
+            last_seq=int(obj["last_seq"]),
+            raw_bytes=int(obj.get("raw_bytes") or 0),
+            summary_seq=summary if isinstance(summary, int) else None,
+            controls=int(obj.get("controls") or 0),
+        )
+
+
+def load_manifest(path: Path) -> list[SegmentInfo]:
+    try:
+        with path.open("rb") as f:
+            obj = json.loads(f.read())
+    except FileNotFoundError:
+        return []
+    segs = obj.get("segments") if isinstance(obj, dict) else None
+    if not isinstance(segs, list):
+        return []
+    return [SegmentInfo.from_dict(s) for s in segs if isinstance(s, dict)]
+
+
+def write_manifest(path: Path, segments: Iterable[SegmentInfo]) -> None:
+    body = {"version": 1, "segments": [s.to_dict() for s in segments]}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(body, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def normalize_lines(data: bytes, *, last_seq: int) -> tuple[list[bytes], int, int | None, int]:
+    """Split complete log lines and give seq-less legacy lines an explicit seq.
+
+    Returns (lines, last_seq, summary_seq, controls). Sealed segments always
+    carry explicit seqs so they can be read independently of earlier ones.
+    """
+
+    lines: list[bytes] = []
+    summary_seq: int | None = None
+    controls = 0
+    for line in data.splitlines(keepends=True):
+        if not line.strip():
+            continue
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        seq = _line_seq(line)
+        if seq is None:
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(obj, dict):
+                continue
+            seq = last_seq + 1
+            obj["seq"] = seq
+            line = (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        last_seq = seq
+        if b'"is_summary":true' in line:
+            try:
+                obj2 = json.loads(line)
+            except ValueError:
+                obj2 = None
+            if isinstance(obj2, dict) and obj2.get("type") == "assistant.message" and obj2.get("is_summary") is True:
+                summary_seq = seq
+        if any(t in line for t in _CONTROL_TYPES):
+            controls += 1
+        lines.append(line)
+    return lines, last_seq, summary_seq, controls
+
+
+def segment_name(number: int, codec: str) -> str:
+    return f"events.{number:06d}{_SUFFIXES[codec]}"
+
+
+def base_segment_name(codec: str) -> str:
+    # Holds the events a detached fork used to read through to its parent.
+    return f"events.base{_SUFFIXES[codec]}"
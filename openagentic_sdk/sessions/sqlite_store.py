@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import json
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Collection, Iterable, Iterator, Optional
+
+from ..events import Event, SessionCheckpoint, SessionRedo, SessionSetHead, SessionUndo
+from ..serialization import dumps_event_dict, event_to_dict, loads_events
+from .paths import session_dir, transcript_path
+from .store import transcript_line_for
+from .writer import validate_durability
+
+_ITER_PAGE = 1000
+
+_SYNCHRONOUS = {"none": "OFF", "flush": "NORMAL", "fsync": "FULL"}
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS session_meta (
+      session_id TEXT PRIMARY KEY,
+      created_at REAL NOT NULL,
+      updated_at REAL NOT NULL,
+      parent_session_id TEXT,
+      record TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_session_meta_created ON session_meta(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_session_meta_parent ON session_meta(parent_session_id, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS events (
+      session_id TEXT NOT NULL,
+      seq INTEGER NOT NULL,
+      type TEXT NOT NULL,
+      ts REAL,
+      data TEXT NOT NULL,
+      PRIMARY KEY (session_id, seq)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def _parent_of(record: dict[str, Any]) -> str | None:
+    md = record.get("metadata")
+    parent = md.get("parent_session_id") if isinstance(md, dict) else None
+    return parent if isinstance(parent, str) and parent else None
+
+
+@dataclass(frozen=True, slots=True)
+class SqliteSessionStore:
+    """Session store backed by a single SQLite database (WAL mode).
+
+    Drop-in alternative to `FileSessionStore`: events live in one `events`
+    table keyed by (session_id, seq) and meta records in `session_meta`, so
+    listing, parent lookups and range reads are indexed queries. Per-session
+    directories under `root_dir/sessions/` are still created for sidecar
+    files (todos.json, transcript.jsonl) used by the server and runtime.
+    """
+
+    root_dir: Path
+    # Defaults to `root_dir / "sessions.sqlite3"`.
+    db_path: Path | None = None
+    # Mapped onto `PRAGMA synchronous`: "none" -> OFF, "flush" -> NORMAL, "fsync" -> FULL.
+    durability: str = "flush"
+
+    _conn: sqlite3.Connection | None = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        validate_durability(self.durability)
+        path = Path(self.db_path) if self.db_path is not None else Path(self.root_dir) / "sessions.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions so seq
+        # assignment is atomic across processes sharing the database.
+        conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS[self.durability]}")
+        conn.execute("PRAGMA busy_timeout=5000")
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        object.__setattr__(self, "_conn", conn)
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("session store is closed")
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                object.__setattr__(self, "_conn", None)
+
+    def flush(self, session_id: str | None = None) -> None:
+        """No-op: every append is its own committed transaction."""
+
+        _ = session_id
+
+    def session_dir(self, session_id: str) -> Path:
+        # Security: prevent path traversal (session_id becomes a path component).
+        sid = str(session_id or "").strip()
+        if not re.fullmatch(r"[0-9a-f]{32}", sid):
+            raise ValueError("invalid session_id")
+        return session_dir(self.root_dir, sid)
+
+    # Metadata.
+
+    def create_session(self, *, metadata: Optional[dict[str, Any]] = None) -> str:
+        session_id = uuid.uuid4().hex
+        self.session_dir(session_id).mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        rec = {"session_id": session_id, "created_at": now, "metadata": metadata or {}}
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT INTO session_meta(session_id, created_at, updated_at, parent_session_id, record) VALUES (?, ?, ?, ?, ?)",
+                (session_id, now, now, _parent_of(rec), json.dumps(rec, ensure_ascii=False)),
+            )
+        return session_id
+
+    def read_meta_record(self, session_id: str) -> dict[str, Any]:
+        """Read the raw meta record (same shape as FileSessionStore's meta.json)."""
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return {}
+        with self._lock:
+            row = self._connection().execute("SELECT record FROM session_meta WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return {}
+        try:
+            obj = json.loads(row[0])
+        except ValueError:
+            return {}
+        return obj if isinstance(obj, dict) else {}
+
+    def read_metadata(self, session_id: str) -> dict[str, Any]:
+        md = self.read_meta_record(session_id).get("metadata")
+        return dict(md) if isinstance(md, dict) else {}
+
+    def update_metadata(self, session_id: str, *, patch: dict[str, Any]) -> dict[str, Any]:
+        """Merge `patch` into the stored metadata dict and persist."""
+
+        if not isinstance(patch, dict):
+            raise ValueError("patch must be a dict")
+        # Read inside the write transaction so a concurrent writer (another
+        # process on the same database) cannot interleave its own patch.
+        with self._tx() as conn:
+            rec = self.read_meta_record(session_id)
+            if not rec:
+                raise FileNotFoundError(session_id)
+            md = rec.get("metadata")
+            md2: dict[str, Any] = dict(md) if isinstance(md, dict) else {}
+            md2.update(patch)
+            rec["metadata"] = md2
+            conn.execute(
+                "UPDATE session_meta SET record = ?, parent_session_id = ?, updated_at = ? WHERE session_id = ?",
+                (json.dumps(rec, ensure_ascii=False), _parent_of(rec), time.time(), session_id),
+            )
+        return md2
+
+    def list_sessions(
+        self,
+        *,
+        parent_session_id: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """List meta records, newest first, optionally only children of `parent_session_id`."""
+
+        sql = "SELECT record FROM session_meta"
+        params: list[Any] = []
+        if parent_session_id is not None:
+            sql += " WHERE parent_session_id = ?"
+            params.append(parent_session_id)
+        sql += " ORDER BY created_at DESC, session_id LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else max(0, int(limit)), max(0, int(offset))])
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        out: list[dict[str, Any]] = []
+        for (raw,) in rows:
+            try:
+                obj = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(obj, dict):
+                out.append(obj)
+        return out
+
+    def rebuild_catalog(self) -> int:
+        """Interface parity with FileSessionStore: `session_meta` is the catalog."""
+
+        with self._lock:
+            row = self._connection().execute("SELECT COUNT(*) FROM session_meta").fetchone()
+        return int(row[0])
+
+    def delete_session(self, session_id: str) -> None:
+        d = self.session_dir(session_id)
+        with self._tx() as conn:
+            n = conn.execute("DELETE FROM session_meta WHERE session_id = ?", (session_id,)).rowcount
+            n += conn.execute("DELETE FROM events WHERE session_id = ?", (session_id,)).rowcount
+        if n == 0 and not d.exists():
+            raise FileNotFoundError(session_id)
+        if d.exists():
+            shutil.rmtree(d)
+
+    def fork_session(self, parent_session_id: str, *, head_seq: int | None = None, metadata: dict[str, Any] | None = None) -> str:
+        """Fork a session by copying events up to `head_seq`.
+
+        The new session is append-only and gets its own `system.init` event.
+        """
+
+        if head_seq is None:
+            head_seq = self._last_seq(parent_session_id)
+        if not isinstance(head_seq, int) or head_seq <= 0:
+            raise ValueError("head_seq must be a positive int")
+        parent_events = self.read_events_range(parent_session_id, end_seq=head_seq)
+
+        md = {"parent_session_id": parent_session_id, "parent_head_seq": head_seq}
+        if metadata:
+            md.update(dict(metadata))
+        new_id = self.create_session(metadata=md)
+
+        for e in parent_events:
+            # Skip initialization/result events; the new session will create its own.
+            if getattr(e, "type", "") in ("system.init", "result"):
+                continue
+            # Skip session control events; the fork materializes at a specific head.
+            if getattr(e, "type", "").startswith("session."):
+                continue
+            self.append_event(new_id, e)
+
+        return new_id
+
+    def import_session(self, session_id: str, *, meta_record: dict[str, Any], events: Iterable[Event]) -> None:
+        """Write a complete session (used by migrations), preserving event seq and ts."""
+
+        d = self.session_dir(session_id)
+        # A copy-on-write file fork arrives materialized; its base pointer no longer applies.
+        rec = {k: v for k, v in dict(meta_record).items() if k != "base"}
+        rec["session_id"] = session_id
+        created = rec.get("created_at")
+        created_at = float(created) if isinstance(created, (int, float)) else time.time()
+        rows: list[tuple[Any, ...]] = []
+        transcript: list[str] = []
+        last_seq = 0
+        for e in events:
+            obj = event_to_dict(e)
+            if not isinstance(obj.get("seq"), int):
+                obj["seq"] = last_seq + 1
+            last_seq = obj["seq"]
+            ts = obj.get("ts")
+            rows.append(
+                (
+                    session_id,
+                    last_seq,
+                    str(obj.get("type") or ""),
+                    float(ts) if isinstance(ts, (int, float)) else None,
+                    dumps_event_dict(obj),
+                )
+            )
+            tl = transcript_line_for(obj)
+            if tl is not None:
+                transcript.append(tl)
+        with self._tx() as conn:
+            if conn.execute("SELECT 1 FROM session_meta WHERE session_id = ?", (session_id,)).fetchone():
+                raise FileExistsError(session_id)
+            conn.execute("DELETE FROM events WHERE session_id = ?", (session_id,))
+            conn.executemany("INSERT INTO events(session_id, seq, type, ts, data) VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT INTO session_meta(session_id, created_at, updated_at, parent_session_id, record) VALUES (?, ?, ?, ?, ?)",
+                (session_id, created_at, time.time(), _parent_of(rec), json.dumps(rec, ensure_ascii=False)),
+            )
+        d.mkdir(parents=True, exist_ok=True)
+        transcript_path(self.root_dir, session_id).write_text("".join(transcript), encoding="utf-8")
+
+    # Events.
+
+    def append_event(self, session_id: str, event: Event) -> None:
+        # Validate session id before path usage.
+        d = self.session_dir(session_id)
+        obj = event_to_dict(event)
+        with self._tx() as conn:
+            row = conn.execute("SELECT MAX(seq) FROM events WHERE session_id = ?", (session_id,)).fetchone()
+            seq = int(row[0] or 0) + 1
+            obj["seq"] = seq
+            obj["ts"] = time.time()
+            conn.execute(
+                "INSERT INTO events(session_id, seq, type, ts, data) VALUES (?, ?, ?, ?, ?)",
+                (session_id, seq, str(obj.get("type") or ""), obj["ts"], dumps_event_dict(obj)),
+            )
+            conn.execute("UPDATE session_meta SET updated_at = ? WHERE session_id = ?", (obj["ts"], session_id))
+
+        transcript_line = transcript_line_for(obj)
+        if transcript_line is not None:
+            d.mkdir(parents=True, exist_ok=True)
+            with transcript_path(self.root_dir, session_id).open("a", encoding="utf-8") as tf:
+                tf.write(transcript_line)
+
+    def append_events(self, session_id: str, events: Iterable[Event]) -> None:
+        for e in events:
+            self.append_event(session_id, e)
+
+    def read_events(self, session_id: str) -> list[Event]:
+        return self.read_events_range(session_id)
+
+    def iter_events(
+        self,
+        session_id: str,
+        *,
+        types: Collection[str] | None = None,
+        fields: Collection[str] | None = None,
+        after_seq: int | None = None,
+    ) -> Iterator[Event]:
+        """Stream events in seq order; see `FileSessionStore.iter_events`.
+
+        Type and seq filters run in SQL, and rows are fetched in pages so the
+        lock is not held while the caller consumes events.
+        """
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return
+        want = None if types is None else sorted(set(types))
+        if want == []:
+            return
+        cursor = -(2**63) if after_seq is None else int(after_seq)
+        sql = "SELECT seq, data FROM events WHERE session_id = ? AND seq > ?"
+        if want is not None:
+            sql += f" AND type IN ({', '.join('?' * len(want))})"
+        sql += " ORDER BY seq LIMIT ?"
+        while True:
+            with self._lock:
+                rows = self._connection().execute(sql, (session_id, cursor, *(want or ()), _ITER_PAGE)).fetchall()
+            if not rows:
+                return
+            cursor = rows[-1][0]
+            yield from loads_events((r[1] for r in rows), fields=fields)
+            if len(rows) < _ITER_PAGE:
+                return
+
+    def read_window(self, session_id: str) -> list[Event]:
+        """Same as `read_events()`; kept for interface parity with segmented file stores."""
+
+        return self.read_events(session_id)
+
+    def read_events_range(
+        self,
+        session_id: str,
+        start_seq: int | None = None,
+        end_seq: int | None = None,
+    ) -> list[Event]:
+        """Read events with `start_seq <= seq <= end_seq` (bounds inclusive, None = open)."""
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return []
+        lo = -(2**63) if start_seq is None else int(start_seq)
+        hi = 2**63 - 1 if end_seq is None else int(end_seq)
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT data FROM events WHERE session_id = ? AND seq BETWEEN ? AND ? ORDER BY seq",
+                (session_id, lo, hi),
+            ).fetchall()
+        return loads_events(r[0] for r in rows)
+
+    def tail(self, session_id: str, n: int) -> list[Event]:
+        """Read the last `n` events of a session."""
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return []
+        if int(n) <= 0:
+            return []
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT data FROM events WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                (session_id, int(n)),
+            ).fetchall()
+        return loads_events(r[0] for r in reversed(rows))
+
+    def strip_deltas(self, session_id: str) -> int:
+        """Remove persisted `assistant.delta` events; surviving events keep their seqs."""
+
+        _ = self.session_dir(session_id)
+        with self._tx() as conn:
+            return conn.execute(
+                "DELETE FROM events WHERE session_id = ? AND type = 'assistant.delta'", (session_id,)
+            ).rowcount
+
+    # Session timeline helpers (append-only).
+
+    def checkpoint(self, session_id: str, *, label: str) -> None:
+        # Capture the current last seq as the checkpoint head.
+        head = self._last_seq(session_id)
+        self.append_event(session_id, SessionCheckpoint(label=label, head_seq=head))
+
+    def set_head(self, session_id: str, *, head_seq: int, reason: str | None = None) -> None:
+        if not isinstance(head_seq, int) or head_seq <= 0:
+            raise ValueError("head_seq must be a positive int")
+        self.append_event(session_id, SessionSetHead(head_seq=head_seq, reason=reason))
+
+    def undo(self, session_id: str) -> None:
+        self.append_event(session_id, SessionUndo())
+
+    def redo(self, session_id: str) -> None:
+        self.append_event(session_id, SessionRedo())
+
+    def _last_seq(self, session_id: str) -> int:
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return 0
+        with self._lock:
+            row = self._connection().execute("SELECT MAX(seq) FROM events WHERE session_id = ?", (session_id,)).fetchone()
+        return int(row[0] or 0)
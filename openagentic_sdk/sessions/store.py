@@ -1,47 +1,221 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import shutil
 import threading
 import time
 import uuid
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any, Collection, Iterable, Iterator, Optional
 
-from ..events import Event, SessionCheckpoint, SessionRedo, SessionSetHead, SessionUndo
-from ..serialization import event_to_dict, loads_event
-from .paths import events_path, meta_path, session_dir, transcript_path
+from ..events import AssistantMessage, Event, SessionCheckpoint, SessionRedo, SessionSetHead, SessionUndo
+from ..serialization import dumps_event_dict, event_to_dict, loads_events
+from .catalog import SessionCatalog
+from .index import EventLogIndex, _line_seq, _line_type
+from .paths import (
+    catalog_path,
+    events_path,
+    index_path,
+    meta_path,
+    segments_dir,
+    segments_manifest_path,
+    session_dir,
+    transcript_path,
+)
+from .segments import (
+    SEGMENT_CODECS,
+    SegmentInfo,
+    base_segment_name,
+    compress,
+    decompress,
+    load_manifest,
+    normalize_lines,
+    segment_name,
+    validate_codec,
+    write_manifest,
+)
+from .writer import GroupCommitter, SessionLogWriter, validate_durability
+
+
+def transcript_line_for(obj: dict[str, Any]) -> str | None:
+    """Return the transcript.jsonl line for a serialized event, if any.
+
+    Best-effort transcript for UI and diffing. This intentionally excludes
+    tool inputs/outputs to reduce accidental leakage.
+    """
+
+    et = obj.get("type")
+    if et not in ("user.message", "assistant.message"):
+        return None
+    entry = {
+        "seq": obj.get("seq"),
+        "ts": obj.get("ts"),
+        "role": "user" if et == "user.message" else "assistant",
+        "text": obj.get("text") if isinstance(obj.get("text"), str) else "",
+    }
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _strip_delta_lines(data: bytes, *, last_seq: int) -> tuple[list[bytes], int, int]:
+    """Drop `assistant.delta` lines; returns (kept lines, removed count, last seq)."""
+
+    removed = 0
+    kept: list[bytes] = []
+    for line in data.splitlines(keepends=True):
+        if not line.strip():
+            continue
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        seq = _line_seq(line)
+        if seq is not None and b"assistant.delta" not in line:
+            # Fast path: keep lines that carry a seq verbatim.
+            kept.append(line)
+            last_seq = seq
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            kept.append(line)
+            continue
+        if not isinstance(obj, dict):
+            kept.append(line)
+            continue
+        seq = obj.get("seq")
+        if not isinstance(seq, int):
+            # Seq-less legacy line: write out its implied seq.
+            seq = last_seq + 1
+            obj["seq"] = seq
+            line = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+        last_seq = seq
+        if obj.get("type") == "assistant.delta":
+            removed += 1
+            continue
+        kept.append(line)
+    return kept, removed, last_seq
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+_CONTROL_EVENT_TYPES = frozenset({"session.set_head", "session.undo", "session.redo"})
+
+# Parent events a fork does not inherit: it gets its own init/result, and it is
+# materialized at a fixed head, so the parent's head controls do not apply.
+_FORK_SKIP_TYPES = frozenset({"system.init", "result", "session.checkpoint", *_CONTROL_EVENT_TYPES})
+
+
+def _select_lines(data: bytes, *, types: frozenset[str] | None, after_seq: int | None) -> Iterator[bytes]:
+    """Yield the log lines that may pass the filters, judged from the line prefix.
+
+    Lines whose type or seq cannot be read from the prefix are passed through;
+    callers re-check the decoded events.
+    """
+
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        if types is not None:
+            t = _line_type(line)
+            if t is not None and t not in types:
+                continue
+        if after_seq is not None:
+            seq = _line_seq(line)
+            if seq is not None and seq <= after_seq:
+                continue
+        yield line
+
+
+def _is_summary(e: Event) -> bool:
+    return isinstance(e, AssistantMessage) and bool(getattr(e, "is_summary", False))
 
 
 @dataclass(frozen=True, slots=True)
 class FileSessionStore:
     root_dir: Path
+
+    # Group-commit mode: keep a long-lived append handle per session and let a
+    # background thread write batches every `flush_interval_s` (or as soon as
+    # `flush_max_bytes` are pending) instead of open/write/close per event.
+    buffered: bool = False
+    # Per-batch durability: "none" (leave in userspace buffers), "flush" (hand
+    # to the OS) or "fsync" (force to disk).
+    durability: str = "flush"
+    flush_interval_s: float = 0.05
+    flush_max_bytes: int = 256 * 1024
+    max_open_writers: int = 64
+
+    # Log rotation: once the live `events.jsonl` reaches `segment_max_bytes`
+    # it is sealed into `segments/` and compressed with `segment_compression`
+    # ("none", "gzip" or "zstd"). 0 disables rotation.
+    segment_max_bytes: int = 0
+    segment_compression: str = "gzip"
+
     _seq: dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
-    _locks: dict[str, threading.Lock] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _locks: dict[str, threading.RLock] = field(default_factory=dict, init=False, repr=False, compare=False)
     _locks_guard: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _writers: "OrderedDict[str, SessionLogWriter]" = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
+    _writers_guard: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _committer: GroupCommitter | None = field(default=None, init=False, repr=False, compare=False)
+    _indexes: dict[str, EventLogIndex] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _catalog: SessionCatalog | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        validate_durability(self.durability)
+        if self.segment_compression not in SEGMENT_CODECS:
+            raise ValueError(f"segment_compression must be one of {', '.join(SEGMENT_CODECS)}")
+        if self.segment_max_bytes > 0:
+            validate_codec(self.segment_compression)
+        object.__setattr__(
+            self,
+            "_catalog",
+            SessionCatalog(path=catalog_path(self.root_dir), scan=self._scan_meta_records),
+        )
+        if self.buffered:
+            object.__setattr__(
+                self,
+                "_committer",
+                GroupCommitter(interval_s=self.flush_interval_s, commit_all=self._commit_pending),
+            )
 
-    def _session_lock(self, session_id: str) -> threading.Lock:
+    def _session_lock(self, session_id: str) -> threading.RLock:
+        # Re-entrant so read helpers (drain, index refresh) can run inside append paths.
         with self._locks_guard:
             lock = self._locks.get(session_id)
             if lock is None:
-                lock = threading.Lock()
+                lock = threading.RLock()
                 self._locks[session_id] = lock
             return lock
 
     def create_session(self, *, metadata: Optional[dict[str, Any]] = None) -> str:
+        return self._create_session(metadata=metadata)
+
+    def _create_session(self, *, metadata: Optional[dict[str, Any]], base: dict[str, Any] | None = None) -> str:
         session_id = uuid.uuid4().hex
         directory = self.session_dir(session_id)
         directory.mkdir(parents=True, exist_ok=False)
 
-        meta = {
+        meta: dict[str, Any] = {
             "session_id": session_id,
             "created_at": time.time(),
             "metadata": metadata or {},
         }
+        if base is not None:
+            meta["base"] = base
         meta_file = meta_path(self.root_dir, session_id)
         meta_file.write_text(json.dumps(meta, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        self._catalog_put(meta)
 
         return session_id
 
@@ -102,52 +276,169 @@ class FileSessionStore:
         rec["metadata"] = md2
         p = self.session_dir(session_id) / "meta.json"
         p.write_text(json.dumps(rec, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        self._catalog_put(rec)
         return md2
 
+    def list_sessions(
+        self,
+        *,
+        parent_session_id: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """List meta records, newest first, optionally only children of `parent_session_id`.
+
+        Served from the session catalog (`sessions/catalog.jsonl`) rather than
+        scanning every session directory.
+        """
+
+        assert self._catalog is not None
+        return self._catalog.list(parent_session_id=parent_session_id, limit=limit, offset=offset)
+
+    def rebuild_catalog(self) -> int:
+        """Rebuild the session catalog from the meta.json files on disk."""
+
+        assert self._catalog is not None
+        return self._catalog.rebuild()
+
+    def _scan_meta_records(self) -> list[dict[str, Any]]:
+        base = self.root_dir / "sessions"
+        if not base.is_dir():
+            return []
+        records: list[dict[str, Any]] = []
+        for d in base.iterdir():
+            if not d.is_dir() or not re.fullmatch(r"[0-9a-f]{32}", d.name):
+                continue
+            rec = self.read_meta_record(d.name)
+            if rec:
+                records.append(rec)
+        return records
+
+    def _catalog_put(self, record: dict[str, Any]) -> None:
+        if self._catalog is not None:
+            self._catalog.put(record)
+
+    def import_session(self, session_id: str, *, meta_record: dict[str, Any], events: Iterable[Event]) -> None:
+        """Write a complete session (used by migrations), preserving event seq and ts."""
+
+        d = self.session_dir(session_id)
+        with self._session_lock(session_id):
+            if meta_path(self.root_dir, session_id).exists():
+                raise FileExistsError(session_id)
+            d.mkdir(parents=True, exist_ok=True)
+            lines: list[bytes] = []
+            transcript: list[str] = []
+            last_seq = 0
+            for e in events:
+                obj = event_to_dict(e)
+                if not isinstance(obj.get("seq"), int):
+                    obj["seq"] = last_seq + 1
+                last_seq = obj["seq"]
+                lines.append((dumps_event_dict(obj) + "\n").encode("utf-8"))
+                tl = transcript_line_for(obj)
+                if tl is not None:
+                    transcript.append(tl)
+            events_path(self.root_dir, session_id).write_bytes(b"".join(lines))
+            transcript_path(self.root_dir, session_id).write_text("".join(transcript), encoding="utf-8")
+            # `events` is the complete history, so a fork arrives already materialized.
+            rec = {k: v for k, v in dict(meta_record).items() if k != "base"}
+            rec["session_id"] = session_id
+            meta_path(self.root_dir, session_id).write_text(
+                json.dumps(rec, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+            )
+            self._catalog_put(rec)
+            self._seq.pop(session_id, None)
+            self._indexes.pop(session_id, None)
+            if self.segment_max_bytes > 0 and self._index(session_id).size >= self.segment_max_bytes:
+                self._seal_live_segment(session_id)
+
     def delete_session(self, session_id: str) -> None:
         d = self.session_dir(session_id)
         if not d.exists():
             raise FileNotFoundError(session_id)
-        shutil.rmtree(d)
+        # Forks reading through to this session get their own copy first.
+        assert self._catalog is not None
+        for rec in self._catalog.list():
+            base = rec.get("base")
+            if isinstance(base, dict) and base.get("session_id") == session_id:
+                self._detach_fork(str(rec.get("session_id") or ""))
+        with self._session_lock(session_id):
+            with self._writers_guard:
+                writer = self._writers.pop(session_id, None)
+            if writer is not None:
+                writer.close()
+            self._indexes.pop(session_id, None)
+            shutil.rmtree(d)
+        if self._catalog is not None:
+            self._catalog.delete(session_id)
 
     def fork_session(self, parent_session_id: str, *, head_seq: int | None = None, metadata: dict[str, Any] | None = None) -> str:
-        """Fork a session by copying events up to `head_seq`.
+        """Fork a session at `head_seq` (copy-on-write).
 
-        The new session is append-only and gets its own `system.init` event.
+        No events are copied: the child's meta record points at the parent
+        (`{"base": {"session_id", "head_seq", "start_seq"}}`) and reads go
+        through to the parent's log for seqs up to `head_seq`, minus its
+        init/result and session control events. Only the child's own events are
+        written to its log, numbered after `head_seq`. The new session gets its
+        own `system.init` event. The parent's transcript.jsonl entries up to
+        `head_seq` are copied, since readers open that file directly.
         """
 
-        parent_events = self.read_events(parent_session_id)
+        _ = self.session_dir(parent_session_id)
+        last = self._infer_next_seq(parent_session_id)
         if head_seq is None:
             # Default to the last applied seq in the parent log.
-            head_seq = self._infer_next_seq(parent_session_id)
+            head_seq = last
         if not isinstance(head_seq, int) or head_seq <= 0:
             raise ValueError("head_seq must be a positive int")
 
         md = {"parent_session_id": parent_session_id, "parent_head_seq": head_seq}
         if metadata:
             md.update(dict(metadata))
-        new_id = self.create_session(metadata=md)
+        # Later parent appends must stay invisible, so never point past its end.
+        base_head = min(head_seq, last)
+        if base_head <= 0:
+            return self._create_session(metadata=md)
+        # The child only needs the parent's post-pivot window, provided a
+        # summary pivot at or before the head is inside it.
+        start_seq: int | None = None
+        if self._segments(parent_session_id):
+            window = self.read_window(parent_session_id)
+            if any(_is_summary(e) and (e.seq or 0) <= base_head for e in window):
+                start_seq = next((e.seq for e in window if isinstance(e.seq, int)), None)
+        base = {"session_id": parent_session_id, "head_seq": base_head, "start_seq": start_seq}
+        child = self._create_session(metadata=md, base=base)
+        self._copy_transcript(parent_session_id, child, start_seq=start_seq or 0, head_seq=base_head)
+        return child
 
-        for e in parent_events:
-            # Skip initialization/result events; the new session will create its own.
-            if getattr(e, "type", "") in ("system.init", "result"):
-                continue
-            # Skip session control events; the fork materializes at a specific head.
-            if getattr(e, "type", "").startswith("session."):
-                continue
-            seq = getattr(e, "seq", None)
-            if isinstance(seq, int) and seq > head_seq:
+    def _copy_transcript(self, parent_session_id: str, session_id: str, *, start_seq: int, head_seq: int) -> None:
+        # transcript.jsonl is read directly (server, share), not through `base`,
+        # so a fork gets its own copy of the inherited entries. It holds only
+        # message text and stays small.
+        self.flush(parent_session_id)
+        src = transcript_path(self.root_dir, parent_session_id)
+        try:
+            text = src.read_text(encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            return
+        kept: list[str] = []
+        for line in text.splitlines():
+            try:
+                seq = json.loads(line).get("seq")
+            except (ValueError, AttributeError):
                 continue
-            self.append_event(new_id, e)
-
-        return new_id
+            if isinstance(seq, int) and start_seq <= seq <= head_seq:
+                kept.append(line + "\n")
+        if kept:
+            transcript_path(self.root_dir, session_id).write_text("".join(kept), encoding="utf-8")
 
     def append_event(self, session_id: str, event: Event) -> None:
         # Validate session id before path usage.
         _ = self.session_dir(session_id)
         with self._session_lock(session_id):
             path = events_path(self.root_dir, session_id)
-            path.parent.mkdir(parents=True, exist_ok=True)
+            if not self.buffered:
+                path.parent.mkdir(parents=True, exist_ok=True)
 
             seq = self._seq.get(session_id)
             if seq is None:
@@ -158,42 +449,314 @@ class FileSessionStore:
             obj = event_to_dict(event)
             obj["seq"] = seq
             obj["ts"] = time.time()
+            line = dumps_event_dict(obj) + "\n"
 
-            with path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
-                f.write("\n")
-
-            # Best-effort transcript for UI and diffing. This intentionally excludes
-            # tool inputs/outputs to reduce accidental leakage.
-            et = obj.get("type")
-            if et in ("user.message", "assistant.message"):
-                role = "user" if et == "user.message" else "assistant"
-                entry = {
-                    "seq": seq,
-                    "ts": obj.get("ts"),
-                    "role": role,
-                    "text": obj.get("text") if isinstance(obj.get("text"), str) else "",
-                }
+            transcript_line = transcript_line_for(obj)
+
+            data = line.encode("utf-8")
+            index = self._index(session_id)
+
+            if self.buffered:
+                writer = self._writer(session_id)
+                offset = index.size
+                writer.append(
+                    data,
+                    transcript_line=transcript_line.encode("utf-8") if transcript_line is not None else None,
+                    index_record=index.add(seq, offset, offset + len(data)),
+                )
+                if self.segment_max_bytes > 0 and index.size >= self.segment_max_bytes:
+                    self._seal_live_segment(session_id)
+                elif writer.pending_bytes >= self.flush_max_bytes:
+                    writer.commit()
+                elif self._committer is not None:
+                    self._committer.notify()
+                return
+
+            with path.open("ab") as f:
+                offset = f.tell()
+                if offset != index.size:
+                    # Another writer appended since we last looked; index its lines first.
+                    index.refresh(upto=offset)
+                f.write(data)
+                if self.durability == "fsync":
+                    f.flush()
+                    os.fsync(f.fileno())
+            record = index.add(seq, offset, offset + len(data))
+            with index_path(self.root_dir, session_id).open("ab") as xf:
+                xf.write(record)
+
+            if transcript_line is not None:
                 tp = transcript_path(self.root_dir, session_id)
                 with tp.open("a", encoding="utf-8") as tf:
-                    tf.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
-                    tf.write("\n")
+                    tf.write(transcript_line)
+
+            if self.segment_max_bytes > 0 and index.size >= self.segment_max_bytes:
+                self._seal_live_segment(session_id)
 
     def read_events(self, session_id: str) -> list[Event]:
+        """Read the full session history (fork base, sealed segments, then the live log)."""
+
         try:
             _ = self.session_dir(session_id)
         except ValueError:
             return []
-        path = events_path(self.root_dir, session_id)
-        if not path.exists():
+        with self._session_lock(session_id):
+            out: list[Event] = list(self._base_events(session_id))
+            for info in self._segments(session_id):
+                out.extend(self._read_segment(session_id, info))
+            out.extend(self._read_live(session_id))
+            return out
+
+    def iter_events(
+        self,
+        session_id: str,
+        *,
+        types: Collection[str] | None = None,
+        fields: Collection[str] | None = None,
+        after_seq: int | None = None,
+    ) -> Iterator[Event]:
+        """Stream events in seq order, decoding only the lines that are needed.
+
+        - `types`: event type names to keep (e.g. `"tool.result"`). Other lines
+          are skipped from their prefix without being decoded.
+        - `fields`: project each event onto these fields; `type` and `seq` are
+          always set and everything else keeps its dataclass default.
+        - `after_seq`: only events with `seq > after_seq`. Sealed segments
+          before it are not opened and the live log is entered at the indexed
+          offset.
+
+        The live log is captured when iteration starts; events appended later
+        are not seen. Sealed segments are read one at a time.
+        """
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return
+        want = None if types is None else frozenset(types)
+        yield from self._base_events(session_id, types=want, fields=fields, after_seq=after_seq)
+        with self._session_lock(session_id):
+            segments = self._segments(session_id)
+            index = self._synced_index(session_id)
+            span = index.byte_range(None if after_seq is None else after_seq + 1, None)
+            live = b""
+            if span is not None:
+                with events_path(self.root_dir, session_id).open("rb") as f:
+                    f.seek(span[0])
+                    live = f.read(span[1] - span[0])
+        chunks: list[tuple[SegmentInfo | None, int | None]] = []
+        for info in segments:
+            if after_seq is not None and info.last_seq <= after_seq:
+                continue
+            if want is not None and want <= _CONTROL_EVENT_TYPES and not info.controls:
+                continue
+            chunks.append((info, after_seq if after_seq is not None and info.first_seq <= after_seq else None))
+        chunks.append((None, None))  # The live span is already cut at after_seq.
+        for info, cut in chunks:
+            if info is None:
+                data = live
+            else:
+                data = decompress(info.codec, (segments_dir(self.root_dir, session_id) / info.file).read_bytes())
+            for e in loads_events(_select_lines(data, types=want, after_seq=cut), fields=fields):
+                if want is not None and e.type not in want:
+                    continue
+                if cut is not None and isinstance(e.seq, int) and e.seq <= cut:
+                    continue
+                yield e
+
+    def read_window(self, session_id: str) -> list[Event]:
+        """Read the events needed to rebuild provider input on resume.
+
+        Sealed segments before the one holding the latest summary pivot are
+        skipped, so resume cost tracks the live window rather than the session's
+        lifetime. Falls back to the full history whenever skipping could change
+        the rebuild result: no sealed summary, head-control events in skipped
+        segments, or a head moved back before the pivot. Without rotation this
+        is the same as `read_events()`.
+        """
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
             return []
+        with self._session_lock(session_id):
+            segments = self._segments(session_id)
+            live = self._read_live(session_id)
+            if not segments:
+                return [*self._base_events(session_id), *live]
+            start: int | None = None
+            if any(_is_summary(e) for e in live):
+                start = len(segments)
+            else:
+                for i in range(len(segments) - 1, -1, -1):
+                    if segments[i].summary_seq is not None:
+                        start = i
+                        break
+            if start is None or any(info.controls for info in segments[:start]):
+                return self.read_events(session_id)
+            out: list[Event] = []
+            for info in segments[start:]:
+                out.extend(self._read_segment(session_id, info))
+            out.extend(live)
+            # Imported lazily: rebuild -> compaction -> options -> store.
+            from .rebuild import _max_seq, _replay_head_controls
+
+            pivot = max(getattr(e, "seq", 0) or 0 for e in out if _is_summary(e))
+            if _replay_head_controls(out, head=_max_seq(out)) < pivot:
+                return self.read_events(session_id)
+            return out
+
+    def read_events_range(
+        self,
+        session_id: str,
+        start_seq: int | None = None,
+        end_seq: int | None = None,
+    ) -> list[Event]:
+        """Read events with `start_seq <= seq <= end_seq` (bounds inclusive, None = open).
+
+        Seeks straight to the byte span recorded in the `events.idx` sidecar
+        instead of parsing the whole log.
+        """
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return []
+        with self._session_lock(session_id):
+            events: list[Event] = []
+            for e in self._base_events(session_id, after_seq=None if start_seq is None else start_seq - 1):
+                if end_seq is not None and isinstance(e.seq, int) and e.seq > end_seq:
+                    break
+                events.append(e)
+            for info in self._segments(session_id):
+                if start_seq is not None and info.last_seq < start_seq:
+                    continue
+                if end_seq is not None and info.first_seq > end_seq:
+                    break
+                events.extend(self._read_segment(session_id, info))
+            index = self._synced_index(session_id)
+            span = index.byte_range(start_seq, end_seq)
+            if span is not None:
+                events.extend(self._read_span(session_id, span))
         out: list[Event] = []
-        for line in path.read_text(encoding="utf-8").splitlines():
-            if not line.strip():
-                continue
-            out.append(loads_event(line))
+        for e in events:
+            seq = getattr(e, "seq", None)
+            if isinstance(seq, int):
+                if start_seq is not None and seq < start_seq:
+                    continue
+                if end_seq is not None and seq > end_seq:
+                    continue
+            out.append(e)
         return out
 
+    def tail(self, session_id: str, n: int) -> list[Event]:
+        """Read the last `n` events of a session without scanning the log."""
+
+        try:
+            _ = self.session_dir(session_id)
+        except ValueError:
+            return []
+        n = int(n)
+        if n <= 0:
+            return []
+        with self._session_lock(session_id):
+            index = self._synced_index(session_id)
+            span = index.tail_range(n)
+            out = self._read_span(session_id, span) if span is not None else []
+            for info in reversed(self._segments(session_id)):
+                if len(out) >= n:
+                    break
+                out = [*self._read_segment(session_id, info), *out]
+            if len(out) < n:
+                out = [*self._base_events(session_id), *out]
+            return out[-n:]
+
+    def flush(self, session_id: str | None = None) -> None:
+        """Commit buffered events to disk.
+
+        Always hands pending writes to the OS (and fsyncs under the "fsync"
+        policy). The runtime calls this at turn boundaries and before yielding
+        `Result`. No-op for unbuffered stores, which write through on append.
+        """
+
+        if not self.buffered:
+            return
+        if session_id is None:
+            with self._writers_guard:
+                sids = list(self._writers.keys())
+        else:
+            sids = [session_id]
+        mode = "fsync" if self.durability == "fsync" else "flush"
+        for sid in sids:
+            with self._session_lock(sid):
+                writer = self._writers.get(sid)
+                if writer is not None:
+                    writer.commit(durability=mode)
+
+    def close(self) -> None:
+        """Flush and release all long-lived session file handles."""
+
+        if self._committer is not None:
+            self._committer.stop()
+        with self._writers_guard:
+            sids = list(self._writers.keys())
+        for sid in sids:
+            with self._session_lock(sid):
+                with self._writers_guard:
+                    writer = self._writers.pop(sid, None)
+                if writer is not None:
+                    writer.close()
+
+    def strip_deltas(self, session_id: str) -> int:
+        """Remove persisted `assistant.delta` events from a session log.
+
+        The final `assistant.message` already carries the full text, so deltas
+        are redundant once a turn completes. Surviving events keep their seqs
+        (seq-less legacy lines get their implied seq written out so head/undo
+        references stay valid). Returns the number of events removed.
+        """
+
+        d = self.session_dir(session_id)
+        if not d.exists():
+            raise FileNotFoundError(session_id)
+        path = events_path(self.root_dir, session_id)
+        with self._session_lock(session_id):
+            with self._writers_guard:
+                writer = self._writers.pop(session_id, None)
+            if writer is not None:
+                writer.close()
+
+            removed = 0
+            segments = self._segments(session_id)
+            if segments:
+                sd = segments_dir(self.root_dir, session_id)
+                updated: list[SegmentInfo] = []
+                for info in segments:
+                    raw = decompress(info.codec, (sd / info.file).read_bytes())
+                    kept, n, _ = _strip_delta_lines(raw, last_seq=info.first_seq - 1)
+                    if n:
+                        data = b"".join(kept)
+                        _atomic_write_bytes(sd / info.file, compress(info.codec, data))
+                        info = replace(info, raw_bytes=len(data))
+                        removed += n
+                    updated.append(info)
+                if removed:
+                    write_manifest(segments_manifest_path(self.root_dir, session_id), updated)
+
+            if path.exists():
+                base = segments[-1].last_seq if segments else 0
+                kept, n, _ = _strip_delta_lines(path.read_bytes(), last_seq=base)
+                if n:
+                    _atomic_write_bytes(path, b"".join(kept))
+                    # Offsets changed: drop the sidecar index; it is rebuilt on next use.
+                    self._indexes.pop(session_id, None)
+                    try:
+                        index_path(self.root_dir, session_id).unlink()
+                    except FileNotFoundError:
+                        pass
+                    removed += n
+            return removed
+
     def append_events(self, session_id: str, events: Iterable[Event]) -> None:
         for e in events:
             self.append_event(session_id, e)
@@ -202,6 +765,7 @@ class FileSessionStore:
 
     def checkpoint(self, session_id: str, *, label: str) -> None:
         # Capture the current last seq as the checkpoint head.
+        self._drain(session_id)
         head = self._infer_next_seq(session_id)
         self.append_event(session_id, SessionCheckpoint(label=label, head_seq=head))
 
@@ -216,30 +780,294 @@ class FileSessionStore:
     def redo(self, session_id: str) -> None:
         self.append_event(session_id, SessionRedo())
 
+    # Buffered (group-commit) mode internals.
+
+    def _writer(self, session_id: str) -> SessionLogWriter:
+        # Caller holds the session lock.
+        with self._writers_guard:
+            writer = self._writers.get(session_id)
+            if writer is not None:
+                self._writers.move_to_end(session_id)
+                return writer
+        path = events_path(self.root_dir, session_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer = SessionLogWriter(
+            events_file=path,
+            transcript_file=transcript_path(self.root_dir, session_id),
+            index_file=index_path(self.root_dir, session_id),
+            durability=self.durability,
+        )
+        with self._writers_guard:
+            self._writers[session_id] = writer
+        self._evict_writers(keep=session_id)
+        return writer
+
+    def _evict_writers(self, *, keep: str) -> None:
+        with self._writers_guard:
+            excess = len(self._writers) - max(1, int(self.max_open_writers))
+            if excess <= 0:
+                return
+            victims = [sid for sid in self._writers if sid != keep][:excess]
+        for sid in victims:
+            lock = self._session_lock(sid)
+            # Never block on another session's lock while holding our own.
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                with self._writers_guard:
+                    writer = self._writers.pop(sid, None)
+                if writer is not None:
+                    writer.close()
+            finally:
+                lock.release()
+
+    def _commit_pending(self) -> None:
+        with self._writers_guard:
+            items = list(self._writers.items())
+        for sid, writer in items:
+            if not writer.has_pending:
+                continue
+            with self._session_lock(sid):
+                if self._writers.get(sid) is writer:
+                    writer.commit()
+
+    def _drain(self, session_id: str) -> None:
+        """Make buffered events visible to file readers (read-your-writes)."""
+
+        if not self.buffered:
+            return
+        with self._session_lock(session_id):
+            writer = self._writers.get(session_id)
+            if writer is not None:
+                writer.commit(durability="flush")
+
+    # Offset index internals.
+
+    def _index(self, session_id: str) -> EventLogIndex:
+        # Caller holds the session lock.
+        index = self._indexes.get(session_id)
+        if index is None:
+            segments = self._segments(session_id)
+            base_seq = segments[-1].last_seq if segments else 0
+            if base_seq:
+                self._drop_sealed_prefix(session_id, base_seq)
+            index = EventLogIndex(
+                log_path=events_path(self.root_dir, session_id),
+                idx_path=index_path(self.root_dir, session_id),
+                base_seq=base_seq,
+            )
+            index.load()
+            self._indexes[session_id] = index
+        return index
+
+    def _synced_index(self, session_id: str) -> EventLogIndex:
+        # Caller holds the session lock. Commit buffered lines, then pick up
+        # anything other writers appended to the log.
+        self._drain(session_id)
+        index = self._index(session_id)
+        index.refresh()
+        return index
+
+    def _read_span(self, session_id: str, span: tuple[int, int]) -> list[Event]:
+        start, end = span
+        with events_path(self.root_dir, session_id).open("rb") as f:
+            f.seek(start)
+            raw = f.read(end - start)
+        return loads_events(raw.splitlines())
+
+    # Segmented log internals.
+
+    def _segments(self, session_id: str) -> list[SegmentInfo]:
+        return load_manifest(segments_manifest_path(self.root_dir, session_id))
+
+    def _read_segment(self, session_id: str, info: SegmentInfo) -> list[Event]:
+        raw = decompress(info.codec, (segments_dir(self.root_dir, session_id) / info.file).read_bytes())
+        return loads_events(raw.splitlines())
+
+    def _read_live(self, session_id: str) -> list[Event]:
+        # Caller holds the session lock.
+        self._drain(session_id)
+        path = events_path(self.root_dir, session_id)
+        if not path.exists():
+            return []
+        self._index(session_id)  # Repairs an interrupted seal before reading.
+        with path.open("rb") as f:
+            return loads_events(f.read().splitlines())
+
+    # Copy-on-write fork internals.
+
+    def _base(self, session_id: str) -> tuple[str, int, int | None] | None:
+        """Return (parent_session_id, head_seq, start_seq) for a fork that reads through."""
+
+        base = self.read_meta_record(session_id).get("base")
+        if not isinstance(base, dict):
+            return None
+        parent, head, start = base.get("session_id"), base.get("head_seq"), base.get("start_seq")
+        if not isinstance(parent, str) or not isinstance(head, int) or isinstance(head, bool) or head <= 0:
+            return None
+        segments = self._segments(session_id)
+        if segments and segments[0].first_seq <= head:
+            # Already materialized by a detach that stopped before updating meta.json.
+            return None
+        return parent, head, start if isinstance(start, int) else None
+
+    def _base_events(
+        self,
+        session_id: str,
+        *,
+        types: frozenset[str] | None = None,
+        fields: Collection[str] | None = None,
+        after_seq: int | None = None,
+    ) -> Iterator[Event]:
+        """Yield the events a fork inherits from its base chain, in seq order."""
+
+        base = self._base(session_id)
+        if base is None:
+            return
+        parent, head, start = base
+        if after_seq is not None and after_seq >= head:
+            return
+        if start is not None:
+            after_seq = max(after_seq if after_seq is not None else 0, start - 1)
+        for e in self.iter_events(parent, types=types, fields=fields, after_seq=after_seq):
+            if isinstance(e.seq, int) and e.seq > head:
+                break
+            if e.type in _FORK_SKIP_TYPES:
+                continue
+            yield e
+
+    def _detach_fork(self, session_id: str) -> None:
+        """Copy a fork's inherited events into its own log so the parent can go away.
+
+        The events become a sealed segment placed before the fork's own
+        segments, then the base pointer is dropped from meta.json. If that last
+        step does not happen, `_base()` sees the segment and ignores the pointer.
+        """
+
+        with self._session_lock(session_id):
+            if self._base(session_id) is None:
+                return
+            data = b"".join((dumps_event_dict(event_to_dict(e)) + "\n").encode("utf-8") for e in self._base_events(session_id))
+            lines, last_seq, summary_seq, controls = normalize_lines(data, last_seq=0)
+            if lines:
+                codec = self.segment_compression if self.segment_max_bytes > 0 else "gzip"
+                raw = b"".join(lines)
+                name = base_segment_name(codec)
+                sd = segments_dir(self.root_dir, session_id)
+                sd.mkdir(parents=True, exist_ok=True)
+                tmp = sd / (name + ".tmp")
+                with tmp.open("wb") as f:
+                    f.write(compress(codec, raw))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, sd / name)
+                info = SegmentInfo(
+                    file=name,
+                    codec=codec,
+                    first_seq=_line_seq(lines[0]) or 1,
+                    last_seq=last_seq,
+                    raw_bytes=len(raw),
+                    summary_seq=summary_seq,
+                    controls=controls,
+                )
+                write_manifest(segments_manifest_path(self.root_dir, session_id), [info, *self._segments(session_id)])
+                self._indexes.pop(session_id, None)
+            rec = self.read_meta_record(session_id)
+            rec.pop("base", None)
+            _atomic_write_bytes(
+                meta_path(self.root_dir, session_id),
+                (json.dumps(rec, ensure_ascii=False, indent=2) + "\n").encode("utf-8"),
+            )
+            self._catalog_put(rec)
+
+    def _seal_live_segment(self, session_id: str) -> None:
+        """Move the live log into a new compressed segment and start a fresh one.
+
+        Caller holds the session lock. The segment file and manifest are made
+        durable before the live log is truncated; a crash in between leaves
+        already-sealed lines at the head of the live log, which `_index()`
+        drops on next use.
+        """
+
+        with self._writers_guard:
+            writer = self._writers.pop(session_id, None)
+        if writer is not None:
+            writer.close()
+        path = events_path(self.root_dir, session_id)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return
+        cut = data.rfind(b"\n") + 1
+        segments = self._segments(session_id)
+        base = segments[-1].last_seq if segments else 0
+        lines, last_seq, summary_seq, controls = normalize_lines(data[:cut], last_seq=base)
+        if not lines:
+            return
+        first_seq = _line_seq(lines[0]) or base + 1
+        raw = b"".join(lines)
+        codec = self.segment_compression
+        name = segment_name(len(segments) + 1, codec)
+        sd = segments_dir(self.root_dir, session_id)
+        sd.mkdir(parents=True, exist_ok=True)
+        tmp = sd / (name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(compress(codec, raw))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, sd / name)
+        info = SegmentInfo(
+            file=name,
+            codec=codec,
+            first_seq=first_seq,
+            last_seq=last_seq,
+            raw_bytes=len(raw),
+            summary_seq=summary_seq,
+            controls=controls,
+        )
+        write_manifest(segments_manifest_path(self.root_dir, session_id), [*segments, info])
+        with path.open("wb") as f:
+            f.write(data[cut:])
+        self._indexes.pop(session_id, None)
+        try:
+            index_path(self.root_dir, session_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _drop_sealed_prefix(self, session_id: str, base_seq: int) -> None:
+        # Caller holds the session lock. Finishes a seal that crashed after the
+        # manifest was written but before the live log was truncated.
+        path = events_path(self.root_dir, session_id)
+        try:
+            with path.open("rb") as f:
+                first = f.readline()
+        except FileNotFoundError:
+            return
+        seq = _line_seq(first) if first.strip() else None
+        if seq is None or seq > base_seq:
+            return
+        kept = [ln for ln in path.read_bytes().splitlines(keepends=True) if (_line_seq(ln) or base_seq + 1) > base_seq]
+        with path.open("wb") as f:
+            f.write(b"".join(kept))
+        try:
+            index_path(self.root_dir, session_id).unlink()
+        except FileNotFoundError:
+            pass
+
     def _infer_next_seq(self, session_id: str) -> int:
+        """Return the last seq in the session log (0 when empty).
+
+        Served from the offset index, so this is O(1) once the index exists.
+        Back-compat: lines without seq fields count as consecutive seqs.
+        """
+
         try:
             _ = self.session_dir(session_id)
         except ValueError:
             return 0
-        path = events_path(self.root_dir, session_id)
-        if not path.exists():
-            return 0
-        last_seq: int | None = None
-        # Read from the end in a simple, safe way (small files expected for v0.1).
-        for line in reversed(path.read_text(encoding="utf-8").splitlines()):
-            if not line.strip():
-                continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
-                break
-            if not isinstance(obj, dict):
-                break
-            seq = obj.get("seq")
-            if isinstance(seq, int):
-                last_seq = seq
-                break
-        if last_seq is not None:
-            return last_seq
-        # Back-compat: older logs without seq fields.
-        return len([ln for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()])
+        with self._session_lock(session_id):
+            base = self._base(session_id)
+            floor = base[1] if base is not None else 0
+            if not events_path(self.root_dir, session_id).exists() and not self._segments(session_id):
+                return floor
+            return max(floor, self._synced_index(session_id).last_seq)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+DURABILITY_MODES = ("none", "flush", "fsync")
+
+
+def validate_durability(durability: str) -> str:
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f"durability must be one of {', '.join(DURABILITY_MODES)}")
+    return durability
+
+
+class SessionLogWriter:
+    """Long-lived append handles for one session's log, transcript and index files.
+
+    Lines are buffered in memory by `append()` and written as a single batch by
+    `commit()`. Callers are responsible for serializing access (the store holds
+    the per-session lock around every call).
+    """
+
+    def __init__(
+        self,
+        *,
+        events_file: Path,
+        transcript_file: Path,
+        index_file: Path | None = None,
+        durability: str = "flush",
+    ) -> None:
+        self._events_file = events_file
+        self._transcript_file = transcript_file
+        self._index_file = index_file
+        self._durability = validate_durability(durability)
+        self._events_f: BinaryIO | None = None
+        self._transcript_f: BinaryIO | None = None
+        self._index_f: BinaryIO | None = None
+        self._pending: list[bytes] = []
+        self._pending_transcript: list[bytes] = []
+        self._pending_index: list[bytes] = []
+        self._pending_bytes = 0
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_bytes
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending or self._pending_transcript)
+
+    def append(self, line: bytes, *, transcript_line: bytes | None = None, index_record: bytes | None = None) -> None:
+        self._pending.append(line)
+        self._pending_bytes += len(line)
+        if index_record is not None:
+            self._pending_index.append(index_record)
+        if transcript_line is not None:
+            self._pending_transcript.append(transcript_line)
+            self._pending_bytes += len(transcript_line)
+
+    def commit(self, *, durability: str | None = None) -> None:
+        """Write the pending batch and apply the durability policy.
+
+        `durability` overrides the configured policy for this batch (readers use
+        "flush" so buffered events become visible without paying for fsync).
+        """
+
+        mode = self._durability if durability is None else validate_durability(durability)
+        if self._pending:
+            if self._events_f is None:
+                self._events_f = self._events_file.open("ab")
+            self._events_f.write(b"".join(self._pending))
+            self._pending.clear()
+        if self._pending_index and self._index_file is not None:
+            # Written after the log so a crash can only leave the index behind.
+            if self._index_f is None:
+                self._index_f = self._index_file.open("ab")
+            self._index_f.write(b"".join(self._pending_index))
+        self._pending_index.clear()
+        if self._pending_transcript:
+            if self._transcript_f is None:
+                self._transcript_f = self._transcript_file.open("ab")
+            self._transcript_f.write(b"".join(self._pending_transcript))
+            self._pending_transcript.clear()
+        self._pending_bytes = 0
+        if mode == "none":
+            return
+        for f in (self._events_f, self._transcript_f, self._index_f):
+            if f is None:
+                continue
+            f.flush()
+            if mode == "fsync":
+                os.fsync(f.fileno())
+
+    def close(self) -> None:
+        try:
+            self.commit()
+        finally:
+            for f in (self._events_f, self._transcript_f, self._index_f):
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+            self._events_f = None
+            self._transcript_f = None
+            self._index_f = None
+
+
+_LIVE_COMMITTERS: "weakref.WeakSet[GroupCommitter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _commit_all_at_exit() -> None:
+    for c in list(_LIVE_COMMITTERS):
+        try:
+            c.commit_now()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+class GroupCommitter:
+    """Background thread that periodically commits buffered session writers.
+
+    The thread is started lazily on the first `notify()` and exits after an idle
+    interval, so stores that stop writing do not keep a thread alive.
+    """
+
+    def __init__(self, *, interval_s: float, commit_all: Callable[[], None]) -> None:
+        self._interval_s = max(0.001, float(interval_s))
+        self._commit_all = commit_all
+        self._guard = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._dirty = False
+        self._stop = threading.Event()
+        _LIVE_COMMITTERS.add(self)
+
+    def notify(self) -> None:
+        with self._guard:
+            self._dirty = True
+            if self._thread is None and not self._stop.is_set():
+                t = threading.Thread(target=self._run, name="openagentic-session-commit", daemon=True)
+                self._thread = t
+                t.start()
+
+    def commit_now(self) -> None:
+        with self._guard:
+            self._dirty = False
+        self._commit_all()
+
+    def stop(self) -> None:
+        """Stop the background thread; a later `notify()` starts a new one."""
+
+        self._stop.set()
+        with self._guard:
+            t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout=max(1.0, self._interval_s * 4))
+        self._stop.clear()
+
+    def _run(self) -> None:
+        while True:
+            stopped = self._stop.wait(self._interval_s)
+            with self._guard:
+                dirty = self._dirty
+                self._dirty = False
+                if not dirty or stopped:
+                    self._thread = None
+            if dirty:
+                try:
+                    self._commit_all()
+                except Exception:  # noqa: BLE001
+                    # Best-effort: the next flush()/read surfaces persistent errors.
+                    pass
+            if not dirty or stopped:
+                return
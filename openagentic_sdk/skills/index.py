@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -25,14 +28,70 @@ def _iter_skill_files(root: Path) -> list[Path]:
     return out
 
 
-def index_skills(*, project_dir: str) -> list[SkillInfo]:
-    project_root = Path(project_dir)
-    global_root = default_session_root()
-    claude_root = project_root / ".claude"
+def _skill_roots(project_dir: str) -> tuple[Path, Path]:
+    # Precedence order: project skills override global skills when name collides.
+    return (default_session_root(), Path(project_dir) / ".claude")
 
-    # Precedence: project skills override global skills when name collides.
+
+def skills_fingerprint(*, project_dir: str) -> tuple[tuple[str, int, int], ...]:
+    """Cheap change detector for `index_skills(project_dir=...)`.
+
+    Stats (never reads) every directory under the skill roots and every
+    `SKILL.md`, so adding, removing or editing a skill changes the result.
+    """
+
+    out: list[tuple[str, int, int]] = []
+    for root in _skill_roots(project_dir):
+        for dirname in ("skill", "skills"):
+            top = root / dirname
+            if not top.is_dir():
+                out.append((str(top), -1, 0))
+                continue
+            # followlinks matches Path.glob("**"), which index_skills uses.
+            for dirpath, dirnames, filenames in os.walk(top, followlinks=True):
+                dirnames.sort()
+                try:
+                    out.append((dirpath, os.stat(dirpath).st_mtime_ns, 0))
+                    if "SKILL.md" in filenames:
+                        p = os.path.join(dirpath, "SKILL.md")
+                        st = os.stat(p)
+                        out.append((p, st.st_mtime_ns, st.st_size))
+                except OSError:
+                    continue
+    return tuple(out)
+
+
+_INDEX_CACHE: OrderedDict[tuple[str, tuple[tuple[str, int, int], ...]], tuple[SkillInfo, ...]] = OrderedDict()
+_INDEX_CACHE_MAX = 32
+_INDEX_LOCK = threading.Lock()
+
+
+def index_skills(*, project_dir: str, fingerprint: tuple[tuple[str, int, int], ...] | None = None) -> list[SkillInfo]:
+    """List the skills visible from `project_dir`, sorted by name.
+
+    Results are memoised on `skills_fingerprint()`; pass `fingerprint` when
+    the caller has already computed it.
+    """
+
+    if fingerprint is None:
+        fingerprint = skills_fingerprint(project_dir=project_dir)
+    key = (project_dir, fingerprint)
+    with _INDEX_LOCK:
+        hit = _INDEX_CACHE.get(key)
+        if hit is not None:
+            _INDEX_CACHE.move_to_end(key)
+            return list(hit)
+    skills = _index_skills(project_dir)
+    with _INDEX_LOCK:
+        _INDEX_CACHE[key] = tuple(skills)
+        while len(_INDEX_CACHE) > _INDEX_CACHE_MAX:
+            _INDEX_CACHE.popitem(last=False)
+    return skills
+
+
+def _index_skills(project_dir: str) -> list[SkillInfo]:
     seen: dict[str, SkillInfo] = {}
-    for root in (global_root, claude_root):
+    for root in _skill_roots(project_dir):
         for p in _iter_skill_files(root):
             raw = p.read_text(encoding="utf-8", errors="replace")
             doc = parse_skill_markdown(raw)
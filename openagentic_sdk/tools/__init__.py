@@ -4,7 +4,7 @@ from .edit import EditTool
 from .glob import GlobTool
 from .grep import GrepTool
 from .read import ReadTool
-from .registry import ToolRegistry
+from .registry import ToolAccess, ToolRegistry
 from .slash_command import SlashCommandTool
 from .task import TaskTool
 from .web_fetch import WebFetchTool
@@ -17,6 +17,7 @@ __all__ = [
     "GlobTool",
     "GrepTool",
     "ReadTool",
+    "ToolAccess",
     "ToolRegistry",
     "WebFetchTool",
     "WebSearchTool",
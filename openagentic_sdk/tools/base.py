@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 
 @dataclass(frozen=True, slots=True)
@@ -14,6 +14,11 @@ class ToolContext:
 class Tool:
     name: str
     description: str
+    # Scheduling metadata read by `ToolRegistry.access()`: read-only tools may
+    # run concurrently; tools naming the file they write in one of `path_keys`
+    # are serialised per file. Anything else runs alone.
+    read_only: ClassVar[bool] = False
+    path_keys: ClassVar[tuple[str, ...]] = ()
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> Any:
         raise NotImplementedError
@@ -2,15 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 from .base import Tool, ToolContext
+from .file_index import note_change
 
 
 @dataclass(frozen=True, slots=True)
 class EditTool(Tool):
     name: str = "Edit"
     description: str = "Apply a precise edit (string replace) to a file."
+    path_keys: ClassVar[tuple[str, ...]] = ("file_path", "filePath")
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> dict[str, Any]:
         file_path = tool_input.get("file_path", tool_input.get("filePath"))
@@ -57,6 +59,7 @@ class EditTool(Tool):
 
         replaced = text.replace(old, new, count) if count != 0 else text.replace(old, new)
         p.write_text(replaced, encoding="utf-8")
+        note_change(p)
         replacements = text.count(old) if count == 0 else min(text.count(old), count)
         return {
             "message": "Edit applied",
@@ -0,0 +1,622 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from .ignore import _IGNORE_PREFIXES, IgnoreRules, compile_glob
+
+# inotify(7) constants.
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONTFOLLOW = 0x02000000
+_IN_EXCL_UNLINK = 0x04000000
+_STRUCTURE = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO
+_CONTENT = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE
+_SELF = _IN_DELETE_SELF | _IN_MOVE_SELF
+_WATCH_MASK = _STRUCTURE | _CONTENT | _SELF | _IN_ONLYDIR | _IN_DONTFOLLOW | _IN_EXCL_UNLINK
+_EVENT_HEADER = struct.Struct("iIII")
+
+_GLOB_CHARS = frozenset("*?[")
+_MAX_CACHED_QUERIES = 256
+_MAX_INDEXES = 8
+# Never project content: git's object store and the SDK's per-project state.
+_ALWAYS_IGNORED = frozenset({".git", ".openagentic-sdk"})
+
+
+@dataclass(frozen=True, slots=True)
+class IndexEntry:
+    # Relative to the index root, with `/` separators.
+    path: str
+    is_dir: bool
+    mtime_ns: int
+    size: int
+    ignored: bool
+
+
+class _Node:
+    __slots__ = ("rel", "is_dir", "mtime_ns", "size", "ignored", "pruned", "children", "rules", "wd", "span")
+
+    def __init__(self, rel: str, *, is_dir: bool, mtime_ns: int = 0, size: int = 0, ignored: bool = False, pruned: bool = False) -> None:
+        self.rel = rel
+        self.is_dir = is_dir
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.ignored = ignored
+        # `_IGNORE_PREFIXES` and symlinked directories are listed but never scanned or watched.
+        self.pruned = pruned
+        self.children: dict[str, _Node] | None = {} if is_dir else None
+        self.rules: IgnoreRules | None = None
+        self.wd = -1
+        # [start, end) of this directory's subtree in the flattened, sorted entry list.
+        self.span = (0, 0)
+
+    def entry(self) -> IndexEntry:
+        return IndexEntry(path=self.rel, is_dir=self.is_dir, mtime_ns=self.mtime_ns, size=self.size, ignored=self.ignored)
+
+
+class _Inotify:
+    """Minimal ctypes binding; raises OSError where inotify is unavailable."""
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is Linux-only")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._libc = libc
+        self.fd = fd
+
+    def add(self, path: str) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {path}")
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> list[tuple[int, int, str]]:
+        events: list[tuple[int, int, str]] = []
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return events
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = os.fsdecode(data[pos : pos + length].rstrip(b"\0"))
+                pos += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class WorkspaceIndex:
+    """In-memory trie of the files below one root, with mtime, size and ignore status.
+
+    The tree is scanned on first use and kept fresh with inotify on Linux. Pending
+    events are drained at the start of every query, so changes made before a
+    query are always seen. Elsewhere, or when inotify runs out of watches, the
+    directories are stat-diffed at most every `poll_interval_s`. `note_change()`
+    forces a refresh of one path in either mode.
+
+    The contents of `_IGNORE_PREFIXES` directories and of symlinked directories
+    are not indexed ("pruned"); queries that could reach into them return None
+    so callers fall back to the file system. `.gitignore`d entries are indexed
+    with `ignored=True`, as are `.git` and `.openagentic-sdk`.
+    """
+
+    def __init__(self, root: str | os.PathLike[str], *, poll_interval_s: float = 2.0, use_inotify: bool = True) -> None:
+        self.root = Path(os.path.realpath(root))
+        self.poll_interval_s = poll_interval_s
+        self._use_inotify = use_inotify
+        self._lock = threading.RLock()
+        self._top: _Node | None = None
+        self._inotify: _Inotify | None = None
+        self._watches: dict[int, _Node] = {}
+        self._dirs: dict[str, _Node] = {}
+        self._dirty_dirs: set[str] = set()
+        self._dirty_files: set[str] = set()
+        self._last_poll = 0.0
+        self._flat: list[_Node] | None = None
+        self._queries: OrderedDict[tuple[object, ...], list[str] | None] = OrderedDict()
+        self._generation = 0
+        self.closed = False
+
+    # -- queries -------------------------------------------------------------
+
+    @property
+    def watching(self) -> bool:
+        """True while inotify keeps the index fresh (False: polling)."""
+
+        with self._lock:
+            self._sync()
+            return self._inotify is not None
+
+    @property
+    def generation(self) -> int:
+        """Bumped whenever an entry is added, removed, or changes mtime or size."""
+
+        with self._lock:
+            self._sync()
+            return self._generation
+
+    def covers(self, under: str = "", *, include_ignored: bool = False, include_pruned: bool = False) -> bool:
+        """True when `under` is an indexed directory whose contents queries can see.
+
+        With `include_pruned`, also False while the subtree holds a pruned
+        directory (visible under `include_ignored`), whose contents `entries()`
+        would be missing.
+        """
+
+        with self._lock:
+            self._sync()
+            node = self._find(under)
+            if node is None or not node.is_dir or node.pruned or (node.ignored and not include_ignored):
+                return False
+            if include_pruned:
+                flat = self._flatten()
+                return not any(n.pruned and (include_ignored or not n.ignored) for n in flat[node.span[0] : node.span[1]])
+            return True
+
+    def entries(self, under: str = "", *, include_ignored: bool = False, dirs: bool = False) -> list[IndexEntry]:
+        """Entries below `under` (root-relative), sorted like `sorted(Path.rglob(...))`."""
+
+        with self._lock:
+            self._sync()
+            node = self._find(under)
+            if node is None or not node.is_dir:
+                return []
+            flat = self._flatten()
+            return [
+                n.entry()
+                for n in flat[node.span[0] : node.span[1]]
+                if (dirs or not n.is_dir) and (include_ignored or not n.ignored)
+            ]
+
+    def glob(
+        self,
+        pattern: str,
+        under: str = "",
+        *,
+        include_ignored: bool = False,
+        include_pruned: bool = True,
+        dirs: bool = True,
+    ) -> list[str] | None:
+        """`Path.glob(pattern)` from `under`, as paths relative to `under`, sorted.
+
+        Returns None when the pattern could reach into a directory the index does
+        not cover (pruned, or ignored without `include_ignored`); callers then
+        fall back to the file system. `include_pruned=False` instead leaves the
+        contents of pruned directories out, like the grep engine's walk.
+        """
+
+        with self._lock:
+            self._sync()
+            key = (pattern, under, include_ignored, include_pruned, dirs)
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                result = self._queries[key]
+            else:
+                result = self._glob(pattern, under, include_ignored=include_ignored, include_pruned=include_pruned, dirs=dirs)
+                self._queries[key] = result
+                if len(self._queries) > _MAX_CACHED_QUERIES:
+                    self._queries.popitem(last=False)
+            return None if result is None else list(result)
+
+    def note_change(self, path: str | os.PathLike[str]) -> None:
+        """Marks `path` (absolute, or relative to the root) as created, changed or removed."""
+
+        p = Path(path)
+        full = Path(os.path.realpath(p if p.is_absolute() else self.root / p))
+        try:
+            rel = full.relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        with self._lock:
+            parent = rel.rpartition("/")[0] if "/" in rel else ""
+            self._dirty_dirs.add(parent if rel != "." else "")
+            if rel != ".":
+                self._dirty_files.add(rel)
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            self._watches.clear()
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _sync(self) -> None:
+        if self.closed:
+            raise RuntimeError(f"workspace index closed: {self.root}")
+        if self._top is None:
+            self._build()
+            return
+        full = False
+        if self._inotify is not None:
+            for wd, mask, name in self._inotify.read():
+                if mask & _IN_Q_OVERFLOW:
+                    full = True
+                    continue
+                node = self._watches.get(wd)
+                if mask & _IN_IGNORED:
+                    self._watches.pop(wd, None)
+                if node is None:
+                    continue
+                if mask & _SELF:
+                    if node is self._top:
+                        full = True
+                    else:
+                        self._dirty_dirs.add(node.rel.rpartition("/")[0])
+                elif mask & _STRUCTURE:
+                    self._dirty_dirs.add(node.rel)
+                elif mask & _CONTENT and name:
+                    self._dirty_files.add(f"{node.rel}/{name}" if node.rel else name)
+        elif time.monotonic() - self._last_poll >= self.poll_interval_s:
+            self._last_poll = time.monotonic()
+            for rel, node in list(self._dirs.items()):
+                try:
+                    mtime_ns = os.stat(self._abs(rel)).st_mtime_ns
+                except OSError:
+                    mtime_ns = -1
+                if mtime_ns != node.mtime_ns:
+                    self._dirty_dirs.add(rel)
+                elif node.children and ".gitignore" in node.children:
+                    # Rewriting a file in place leaves its directory's mtime alone.
+                    self._dirty_files.add(f"{rel}/.gitignore" if rel else ".gitignore")
+        if full:
+            self._dirty_dirs.clear()
+            self._dirty_files.clear()
+            self._build()
+            return
+        dirty_dirs, self._dirty_dirs = self._dirty_dirs, set()
+        dirty_files, self._dirty_files = self._dirty_files, set()
+        # Parents first, so a rescanned child is not dropped again by its parent's rescan.
+        for rel in sorted(dirty_dirs, key=lambda r: (r.count("/") + bool(r), r)):
+            node = self._dirs.get(rel)
+            if node is not None:
+                self._rescan(node)
+        for rel in dirty_files:
+            self._restat(rel)
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else os.fspath(self.root)
+
+    def _changed(self) -> None:
+        self._generation += 1
+        self._flat = None
+        self._queries.clear()
+
+    def _build(self) -> None:
+        for node in list(self._dirs.values()):
+            self._unwatch(node)
+        self._dirs.clear()
+        self._watches.clear()
+        if self._use_inotify and self._inotify is None:
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError(f"workspace index root is not a directory: {self.root}")
+        top = _Node("", is_dir=True)
+        top.rules = IgnoreRules.for_root(self.root)
+        self._top = top
+        self._last_poll = time.monotonic()
+        self._scan(top)
+        self._changed()
+
+    def _watch(self, node: _Node) -> None:
+        self._dirs[node.rel] = node
+        if self._inotify is None:
+            return
+        try:
+            node.wd = self._inotify.add(self._abs(node.rel))
+        except OSError:
+            # Out of watches (or the directory vanished): fall back to polling everything.
+            self._inotify.close()
+            self._inotify = None
+            self._watches.clear()
+            return
+        self._watches[node.wd] = node
+
+    def _unwatch(self, node: _Node) -> None:
+        self._dirs.pop(node.rel, None)
+        if node.wd >= 0:
+            self._watches.pop(node.wd, None)
+            if self._inotify is not None:
+                self._inotify.remove(node.wd)
+            node.wd = -1
+
+    def _scan(self, top: _Node) -> None:
+        stack = [top]
+        while stack:
+            node = stack.pop()
+            path = self._abs(node.rel)
+            # Watch before listing, so nothing created in between is missed.
+            self._watch(node)
+            try:
+                node.mtime_ns = os.stat(path).st_mtime_ns
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            assert node.children is not None
+            node.children.clear()
+            if node.rel:
+                assert node.rules is not None
+                node.rules = node.rules.child(Path(path), node.rel)
+            for entry in entries:
+                child = self._make(node, entry)
+                if child is None:
+                    continue
+                node.children[entry.name] = child
+                if child.is_dir and not child.pruned:
+                    stack.append(child)
+
+    def _make(self, parent: _Node, entry: os.DirEntry[str]) -> _Node | None:
+        rel = f"{parent.rel}/{entry.name}" if parent.rel else entry.name
+        try:
+            linked_dir = entry.is_symlink() and entry.is_dir()
+            is_dir = linked_dir or entry.is_dir(follow_symlinks=False)
+            if not is_dir and not entry.is_file():
+                return None
+            st = entry.stat(follow_symlinks=not is_dir)
+        except OSError:
+            return None
+        assert parent.rules is not None
+        pruned = linked_dir or (is_dir and entry.name in _IGNORE_PREFIXES)
+        ignored = (
+            parent.ignored
+            or (is_dir and entry.name in _ALWAYS_IGNORED)
+            or parent.rules.ignored(rel, is_dir=is_dir)
+        )
+        child = _Node(rel, is_dir=is_dir, mtime_ns=st.st_mtime_ns, size=0 if is_dir else st.st_size, ignored=ignored, pruned=pruned)
+        # Children inherit the parent's rules; `_scan` adds their own .gitignore.
+        child.rules = parent.rules if is_dir else None
+        return child
+
+    def _drop(self, node: _Node) -> None:
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if n.is_dir:
+                self._unwatch(n)
+                stack.extend((n.children or {}).values())
+
+    def _rescan(self, node: _Node) -> None:
+        path = self._abs(node.rel)
+        try:
+            node.mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                listing = {e.name: e for e in it}
+        except OSError:
+            listing = {}
+        children = node.children
+        assert children is not None
+        if ".gitignore" in listing or ".gitignore" in children:
+            old = children.get(".gitignore")
+            new = listing.get(".gitignore")
+            try:
+                new_mtime = new.stat().st_mtime_ns if new is not None else None
+            except OSError:
+                new_mtime = None
+            if (old is None) != (new is None) or (old is not None and old.mtime_ns != new_mtime):
+                self._rescan_tree(node)
+                return
+        changed = False
+        for name in [n for n in children if n not in listing]:
+            self._drop(children.pop(name))
+            changed = True
+        for name, entry in listing.items():
+            current = children.get(name)
+            fresh = self._make(node, entry)
+            if fresh is None:
+                if current is not None:
+                    self._drop(children.pop(name))
+                    changed = True
+                continue
+            if current is not None and (current.is_dir, current.pruned) == (fresh.is_dir, fresh.pruned):
+                if not current.is_dir and (current.mtime_ns, current.size) != (fresh.mtime_ns, fresh.size):
+                    current.mtime_ns, current.size = fresh.mtime_ns, fresh.size
+                    changed = True
+                continue
+            if current is not None:
+                self._drop(current)
+            children[name] = fresh
+            if fresh.is_dir and not fresh.pruned:
+                self._scan(fresh)
+            changed = True
+        if changed:
+            self._changed()
+
+    def _rescan_tree(self, node: _Node) -> None:
+        # A .gitignore changed: every ignore flag below `node` may differ.
+        for child in (node.children or {}).values():
+            self._drop(child)
+        if node.rel:
+            parent = self._dirs[node.rel.rpartition("/")[0] if "/" in node.rel else ""]
+            node.rules = parent.rules
+        else:
+            node.rules = IgnoreRules.for_root(self.root)
+        self._scan(node)
+        self._changed()
+
+    def _restat(self, rel: str) -> None:
+        node = self._find(rel)
+        parent = self._dirs.get(rel.rpartition("/")[0] if "/" in rel else "")
+        if node is not None and node.is_dir:
+            return
+        try:
+            st = os.stat(self._abs(rel))
+        except OSError:
+            st = None
+        if node is None or st is None:
+            # Created or removed: the parent's listing decides.
+            if parent is not None:
+                self._rescan(parent)
+            return
+        if (node.mtime_ns, node.size) == (st.st_mtime_ns, st.st_size):
+            return
+        node.mtime_ns, node.size = st.st_mtime_ns, st.st_size
+        if rel.rpartition("/")[2] == ".gitignore" and parent is not None:
+            self._rescan_tree(parent)
+            return
+        self._changed()
+
+    def _find(self, rel: str) -> _Node | None:
+        node = self._top
+        if not rel or rel == ".":
+            return node
+        for part in rel.strip("/").split("/"):
+            if node is None or node.children is None:
+                return None
+            node = node.children.get(part)
+        return node
+
+    def _flatten(self) -> list[_Node]:
+        if self._flat is not None:
+            return self._flat
+        flat: list[_Node] = []
+        assert self._top is not None
+        # Iterative pre-order walk in name order; a directory's span closes after its subtree.
+        stack: list[tuple[_Node, bool]] = [(self._top, False)]
+        while stack:
+            node, closing = stack.pop()
+            if closing:
+                node.span = (node.span[0], len(flat))
+                continue
+            if node is not self._top:
+                flat.append(node)
+            if node.is_dir:
+                node.span = (len(flat), len(flat))
+                stack.append((node, True))
+                for name in sorted(node.children or {}, reverse=True):
+                    stack.append(((node.children or {})[name], False))
+        self._flat = flat
+        return flat
+
+    def _glob(self, pattern: str, under: str, *, include_ignored: bool, include_pruned: bool, dirs: bool) -> list[str] | None:
+        base = self._find(under)
+        if base is None or not base.is_dir:
+            # Possibly below a pruned directory; the file system knows.
+            return None
+        parts = pattern.split("/")
+        if pattern.startswith("/") or ".." in parts:
+            return None
+        # Literal leading segments are looked up directly instead of matched.
+        start = base
+        for part in parts[:-1]:
+            if part == "**" or _GLOB_CHARS & set(part):
+                break
+            if part in (".", ""):
+                continue
+            if start.pruned or (start.ignored and not include_ignored):
+                return None
+            nxt = (start.children or {}).get(part)
+            if nxt is None or not nxt.is_dir:
+                return []
+            start = nxt
+        if start.pruned or (start.ignored and not include_ignored):
+            return None
+        rx = compile_glob(pattern)
+        segments = [p for p in parts if p not in (".", "")]
+        flat = self._flatten()
+        cut = len(under) + 1 if under else 0
+        out: list[str] = []
+        for n in flat[start.span[0] : start.span[1]]:
+            if n.ignored and not include_ignored:
+                continue
+            rel = n.rel[cut:]
+            if n.pruned and include_pruned and _reaches_below(segments, rel):
+                return None
+            if n.is_dir and not dirs:
+                continue
+            if rx.match(rel):
+                out.append(rel)
+        return out
+
+
+def _reaches_below(segments: list[str], rel: str) -> bool:
+    """True when a glob of `segments` could match a path below the directory `rel`."""
+
+    names = rel.split("/")
+    for i, segment in enumerate(segments):
+        if "**" in segment or i == len(names):
+            return True
+        if not compile_glob(segment).match(names[i]):
+            return False
+    return False
+
+
+_INDEXES: OrderedDict[str, WorkspaceIndex] = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+def workspace_index(root: str | os.PathLike[str]) -> WorkspaceIndex:
+    """The shared index for `root`, created on first use (the least recently used of 8 is closed)."""
+
+    key = os.path.realpath(root)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is not None and not index.closed and os.path.isdir(key):
+            _INDEXES.move_to_end(key)
+            return index
+        if index is not None:
+            index.close()
+        index = WorkspaceIndex(key)
+        _INDEXES[key] = index
+        while len(_INDEXES) > _MAX_INDEXES:
+            _, old = _INDEXES.popitem(last=False)
+            old.close()
+        return index
+
+
+def index_for(path: str | os.PathLike[str], project_root: str | os.PathLike[str] | None) -> tuple[WorkspaceIndex, str] | None:
+    """`(index, rel)` when `path` lies inside `project_root`, else None (search the file system)."""
+
+    if project_root is None:
+        return None
+    root = os.path.realpath(project_root)
+    full = os.path.realpath(path)
+    if full != root and not full.startswith(root.rstrip(os.sep) + os.sep):
+        return None
+    if not os.path.isdir(root):
+        return None
+    rel = "" if full == root else Path(os.path.relpath(full, root)).as_posix()
+    return workspace_index(root), rel
+
+
+def note_change(path: str | os.PathLike[str]) -> None:
+    """Tells every live index that `path` was written, so polling indexes see it at once."""
+
+    with _INDEXES_LOCK:
+        indexes = list(_INDEXES.values())
+    for index in indexes:
+        if not index.closed:
+            index.note_change(path)
@@ -2,15 +2,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 from .base import Tool, ToolContext
+from .file_index import index_for
 
 
 @dataclass(frozen=True, slots=True)
 class GlobTool(Tool):
     name: str = "Glob"
     description: str = "Find files by glob pattern."
+    read_only: ClassVar[bool] = True
+    # Answer from the workspace file index when the search root is inside the
+    # project and the index holds every possible match; otherwise glob on disk.
+    # Ignored files are matched either way, as with `Path.glob`.
+    use_index: bool = True
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> dict[str, Any]:
         pattern = tool_input.get("pattern")
@@ -18,7 +24,18 @@ class GlobTool(Tool):
             raise ValueError("Glob: 'pattern' must be a non-empty string")
         root = tool_input.get("root", tool_input.get("path"))
         base = Path(ctx.cwd) if root is None else Path(str(root))
-        matches = [str(p) for p in sorted(base.glob(pattern))]
+        found: list[str] | None = None
+        hit = index_for(base, ctx.project_dir or ctx.cwd) if self.use_index else None
+        if hit is not None:
+            index, under = hit
+            try:
+                found = index.glob(pattern, under, include_ignored=True)
+            except (OSError, RuntimeError):
+                found = None
+        if found is not None:
+            matches = [str(base / rel) for rel in found]
+        else:
+            matches = [str(p) for p in sorted(base.glob(pattern))]
         return {
             "root": str(base),
             "matches": matches,
@@ -1,18 +1,35 @@
 from __future__ import annotations
 
+import asyncio
 import re
+import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Iterator, Mapping
 
 from .base import Tool, ToolContext
+from .file_index import index_for
+from .grep_engine import GrepMatch, GrepQuery, iter_grep, iter_ripgrep
+from .trigram_index import trigram_index
 
 
 @dataclass(frozen=True, slots=True)
 class GrepTool(Tool):
     name: str = "Grep"
     description: str = "Search file contents with a regex."
+    read_only: ClassVar[bool] = True
     max_matches: int = 5000
+    # Scanner threads; None picks min(8, cpu_count).
+    workers: int | None = None
+    # Search with `rg` when it is on PATH, falling back to the built-in engine
+    # if it is missing or rejects the pattern.
+    use_ripgrep: bool = False
+    # Take the file list from the workspace file index when the search root is
+    # inside the project.
+    use_index: bool = True
+    # Narrow the indexed file list with the on-disk trigram index under
+    # `.openagentic-sdk/` (built on first use) before running the regex.
+    use_trigram_index: bool = False
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> dict[str, Any]:
         query = tool_input.get("query")
@@ -25,8 +42,9 @@ class GrepTool(Tool):
         root_in = tool_input.get("root", tool_input.get("path"))
         root = Path(ctx.cwd) if root_in is None else Path(str(root_in))
 
-        flags = 0 if tool_input.get("case_sensitive", True) else re.IGNORECASE
-        rx = re.compile(query, flags=flags)
+        case_sensitive = tool_input.get("case_sensitive", True)
+        # Fail on a bad pattern here rather than in a worker thread.
+        re.compile(query, flags=0 if case_sensitive else re.IGNORECASE)
 
         mode = tool_input.get("mode", "content")
         if not isinstance(mode, str) or not mode:
@@ -39,37 +57,80 @@ class GrepTool(Tool):
         if not isinstance(after_n, int) or after_n < 0:
             raise ValueError("Grep: 'after_context' must be a non-negative integer")
 
-        matches: list[dict[str, Any]] = []
-        files_with_matches: set[str] = set()
-        for p in root.glob(file_glob):
-            if not p.is_file():
-                continue
+        search = GrepQuery(
+            pattern=query,
+            case_sensitive=bool(case_sensitive),
+            before=before_n,
+            after=after_n,
+            files_only=mode == "files_with_matches",
+        )
+        # The scan reads files on a thread pool; keep the event loop free meanwhile.
+        return await asyncio.to_thread(self._search, root, search, file_glob, ctx.project_dir or ctx.cwd)
+
+    def _files(self, root: Path, search: GrepQuery, file_glob: str, project_root: str) -> list[Path] | None:
+        hit = index_for(root, project_root) if self.use_index else None
+        if hit is None:
+            return None
+        index, under = hit
+        try:
+            # The grep walk skips `_IGNORE_PREFIXES` and symlinked directories too.
+            found = index.glob(file_glob, under, include_pruned=False, dirs=False)
+        except (OSError, RuntimeError):
+            return None
+        if found is None:
+            return None
+        keep: set[str] | None = None
+        if self.use_trigram_index:
+            try:
+                keep = trigram_index(index).candidates(search)
+            except (OSError, RuntimeError, sqlite3.Error):
+                keep = None
+        if keep is None:
+            return [root / rel for rel in found]
+        prefix = f"{under}/" if under else ""
+        return [root / rel for rel in found if prefix + rel in keep]
+
+    def _search(self, root: Path, search: GrepQuery, file_glob: str, project_root: str) -> dict[str, Any]:
+        found: list[GrepMatch] | None = None
+        if self.use_ripgrep:
             try:
-                text = p.read_text(encoding="utf-8", errors="replace")
-            except OSError:
-                continue
-            lines = text.splitlines()
-            for idx, line in enumerate(lines, start=1):
-                if rx.search(line):
-                    files_with_matches.add(str(p))
-                    if mode == "files_with_matches":
-                        continue
-                    before_ctx = lines[max(0, idx - 1 - before_n) : idx - 1] if before_n else None
-                    after_ctx = lines[idx : idx + after_n] if after_n else None
-                    matches.append(
-                        {
-                            "file_path": str(p),
-                            "line": idx,
-                            "text": line,
-                            "before_context": before_ctx,
-                            "after_context": after_ctx,
-                        }
-                    )
-                    if len(matches) >= self.max_matches:
-                        return {"root": str(root), "query": query, "matches": matches, "truncated": True}
+                rg = iter_ripgrep(root, search, file_glob=file_glob)
+                if rg is not None:
+                    found = self._collect(rg, search)
+            except (OSError, RuntimeError):
+                found = None
+        if found is None:
+            files = self._files(root, search, file_glob, project_root)
+            found = self._collect(iter_grep(root, search, file_glob=file_glob, files=files, workers=self.workers), search)
+
+        if search.files_only:
+            files = sorted({m.file_path for m in found})
+            return {"root": str(root), "query": search.pattern, "files": files, "count": len(files)}
 
-        if mode == "files_with_matches":
-            files = sorted(files_with_matches)
-            return {"root": str(root), "query": query, "files": files, "count": len(files)}
+        matches = [
+            {
+                "file_path": m.file_path,
+                "line": m.line,
+                "text": m.text,
+                "before_context": m.before_context,
+                "after_context": m.after_context,
+            }
+            for m in found
+        ]
+        if len(matches) >= self.max_matches:
+            return {"root": str(root), "query": search.pattern, "matches": matches, "truncated": True}
+        return {"root": str(root), "query": search.pattern, "matches": matches, "truncated": False, "total_matches": len(matches)}
 
-        return {"root": str(root), "query": query, "matches": matches, "truncated": False, "total_matches": len(matches)}
+    def _collect(self, it: Iterator[GrepMatch], search: GrepQuery) -> list[GrepMatch]:
+        # Closing the iterator stops the scan (or kills rg) once max_matches is reached.
+        out: list[GrepMatch] = []
+        try:
+            for m in it:
+                out.append(m)
+                if not search.files_only and len(out) >= self.max_matches:
+                    break
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+        return out
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from re import _constants as _sre
+from re import _parser as _sre_parse
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from .ignore import _IGNORE_PREFIXES, compile_glob, walk_files
+
+# Files this large are memory-mapped instead of read into a bytes object.
+_MMAP_MIN_BYTES = 1 << 20
+# A NUL byte in this many leading bytes marks a file as binary.
+_BINARY_SNIFF_BYTES = 8192
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+@dataclass(frozen=True, slots=True)
+class GrepMatch:
+    file_path: str
+    line: int
+    text: str
+    before_context: list[str] | None = None
+    after_context: list[str] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class GrepQuery:
+    """One search: the pattern as given plus the compiled forms the scanners need."""
+
+    pattern: str
+    case_sensitive: bool = True
+    before: int = 0
+    after: int = 0
+    files_only: bool = False
+
+    @property
+    def literal(self) -> bytes | None:
+        # Case-sensitive patterns without regex syntax are searched as raw bytes, undecoded.
+        if not self.case_sensitive or any(c in _REGEX_META for c in self.pattern) or "\n" in self.pattern:
+            return None
+        return self.pattern.encode("utf-8")
+
+    def compile(self) -> tuple[re.Pattern[str], re.Pattern[str]]:
+        """`(line_rx, buffer_rx)`: the per-line regex and its MULTILINE twin for whole buffers."""
+
+        flags = 0 if self.case_sensitive else re.IGNORECASE
+        return re.compile(self.pattern, flags), re.compile(self.pattern, flags | re.MULTILINE)
+
+
+# Nodes that can match a line on its own but not inside the whole buffer:
+# `\A`/`\Z` see the buffer's ends, lookarounds see the neighbouring lines.
+_LINE_ONLY_OPS = (_sre.ASSERT, _sre.ASSERT_NOT)
+_LINE_ONLY_ATS = (_sre.AT_BEGINNING_STRING, _sre.AT_END_STRING)
+
+
+def _has_line_only_nodes(items: _sre_parse.SubPattern | list) -> bool:
+    for op, av in items:
+        if op in _LINE_ONLY_OPS or (op is _sre.AT and av in _LINE_ONLY_ATS):
+            return True
+        if op is _sre.SUBPATTERN:
+            subs = [av[3]]
+        elif op is _sre.BRANCH:
+            subs = av[1]
+        elif op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT, _sre.POSSESSIVE_REPEAT):
+            subs = [av[2]]
+        elif op is _sre.ATOMIC_GROUP:
+            subs = [av]
+        elif op is _sre.GROUPREF_EXISTS:
+            subs = [b for b in av[1:] if b is not None]
+        else:
+            continue
+        if any(_has_line_only_nodes(sub) for sub in subs):
+            return True
+    return False
+
+
+@lru_cache(maxsize=256)
+def _needs_line_scan(pattern: str, flags: int) -> bool:
+    """True when searching the whole buffer could miss lines a per-line search matches."""
+
+    try:
+        return _has_line_only_nodes(_sre_parse.parse(pattern, flags))
+    except re.error:
+        return True
+
+
+def _strip_cr(line: str) -> str:
+    return line[:-1] if line.endswith("\r") else line
+
+
+def _scan(
+    buf: Any,
+    nl: Any,
+    find: Callable[[int], int],
+    verify: Callable[[str], bool] | None,
+    decode: Callable[[Any], str],
+    query: GrepQuery,
+    file_path: str,
+) -> list[GrepMatch]:
+    """Finds matching lines in a whole buffer (`str`, `bytes` or `mmap`).
+
+    `find(pos)` returns the offset of the next candidate at or after `pos`. Each
+    candidate is mapped to its line; `verify` re-checks that line on its own so
+    results are the same as matching line by line.
+    """
+
+    size = len(buf)
+    if size and buf[size - 1 : size] == nl:
+        size -= 1
+    out: list[GrepMatch] = []
+    pos = 0
+    line_no = 1
+    counted_to = 0
+    while pos <= size:
+        hit = find(pos)
+        if hit < 0 or hit > size:
+            break
+        start = buf.rfind(nl, 0, hit) + 1
+        end = buf.find(nl, hit)
+        if end < 0 or end > size:
+            end = size
+        pos = end + 1
+        text = _strip_cr(decode(buf[start:end]))
+        if verify is not None and not verify(text):
+            continue
+        # mmap has no count(); its slices are bytes.
+        line_no += buf.count(nl, counted_to, start) if not isinstance(buf, mmap.mmap) else buf[counted_to:start].count(nl)
+        counted_to = start
+        before: list[str] | None = None
+        after: list[str] | None = None
+        if query.before:
+            before = []
+            cur = start
+            while cur > 0 and len(before) < query.before:
+                prev = buf.rfind(nl, 0, cur - 1) + 1
+                before.append(_strip_cr(decode(buf[prev : cur - 1])))
+                cur = prev
+            before.reverse()
+        if query.after:
+            after = []
+            cur = end + 1
+            while cur <= size and len(after) < query.after:
+                nxt = buf.find(nl, cur)
+                if nxt < 0 or nxt > size:
+                    nxt = size
+                after.append(_strip_cr(decode(buf[cur:nxt])))
+                cur = nxt + 1
+        out.append(GrepMatch(file_path=file_path, line=line_no, text=text, before_context=before, after_context=after))
+        if query.files_only:
+            break
+    return out
+
+
+def grep_file(path: Path, query: GrepQuery, *, compiled: tuple[re.Pattern[str], re.Pattern[str]] | None = None) -> list[GrepMatch]:
+    """Matching lines of one file; binary and unreadable files have none."""
+
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            if size >= _MMAP_MIN_BYTES:
+                buf: Any = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+    except (OSError, ValueError):
+        return []
+    try:
+        if b"\0" in buf[:_BINARY_SNIFF_BYTES]:
+            return []
+        file_path = str(path)
+        literal = query.literal
+        if literal is not None:
+            return _scan(
+                buf,
+                b"\n",
+                lambda pos: buf.find(literal, pos),
+                None,
+                lambda b: b.decode("utf-8", errors="replace"),
+                query,
+                file_path,
+            )
+        line_rx, buffer_rx = compiled or query.compile()
+        text = str(buf, "utf-8", "replace")
+        if "\r\n" in text:
+            # `$` must match before a CRLF line ending, as it does per line.
+            text = text.replace("\r\n", "\n")
+
+        if _needs_line_scan(query.pattern, line_rx.flags):
+
+            def find_line(pos: int) -> int:
+                # One search per line, like the old engine.
+                while pos <= len(text):
+                    end = text.find("\n", pos)
+                    if end < 0:
+                        end = len(text)
+                    if line_rx.search(text[pos:end]):
+                        return pos
+                    pos = end + 1
+                return -1
+
+            return _scan(text, "\n", find_line, None, lambda s: s, query, file_path)
+
+        def find(pos: int) -> int:
+            m = buffer_rx.search(text, pos)
+            return m.start() if m else -1
+
+        return _scan(text, "\n", find, lambda line: line_rx.search(line) is not None, lambda s: s, query, file_path)
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+
+def iter_grep(
+    root: Path,
+    query: GrepQuery,
+    *,
+    file_glob: str = "**/*",
+    files: Iterable[Path] | None = None,
+    workers: int | None = None,
+) -> Iterator[GrepMatch]:
+    """Yields matches below `root` in file order, scanning files on a thread pool.
+
+    Files come from `walk_files` (ignore rules applied) unless `files` is given.
+    Results are produced as soon as every earlier file is done, so a consumer
+    that stops early (`max_matches`) leaves the rest of the tree unread.
+    """
+
+    compiled = query.compile()
+    if files is None:
+        glob_rx = None if file_glob in ("**/*", "**") else compile_glob(file_glob)
+        files = (p for p, rel in walk_files(root) if glob_rx is None or glob_rx.match(rel))
+    n = max(1, workers or min(8, os.cpu_count() or 1))
+    pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="grep")
+    pending: deque[Future[list[GrepMatch]]] = deque()
+    try:
+        for p in files:
+            pending.append(pool.submit(grep_file, p, query, compiled=compiled))
+            if len(pending) >= n * 4:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _rg_text(obj: Any) -> str | None:
+    if isinstance(obj, dict):
+        text = obj.get("text")
+        if isinstance(text, str):
+            return text
+    return None
+
+
+def iter_ripgrep(root: Path, query: GrepQuery, *, file_glob: str = "**/*") -> Iterator[GrepMatch] | None:
+    """Runs the search with `rg`, or returns None when it is not installed.
+
+    `rg` applies its own .gitignore handling; `_IGNORE_PREFIXES` and hidden
+    files are passed through so the file set matches `iter_grep`. The process
+    is killed as soon as the consumer stops. Raises `RuntimeError` if `rg`
+    rejects the pattern (its regex dialect differs from Python's).
+    """
+
+    exe = shutil.which("rg")
+    if exe is None:
+        return None
+    # --sort keeps results in the same file order as iter_grep.
+    args: list[str] = [exe, "--hidden", "--no-config", "--no-messages", "--sort", "path"]
+    for name in _IGNORE_PREFIXES:
+        args += ["--glob", f"!{name}"]
+    if file_glob not in ("**/*", "**"):
+        args += ["--glob", file_glob]
+    if not query.case_sensitive:
+        args.append("--ignore-case")
+    if query.files_only:
+        args.append("--files-with-matches")
+    else:
+        args.append("--json")
+        if query.before:
+            args += ["--before-context", str(query.before)]
+        if query.after:
+            args += ["--after-context", str(query.after)]
+    if query.literal is not None:
+        args.append("--fixed-strings")
+    args += ["--regexp", query.pattern, "--", os.fspath(root)]
+    return _ripgrep_matches(args, query)
+
+
+def _ripgrep_matches(args: Sequence[str], query: GrepQuery) -> Iterator[GrepMatch]:
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace")
+    # Per file: every line rg printed (matches and context), and the match line numbers.
+    lines: dict[int, str] = {}
+    hits: list[int] = []
+    path: str | None = None
+
+    def flush() -> list[GrepMatch]:
+        out = []
+        for n in hits:
+            before = [lines[i] for i in range(max(1, n - query.before), n) if i in lines] if query.before else None
+            after = [lines[i] for i in range(n + 1, n + 1 + query.after) if i in lines] if query.after else None
+            out.append(GrepMatch(file_path=path or "", line=n, text=lines[n], before_context=before, after_context=after))
+        return out
+
+    try:
+        assert proc.stdout is not None
+        for raw in proc.stdout:
+            if query.files_only:
+                if raw.strip():
+                    yield GrepMatch(file_path=raw.rstrip("\n"), line=0, text="")
+                continue
+            try:
+                obj = json.loads(raw)
+            except ValueError:
+                continue
+            kind = obj.get("type") if isinstance(obj, dict) else None
+            data = obj.get("data") if isinstance(obj, dict) else None
+            if not isinstance(data, dict):
+                continue
+            if kind == "begin":
+                lines, hits, path = {}, [], _rg_text(data.get("path"))
+            elif kind in ("match", "context"):
+                n = data.get("line_number")
+                text = _rg_text(data.get("lines"))
+                if isinstance(n, int) and text is not None:
+                    lines[n] = _strip_cr(text.rstrip("\n"))
+                    if kind == "match":
+                        hits.append(n)
+            elif kind == "end":
+                yield from flush()
+                lines, hits = {}, []
+        if proc.wait() == 2:
+            stderr = proc.stderr.read() if proc.stderr is not None else ""
+            raise RuntimeError(f"rg failed: {stderr.strip()}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        for stream in (proc.stdout, proc.stderr):
+            if stream is not None:
+                stream.close()
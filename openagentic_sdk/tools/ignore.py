@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+
+# Directory names skipped anywhere below a search root, .gitignore or not.
+_IGNORE_PREFIXES = (
+    "node_modules",
+    "__pycache__",
+    ".git",
+    "dist",
+    "build",
+    "target",
+    "vendor",
+    ".idea",
+    ".vscode",
+    ".venv",
+    "venv",
+    "env",
+    ".cache",
+    "coverage",
+    "tmp",
+    "temp",
+    # The SDK's own per-project state (tool output, the trigram index).
+    ".openagentic-sdk",
+)
+
+
+def _translate(pattern: str) -> str:
+    """Regex source for a glob over `/`-separated relative paths (`**` spans directories)."""
+
+    out: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        else:
+            c = pattern[i]
+            i += 1
+            if c == "*":
+                out.append("[^/]*")
+            elif c == "?":
+                out.append("[^/]")
+            elif c == "\\" and i < n:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            elif c == "[":
+                j = i + 1 if i < n and pattern[i] in "!^" else i
+                if j < n and pattern[j] == "]":
+                    j += 1
+                j = pattern.find("]", j)
+                if j < 0:
+                    out.append("\\[")
+                    continue
+                body = pattern[i:j].replace("\\", "\\\\")
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+            else:
+                out.append(re.escape(c))
+    return "".join(out)
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> re.Pattern[str]:
+    """Compiles a `Path.glob`-style pattern matched against a root-relative POSIX path."""
+
+    return re.compile(_translate(pattern.lstrip("/")) + r"\Z")
+
+
+@dataclass(frozen=True, slots=True)
+class _Rule:
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+def _parse_gitignore(text: str) -> tuple[_Rule, ...]:
+    rules: list[_Rule] = []
+    for raw in text.splitlines():
+        line = raw.rstrip("\n\r")
+        if not line or line.startswith("#"):
+            continue
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\#") or line.startswith("\\!"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to the .gitignore's directory.
+        anchored = "/" in line
+        source = _translate(line.lstrip("/"))
+        if not anchored:
+            source = "(?:.*/)?" + source
+        rules.append(_Rule(regex=re.compile(source + r"\Z"), negate=negate, dir_only=dir_only))
+    return tuple(rules)
+
+
+def _read_rules(path: Path) -> tuple[_Rule, ...]:
+    try:
+        return _parse_gitignore(path.read_text(encoding="utf-8", errors="replace"))
+    except OSError:
+        return ()
+
+
+@dataclass(frozen=True, slots=True)
+class IgnoreRules:
+    """`.gitignore` rules in effect for one directory below a search root.
+
+    Each entry pairs a rule set with where its `.gitignore` sits relative to the
+    root: a prefix to strip for nested `.gitignore` files, or a prefix to add
+    for those of parent directories up to the enclosing repository.
+    """
+
+    _sets: tuple[tuple[str, str, tuple[_Rule, ...]], ...] = ()
+
+    @classmethod
+    def for_root(cls, root: Path) -> IgnoreRules:
+        root = root.resolve()
+        # Parent directories count only inside a repository, up to its top level.
+        dirs = [root]
+        for parent in root.parents:
+            if (dirs[-1] / ".git").exists():
+                break
+            dirs.append(parent)
+        if not (dirs[-1] / ".git").exists():
+            dirs = [root]
+        sets: list[tuple[str, str, tuple[_Rule, ...]]] = []
+        for d in reversed(dirs):
+            rules = _read_rules(d / ".gitignore")
+            if rules:
+                sets.append(("", root.relative_to(d).as_posix() + "/" if d != root else "", rules))
+        return cls(tuple(sets))
+
+    def child(self, directory: Path, rel_dir: str) -> IgnoreRules:
+        """Rules for the files of `directory` (at `rel_dir` below the root), adding its `.gitignore`."""
+
+        rules = _read_rules(directory / ".gitignore") if rel_dir else ()
+        if not rules:
+            return self
+        return IgnoreRules((*self._sets, (rel_dir + "/", "", rules)))
+
+    def ignored(self, rel_path: str, *, is_dir: bool) -> bool:
+        result = False
+        for strip, prepend, rules in self._sets:
+            if strip:
+                if not rel_path.startswith(strip):
+                    continue
+                path = rel_path[len(strip) :]
+            else:
+                path = prepend + rel_path
+            for rule in rules:
+                if rule.dir_only and not is_dir:
+                    continue
+                if rule.negate == result:
+                    # Only a rule that would flip the current verdict needs testing.
+                    if rule.regex.match(path):
+                        result = not rule.negate
+        return result
+
+
+def walk_files(root: Path, *, use_gitignore: bool = True) -> Iterator[tuple[Path, str]]:
+    """Yields `(path, rel_posix)` for the files below `root`, in sorted order.
+
+    Skips `_IGNORE_PREFIXES` directories and, with `use_gitignore`, whatever the
+    `.gitignore` files of `root`, its subdirectories and its parents up to the
+    enclosing repository exclude. Symlinked directories are not followed.
+    """
+
+    rules_root = IgnoreRules.for_root(root) if use_gitignore else IgnoreRules()
+    # Entries still to visit, last one first: (path, rel, is_dir, rules of its directory).
+    stack: list[tuple[str, str, bool, IgnoreRules]] = [(os.fspath(root), "", True, rules_root)]
+    while stack:
+        path, rel_dir, is_dir, rules = stack.pop()
+        if not is_dir:
+            yield Path(path), rel_dir
+            continue
+        if use_gitignore:
+            rules = rules.child(Path(path), rel_dir)
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name, reverse=True)
+        except OSError:
+            continue
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                entry_is_dir = entry.is_dir(follow_symlinks=False)
+                if not entry_is_dir and not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if entry_is_dir and entry.name in _IGNORE_PREFIXES:
+                continue
+            if rules.ignored(rel, is_dir=entry_is_dir):
+                continue
+            stack.append((entry.path, rel, entry_is_dir, rules))
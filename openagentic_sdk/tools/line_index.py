@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterator
+
+# A checkpoint is recorded at the first line start after every this many bytes;
+# a window read scans at most this far before reaching its first line.
+_BLOCK_BYTES = 256 * 1024
+_MAX_CACHED = 64
+
+# Everything `str.splitlines()` splits on, as UTF-8. `\r\n` comes first so it is one separator.
+_SEP = re.compile(rb"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
+_SEP_AT_END = re.compile(rb"(?:\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9])\Z")
+# Separators other than `\n` and `\r\n`; files without them are split with plain `find`.
+_OTHER_SEPS = (b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\xc2\x85", b"\xe2\x80\xa8", b"\xe2\x80\xa9")
+
+
+@dataclass(frozen=True, slots=True)
+class LineIndex:
+    """Sparse line-offset index of one version of a file, as `str.splitlines()` would split it."""
+
+    mtime_ns: int
+    size: int
+    total_lines: int
+    # True when the file has separators besides `\n`/`\r\n` and must be split by regex.
+    mixed: bool
+    # Checkpoints: `offsets[i]` is the byte offset where line `lines[i]` (0-based) starts.
+    offsets: array[int]
+    lines: array[int]
+
+
+def _count(buf: mmap.mmap, mixed: bool) -> tuple[int, array[int], array[int]] | None:
+    """Separator count and checkpoints, or None if a newline-only count meets a lone `\\r`."""
+
+    size = len(buf)
+    has_cr = not mixed and buf.find(b"\r") >= 0
+    offsets = array("Q", [0])
+    lines = array("Q", [0])
+    start = count = 0
+    while start < size:
+        if mixed:
+            m = _SEP.search(buf, start + _BLOCK_BYTES)
+            end = m.end() if m is not None else size
+            count += len(_SEP.findall(buf, start, end))
+        else:
+            nl = buf.find(b"\n", start + _BLOCK_BYTES)
+            end = nl + 1 if nl >= 0 else size
+            block = buf[start:end]
+            if has_cr and block.count(b"\r") != block.count(b"\r\n"):
+                return None
+            count += block.count(b"\n")
+        if end < size:
+            offsets.append(end)
+            lines.append(count)
+        start = end
+    return count, offsets, lines
+
+
+def _build(buf: mmap.mmap, mtime_ns: int) -> LineIndex:
+    # Newline-only files (nearly all of them) are counted with bytes.count and
+    # split with find; anything else goes through the regex.
+    size = len(buf)
+    mixed = any(buf.find(sep) >= 0 for sep in _OTHER_SEPS)
+    counted = _count(buf, mixed)
+    if counted is None:
+        mixed = True
+        counted = _count(buf, mixed)
+        assert counted is not None
+    count, offsets, lines = counted
+    ends_with_sep = size > 0 and _SEP_AT_END.search(buf, max(0, size - 3)) is not None
+    total = count + (1 if size and not ends_with_sep else 0)
+    return LineIndex(mtime_ns=mtime_ns, size=size, total_lines=total, mixed=mixed, offsets=offsets, lines=lines)
+
+
+def _iter_lines(buf: mmap.mmap, pos: int, mixed: bool) -> Iterator[tuple[int, int]]:
+    """Yields `(start, end)` of each line's content from `pos` (a line start) on."""
+
+    size = len(buf)
+    if mixed:
+        for m in _SEP.finditer(buf, pos):
+            yield pos, m.start()
+            pos = m.end()
+    else:
+        while True:
+            nl = buf.find(b"\n", pos)
+            if nl < 0:
+                break
+            yield pos, nl - 1 if nl > pos and buf[nl - 1] == 0x0D else nl
+            pos = nl + 1
+    if pos < size:
+        yield pos, size
+
+
+_CACHE: OrderedDict[str, LineIndex] = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _index_for(path: str, buf: mmap.mmap, mtime_ns: int) -> LineIndex:
+    key = os.path.realpath(path)
+    with _CACHE_LOCK:
+        index = _CACHE.get(key)
+        if index is not None and (index.mtime_ns, index.size) == (mtime_ns, len(buf)):
+            _CACHE.move_to_end(key)
+            return index
+    index = _build(buf, mtime_ns)
+    with _CACHE_LOCK:
+        _CACHE[key] = index
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _MAX_CACHED:
+            _CACHE.popitem(last=False)
+    return index
+
+
+def read_lines(path: str | os.PathLike[str], start: int, limit: int | None, *, max_bytes: int) -> tuple[list[str], int]:
+    """`(lines, total_lines)`: `text.splitlines()[start:start + limit]` without reading the whole file.
+
+    The first call for a version of a file (keyed on path, mtime and size)
+    counts its lines once; later windows seek to the nearest checkpoint and
+    read only what they return. The window stops after `max_bytes` of file
+    content; a single longer line is cut at `max_bytes`.
+    """
+
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return [], 0
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        index = _index_for(os.fspath(path), buf, st.st_mtime_ns)
+        out: list[str] = []
+        if limit == 0 or start >= index.total_lines:
+            return out, index.total_lines
+        at = bisect_right(index.lines, start) - 1
+        line_no = index.lines[at]
+        used = 0
+        for s, e in _iter_lines(buf, index.offsets[at], index.mixed):
+            if line_no >= start:
+                if used + (e - s) > max_bytes:
+                    if not out:
+                        out.append(buf[s : s + max_bytes].decode("utf-8", errors="replace"))
+                    break
+                out.append(buf[s:e].decode("utf-8", errors="replace"))
+                used += e - s
+                if limit is not None and len(out) >= limit:
+                    break
+            line_no += 1
+        return out, index.total_lines
+    finally:
+        buf.close()
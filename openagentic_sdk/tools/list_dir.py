@@ -3,29 +3,11 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 from .base import Tool, ToolContext
-
-
-_IGNORE_PREFIXES = (
-    "node_modules",
-    "__pycache__",
-    ".git",
-    "dist",
-    "build",
-    "target",
-    "vendor",
-    ".idea",
-    ".vscode",
-    ".venv",
-    "venv",
-    "env",
-    ".cache",
-    "coverage",
-    "tmp",
-    "temp",
-)
+from .file_index import index_for
+from .ignore import _IGNORE_PREFIXES
 
 
 def _should_ignore(rel_parts: tuple[str, ...]) -> bool:
@@ -43,7 +25,11 @@ class ListTool(Tool):
 
     name: str = "List"
     description: str = "List files under a directory."
+    read_only: ClassVar[bool] = True
     limit: int = 100
+    # List from the workspace file index when the directory is inside the
+    # project; .gitignore'd files are then left out as well.
+    use_index: bool = True
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> dict[str, Any]:
         raw = tool_input.get("path")
@@ -62,33 +48,9 @@ class ListTool(Tool):
         if not base.exists() or not base.is_dir():
             raise FileNotFoundError(f"List: not a directory: {base}")
 
-        files: list[Path] = []
-        for root, dirs, filenames in os.walk(base):
-            root_p = Path(root)
-            try:
-                rel_root = root_p.relative_to(base)
-            except Exception:  # noqa: BLE001
-                rel_root = Path(".")
-            rel_parts = tuple(rel_root.parts)
-            if _should_ignore(rel_parts):
-                dirs[:] = []
-                continue
-            dirs[:] = sorted(dirs)
-            filenames = sorted(filenames)
-            for fn in filenames:
-                p = root_p / fn
-                try:
-                    rel = p.relative_to(base)
-                except Exception:  # noqa: BLE001
-                    continue
-                if _should_ignore(tuple(rel.parts)):
-                    continue
-                files.append(rel)
-                if len(files) >= int(self.limit):
-                    dirs[:] = []
-                    break
-            if len(files) >= int(self.limit):
-                break
+        files = self._indexed_files(base, ctx)
+        if files is None:
+            files = self._walk_files(base)
 
         # Build a simple tree structure.
         dirs_set: set[tuple[str, ...]] = {()}
@@ -121,3 +83,47 @@ class ListTool(Tool):
             "truncated": len(files) >= int(self.limit),
             "output": output,
         }
+
+    def _indexed_files(self, base: Path, ctx: ToolContext) -> list[Path] | None:
+        hit = index_for(base, ctx.project_dir or ctx.cwd) if self.use_index else None
+        if hit is None:
+            return None
+        index, under = hit
+        try:
+            if not index.covers(under):
+                return None
+            entries = index.entries(under)
+        except (OSError, RuntimeError):
+            return None
+        cut = len(under) + 1 if under else 0
+        return [Path(e.path[cut:]) for e in entries[: int(self.limit)]]
+
+    def _walk_files(self, base: Path) -> list[Path]:
+        files: list[Path] = []
+        for root, dirs, filenames in os.walk(base):
+            root_p = Path(root)
+            try:
+                rel_root = root_p.relative_to(base)
+            except Exception:  # noqa: BLE001
+                rel_root = Path(".")
+            rel_parts = tuple(rel_root.parts)
+            if _should_ignore(rel_parts):
+                dirs[:] = []
+                continue
+            dirs[:] = sorted(dirs)
+            filenames = sorted(filenames)
+            for fn in filenames:
+                p = root_p / fn
+                try:
+                    rel = p.relative_to(base)
+                except Exception:  # noqa: BLE001
+                    continue
+                if _should_ignore(tuple(rel.parts)):
+                    continue
+                files.append(rel)
+                if len(files) >= int(self.limit):
+                    dirs[:] = []
+                    break
+            if len(files) >= int(self.limit):
+                break
+        return files
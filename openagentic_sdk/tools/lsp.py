@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 from ..lsp import LspManager, parse_lsp_config
 from ..opencode_config import load_merged_config
@@ -35,6 +35,7 @@ Note: LSP servers must be configured for the file type via OpenCode-style config
 class LspTool(Tool):
     name: str = "lsp"
     description: str = _DESCRIPTION
+    read_only: ClassVar[bool] = True
 
     openai_schema: dict[str, Any] = None  # type: ignore[assignment]
 
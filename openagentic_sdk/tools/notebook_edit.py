@@ -4,9 +4,10 @@ import json
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 from .base import Tool, ToolContext
+from .file_index import note_change
 
 
 def _normalize_source(new_source: str) -> list[str]:
@@ -22,6 +23,7 @@ def _normalize_source(new_source: str) -> list[str]:
 class NotebookEditTool(Tool):
     name: str = "NotebookEdit"
     description: str = "Edit a Jupyter notebook (.ipynb)."
+    path_keys: ClassVar[tuple[str, ...]] = ("notebook_path",)
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> dict[str, Any]:
         notebook_path = tool_input.get("notebook_path")
@@ -69,6 +71,7 @@ class NotebookEditTool(Tool):
             deleted = cells.pop(idx)
             nb["cells"] = cells
             p.write_text(json.dumps(nb, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            note_change(p)
             return {
                 "message": "Deleted cell",
                 "edit_type": "deleted",
@@ -88,6 +91,7 @@ class NotebookEditTool(Tool):
             cells.insert(insert_at, cell)
             nb["cells"] = cells
             p.write_text(json.dumps(nb, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            note_change(p)
             return {"message": "Inserted cell", "edit_type": "inserted", "cell_id": new_id, "total_cells": len(cells)}
 
         # replace
@@ -102,5 +106,6 @@ class NotebookEditTool(Tool):
         cells[idx] = cell
         nb["cells"] = cells
         p.write_text(json.dumps(nb, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        note_change(p)
         return {"message": "Replaced cell", "edit_type": "replaced", "cell_id": cell.get("id"), "total_cells": len(cells)}
 
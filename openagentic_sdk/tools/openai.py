@@ -6,6 +6,7 @@ from openagentic_sdk.skills.index import index_skills
 from openagentic_sdk.tool_prompts import render_tool_prompt
 
 from .registry import ToolRegistry
+from .schema_cache import TOOL_SCHEMA_CACHE, SkillsFingerprint, schema_context
 
 
 def tool_schemas_for_openai(
@@ -14,12 +15,27 @@ def tool_schemas_for_openai(
     registry: ToolRegistry | None = None,
     context: Mapping[str, Any] | None = None,
 ) -> list[Mapping[str, Any]]:
-    ctx = dict(context or {})
-    cwd = ctx.get("cwd")
-    directory = cwd if isinstance(cwd, str) and cwd else "(unknown)"
-    project_dir = ctx.get("project_dir") if isinstance(ctx.get("project_dir"), str) else None
-    if not project_dir and isinstance(directory, str) and directory and directory != "(unknown)":
-        project_dir = directory
+    return TOOL_SCHEMA_CACHE.get_or_build(
+        "openai",
+        tool_names,
+        registry=registry,
+        context=context,
+        build=lambda fingerprint: build_tool_schemas_for_openai(
+            tool_names, registry=registry, context=context, skills_fingerprint=fingerprint
+        ),
+    )
+
+
+def build_tool_schemas_for_openai(
+    tool_names: Sequence[str],
+    *,
+    registry: ToolRegistry | None = None,
+    context: Mapping[str, Any] | None = None,
+    skills_fingerprint: SkillsFingerprint | None = None,
+) -> list[Mapping[str, Any]]:
+    """Uncached `tool_schemas_for_openai`."""
+
+    directory, project_dir = schema_context(context)
 
     bash_max_bytes = 1024 * 1024
     bash_max_lines = 2000
@@ -324,9 +340,9 @@ def tool_schemas_for_openai(
         },
     }
 
-    if isinstance(project_dir, str) and project_dir:
+    if isinstance(project_dir, str) and project_dir and "Skill" in tool_names:
         try:
-            skills = index_skills(project_dir=project_dir)
+            skills = index_skills(project_dir=project_dir, fingerprint=skills_fingerprint)
         except Exception:  # pragma: no cover
             skills = []
         if skills:
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from typing import Any, Mapping, Sequence
 
-from .openai import tool_schemas_for_openai
+from .openai import build_tool_schemas_for_openai
 from .registry import ToolRegistry
+from .schema_cache import TOOL_SCHEMA_CACHE
 
 
 def tool_schemas_for_responses(
@@ -12,7 +13,20 @@ def tool_schemas_for_responses(
     registry: ToolRegistry | None = None,
     context: Mapping[str, Any] | None = None,
 ) -> list[Mapping[str, Any]]:
-    schemas = tool_schemas_for_openai(tool_names, registry=registry, context=context)
+    return TOOL_SCHEMA_CACHE.get_or_build(
+        "responses",
+        tool_names,
+        registry=registry,
+        context=context,
+        build=lambda fingerprint: _responses_shape(
+            build_tool_schemas_for_openai(
+                tool_names, registry=registry, context=context, skills_fingerprint=fingerprint
+            )
+        ),
+    )
+
+
+def _responses_shape(schemas: Sequence[Mapping[str, Any]]) -> list[Mapping[str, Any]]:
     out: list[Mapping[str, Any]] = []
     for t in schemas:
         if not isinstance(t, dict):
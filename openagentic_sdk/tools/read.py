@@ -1,17 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 from .base import Tool, ToolContext
+from .line_index import read_lines
 
 
 @dataclass(frozen=True, slots=True)
 class ReadTool(Tool):
     name: str = "Read"
     description: str = "Read a file from disk."
+    read_only: ClassVar[bool] = True
     max_bytes: int = 1024 * 1024
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> dict[str, Any]:
@@ -53,13 +56,10 @@ class ReadTool(Tool):
         if limit is not None and (not isinstance(limit, int) or limit < 0):
             raise ValueError("Read: 'limit' must be a non-negative integer")
 
-        data = p.read_bytes()
-        if len(data) > self.max_bytes:
-            data = data[: self.max_bytes]
-
         # Image mode (best-effort): return base64 for common image types.
         suffix = p.suffix.lower()
         if suffix in (".png", ".jpg", ".jpeg", ".gif", ".webp"):
+            data = self._head(p)
             mime = {
                 ".png": "image/png",
                 ".jpg": "image/jpeg",
@@ -74,20 +74,23 @@ class ReadTool(Tool):
                 "file_size": len(data),
             }
 
-        text = data.decode("utf-8", errors="replace")
-        lines = text.splitlines()
-
         # CAS compatibility: if offset/limit is provided, return line-numbered content.
         if offset is not None or limit is not None:
             start = (offset - 1) if isinstance(offset, int) else 0
-            end = start + limit if isinstance(limit, int) else len(lines)
-            slice_lines = lines[start:end]
+            # Only the requested window is read (the line index is cached per file version);
+            # counting lines of a large file the first time happens off the event loop.
+            slice_lines, total_lines = await asyncio.to_thread(read_lines, p, start, limit, max_bytes=self.max_bytes)
             numbered = "\n".join(f"{i + 1}: {line}" for i, line in enumerate(slice_lines, start=start))
             return {
                 "file_path": str(p),
                 "content": numbered,
-                "total_lines": len(lines),
+                "total_lines": total_lines,
                 "lines_returned": len(slice_lines),
             }
 
+        text = self._head(p).decode("utf-8", errors="replace")
         return {"file_path": str(p), "content": text}
+
+    def _head(self, p: Path) -> bytes:
+        with open(p, "rb") as f:
+            return f.read(self.max_bytes)
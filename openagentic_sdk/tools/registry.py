@@ -1,17 +1,33 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Any, Iterable, Mapping
 
 from .base import Tool
 
 
+@dataclass(frozen=True, slots=True)
+class ToolAccess:
+    """What a tool call may touch, as far as the runtime's tool scheduler is concerned."""
+
+    read_only: bool = False
+    # Files the call writes; None means it may touch anything and must run alone.
+    paths: tuple[str, ...] | None = None
+
+    @property
+    def exclusive(self) -> bool:
+        return not self.read_only and self.paths is None
+
+
 @dataclass(frozen=True, slots=True)
 class ToolRegistry:
     _tools: dict[str, Tool]
+    # Bumped on every register(); lets schema caches notice tool set changes.
+    _version: list[int]
 
     def __init__(self, tools: Iterable[Tool] = ()) -> None:
         object.__setattr__(self, "_tools", {})
+        object.__setattr__(self, "_version", [0])
         for tool in tools:
             self.register(tool)
 
@@ -20,6 +36,11 @@ class ToolRegistry:
         if not isinstance(name, str) or not name:
             raise ValueError("tool must have a non-empty string 'name'")
         self._tools[name] = tool
+        self._version[0] += 1
+
+    @property
+    def version(self) -> int:
+        return self._version[0]
 
     def get(self, name: str) -> Tool:
         try:
@@ -30,3 +51,14 @@ class ToolRegistry:
     def names(self) -> list[str]:
         return sorted(self._tools.keys())
 
+    def access(self, name: str, tool_input: Mapping[str, Any]) -> ToolAccess:
+        tool = self._tools.get(name)
+        if tool is None:
+            return ToolAccess()
+        if getattr(tool, "read_only", False):
+            return ToolAccess(read_only=True)
+        for key in getattr(tool, "path_keys", ()):
+            path = tool_input.get(key)
+            if isinstance(path, str) and path:
+                return ToolAccess(paths=(path,))
+        return ToolAccess()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import datetime as _dt
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Mapping, Sequence
+
+from ..skills.index import skills_fingerprint
+from .registry import ToolRegistry
+
+SkillsFingerprint = tuple[tuple[str, int, int], ...]
+
+
+def schema_context(context: Mapping[str, Any] | None) -> tuple[str, str | None]:
+    """Resolve `(directory, project_dir)` the way the schema templates see them."""
+
+    ctx = dict(context or {})
+    cwd = ctx.get("cwd")
+    directory = cwd if isinstance(cwd, str) and cwd else "(unknown)"
+    project_dir = ctx.get("project_dir") if isinstance(ctx.get("project_dir"), str) else None
+    if not project_dir and directory != "(unknown)":
+        project_dir = directory
+    return directory, project_dir
+
+
+class ToolSchemaCache:
+    """Memoised tool schema lists.
+
+    Keyed on (kind, tool names, registry identity and version, cwd,
+    project_dir, date, skills fingerprint): the inputs of the rendered
+    templates. Hits return the same schema dicts, so repeated requests carry
+    byte-identical tool payloads. Callers must not mutate them.
+    """
+
+    def __init__(self, *, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[Any, ...], tuple[ToolRegistry | None, tuple[Mapping[str, Any], ...]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get_or_build(
+        self,
+        kind: str,
+        tool_names: Sequence[str],
+        *,
+        registry: ToolRegistry | None,
+        context: Mapping[str, Any] | None,
+        build: Callable[[SkillsFingerprint | None], list[Mapping[str, Any]]],
+    ) -> list[Mapping[str, Any]]:
+        names = tuple(tool_names)
+        directory, project_dir = schema_context(context)
+        # Only the Skill description depends on the skills on disk.
+        fingerprint = skills_fingerprint(project_dir=project_dir) if project_dir and "Skill" in names else None
+        key = (
+            kind,
+            names,
+            id(registry),
+            getattr(registry, "version", 0),
+            directory,
+            project_dir,
+            _dt.date.today().isoformat(),  # tool prompts render ${date}
+            fingerprint,
+        )
+        with self._lock:
+            entry = self._entries.get(key)
+            # id() can be reused after a registry is collected; the entry keeps it alive to compare.
+            if entry is not None and entry[0] is registry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        schemas = build(fingerprint)
+        with self._lock:
+            self._entries[key] = (registry, tuple(schemas))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return list(schemas)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+TOOL_SCHEMA_CACHE = ToolSchemaCache()
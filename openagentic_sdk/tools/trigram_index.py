@@ -0,0 +1,435 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from re import _constants as _sre
+from re import _parser as _sre_parse
+from typing import Iterator, Union
+
+from ..paths import NEW_DEFAULT_DIRNAME
+from .file_index import WorkspaceIndex
+from .grep_engine import GrepQuery
+
+# Larger files are not indexed; they stay candidates for every query.
+_MAX_INDEXED_BYTES = 16 << 20
+# Same rule as grep_engine: a NUL byte in the leading bytes marks a file as binary.
+_BINARY_SNIFF_BYTES = 8192
+# Bytes of source read per write transaction while (re)building.
+_BATCH_BYTES = 32 << 20
+# Syncs adding fewer postings than this write them to `pending`; larger ones,
+# and `pending` once it outgrows _PENDING_FOLD_ROWS, are appended to `postings`.
+_PENDING_MAX_ROWS = 50_000
+_PENDING_FOLD_ROWS = 500_000
+# Posting lists are rewritten without dead file ids once this many ids are dead.
+_MIN_DEAD_TO_COMPACT = 1024
+_MAX_INDEXES = 8
+
+# `files.state`: contents indexed, binary (never matches), or not indexed (always a candidate).
+_INDEXED = 0
+_BINARY = 1
+_UNINDEXED = 2
+
+# Characters that end a literal run: lines are matched one at a time, CRLF is
+# normalised, undecodable bytes become U+FFFD.
+_RUN_BREAKS = frozenset("\r\n\ufffd")
+# ASCII letters that IGNORECASE also matches against non-ASCII characters
+# (`k` and KELVIN SIGN, `s` and LONG S, `i` and the dotted/dotless I).
+_FOLD_UNSAFE = frozenset("iksIKS")
+
+# File ids are never reused (AUTOINCREMENT): a changed file gets a new id and
+# its old id stays behind in posting lists as garbage until the next compaction.
+# `postings` holds one ascending `array("I")` of file ids per trigram; small
+# updates go to `pending` first so an edit does not rewrite thousands of blobs.
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS files (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      path TEXT NOT NULL UNIQUE,
+      mtime_ns INTEGER NOT NULL,
+      size INTEGER NOT NULL,
+      state INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS postings (
+      trigram INTEGER PRIMARY KEY,
+      ids BLOB NOT NULL
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    """
+    CREATE TABLE IF NOT EXISTS pending (
+      trigram INTEGER NOT NULL,
+      file_id INTEGER NOT NULL,
+      PRIMARY KEY (trigram, file_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+# A filter over posting lists: a trigram, or an AND/OR of sub-plans.
+_Plan = Union[int, tuple[str, tuple["_Plan", ...]]]
+
+
+def _run_plan(run: bytes) -> _Plan | None:
+    grams = sorted({(run[i] << 16) | (run[i + 1] << 8) | run[i + 2] for i in range(len(run) - 2)})
+    if not grams:
+        return None
+    return grams[0] if len(grams) == 1 else ("and", tuple(grams))
+
+
+def _sequence_plan(items: _sre_parse.SubPattern | list, fold: bool) -> _Plan | None:
+    clauses: list[_Plan] = []
+    run = bytearray()
+
+    def flush() -> None:
+        plan = _run_plan(bytes(run))
+        if plan is not None:
+            clauses.append(plan)
+        run.clear()
+
+    def usable(ch: str) -> bool:
+        return ch not in _RUN_BREAKS and not (fold and (not ch.isascii() or ch in _FOLD_UNSAFE))
+
+    for op, av in items:
+        if op is _sre.LITERAL:
+            if usable(chr(av)):
+                run += chr(av).encode("utf-8").lower()
+            else:
+                flush()
+            continue
+        if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT, _sre.POSSESSIVE_REPEAT) and av[0] >= 1 and len(av[2]) == 1:
+            sub_op, sub_av = av[2][0]
+            if sub_op is _sre.LITERAL and usable(chr(sub_av)):
+                # `c+`: one `c` ends the run before it and another starts the run after it.
+                ch = chr(sub_av).encode("utf-8").lower()
+                run += ch
+                flush()
+                run += ch
+                continue
+        flush()
+        plan: _Plan | None = None
+        if op is _sre.SUBPATTERN:
+            _, add_flags, _, sub = av
+            plan = _sequence_plan(sub, fold or bool(add_flags & re.IGNORECASE))
+        elif op is _sre.ATOMIC_GROUP:
+            plan = _sequence_plan(av, fold)
+        elif op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT, _sre.POSSESSIVE_REPEAT):
+            low, _, sub = av
+            plan = _sequence_plan(sub, fold) if low >= 1 else None
+        elif op is _sre.BRANCH:
+            alternatives = [_sequence_plan(b, fold) for b in av[1]]
+            if all(a is not None for a in alternatives):
+                plan = ("or", tuple(a for a in alternatives if a is not None))
+        if plan is not None:
+            clauses.append(plan)
+    flush()
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else ("and", tuple(clauses))
+
+
+def query_plan(query: GrepQuery) -> _Plan | None:
+    """Trigrams every matching line must contain, or None when the pattern has no usable literals.
+
+    Trigrams are over ASCII-lowercased UTF-8, like the index, so one plan
+    serves case-sensitive and case-insensitive searches.
+    """
+
+    literal = query.literal
+    if literal is not None:
+        if any(chr(b) in _RUN_BREAKS for b in literal):
+            return None
+        return _run_plan(literal.lower())
+    try:
+        parsed = _sre_parse.parse(query.pattern, 0 if query.case_sensitive else re.IGNORECASE)
+    except re.error:
+        return None
+    return _sequence_plan(parsed, bool(parsed.state.flags & re.IGNORECASE))
+
+
+def file_trigrams(data: bytes) -> list[int]:
+    """Sorted trigrams of the lines of `data`, ASCII-lowercased (no trigram spans a newline)."""
+
+    grams: set[tuple[int, int, int]] = set()
+    for line in set(data.lower().split(b"\n")):
+        grams.update(zip(line, line[1:], line[2:]))
+    return sorted((a << 16) | (b << 8) | c for a, b, c in grams)
+
+
+def _read_for_index(path: str) -> tuple[int, list[int]]:
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size > _MAX_INDEXED_BYTES:
+                return _UNINDEXED, []
+            data = f.read()
+    except OSError:
+        return _UNINDEXED, []
+    if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+        return _BINARY, []
+    return _INDEXED, file_trigrams(data)
+
+
+class TrigramIndex:
+    """On-disk trigram index of the contents of the files a `WorkspaceIndex` lists.
+
+    Lives in `<root>/.openagentic-sdk/trigrams.sqlite3`. Before each query the
+    index is brought up to date with the workspace file list: files whose mtime
+    or size changed are re-read, deleted files are dropped. Writes made through
+    Write/Edit/NotebookEdit reach it through `file_index.note_change()`. While
+    the workspace index is only polling, every file is stat'ed before a query,
+    since polling does not see in-place rewrites.
+    """
+
+    def __init__(self, workspace: WorkspaceIndex, *, db_path: str | os.PathLike[str] | None = None) -> None:
+        self.workspace = workspace
+        path = Path(db_path) if db_path is not None else workspace.root / NEW_DEFAULT_DIRNAME / "trigrams.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        self.db_path = path
+        self._conn: sqlite3.Connection | None = conn
+        self._lock = threading.RLock()
+        # path -> (mtime_ns, size) as last written; live file id -> path.
+        self._known: dict[str, tuple[int, int]] = {}
+        self._paths: dict[int, str] = {}
+        self._unindexed: set[int] = set()
+        self._max_id = 0
+        self._synced_generation = -1
+        self._load()
+
+    def candidates(self, query: GrepQuery) -> set[str] | None:
+        """Root-relative paths of the files that may match, or None to scan every file."""
+
+        plan = query_plan(query)
+        if plan is None:
+            return None
+        with self._lock:
+            self.sync()
+            ids = self._eval(plan, {}) | self._unindexed
+            if ids and max(ids) > self._max_id:
+                # Rows written by another process sharing the database.
+                self._load()
+            return {self._paths[i] for i in ids if i in self._paths}
+
+    def sync(self) -> int:
+        """Re-indexes new and changed files and drops deleted ones; returns how many files changed."""
+
+        with self._lock:
+            generation = self.workspace.generation
+            watching = self.workspace.watching
+            if watching and generation == self._synced_generation:
+                return 0
+            current: dict[str, tuple[int, int]] = {}
+            for e in self.workspace.entries():
+                sig = (e.mtime_ns, e.size)
+                if not watching:
+                    try:
+                        st = os.stat(os.path.join(self.workspace.root, e.path))
+                    except OSError:
+                        continue
+                    sig = (st.st_mtime_ns, st.st_size)
+                current[e.path] = sig
+            stale = [rel for rel, sig in current.items() if self._known.get(rel) != sig]
+            gone = [rel for rel in self._known if rel not in current]
+            if gone:
+                with self._tx() as conn:
+                    for rel in gone:
+                        self._forget(conn, rel)
+            start = 0
+            while start < len(stale):
+                end, size = start, 0
+                while end < len(stale) and (end == start or size < _BATCH_BYTES):
+                    size += current[stale[end]][1]
+                    end += 1
+                batch = [(rel, current[rel], _read_for_index(os.path.join(self.workspace.root, rel))) for rel in stale[start:end]]
+                with self._tx() as conn:
+                    self._store(conn, batch)
+                start = end
+            if stale or gone:
+                with self._tx() as conn:
+                    self._maintain(conn)
+            self._synced_generation = generation
+            return len(stale) + len(gone)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def closed(self) -> bool:
+        return self._conn is None
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        if self._conn is None:
+            raise RuntimeError(f"trigram index closed: {self.db_path}")
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _load(self) -> None:
+        if self._conn is None:
+            raise RuntimeError(f"trigram index closed: {self.db_path}")
+        self._known.clear()
+        self._paths.clear()
+        self._unindexed.clear()
+        self._max_id = 0
+        for file_id, rel, mtime_ns, size, state in self._conn.execute("SELECT id, path, mtime_ns, size, state FROM files"):
+            self._known[rel] = (mtime_ns, size)
+            self._paths[file_id] = rel
+            self._max_id = max(self._max_id, file_id)
+            if state == _UNINDEXED:
+                self._unindexed.add(file_id)
+
+    def _forget(self, conn: sqlite3.Connection, rel: str) -> None:
+        # The id's postings stay behind; queries skip ids that are not live.
+        row = conn.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()
+        self._known.pop(rel, None)
+        if row is not None:
+            conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+            conn.execute("INSERT INTO meta(key, value) VALUES ('dead', 1) ON CONFLICT(key) DO UPDATE SET value = value + 1")
+            self._paths.pop(row[0], None)
+            self._unindexed.discard(row[0])
+
+    def _store(self, conn: sqlite3.Connection, batch: list[tuple[str, tuple[int, int], tuple[int, list[int]]]]) -> None:
+        added: dict[int, array[int]] = {}
+        rows = 0
+        for rel, sig, (state, grams) in batch:
+            self._forget(conn, rel)
+            cur = conn.execute(
+                "INSERT INTO files(path, mtime_ns, size, state) VALUES (?, ?, ?, ?)",
+                (rel, sig[0], sig[1], state),
+            )
+            file_id = int(cur.lastrowid or 0)
+            self._known[rel] = sig
+            self._paths[file_id] = rel
+            self._max_id = max(self._max_id, file_id)
+            if state == _UNINDEXED:
+                self._unindexed.add(file_id)
+            for g in grams:
+                ids = added.get(g)
+                if ids is None:
+                    added[g] = ids = array("I")
+                ids.append(file_id)
+            rows += len(grams)
+        if rows < _PENDING_MAX_ROWS:
+            conn.executemany(
+                "INSERT OR IGNORE INTO pending(trigram, file_id) VALUES (?, ?)",
+                ((g, i) for g in sorted(added) for i in added[g]),
+            )
+        else:
+            self._append(conn, added)
+
+    def _append(self, conn: sqlite3.Connection, added: dict[int, array[int]]) -> None:
+        # New ids are larger than every id already stored, so appending keeps each list ascending.
+        for g in sorted(added):
+            row = conn.execute("SELECT ids FROM postings WHERE trigram = ?", (g,)).fetchone()
+            blob = added[g].tobytes()
+            conn.execute("INSERT OR REPLACE INTO postings(trigram, ids) VALUES (?, ?)", (g, row[0] + blob if row else blob))
+
+    def _maintain(self, conn: sqlite3.Connection) -> None:
+        (pending,) = conn.execute("SELECT count(*) FROM pending").fetchone()
+        (live,) = conn.execute("SELECT count(*) FROM files").fetchone()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'dead'").fetchone()
+        dead = row[0] if row is not None else 0
+        if dead >= max(live, _MIN_DEAD_TO_COMPACT):
+            self._compact(conn)
+        elif pending >= _PENDING_FOLD_ROWS:
+            # Another process may have appended larger ids since these rows were
+            # written; fold them in with a merge rather than an append.
+            folded: dict[int, set[int]] = {}
+            for g, file_id in conn.execute("SELECT trigram, file_id FROM pending"):
+                folded.setdefault(g, set()).add(file_id)
+            for g, ids in folded.items():
+                row = conn.execute("SELECT ids FROM postings WHERE trigram = ?", (g,)).fetchone()
+                if row is not None:
+                    ids.update(_unpack(row[0]))
+                conn.execute("INSERT OR REPLACE INTO postings(trigram, ids) VALUES (?, ?)", (g, array("I", sorted(ids)).tobytes()))
+            conn.execute("DELETE FROM pending")
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        live = {row[0] for row in conn.execute("SELECT id FROM files")}
+        merged: dict[int, set[int]] = {}
+        for g, file_id in conn.execute("SELECT trigram, file_id FROM pending"):
+            merged.setdefault(g, set()).add(file_id)
+        for g, blob in conn.execute("SELECT trigram, ids FROM postings").fetchall():
+            ids = merged.setdefault(g, set())
+            ids.update(_unpack(blob))
+        conn.execute("DELETE FROM pending")
+        conn.execute("DELETE FROM meta WHERE key = 'dead'")
+        for g, ids in merged.items():
+            ids &= live
+            if ids:
+                conn.execute("INSERT OR REPLACE INTO postings(trigram, ids) VALUES (?, ?)", (g, array("I", sorted(ids)).tobytes()))
+            else:
+                conn.execute("DELETE FROM postings WHERE trigram = ?", (g,))
+
+    def _eval(self, plan: _Plan, postings: dict[int, set[int]]) -> set[int]:
+        if isinstance(plan, int):
+            ids = postings.get(plan)
+            if ids is None:
+                assert self._conn is not None
+                row = self._conn.execute("SELECT ids FROM postings WHERE trigram = ?", (plan,)).fetchone()
+                ids = set(_unpack(row[0])) if row is not None else set()
+                ids.update(r[0] for r in self._conn.execute("SELECT file_id FROM pending WHERE trigram = ?", (plan,)))
+                postings[plan] = ids
+            return ids
+        op, parts = plan
+        if op == "or":
+            out: set[int] = set()
+            for part in parts:
+                out |= self._eval(part, postings)
+            return out
+        acc: set[int] | None = None
+        for part in parts:
+            ids = self._eval(part, postings)
+            acc = set(ids) if acc is None else acc & ids
+            if not acc:
+                break
+        return acc or set()
+
+
+def _unpack(blob: bytes) -> array[int]:
+    ids = array("I")
+    ids.frombytes(blob)
+    return ids
+
+
+_INDEXES: OrderedDict[str, TrigramIndex] = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+def trigram_index(workspace: WorkspaceIndex) -> TrigramIndex:
+    """The shared trigram index for `workspace`'s root (the least recently used of 8 is closed)."""
+
+    key = os.fspath(workspace.root)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is not None and not index.closed and index.workspace is workspace:
+            _INDEXES.move_to_end(key)
+            return index
+        if index is not None:
+            index.close()
+        index = TrigramIndex(workspace)
+        _INDEXES[key] = index
+        while len(_INDEXES) > _MAX_INDEXES:
+            _, old = _INDEXES.popitem(last=False)
+            old.close()
+        return index
@@ -6,7 +6,7 @@ import urllib.error
 import urllib.parse
 import urllib.request
 from dataclasses import dataclass
-from typing import Any, Callable, Mapping
+from typing import Any, Callable, ClassVar, Mapping
 
 from .base import Tool, ToolContext
 
@@ -77,6 +77,7 @@ def _is_blocked_host(host: str) -> bool:
 class WebFetchTool(Tool):
     name: str = "WebFetch"
     description: str = "Fetch a URL over HTTP(S)."
+    read_only: ClassVar[bool] = True
     max_bytes: int = 1024 * 1024
     max_redirects: int = 5
     allow_private_networks: bool = False
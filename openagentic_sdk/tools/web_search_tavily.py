@@ -8,7 +8,7 @@ import urllib.error
 import urllib.parse
 import urllib.request
 from dataclasses import dataclass
-from typing import Any, Callable, Mapping
+from typing import Any, Callable, ClassVar, Mapping
 
 from .base import Tool, ToolContext
 
@@ -96,6 +96,7 @@ def _duckduckgo_search(query: str, *, max_results: int, allowed_set: set[str], b
 class WebSearchTool(Tool):
     name: str = "WebSearch"
     description: str = "Search the web (Tavily backend; falls back to DuckDuckGo HTML when TAVILY_API_KEY is missing)."
+    read_only: ClassVar[bool] = True
     transport: SearchTransport = _default_search_transport
     endpoint: str = "https://api.tavily.com/search"
 
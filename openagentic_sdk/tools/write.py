@@ -3,15 +3,17 @@ from __future__ import annotations
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 
 from .base import Tool, ToolContext
+from .file_index import note_change
 
 
 @dataclass(frozen=True, slots=True)
 class WriteTool(Tool):
     name: str = "Write"
     description: str = "Create or overwrite a file."
+    path_keys: ClassVar[tuple[str, ...]] = ("file_path", "filePath")
 
     async def run(self, tool_input: Mapping[str, Any], ctx: ToolContext) -> dict[str, Any]:
         file_path = tool_input.get("file_path", tool_input.get("filePath"))
@@ -38,6 +40,7 @@ class WriteTool(Tool):
         finally:
             if tmp.exists():
                 tmp.unlink()
+        note_change(p)
         bytes_written = len(content.encode("utf-8"))
         return {
             "message": f"Wrote {bytes_written} bytes",
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import unittest
+from unittest import mock
+
+from openagentic_sdk.providers import aio_http
+from openagentic_sdk.providers.openai_compatible import OpenAICompatibleProvider
+from openagentic_sdk.providers.openai_responses import OpenAIResponsesProvider
+
+_STREAM_EVENTS = (
+    {"type": "response.created", "response": {"id": "resp_1"}},
+    {"type": "response.output_item.added", "output_index": 0, "item": {"id": "msg_1", "type": "message"}},
+    {"type": "response.output_text.delta", "item_id": "msg_1", "delta": "he"},
+    {"type": "response.output_text.delta", "item_id": "msg_1", "delta": "llo"},
+    {"type": "response.completed", "response": {"id": "resp_1", "usage": {"total_tokens": 3}}},
+)
+_COMPLETION = {
+    "id": "resp_2",
+    "output": [{"type": "message", "content": [{"type": "output_text", "text": "done"}]}],
+}
+
+
+class _FakeServer:
+    """Keep-alive HTTP/1.1 server answering like the Responses API."""
+
+    def __init__(
+        self,
+        *,
+        event_delay_s: float = 0.0,
+        fail_first: int = 0,
+        fail_status: int = 502,
+        fail_headers: dict[str, str] | None = None,
+        chunked_json: bool = False,
+        drop_idle: bool = False,
+    ) -> None:
+        self.event_delay_s = event_delay_s
+        self.drop_idle = drop_idle
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.fail_headers = dict(fail_headers or {})
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chunked_json = chunked_json
+        self.requests = 0
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def __aenter__(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def __aexit__(self, *exc: object) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    name, _, value = line.partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                payload = json.loads(await reader.readexactly(length))
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                if self.requests <= self.fail_first:
+                    body = b"upstream error"
+                    extra = "".join(f"{k}: {v}\r\n" for k, v in self.fail_headers.items()).encode("latin-1")
+                    writer.write(
+                        b"HTTP/1.1 %d Error\r\ncontent-length: %d\r\n%s\r\n%s"
+                        % (self.fail_status, len(body), extra, body)
+                    )
+                elif payload.get("stream"):
+                    writer.write(b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\ntransfer-encoding: chunked\r\n\r\n")
+                    for ev in _STREAM_EVENTS:
+                        data = f"data: {json.dumps(ev)}\n\n".encode("utf-8")
+                        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                        await writer.drain()
+                        if self.event_delay_s:
+                            await asyncio.sleep(self.event_delay_s)
+                    writer.write(b"0\r\n\r\n")
+                elif self.chunked_json:
+                    body = json.dumps(_COMPLETION).encode("utf-8")
+                    half = len(body) // 2
+                    writer.write(b"HTTP/1.1 200 OK\r\ntransfer-encoding: chunked\r\n\r\n")
+                    for part in (body[:half], body[half:]):
+                        writer.write(b"%x\r\n%s\r\n" % (len(part), part))
+                    writer.write(b"0\r\n\r\n")
+                else:
+                    body = json.dumps(_COMPLETION).encode("utf-8")
+                    writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+                self.in_flight -= 1
+                if self.drop_idle:
+                    break  # close without announcing it, like an idle timeout upstream
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _stream_text(provider) -> str:
+    text = ""
+    async for ev in provider.stream(model="m", input=[{"role": "user", "content": "hi"}], api_key="k"):
+        if getattr(ev, "type", None) == "text_delta":
+            text += ev.delta
+    return text
+
+
+class TestAsyncProviderTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self) -> None:
+        aio_http.default_client().close()
+
+    async def test_concurrent_streams_share_the_loop(self) -> None:
+        delay = 0.05
+        async with _FakeServer(event_delay_s=delay) as base_url:
+            provider = OpenAIResponsesProvider(base_url=base_url)
+            ticks = 0
+            stop = asyncio.Event()
+
+            async def ticker() -> None:
+                nonlocal ticks
+                while not stop.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            tick_task = asyncio.create_task(ticker())
+            t0 = time.perf_counter()
+            texts = await asyncio.gather(*[_stream_text(provider) for _ in range(50)])
+            elapsed = time.perf_counter() - t0
+            stop.set()
+            await tick_task
+
+            self.assertEqual(texts, ["hello"] * 50)
+            # 50 streams of ~0.25s each overlap instead of running back to back.
+            self.assertLess(elapsed, 50 * len(_STREAM_EVENTS) * delay / 5)
+            self.assertGreater(ticks, 10)
+
+            # Finished streams return their connections; a second wave reuses them.
+            opened = sum(aio_http.default_client().pool_stats().values())
+            self.assertLessEqual(opened, 32)
+            await asyncio.gather(*[_stream_text(provider) for _ in range(10)])
+            self.assertEqual(sum(aio_http.default_client().pool_stats().values()), opened)
+
+    async def test_complete_reuses_one_connection(self) -> None:
+        for chunked in (False, True):
+            server = _FakeServer(chunked_json=chunked)
+            async with server as base_url:
+                for cls in (OpenAIResponsesProvider, OpenAICompatibleProvider):
+                    provider = cls(base_url=base_url)
+                    out = await provider.complete(model="m", input=[{"role": "user", "content": "hi"}], api_key="k")
+                    self.assertEqual(out.assistant_text, "done")
+                    self.assertEqual(out.response_id, "resp_2")
+            self.assertEqual(server.requests, 2)
+            self.assertEqual(server.connections, 1)
+
+    async def test_retries_502_with_async_backoff(self) -> None:
+        async with _FakeServer(fail_first=2) as base_url:
+            provider = OpenAIResponsesProvider(base_url=base_url, max_retries=2, retry_backoff_s=0.5)
+            with mock.patch.object(aio_http.asyncio, "sleep", new_callable=mock.AsyncMock) as sleep:
+                self.assertEqual(await _stream_text(provider), "hello")
+            self.assertEqual([c.args[0] for c in sleep.await_args_list], [0.5, 1.0])
+
+        async with _FakeServer(fail_first=5) as base_url:
+            provider = OpenAIResponsesProvider(base_url=base_url, max_retries=0)
+            with self.assertRaisesRegex(RuntimeError, "HTTP 502"):
+                await provider.complete(model="m", input=[], api_key="k")
+
+    async def test_stale_keep_alive_connection_is_replaced(self) -> None:
+        server = _FakeServer(drop_idle=True)
+        async with server as base_url:
+            provider = OpenAIResponsesProvider(base_url=base_url)
+            for _ in range(3):
+                out = await provider.complete(model="m", input=[], api_key="k")
+                self.assertEqual(out.assistant_text, "done")
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(server.connections, 3)
+
+    async def test_async_stream_transport_hook(self) -> None:
+        async def stream_transport(url, headers, payload):
+            _ = (url, headers, payload)
+            for ev in _STREAM_EVENTS:
+                yield f"data: {json.dumps(ev)}\n\n".encode("utf-8")
+
+        async def transport(url, headers, payload):
+            _ = (url, headers, payload)
+            return _COMPLETION
+
+        provider = OpenAIResponsesProvider(transport=transport, stream_transport=stream_transport)
+        self.assertEqual(await _stream_text(provider), "hello")
+        out = await provider.complete(model="m", input=[], api_key="k")
+        self.assertEqual(out.assistant_text, "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
+import io
 import unittest
+from contextlib import redirect_stdout
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-from openagentic_sdk.events import Result, UserMessage
+from openagentic_sdk.events import Result, StepTiming, UserMessage
 from openagentic_sdk.sessions.store import FileSessionStore
 
 
@@ -31,6 +33,30 @@ class TestCliLogsSummary(unittest.TestCase):
             self.assertIn("user.message", out)
             self.assertIn("Protocol: responses", out)
 
+    def test_summarize_timings_across_sessions(self) -> None:
+        from openagentic_cli.__main__ import main
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            for offset in (0, 50):
+                sid = store.create_session(metadata={"cwd": str(root)})
+                store.append_event(sid, UserMessage(text="hi"))
+                for i in range(1, 51):
+                    store.append_event(sid, StepTiming(step=i, ttft_ms=float(offset + i), stream_ms=1000.0, tool_ms=2.5))
+                    store.append_event(sid, Result(final_text="ok", session_id=sid))
+
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main(["logs", "--timings", "--session-root", str(root)]), 0)
+            lines = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[1:]}
+            self.assertIn("Step timings (100 steps)", out.getvalue())
+            # phase, n, p50, p90, p99, max
+            self.assertEqual(lines["ttft_ms"], ["ttft_ms", "100", "50.0", "90.0", "99.0", "100.0"])
+            self.assertEqual(lines["tool_ms"][1:3], ["100", "2.5"])
+            # Streaming-only fields absent from every event are left out.
+            self.assertNotIn("ttfb_ms", lines)
+
 
 if __name__ == "__main__":
     unittest.main()
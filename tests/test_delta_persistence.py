@@ -0,0 +1,118 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.events import AssistantDelta, AssistantMessage, UserMessage
+from openagentic_sdk.options import DeltaPersistenceOptions, OpenAgenticOptions
+from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+class FakeStreamingProvider:
+    name = "fake-stream"
+
+    async def stream(self, *, model, input, tools=(), api_key=None, previous_response_id=None, store=True):
+        _ = (model, input, tools, api_key, previous_response_id, store)
+        for chunk in ("he", "llo", " wo", "rld"):
+            yield {"type": "text_delta", "delta": chunk}
+        yield {"type": "done", "response_id": "resp_1"}
+
+
+async def _run(root: Path, policy: DeltaPersistenceOptions | None) -> tuple[list, list]:
+    import openagentic_sdk
+
+    store = FileSessionStore(root_dir=root)
+    kwargs = {} if policy is None else {"delta_persistence": policy}
+    options = OpenAgenticOptions(
+        provider=FakeStreamingProvider(),
+        model="m",
+        cwd=str(root),
+        permission_gate=PermissionGate(permission_mode="bypass"),
+        session_store=store,
+        **kwargs,
+    )
+    live = [e async for e in openagentic_sdk.query(prompt="hi", options=options)]
+    return live, store.read_events(live[-1].session_id)
+
+
+class TestDeltaPersistencePolicy(unittest.IsolatedAsyncioTestCase):
+    async def test_default_streams_but_does_not_persist_deltas(self) -> None:
+        with TemporaryDirectory() as td:
+            live, stored = await _run(Path(td), None)
+            self.assertEqual([e.text_delta for e in live if e.type == "assistant.delta"], ["he", "llo", " wo", "rld"])
+            self.assertNotIn("assistant.delta", [e.type for e in stored])
+            self.assertEqual([e.text for e in stored if e.type == "assistant.message"], ["hello world"])
+
+    async def test_full_persists_every_delta(self) -> None:
+        with TemporaryDirectory() as td:
+            _, stored = await _run(Path(td), DeltaPersistenceOptions(mode="full"))
+            self.assertEqual([e.text_delta for e in stored if e.type == "assistant.delta"], ["he", "llo", " wo", "rld"])
+
+    async def test_coalesce_merges_by_bytes_and_flushes_tail(self) -> None:
+        with TemporaryDirectory() as td:
+            policy = DeltaPersistenceOptions(mode="coalesce", coalesce_ms=60_000, coalesce_bytes=5)
+            live, stored = await _run(Path(td), policy)
+            self.assertEqual(len([e for e in live if e.type == "assistant.delta"]), 4)
+            self.assertEqual([e.text_delta for e in stored if e.type == "assistant.delta"], ["hello", " world"])
+            types = [e.type for e in stored]
+            self.assertLess(max(i for i, t in enumerate(types) if t == "assistant.delta"), types.index("assistant.message"))
+
+    async def test_unknown_mode_is_rejected(self) -> None:
+        with TemporaryDirectory() as td:
+            with self.assertRaises(ValueError):
+                await _run(Path(td), DeltaPersistenceOptions(mode="sometimes"))
+
+
+class TestStripDeltas(unittest.TestCase):
+    def test_strip_keeps_seqs_and_rebuilds_index(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sid = store.create_session()
+            store.append_event(sid, UserMessage(text="hi"))
+            store.append_event(sid, AssistantDelta(text_delta="a"))
+            store.append_event(sid, AssistantDelta(text_delta="b"))
+            store.append_event(sid, AssistantMessage(text="ab"))
+
+            self.assertEqual(store.strip_deltas(sid), 2)
+            self.assertEqual(store.strip_deltas(sid), 0)
+            self.assertEqual([(e.type, e.seq) for e in store.read_events(sid)], [("user.message", 1), ("assistant.message", 4)])
+            self.assertEqual([e.seq for e in store.read_events_range(sid, start_seq=2)], [4])
+
+            store.append_event(sid, UserMessage(text="next"))
+            self.assertEqual(store.read_events(sid)[-1].seq, 5)
+
+    def test_strip_assigns_implied_seq_to_legacy_lines(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sid = store.create_session()
+            p = root / "sessions" / sid / "events.jsonl"
+            lines = [
+                {"type": "user.message", "text": "hi"},
+                {"type": "assistant.delta", "text_delta": "a"},
+                {"type": "assistant.message", "text": "a"},
+            ]
+            p.write_text("".join(json.dumps(o) + "\n" for o in lines), encoding="utf-8")
+            self.assertEqual(store.strip_deltas(sid), 1)
+            self.assertEqual([e.seq for e in store.read_events(sid)], [1, 3])
+
+    def test_cli_strip_all_sessions(self) -> None:
+        from openagentic_cli.__main__ import main
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sids = [store.create_session() for _ in range(2)]
+            for sid in sids:
+                store.append_event(sid, AssistantDelta(text_delta="x"))
+                store.append_event(sid, AssistantMessage(text="x"))
+            rc = main(["sessions", "strip-deltas", "--all", "--session-root", str(root)])
+            self.assertEqual(rc, 0)
+            for sid in sids:
+                self.assertEqual([e.type for e in store.read_events(sid)], ["assistant.message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import random
+import time
+import unittest
+from dataclasses import asdict, fields
+
+from openagentic_sdk import events
+from openagentic_sdk.errors import InvalidEventError, UnknownEventTypeError
+from openagentic_sdk.serialization import (
+    _TYPE_MAP,
+    dumps_event,
+    event_from_dict,
+    event_to_dict,
+    loads_event,
+    loads_events,
+)
+
+
+def _legacy_loads_event(raw: str) -> events.Event:
+    # The original decoder: stdlib json plus an inspect.signature lookup per event.
+    obj = json.loads(raw)
+    cls = _TYPE_MAP[obj.pop("type")]
+    sig = inspect.signature(cls)
+    return cls(**{k: v for k, v in obj.items() if k in sig.parameters})
+
+
+def _realistic_session(n: int, *, seed: int = 0) -> list[events.Event]:
+    rng = random.Random(seed)
+    out: list[events.Event] = [events.SystemInit(session_id="s" * 32, cwd="/work/repo", sdk_version="0.0.0", seq=1, ts=1.0)]
+    seq = 1
+    while len(out) < n:
+        seq += 1
+        ts = 1_700_000_000.0 + seq
+        kind = rng.choices(["user", "delta", "assistant", "tool", "result", "hook"], weights=[3, 40, 6, 12, 12, 4])[0]
+        if kind == "user":
+            e: events.Event = events.UserMessage(text="please look at " + "src/module.py " * rng.randint(1, 8), seq=seq, ts=ts)
+        elif kind == "delta":
+            e = events.AssistantDelta(text_delta="tok" * rng.randint(1, 6), seq=seq, ts=ts)
+        elif kind == "assistant":
+            e = events.AssistantMessage(text="Here is the plan. " * rng.randint(2, 30), seq=seq, ts=ts)
+        elif kind == "tool":
+            e = events.ToolUse(
+                tool_use_id=f"call_{seq}",
+                name=rng.choice(["Read", "Grep", "Bash", "Edit"]),
+                input={"file_path": f"/work/repo/pkg/m{seq % 97}.py", "offset": seq % 50, "limit": 200},
+                seq=seq,
+                ts=ts,
+            )
+        elif kind == "result":
+            e = events.ToolResult(
+                tool_use_id=f"call_{seq - 1}",
+                output={"content": "def f(x):\n    return x\n" * rng.randint(1, 40), "total_lines": 400},
+                seq=seq,
+                ts=ts,
+            )
+        else:
+            e = events.HookEvent(hook_point="PreToolUse", name="audit", matched=True, duration_ms=0.4, seq=seq, ts=ts)
+        out.append(e)
+    return out
+
+
+class TestEventCodec(unittest.TestCase):
+    def test_to_dict_matches_asdict_for_every_type(self) -> None:
+        for cls in _TYPE_MAP.values():
+            e = cls(seq=3, ts=1.5)  # type: ignore[call-arg]
+            d = event_to_dict(e)
+            self.assertEqual(d, asdict(e))
+            self.assertEqual(list(d), [f.name for f in fields(cls)])
+            self.assertEqual(list(d)[:3], ["type", "ts", "seq"])
+
+    def test_roundtrip_every_type(self) -> None:
+        for cls in _TYPE_MAP.values():
+            e = cls(seq=7, ts=2.0)  # type: ignore[call-arg]
+            self.assertEqual(loads_event(dumps_event(e)), e)
+            self.assertEqual(loads_events([dumps_event(e).encode("utf-8")]), [e])
+
+    def test_errors_and_unknown_fields(self) -> None:
+        e = event_from_dict({"type": "user.message", "text": "hi", "future_field": 1})
+        self.assertEqual(e, events.UserMessage(text="hi"))
+        with self.assertRaises(UnknownEventTypeError):
+            loads_events(['{"type":"nope"}'])
+        with self.assertRaises(InvalidEventError):
+            loads_events(['{"type":["user.message"]}'])
+        with self.assertRaises(InvalidEventError):
+            loads_events(["[1,2]"])
+        with self.assertRaises(InvalidEventError):
+            loads_events(["{not json"])
+        with self.assertRaises(InvalidEventError):
+            loads_event('{"type":""}')
+
+    def test_batch_skips_blank_lines_and_keeps_non_ascii(self) -> None:
+        e = events.UserMessage(text="héllo   世界", seq=1)
+        raw = dumps_event(e)
+        self.assertIn("世界", raw)
+        self.assertEqual(loads_events(["", raw, "  ", raw.encode("utf-8")]), [e, e])
+
+
+class TestEventCodecLargeSession(unittest.TestCase):
+    def test_decode_50k_event_session(self) -> None:
+        session = _realistic_session(50_000)
+        lines = [dumps_event(e) for e in session]
+
+        # The field table must decode exactly what the per-event
+        # inspect.signature lookup of the legacy path did.
+        self.assertEqual([_legacy_loads_event(line) for line in lines], session)
+        self.assertEqual(loads_events(lines), session)
+        self.assertEqual(loads_events(line.encode("utf-8") for line in lines), session)
+
+
+@unittest.skipUnless(os.environ.get("OPENAGENTIC_SDK_BENCHMARKS"), "set OPENAGENTIC_SDK_BENCHMARKS=1 to run benchmarks")
+class TestEventCodecBenchmark(unittest.TestCase):
+    def test_batch_decoder_throughput(self) -> None:
+        lines = [dumps_event(e) for e in _realistic_session(50_000)]
+
+        def best_rate(decode) -> float:
+            best = float("inf")
+            for _ in range(3):
+                t0 = time.perf_counter()
+                decode()
+                best = min(best, time.perf_counter() - t0)
+            return len(lines) / best
+
+        legacy = best_rate(lambda: [_legacy_loads_event(line) for line in lines])
+        batch = best_rate(lambda: loads_events(lines))
+        print(f"\nevent decode: legacy {legacy:,.0f} events/s, batch {batch:,.0f} events/s ({batch / legacy:.2f}x)")
+        # Loose on purpose (about 9x locally): the field table removes the per-event signature lookup.
+        self.assertGreater(batch, legacy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+import unittest
+
+from openagentic_sdk.providers import aio_http
+from openagentic_sdk.providers.h2_transport import Http2Transport, _h2_modules
+from openagentic_sdk.providers.openai_responses import OpenAIResponsesProvider
+
+from tests.test_async_provider_transport import _FakeServer
+
+_h2 = _h2_modules()
+
+_STREAM_EVENTS = (
+    {"type": "response.created", "response": {"id": "resp_1"}},
+    {"type": "response.output_text.delta", "item_id": "msg_1", "delta": "he"},
+    {"type": "response.output_text.delta", "item_id": "msg_1", "delta": "llo"},
+    {"type": "response.completed", "response": {"id": "resp_1"}},
+)
+_COMPLETION = {"id": "resp_2", "output": [{"type": "message", "content": [{"type": "output_text", "text": "done"}]}]}
+
+
+class _H2Server:
+    """Cleartext (h2c, prior knowledge) server answering like the Responses API."""
+
+    def __init__(self, *, event_delay_s: float = 0.0, fail_first: int = 0) -> None:
+        self.event_delay_s = event_delay_s
+        self.fail_first = fail_first
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: list[asyncio.StreamWriter] = []
+
+    async def __aenter__(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def __aexit__(self, *exc: object) -> None:
+        assert self._server is not None
+        for w in self._writers:
+            w.close()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.append(writer)
+        conn = _h2.connection.H2Connection(_h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        bodies: dict[int, bytes] = {}
+        tasks: set[asyncio.Task[None]] = set()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for event in conn.receive_data(data):
+                    if isinstance(event, _h2.events.RequestReceived):
+                        bodies[event.stream_id] = b""
+                    elif isinstance(event, _h2.events.DataReceived):
+                        bodies[event.stream_id] += event.data
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, _h2.events.StreamEnded):
+                        payload = json.loads(bodies.pop(event.stream_id))
+                        task = asyncio.create_task(self._respond(conn, writer, event.stream_id, payload))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                writer.write(conn.data_to_send())
+                await writer.drain()
+        except (ConnectionError, _h2.exceptions.ProtocolError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, conn, writer: asyncio.StreamWriter, stream_id: int, payload: dict) -> None:
+        self.requests += 1
+        try:
+            await self._send(conn, writer, stream_id, payload)
+        except _h2.exceptions.StreamClosedError:
+            pass  # the client reset the stream after the final event
+
+    async def _send(self, conn, writer: asyncio.StreamWriter, stream_id: int, payload: dict) -> None:
+        if self.requests <= self.fail_first:
+            conn.send_headers(stream_id, [(":status", "503")])
+            conn.send_data(stream_id, b"unavailable", end_stream=True)
+        elif payload.get("stream"):
+            conn.send_headers(stream_id, [(":status", "200"), ("content-type", "text/event-stream")])
+            for ev in _STREAM_EVENTS:
+                conn.send_data(stream_id, f"data: {json.dumps(ev)}\n\n".encode("utf-8"))
+                writer.write(conn.data_to_send())
+                if self.event_delay_s:
+                    await asyncio.sleep(self.event_delay_s)
+            conn.end_stream(stream_id)
+        else:
+            conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json")])
+            conn.send_data(stream_id, json.dumps(_COMPLETION).encode("utf-8"), end_stream=True)
+        writer.write(conn.data_to_send())
+        await writer.drain()
+
+
+async def _time_to_first_token(provider) -> float:
+    t0 = time.perf_counter()
+    ttft = None
+    async for ev in provider.stream(model="m", input=[{"role": "user", "content": "hi"}], api_key="k"):
+        if ttft is None and getattr(ev, "type", None) == "text_delta":
+            ttft = time.perf_counter() - t0
+    assert ttft is not None
+    return ttft
+
+
+@unittest.skipIf(_h2 is not None, "h2 is installed")
+class TestHttp2TransportWithoutH2(unittest.TestCase):
+    def test_requires_h2(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, "'h2' package"):
+            Http2Transport()
+
+
+@unittest.skipUnless(_h2 is not None, "h2 is not installed")
+class TestHttp2Transport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.transport = Http2Transport(max_connections_per_origin=2, retry_backoff_s=0.0)
+
+    async def asyncTearDown(self) -> None:
+        self.transport.close()
+        aio_http.default_client().close()
+
+    def _provider(self, base_url: str) -> OpenAIResponsesProvider:
+        return OpenAIResponsesProvider(
+            base_url=base_url, transport=self.transport.transport, stream_transport=self.transport.stream_transport
+        )
+
+    async def test_concurrent_streams_multiplex_over_one_connection(self) -> None:
+        server = _H2Server(event_delay_s=0.02)
+        async with server as base_url:
+            provider = self._provider(base_url)
+            ttfts = await asyncio.gather(*[_time_to_first_token(provider) for _ in range(50)])
+            self.assertEqual(len(ttfts), 50)
+            out = await provider.complete(model="m", input=[], api_key="k")
+            self.assertEqual(out.assistant_text, "done")
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(server.requests, 51)
+        stats = next(iter(self.transport.pool_stats().values()))
+        self.assertEqual(stats, {"connections": 1, "streams": 51})
+
+    async def test_benchmark_against_http1_pool(self) -> None:
+        # Same workload over HTTP/1.1: each concurrent stream needs its own connection (handshake),
+        # while HTTP/2 opens one and multiplexes. Time-to-first-token should not regress.
+        async with _FakeServer(event_delay_s=0.02) as base_url:
+            http1 = OpenAIResponsesProvider(base_url=base_url)
+            ttft_h1 = await asyncio.gather(*[_time_to_first_token(http1) for _ in range(30)])
+            h1_connections = sum(aio_http.default_client().pool_stats().values())
+        server = _H2Server(event_delay_s=0.02)
+        async with server as base_url:
+            ttft_h2 = await asyncio.gather(*[_time_to_first_token(self._provider(base_url)) for _ in range(30)])
+        self.assertEqual(h1_connections, 30)
+        self.assertEqual(server.connections, 1)
+        self.assertLess(statistics.median(ttft_h2), statistics.median(ttft_h1) * 3 + 0.05)
+
+    async def test_idle_connection_is_health_checked(self) -> None:
+        self.transport.ping_after_idle_s = 0.0
+        server = _H2Server()
+        async with server as base_url:
+            provider = self._provider(base_url)
+            await provider.complete(model="m", input=[], api_key="k")
+            await provider.complete(model="m", input=[], api_key="k")
+            self.assertEqual(server.connections, 1)
+            # Kill the connection from the server side; the next request detects it and reconnects.
+            for w in server._writers:  # noqa: SLF001
+                w.close()
+            await asyncio.sleep(0.05)
+            out = await provider.complete(model="m", input=[], api_key="k")
+            self.assertEqual(out.assistant_text, "done")
+        self.assertEqual(server.connections, 2)
+
+    async def test_retries_retryable_status(self) -> None:
+        server = _H2Server(fail_first=1)
+        async with server as base_url:
+            out = await self._provider(base_url).complete(model="m", input=[], api_key="k")
+        self.assertEqual(out.assistant_text, "done")
+        self.assertEqual(server.requests, 2)
+
+        self.transport.max_retries = 0
+        server = _H2Server(fail_first=1)
+        async with server as base_url:
+            with self.assertRaisesRegex(RuntimeError, "HTTP 503"):
+                await self._provider(base_url).complete(model="m", input=[], api_key="k")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import random
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk.events import (
+    AssistantDelta,
+    AssistantMessage,
+    HookEvent,
+    SessionRedo,
+    SessionSetHead,
+    SessionUndo,
+    ToolOutputCompacted,
+    ToolResult,
+    ToolUse,
+    UserCompaction,
+    UserMessage,
+)
+from openagentic_sdk.sessions.incremental import IncrementalRebuilder
+from openagentic_sdk.sessions.rebuild import rebuild_messages, rebuild_responses_input
+
+_BUDGETS = [(1000, 2_000_000), (5, 2_000_000), (1000, 120), (3, 60), (0, 1000), (1000, 0)]
+
+
+def _random_session(rng: random.Random, n: int, *, with_seq: bool = True) -> list:
+    events: list = []
+    tool_ids: list[str] = []
+    seq = 0
+    for _ in range(n):
+        seq += 1
+        kind = rng.choices(
+            ["user", "assistant", "summary", "delta", "tool", "result", "compacted", "marker", "hook", "set_head", "undo", "redo"],
+            weights=[10, 8, 1, 6, 8, 8, 3, 1, 2, 2, 2, 2],
+        )[0]
+        text = "x" * rng.randint(0, 40)
+        if kind == "user":
+            e = UserMessage(text=text)
+        elif kind == "assistant":
+            e = AssistantMessage(text=text)
+        elif kind == "summary":
+            e = AssistantMessage(text="summary " + text, is_summary=True)
+        elif kind == "delta":
+            e = AssistantDelta(text_delta=text)
+        elif kind == "tool":
+            tid = f"call_{len(tool_ids)}"
+            tool_ids.append(tid)
+            e = ToolUse(tool_use_id=tid, name="Read", input={"file_path": text})
+        elif kind == "result":
+            tid = rng.choice(tool_ids) if tool_ids else "call_missing"
+            e = ToolResult(tool_use_id=tid, output={"content": text * rng.randint(1, 3)})
+        elif kind == "compacted":
+            tid = rng.choice(tool_ids) if tool_ids else "call_missing"
+            e = ToolOutputCompacted(tool_use_id=tid)
+        elif kind == "marker":
+            e = UserCompaction(auto=True)
+        elif kind == "hook":
+            e = HookEvent(hook_point="PreToolUse", name="h")
+        elif kind == "set_head":
+            e = SessionSetHead(head_seq=rng.randint(0, max(1, seq)))
+        elif kind == "undo":
+            e = SessionUndo()
+        else:
+            e = SessionRedo()
+        if with_seq:
+            e = type(e)(**{**{f: getattr(e, f) for f in e.__dataclass_fields__}, "seq": seq})
+        events.append(e)
+    return events
+
+
+class TestIncrementalRebuildEquivalence(unittest.TestCase):
+    def _assert_equivalent(self, events: list, *, chunk_rng: random.Random) -> None:
+        for max_events, max_bytes in _BUDGETS:
+            for protocol, batch in (("legacy", rebuild_messages), ("responses", rebuild_responses_input)):
+                builder = IncrementalRebuilder(protocol=protocol, max_events=max_events, max_bytes=max_bytes)
+                i = 0
+                while i < len(events):
+                    step = chunk_rng.randint(1, 4)
+                    builder.apply(events[i : i + step])
+                    i += step
+                    expected = batch(events[:i], max_events=max_events, max_bytes=max_bytes)
+                    self.assertEqual(
+                        builder.items(),
+                        expected,
+                        msg=f"protocol={protocol} budget=({max_events},{max_bytes}) prefix={i}",
+                    )
+
+    def test_random_sessions_match_batch_rebuild(self) -> None:
+        for seed in range(40):
+            rng = random.Random(seed)
+            events = _random_session(rng, rng.randint(1, 60))
+            self._assert_equivalent(events, chunk_rng=random.Random(seed + 1000))
+
+    def test_seq_less_legacy_logs_match_batch_rebuild(self) -> None:
+        for seed in range(10):
+            rng = random.Random(seed)
+            events = _random_session(rng, 40, with_seq=False)
+            self._assert_equivalent(events, chunk_rng=random.Random(seed))
+
+    def test_compaction_marker_shrinks_earlier_result(self) -> None:
+        events = [
+            UserMessage(text="u", seq=1),
+            ToolUse(tool_use_id="t1", name="Read", input={}, seq=2),
+            ToolResult(tool_use_id="t1", output="y" * 200, seq=3),
+            UserMessage(text="v", seq=4),
+            ToolOutputCompacted(tool_use_id="t1", seq=5),
+        ]
+        builder = IncrementalRebuilder(protocol="legacy", max_events=100, max_bytes=100)
+        builder.apply(events[:4])
+        self.assertEqual(builder.items(), rebuild_messages(events[:4], max_events=100, max_bytes=100))
+        builder.apply(events[4:])
+        self.assertEqual(builder.items(), rebuild_messages(events, max_events=100, max_bytes=100))
+        self.assertEqual(builder.cursor, 5)
+
+
+class FakeLegacyProvider:
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def complete(self, *, model, messages, tools=(), api_key=None):
+        from openagentic_sdk.providers.base import ModelOutput, ToolCall
+
+        _ = (model, messages, tools, api_key)
+        self.calls += 1
+        if self.calls <= 5:
+            return ModelOutput(assistant_text=None, tool_calls=[ToolCall(f"tc{self.calls}", "Read", {"file_path": "a.txt"})])
+        return ModelOutput(assistant_text="done", tool_calls=[])
+
+
+class TestRuntimeUsesIncrementalRebuild(unittest.IsolatedAsyncioTestCase):
+    async def test_legacy_steps_do_not_reread_whole_log(self) -> None:
+        import openagentic_sdk
+        from openagentic_sdk.options import OpenAgenticOptions
+        from openagentic_sdk.permissions.gate import PermissionGate
+        from openagentic_sdk.sessions.store import FileSessionStore
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "a.txt").write_text("hello", encoding="utf-8")
+            store = FileSessionStore(root_dir=root)
+            options = OpenAgenticOptions(
+                provider=FakeLegacyProvider(),
+                model="m",
+                cwd=str(root),
+                permission_gate=PermissionGate(permission_mode="bypass"),
+                session_store=store,
+            )
+            real_read_window = FileSessionStore.read_window
+            with mock.patch.object(FileSessionStore, "read_window", autospec=True, side_effect=real_read_window) as read_all:
+                events = [e async for e in openagentic_sdk.query(prompt="hi", options=options)]
+            self.assertEqual(events[-1].final_text, "done")
+            # One full read to seed the builder; later steps only read new events.
+            self.assertEqual(read_all.call_count, 1)
+
+            expected = rebuild_messages(store.read_events(events[-1].session_id), max_events=1000, max_bytes=2_000_000)
+            builder = IncrementalRebuilder(protocol="legacy", max_events=1000, max_bytes=2_000_000)
+            builder.apply(store.read_events(events[-1].session_id))
+            self.assertEqual(builder.items(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -34,6 +34,8 @@ class TestOpenCodeLikeFindAndFile(unittest.TestCase):
         with TemporaryDirectory() as td:
             root = Path(td)
             (root / "a.txt").write_text("hello needle\n", encoding="utf-8")
+            (root / ".gitignore").write_text("*.log\n", encoding="utf-8")
+            (root / "build.log").write_text("log\n", encoding="utf-8")
             store = FileSessionStore(root_dir=root)
             opts = OpenAgenticOptions(
                 provider=_Provider(),
@@ -61,6 +63,29 @@ class TestOpenCodeLikeFindAndFile(unittest.TestCase):
 
                 files = _json_req(base + "/find/file?query=a.txt")
                 self.assertTrue(any("a.txt" in x for x in files))
+                # Ignored files are found too.
+                self.assertEqual(_json_req(base + "/find/file?query=build"), ["build.log"])
+            finally:
+                httpd.shutdown()
+                httpd.server_close()
+
+    def test_find_file_with_a_missing_root_returns_nothing(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            opts = OpenAgenticOptions(
+                provider=_Provider(),
+                model="m",
+                api_key="x",
+                cwd=str(root / "gone"),
+                session_store=FileSessionStore(root_dir=root),
+                permission_gate=PermissionGate(permission_mode="bypass"),
+            )
+            httpd = OpenAgenticHttpServer(options=opts, host="127.0.0.1", port=0).serve_forever()
+            port = int(httpd.server_address[1])
+            th = threading.Thread(target=httpd.serve_forever, daemon=True)
+            th.start()
+            try:
+                self.assertEqual(_json_req(f"http://127.0.0.1:{port}/find/file?query=a"), [])
             finally:
                 httpd.shutdown()
                 httpd.server_close()
@@ -14,6 +14,8 @@ from openagentic_sdk.permissions.gate import PermissionGate
 from openagentic_sdk.providers.base import ModelOutput
 from openagentic_sdk.server.http_server import OpenAgenticHttpServer
 from openagentic_sdk.sessions.store import FileSessionStore
+from openagentic_sdk.share.local import LocalShareProvider
+from openagentic_sdk.share.share import fetch_shared_session, share_session
 
 
 class _Provider:
@@ -88,6 +90,17 @@ class TestOpenCodeLikeSessionChildrenForkTodoRoutes(unittest.TestCase):
                 self.assertIsInstance(kids, list)
                 kid_ids = [k.get("id") for k in kids if isinstance(k, dict)]
                 self.assertIn(child, kid_ids)
+
+                # The fork's transcript carries the parent's entries up to the fork point.
+                transcript = _http(base + f"/session/{child}/transcript", "GET")
+                entries = [(e.get("role"), e.get("text")) for e in transcript.get("entries", [])]
+                self.assertEqual(entries, [("user", "u1"), ("assistant", "a1")])
+
+                provider = LocalShareProvider(root_dir=root / "shares")
+                share_id = share_session(store=store, session_id=child, provider=provider)
+                shared = fetch_shared_session(share_id=share_id, provider=provider)
+                shared_entries = [(e.get("role"), e.get("text")) for e in shared.payload.get("transcript", [])]
+                self.assertEqual(shared_entries, entries)
             finally:
                 httpd.shutdown()
                 httpd.server_close()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk.options import OpenAgenticOptions
+from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers import cache as cache_mod
+from openagentic_sdk.providers.base import ModelOutput, ToolCall
+from openagentic_sdk.providers.cache import CachingProvider, ResponseCache, request_key
+from openagentic_sdk.providers.stream_events import DoneEvent, TextDeltaEvent, ToolCallEvent
+from openagentic_sdk.sessions.store import FileSessionStore
+from openagentic_sdk.tools.read import ReadTool
+from openagentic_sdk.tools.registry import ToolRegistry
+
+
+class _StreamingProvider:
+    name = "fake-stream"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def stream(self, *, model, input, tools=(), api_key=None, previous_response_id=None, store=True):
+        self.calls += 1
+        if any(isinstance(i, dict) and i.get("type") == "function_call_output" for i in input):
+            yield {"type": "text_delta", "delta": "file says "}
+            yield TextDeltaEvent(delta="hello")
+            yield DoneEvent(response_id="resp_2", usage={"total_tokens": 7})
+            return
+        yield ToolCallEvent(tool_call=ToolCall(tool_use_id="call_1", name="Read", arguments={"file_path": "a.txt"}))
+        yield {"type": "done", "response_id": "resp_1", "usage": {"total_tokens": 3}}
+
+
+class _LegacyProvider:
+    name = "fake-legacy"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def complete(self, *, model, messages, tools=(), api_key=None):
+        self.calls += 1
+        return ModelOutput(
+            assistant_text=f"echo {messages[-1]['content']}",
+            tool_calls=[ToolCall(tool_use_id="t1", name="Read", arguments={"file_path": "x"})],
+            usage={"total_tokens": 5},
+            response_id=None,
+        )
+
+
+async def _collect(agen) -> list:
+    return [ev async for ev in agen]
+
+
+class TestProviderCache(unittest.IsolatedAsyncioTestCase):
+    async def test_complete_replays_tool_calls_and_usage(self) -> None:
+        with TemporaryDirectory() as td:
+            inner = _LegacyProvider()
+            provider = CachingProvider(inner, cache=Path(td))
+            self.assertEqual(type(provider).__name__, "CachingLegacyProvider")
+            self.assertFalse(hasattr(provider, "stream"))
+            self.assertEqual(provider.name, "fake-legacy")
+
+            msgs = [{"role": "user", "content": "hi"}]
+            first = await provider.complete(model="m", messages=msgs, api_key="k1")
+            # A different api_key hits the same entry.
+            second = await provider.complete(model="m", messages=msgs, api_key="k2")
+            self.assertEqual(inner.calls, 1)
+            self.assertEqual(second, first)
+            await provider.complete(model="m", messages=msgs, tools=[{"type": "function", "name": "Read"}])
+            await provider.complete(model="m2", messages=msgs)
+            self.assertEqual(inner.calls, 3)
+
+            # A fresh cache object on the same directory replays from disk.
+            again = CachingProvider(inner, cache=Path(td), mode="replay")
+            self.assertEqual(await again.complete(model="m", messages=msgs), first)
+            with self.assertRaisesRegex(RuntimeError, "cache miss"):
+                await again.complete(model="m", messages=[{"role": "user", "content": "new"}])
+            self.assertEqual(inner.calls, 3)
+
+    async def test_stream_replays_events_with_pacing(self) -> None:
+        with TemporaryDirectory() as td:
+            inner = _StreamingProvider()
+            provider = CachingProvider(inner, cache=Path(td))
+            self.assertEqual(type(provider).__name__, "CachingStreamingResponsesProvider")
+            req = {"model": "m", "input": [{"role": "user", "content": "read"}], "api_key": "k"}
+            recorded = await _collect(provider.stream(**req))
+            replayed = await _collect(provider.stream(**req))
+            self.assertEqual(inner.calls, 1)
+            self.assertEqual(
+                replayed,
+                [
+                    ToolCallEvent(tool_call=ToolCall(tool_use_id="call_1", name="Read", arguments={"file_path": "a.txt"})),
+                    DoneEvent(response_id="resp_1", usage={"total_tokens": 3}),
+                ],
+            )
+            self.assertEqual(len(recorded), 2)
+
+            # Instant replay by default; pacing scales the recorded gaps.
+            with mock.patch.object(cache_mod.asyncio, "sleep", new_callable=mock.AsyncMock) as sleep:
+                await _collect(provider.stream(**req))
+                sleep.assert_not_awaited()
+                paced = CachingProvider(inner, cache=provider.cache, pacing=1.0)
+                await _collect(paced.stream(**req))
+            self.assertEqual(sleep.await_count, 2)
+
+            # mode="record" always calls through and refreshes the entry.
+            await _collect(CachingProvider(inner, cache=provider.cache, mode="record").stream(**req))
+            self.assertEqual(inner.calls, 2)
+
+    async def test_lru_eviction_by_entries_and_bytes(self) -> None:
+        with TemporaryDirectory() as td:
+            cache = ResponseCache(td, max_entries=3)
+            for i in range(3):
+                cache.put(f"k{i}", {"output": i})
+            self.assertIsNotNone(cache.get("k0"))  # k0 becomes most recent
+            cache.put("k3", {"output": 3})
+            self.assertEqual(len(cache), 3)
+            self.assertIsNone(cache.get("k1"))
+            self.assertIsNotNone(cache.get("k0"))
+
+            small = ResponseCache(Path(td) / "small", max_bytes=300)
+            for i in range(10):
+                small.put(f"k{i}", {"output": "x" * 50})
+            self.assertLessEqual(sum(p.stat().st_size for p in (Path(td) / "small").glob("*.json")), 300)
+            self.assertIsNotNone(small.get("k9"))
+            self.assertIsNone(small.get("k0"))
+            # Recency survives a restart (mtime based).
+            self.assertEqual(len(ResponseCache(Path(td) / "small", max_bytes=300)), len(small))
+
+    def test_request_key_redaction(self) -> None:
+        a = {"model": "m", "input": [{"role": "system", "content": "cwd=/tmp/run1 date=Mon Jan 05 2026"}]}
+        b = {"model": "m", "input": [{"role": "system", "content": "cwd=/tmp/run2 date=Tue Jan 06 2026"}]}
+        self.assertNotEqual(request_key(a), request_key(b))
+        redact = (r"/tmp/run\d", r"\w{3} \w{3} \d{2} \d{4}")
+        self.assertEqual(request_key(a, redact=redact), request_key(b, redact=redact))
+
+    async def test_runtime_second_run_is_served_from_cache(self) -> None:
+        import openagentic_sdk
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "a.txt").write_text("hello", encoding="utf-8")
+            inner = _StreamingProvider()
+
+            async def run() -> str:
+                options = OpenAgenticOptions(
+                    provider=CachingProvider(inner, cache=root / "cache"),
+                    model="m",
+                    api_key="x",
+                    cwd=str(root),
+                    tools=ToolRegistry([ReadTool()]),
+                    permission_gate=PermissionGate(permission_mode="bypass"),
+                    session_store=FileSessionStore(root_dir=root),
+                )
+                final = None
+                async for e in openagentic_sdk.query(prompt="read a.txt", options=options):
+                    if getattr(e, "type", None) == "result":
+                        final = e
+                assert final is not None
+                return final.final_text
+
+            self.assertEqual(await run(), "file says hello")
+            calls = inner.calls
+            self.assertEqual(calls, 2)
+            self.assertEqual(await run(), "file says hello")
+            self.assertEqual(inner.calls, calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import unittest
+
+from openagentic_sdk.providers import aio_http
+from openagentic_sdk.providers.governor import CircuitOpenError, ProviderGovernor, parse_duration, parse_retry_after
+from openagentic_sdk.providers.openai_responses import OpenAIResponsesProvider
+
+from tests.test_async_provider_transport import _FakeServer, _stream_text
+
+
+class TestHeaderParsing(unittest.TestCase):
+    def test_durations_and_retry_after(self) -> None:
+        self.assertEqual(parse_duration("20ms"), 0.02)
+        self.assertEqual(parse_duration("6m0s"), 360.0)
+        self.assertEqual(parse_duration("1h2m3.5s"), 3723.5)
+        self.assertEqual(parse_duration("1.5"), 1.5)
+        self.assertIsNone(parse_duration("soon"))
+        self.assertEqual(parse_retry_after({"retry-after": "2"}), 2.0)
+        self.assertEqual(parse_retry_after({"retry-after-ms": "250", "retry-after": "9"}), 0.25)
+        date = {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        self.assertAlmostEqual(parse_retry_after(date, now=1445412470.0), 10.0)
+        self.assertIsNone(parse_retry_after({}))
+
+
+class TestProviderGovernor(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self) -> None:
+        aio_http.default_client().close()
+
+    async def test_fair_fifo_queue_across_threads(self) -> None:
+        gov = ProviderGovernor(max_in_flight=2)
+        held = [await gov.acquire("k", "m"), await gov.acquire("k", "m")]
+        order: list[int] = []
+
+        async def waiter(i: int) -> None:
+            lease = await gov.acquire("k", "m")
+            order.append(i)
+            held.append(lease)
+
+        tasks = []
+        for i in range(3):
+            tasks.append(asyncio.create_task(waiter(i)))
+            await asyncio.sleep(0)
+        self.assertEqual(gov.snapshot()[next(iter(gov.snapshot()))]["queued"], 3)
+        # Another model has its own lane.
+        (await gov.acquire("k", "other")).release()
+
+        # Releases from another thread (another event loop in the gateway) wake waiters in order.
+        t = threading.Thread(target=lambda: [held.pop(0).release() for _ in range(2)])
+        t.start()
+        t.join()
+        await asyncio.sleep(0.01)
+        self.assertEqual(order, [0, 1])
+        held.pop(0).release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, [0, 1, 2])
+
+        # A cancelled waiter gives its turn away.
+        blocker = asyncio.create_task(gov.acquire("k", "m"))
+        await asyncio.sleep(0)
+        blocker.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await blocker
+        for lease in held:
+            lease.release()
+        stats = gov.snapshot()
+        lane = next(v for k, v in stats.items() if k.endswith("/m"))
+        self.assertEqual((lane["in_flight"], lane["queued"]), (0, 0))
+
+    async def test_rate_limit_headers_pause_the_lane(self) -> None:
+        gov = ProviderGovernor()
+        lease = await gov.acquire("k", "m")
+        lease.observe(
+            200,
+            {
+                "x-ratelimit-limit-requests": "600",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "100ms",
+            },
+        )
+        lease.release()
+        lane = next(iter(gov.snapshot().values()))
+        self.assertGreater(lane["cooldown_s"], 0)
+        self.assertEqual(lane["requests_available"], 0.0)
+        t0 = time.monotonic()
+        (await gov.acquire("k", "m")).release()
+        self.assertGreaterEqual(time.monotonic() - t0, 0.09)
+
+        # A wait beyond max_wait_s fails fast instead of queueing for minutes.
+        gov.max_wait_s = 0.5
+        lease = await gov.acquire("k", "m")
+        lease.observe(429, {"retry-after": "30"})
+        lease.release()
+        with self.assertRaisesRegex(RuntimeError, "would wait"):
+            await gov.acquire("k", "m")
+
+    async def test_429_storm_is_absorbed_not_amplified(self) -> None:
+        gov = ProviderGovernor(max_in_flight=4)
+        server = _FakeServer(fail_first=6, fail_status=429, fail_headers={"retry-after": "0.2"})
+        async with server as base_url:
+            provider = OpenAIResponsesProvider(base_url=base_url, max_retries=3, governor=gov)
+            t0 = time.monotonic()
+            texts = await asyncio.gather(*[_stream_text(provider) for _ in range(12)])
+            elapsed = time.monotonic() - t0
+        self.assertEqual(texts, ["hello"] * 12)
+        lane = next(iter(gov.snapshot().values()))
+        # Only the first wave (bounded by max_in_flight) saw 429s; everyone else waited out the
+        # lane-wide Retry-After instead of adding to the storm.
+        self.assertLessEqual(server.max_in_flight, 4)
+        self.assertLessEqual(server.requests, 12 + 6)
+        self.assertGreaterEqual(lane["throttled"], 4)
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertEqual(lane["in_flight"], 0)
+
+    async def test_circuit_breaker_opens_and_recovers(self) -> None:
+        gov = ProviderGovernor(failure_threshold=2, reset_timeout_s=0.2)
+        server = _FakeServer(fail_first=2, fail_status=503)
+        async with server as base_url:
+            provider = OpenAIResponsesProvider(base_url=base_url, governor=gov)
+            for _ in range(2):
+                with self.assertRaisesRegex(RuntimeError, "HTTP 503"):
+                    await provider.complete(model="m", input=[], api_key="k")
+            with self.assertRaises(CircuitOpenError):
+                await provider.complete(model="m", input=[], api_key="k")
+            self.assertEqual(server.requests, 2)
+            lane = next(iter(gov.snapshot().values()))
+            self.assertEqual((lane["breaker"], lane["rejected"]), ("open", 1))
+
+            await asyncio.sleep(0.25)
+            out = await provider.complete(model="m", input=[], api_key="k")  # the half-open probe
+            self.assertEqual(out.assistant_text, "done")
+        self.assertEqual(next(iter(gov.snapshot().values()))["breaker"], "closed")
+
+    async def test_cancelled_queued_probe_lets_the_next_request_probe(self) -> None:
+        gov = ProviderGovernor(max_in_flight=1, failure_threshold=1, reset_timeout_s=0.05)
+        first = await gov.acquire("k", "m")
+        queued = asyncio.create_task(gov.acquire("k", "m"))
+        await asyncio.sleep(0)
+        first.release(error=True)  # opens the circuit and hands the slot to `queued`
+        holder = await queued
+        await asyncio.sleep(0.06)
+
+        # The half-open probe waits for the slot, then is cancelled.
+        probe = asyncio.create_task(gov.acquire("k", "m"))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        # The next request becomes the probe instead of failing fast forever.
+        retry = asyncio.create_task(gov.acquire("k", "m"))
+        await asyncio.sleep(0)
+        self.assertFalse(retry.done())
+        holder.release()
+        lease = await asyncio.wait_for(retry, timeout=1.0)
+        lease.release()
+        self.assertEqual(next(iter(gov.snapshot().values()))["breaker"], "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+from openagentic_sdk.providers.aio_http import ProviderHttpError
+from openagentic_sdk.providers.base import ModelOutput, ToolCall
+from openagentic_sdk.providers.pool import ProviderPool
+from openagentic_sdk.providers.stream_events import DoneEvent, TextDeltaEvent, ToolCallEvent
+
+
+@dataclass
+class _Endpoint:
+    base_url: str
+    delay_s: float = 0.0
+    errors: list[BaseException] = field(default_factory=list)
+    calls: list[dict[str, Any]] = field(default_factory=list)
+    closed: int = 0
+    name: str = "fake"
+
+    def _next(self, previous_response_id: str | None, input: Sequence[Mapping[str, Any]]) -> str:
+        self.calls.append({"previous_response_id": previous_response_id, "input": list(input)})
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"{self.base_url}-resp{len(self.calls)}"
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        input: Sequence[Mapping[str, Any]],
+        api_key: str | None = None,
+        previous_response_id: str | None = None,
+        store: bool = True,
+    ) -> ModelOutput:
+        await asyncio.sleep(self.delay_s)
+        rid = self._next(previous_response_id, input)
+        return ModelOutput(assistant_text=f"from {self.base_url}", tool_calls=[], response_id=rid)
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        input: Sequence[Mapping[str, Any]],
+        api_key: str | None = None,
+        previous_response_id: str | None = None,
+        store: bool = True,
+    ) -> AsyncIterator[Any]:
+        try:
+            await asyncio.sleep(self.delay_s)
+            rid = self._next(previous_response_id, input)
+            yield TextDeltaEvent(delta="hi ")
+            yield ToolCallEvent(tool_call=ToolCall(tool_use_id="c1", name="Read", arguments={"file_path": "a"}))
+            yield DoneEvent(response_id=rid)
+        finally:
+            self.closed += 1
+
+
+def _user(text: str) -> dict[str, Any]:
+    return {"role": "user", "content": text}
+
+
+class TestProviderPool(unittest.IsolatedAsyncioTestCase):
+    async def test_routes_to_the_fastest_endpoint(self) -> None:
+        slow, fast = _Endpoint("slow", delay_s=0.05), _Endpoint("fast", delay_s=0.0)
+        pool = ProviderPool([slow, fast])
+        for _ in range(6):
+            await pool.complete(model="m", input=[_user("x")], store=False)
+        # Each endpoint is measured once, then the fast one takes the traffic.
+        self.assertEqual((len(slow.calls), len(fast.calls)), (1, 5))
+        stats = pool.snapshot()["endpoints"]
+        self.assertEqual(list(stats), ["1:fast", "0:slow"])
+
+    async def test_fails_over_on_retryable_errors_only(self) -> None:
+        a = _Endpoint("a", errors=[ProviderHttpError("HTTP 503", status=503), RuntimeError("connection reset")])
+        b = _Endpoint("b", delay_s=0.01)
+        pool = ProviderPool([a, b])
+        out = await pool.complete(model="m", input=[_user("x")])
+        self.assertEqual(out.assistant_text, "from b")
+        self.assertGreater(pool.snapshot()["endpoints"]["0:a"]["error_rate"], 0)
+
+        a.errors = [ProviderHttpError("HTTP 400 bad request", status=400)]
+        b.errors = [ProviderHttpError("HTTP 400 bad request", status=400)]
+        with self.assertRaisesRegex(RuntimeError, "HTTP 400"):
+            await pool.complete(model="m", input=[_user("x")])
+        self.assertEqual(len(a.calls) + len(b.calls), 3)
+
+    async def test_threading_is_pinned_and_replayed_on_failover(self) -> None:
+        a, b = _Endpoint("a", delay_s=0.05), _Endpoint("b")
+        pool = ProviderPool([a, b])
+        # Warm up so that b is known to be faster.
+        await pool.complete(model="m", input=[_user("warm")], store=False)
+        await pool.complete(model="m", input=[_user("warm")], store=False)
+        b.errors = [RuntimeError("down")]
+        first = await pool.complete(model="m", input=[_user("one")])
+        self.assertTrue(first.response_id.startswith("a-"))
+
+        # Threaded calls stay on a even though b is faster.
+        second = await pool.complete(model="m", input=[_user("two")], previous_response_id=first.response_id)
+        self.assertEqual(a.calls[-1]["previous_response_id"], first.response_id)
+        self.assertTrue(second.response_id.startswith("a-"))
+
+        # a goes away: b gets the whole conversation instead of an id it does not know.
+        a.errors = [ProviderHttpError("HTTP 502", status=502)]
+        third = await pool.complete(model="m", input=[_user("three")], previous_response_id=second.response_id)
+        self.assertTrue(third.response_id.startswith("b-"))
+        self.assertIsNone(b.calls[-1]["previous_response_id"])
+        self.assertEqual(
+            b.calls[-1]["input"],
+            [
+                _user("one"),
+                {"role": "assistant", "content": "from a"},
+                _user("two"),
+                {"role": "assistant", "content": "from a"},
+                _user("three"),
+            ],
+        )
+
+        # ...and the thread now continues on b.
+        await pool.complete(model="m", input=[_user("four")], previous_response_id=third.response_id)
+        self.assertEqual(b.calls[-1]["previous_response_id"], third.response_id)
+        self.assertEqual(b.calls[-1]["input"], [_user("four")])
+
+    async def test_unknown_thread_is_not_replayed(self) -> None:
+        a = _Endpoint("a", errors=[RuntimeError("down")])
+        b = _Endpoint("b", delay_s=0.01)
+        pool = ProviderPool([a, b])
+        out = await pool.complete(model="m", input=[_user("x")], previous_response_id="resp_elsewhere")
+        # Routed normally (the pool never saw that response), so it cannot be replayed later.
+        self.assertEqual(b.calls[-1]["previous_response_id"], "resp_elsewhere")
+        b.errors = [RuntimeError("down")]
+        with self.assertRaisesRegex(RuntimeError, "down"):
+            await pool.complete(model="m", input=[_user("y")], previous_response_id=out.response_id)
+
+    async def test_stream_hedges_a_slow_first_token(self) -> None:
+        a, b = _Endpoint("a", delay_s=5.0), _Endpoint("b", delay_s=0.0)
+        pool = ProviderPool([a, b], hedge_after_s=0.05)
+        # Make a look fast so it is tried first.
+        pool._endpoints[0].ttft_s = 0.001
+        pool._endpoints[1].ttft_s = 0.01
+        events = [ev async for ev in pool.stream(model="m", input=[_user("x")])]
+        self.assertEqual([ev.type for ev in events], ["text_delta", "tool_call", "done"])
+        self.assertTrue(events[-1].response_id.startswith("b-"))
+        # The losing request was cancelled and its stream closed.
+        self.assertEqual((len(a.calls), a.closed), (0, 1))
+        stats = pool.snapshot()["endpoints"]
+        self.assertEqual((stats["1:b"]["hedges"], stats["1:b"]["wins"]), (1, 1))
+
+        # The streamed output (text and tool call) is what a failover would replay.
+        b.errors = [RuntimeError("down")]
+        a.delay_s = 0.0
+        events = [ev async for ev in pool.stream(model="m", input=[_user("y")], previous_response_id=events[-1].response_id)]
+        self.assertTrue(events[-1].response_id.startswith("a-"))
+        self.assertEqual(
+            a.calls[-1]["input"],
+            [
+                _user("x"),
+                {"role": "assistant", "content": "hi "},
+                {"type": "function_call", "call_id": "c1", "name": "Read", "arguments": '{"file_path": "a"}'},
+                _user("y"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
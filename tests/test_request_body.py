@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.options import OpenAgenticOptions
+from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers import aio_http
+from openagentic_sdk.providers.base import ModelOutput, ToolCall
+from openagentic_sdk.providers.openai_responses import OpenAIResponsesProvider
+from openagentic_sdk.providers.request_body import RequestBodyEncoder
+from openagentic_sdk.sessions.store import FileSessionStore
+from openagentic_sdk.tools.read import ReadTool
+from openagentic_sdk.tools.registry import ToolRegistry
+
+from tests.test_async_provider_transport import _FakeServer
+
+_TOOLS = [{"type": "function", "name": "Read", "description": "Read a file. " * 50, "parameters": {"type": "object"}}]
+
+
+class _EncodingProvider:
+    """Legacy provider that builds its body with the runtime's encoder."""
+
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.bodies: list[bytes] = []
+
+    async def complete(self, *, model, messages, tools=(), api_key=None, body_encoder=None):
+        assert body_encoder is not None
+        self.bodies.append(body_encoder.encode({"model": model, "tools": list(tools), "messages": list(messages)}))
+        if len(self.bodies) == 1:
+            return ModelOutput(
+                assistant_text=None,
+                tool_calls=[ToolCall(tool_use_id="t1", name="Read", arguments={"file_path": "a.txt"})],
+                usage=None,
+            )
+        return ModelOutput(assistant_text="done", tool_calls=[], usage=None)
+
+
+class _KwargsProvider:
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.kwargs: dict = {}
+
+    async def complete(self, **kwargs):
+        self.kwargs = kwargs
+        return ModelOutput(assistant_text="ok", tool_calls=[], usage=None)
+
+
+class TestRequestBodyEncoder(unittest.TestCase):
+    def test_growing_history_serialises_only_new_items(self) -> None:
+        enc = RequestBodyEncoder()
+        history = [{"role": "system", "content": "You are helpful. " * 100}, {"role": "user", "content": "hi"}]
+        payload = {"store": True, "input": history, "model": "m", "tools": _TOOLS, "instructions": "be brief"}
+        first = enc.encode(payload)
+        self.assertEqual(json.loads(first), payload)
+        self.assertEqual(enc.last_stats.body_bytes, len(first))
+        self.assertGreater(enc.last_stats.serialized_bytes, len(first) * 0.9)
+        # Fixed key order: stable parts first, history, then the rest.
+        self.assertEqual(list(json.loads(first)), ["model", "instructions", "tools", "input", "store"])
+
+        # Rebuilt (equal, not identical) history plus one new item.
+        grown = [dict(item) for item in history] + [{"role": "assistant", "content": "hello"}]
+        second = enc.encode({**payload, "tools": [dict(t) for t in _TOOLS], "input": grown})
+        self.assertEqual(json.loads(second)["input"], grown)
+        self.assertEqual(enc.last_stats.serialized_bytes, len(b'{"role":"assistant","content":"hello"}'))
+        self.assertEqual(enc.last_stats.body_bytes, len(second))
+        # Byte-stable prefix: the new body extends the previous one.
+        self.assertTrue(second.startswith(first[: first.index(b'],"store"')]))
+
+        # Identical requests give identical bytes.
+        self.assertEqual(enc.encode({**payload, "input": grown}), second)
+
+    def test_reuse_is_type_and_order_sensitive(self) -> None:
+        enc = RequestBodyEncoder()
+        enc.encode({"input": [{"ok": 1}, {"a": 1, "b": 2}]})
+        body = enc.encode({"input": [{"ok": True}, {"b": 2, "a": 1}]})
+        self.assertEqual(body, b'{"input":[{"ok":true},{"b":2,"a":1}]}')
+        # A top-level key replaced in place on a sent item is noticed.
+        item = {"role": "system", "content": "old"}
+        enc.encode({"input": [item]})
+        item["content"] = "new"
+        self.assertEqual(json.loads(enc.encode({"input": [item]}))["input"][0]["content"], "new")
+
+
+class TestRequestBodyRuntime(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self) -> None:
+        aio_http.default_client().close()
+
+    async def _run(self, provider, root: Path):
+        import openagentic_sdk
+
+        options = OpenAgenticOptions(
+            provider=provider,
+            model="m",
+            api_key="x",
+            cwd=str(root),
+            tools=ToolRegistry([ReadTool()]),
+            permission_gate=PermissionGate(permission_mode="bypass"),
+            session_store=FileSessionStore(root_dir=root),
+        )
+        result = None
+        async for e in openagentic_sdk.query(prompt="read a.txt", options=options):
+            if getattr(e, "type", None) == "result":
+                result = e
+        return result
+
+    async def test_steps_extend_a_byte_stable_prefix(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "a.txt").write_text("hello", encoding="utf-8")
+            provider = _EncodingProvider()
+            result = await self._run(provider, root)
+        first, second = provider.bodies
+        self.assertTrue(second.startswith(first[:-2]))  # up to the closing `]}`
+        metrics = result.provider_metadata["request_bytes"]
+        self.assertEqual([m["body"] for m in metrics], [len(first), len(second)])
+        self.assertLess(metrics[1]["serialized"], len(second) - len(first))
+
+    async def test_kwargs_providers_do_not_get_the_encoder(self) -> None:
+        with TemporaryDirectory() as td:
+            provider = _KwargsProvider()
+            result = await self._run(provider, Path(td))
+        self.assertNotIn("body_encoder", provider.kwargs)
+        self.assertNotIn("request_bytes", result.provider_metadata or {})
+
+    async def test_default_transport_sends_the_encoded_body(self) -> None:
+        async with _FakeServer() as base_url:
+            provider = OpenAIResponsesProvider(base_url=base_url)
+            enc = RequestBodyEncoder()
+            out = await provider.complete(model="m", input=[{"role": "user", "content": "hi"}], api_key="k", body_encoder=enc)
+            self.assertEqual(out.assistant_text, "done")
+            self.assertIsNotNone(enc.last_stats)
+            text = ""
+            async for ev in provider.stream(model="m", input=[{"role": "user", "content": "hi"}], api_key="k", body_encoder=enc):
+                if getattr(ev, "type", None) == "text_delta":
+                    text += ev.delta
+            self.assertEqual(text, "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
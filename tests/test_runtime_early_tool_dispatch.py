@@ -0,0 +1,200 @@
+import asyncio
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.events import ToolResult, ToolUse
+from openagentic_sdk.options import OpenAgenticOptions
+from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers.base import ToolCall
+from openagentic_sdk.sessions.store import FileSessionStore
+from openagentic_sdk.tools.bash import BashTool
+from openagentic_sdk.tools.edit import EditTool
+from openagentic_sdk.tools.grep import GrepTool
+from openagentic_sdk.tools.read import ReadTool
+from openagentic_sdk.tools.registry import ToolRegistry
+from openagentic_sdk.tools.write import WriteTool
+
+
+class RecordingTool:
+    def __init__(self, name: str, *, delay_s: float = 0.0) -> None:
+        self.name = name
+        self.description = name
+        self.delay_s = delay_s
+        self.started = asyncio.Event()
+        self.runs = 0
+
+    async def run(self, tool_input, ctx):
+        self.runs += 1
+        self.started.set()
+        await asyncio.sleep(self.delay_s)
+        return {"tool": self.name, "input": dict(tool_input)}
+
+
+class SlowTailProvider:
+    """Emits the tool calls, then keeps generating until the Read tool has started (or 0.5s pass)."""
+
+    name = "fake-stream"
+
+    def __init__(self, read_tool: RecordingTool) -> None:
+        self.read_tool = read_tool
+        self.overlapped = False
+        self.tools: dict[str, RecordingTool] = {}
+        self.ran_before_done: list[str] = []
+
+    async def stream(self, *, model, input, tools=(), api_key=None, previous_response_id=None, store=True):
+        if previous_response_id is None:
+            yield {"type": "tool_call", "tool_call": ToolCall(tool_use_id="c1", name="Read", arguments={"file_path": "a"})}
+            yield {"type": "tool_call", "tool_call": ToolCall(tool_use_id="c2", name="Glob", arguments={"pattern": "*"})}
+            yield {"type": "tool_call", "tool_call": ToolCall(tool_use_id="c3", name="Write", arguments={"file_path": "b"})}
+            try:
+                await asyncio.wait_for(self.read_tool.started.wait(), timeout=0.5)
+                self.overlapped = True
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(0.01)
+            self.ran_before_done = [name for name, tool in self.tools.items() if tool.runs]
+            yield {"type": "done", "response_id": "resp_1"}
+            return
+        yield {"type": "text_delta", "delta": "ok"}
+        yield {"type": "done", "response_id": "resp_2"}
+
+
+class ScriptedProvider:
+    """Streams one response with the given calls, lingering so early runs can finish first."""
+
+    name = "fake-stream"
+
+    def __init__(self, calls: list[ToolCall]) -> None:
+        self.calls = calls
+
+    async def stream(self, *, model, input, tools=(), api_key=None, previous_response_id=None, store=True):
+        if previous_response_id is None:
+            for tc in self.calls:
+                yield {"type": "tool_call", "tool_call": tc}
+            await asyncio.sleep(0.1)
+            yield {"type": "done", "response_id": "resp_1"}
+            return
+        yield {"type": "text_delta", "delta": "ok"}
+        yield {"type": "done", "response_id": "resp_2"}
+
+
+async def _run_script(root: Path, calls: list[ToolCall], *, early: bool, max_parallel_tools: int = 1) -> dict[str, object]:
+    import openagentic_sdk
+
+    options = OpenAgenticOptions(
+        provider=ScriptedProvider(calls),
+        model="m",
+        api_key="x",
+        cwd=str(root),
+        tools=ToolRegistry([ReadTool(), GrepTool(), WriteTool(), EditTool(), BashTool()]),
+        permission_gate=PermissionGate(permission_mode="bypass"),
+        session_store=FileSessionStore(root_dir=root / ".sessions"),
+        early_tool_dispatch=early,
+        max_parallel_tools=max_parallel_tools,
+    )
+    events = [e async for e in openagentic_sdk.query(prompt="hi", options=options)]
+    return {e.tool_use_id: e.output for e in events if isinstance(e, ToolResult)}
+
+
+# Each script changes a.txt, then reads it back; the read must see the change.
+_MUTATE_THEN_READ = {
+    "write": [
+        ToolCall(tool_use_id="w", name="Write", arguments={"file_path": "a.txt", "content": "NEW\n", "overwrite": True}),
+        ToolCall(tool_use_id="r", name="Read", arguments={"file_path": "a.txt"}),
+    ],
+    "edit": [
+        ToolCall(tool_use_id="w", name="Edit", arguments={"file_path": "a.txt", "old": "OLD", "new": "NEW"}),
+        ToolCall(tool_use_id="r", name="Grep", arguments={"query": "NEW", "file_glob": "*.txt", "mode": "files_with_matches"}),
+    ],
+    "bash": [
+        ToolCall(tool_use_id="w", name="Bash", arguments={"command": "echo NEW > a.txt"}),
+        ToolCall(tool_use_id="r", name="Read", arguments={"file_path": "a.txt"}),
+    ],
+}
+
+
+class TestRuntimeEarlyToolDispatch(unittest.IsolatedAsyncioTestCase):
+    async def _run(self, *, early: bool) -> tuple[SlowTailProvider, dict[str, RecordingTool], list[object]]:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            # Read is slower than Glob: results must still come back in call order.
+            tools = {"Read": RecordingTool("Read", delay_s=0.05), "Glob": RecordingTool("Glob"), "Write": RecordingTool("Write")}
+            provider = SlowTailProvider(tools["Read"])
+            provider.tools = tools
+            options = OpenAgenticOptions(
+                provider=provider,
+                model="m",
+                api_key="x",
+                cwd=str(root),
+                tools=ToolRegistry(list(tools.values())),
+                permission_gate=PermissionGate(permission_mode="bypass"),
+                session_store=FileSessionStore(root_dir=root),
+                early_tool_dispatch=early,
+            )
+            import openagentic_sdk
+
+            events = [e async for e in openagentic_sdk.query(prompt="hi", options=options)]
+        return provider, tools, events
+
+    async def test_read_only_tools_start_before_the_response_ends(self) -> None:
+        provider, tools, events = await self._run(early=True)
+        self.assertTrue(provider.overlapped)
+        # Write is not read-only, so it waits for the finished response.
+        self.assertEqual(provider.ran_before_done, ["Read", "Glob"])
+        self.assertEqual([t.runs for t in tools.values()], [1, 1, 1])
+
+        order = [(type(e).__name__, e.tool_use_id) for e in events if isinstance(e, (ToolUse, ToolResult))]
+        self.assertEqual(
+            order,
+            [
+                ("ToolUse", "c1"),
+                ("ToolResult", "c1"),
+                ("ToolUse", "c2"),
+                ("ToolResult", "c2"),
+                ("ToolUse", "c3"),
+                ("ToolResult", "c3"),
+            ],
+        )
+        results = {e.tool_use_id: e.output for e in events if isinstance(e, ToolResult)}
+        self.assertEqual(results["c1"], {"tool": "Read", "input": {"file_path": "a"}})
+        self.assertEqual(events[-1].final_text, "ok")
+
+    async def test_off_by_default(self) -> None:
+        provider, tools, _ = await self._run(early=False)
+        self.assertFalse(provider.overlapped)
+        self.assertEqual(provider.ran_before_done, [])
+        self.assertEqual([t.runs for t in tools.values()], [1, 1, 1])
+
+    async def test_reads_after_a_mutating_call_are_not_started_early(self) -> None:
+        for label, calls in _MUTATE_THEN_READ.items():
+            for early in (False, True):
+                with self.subTest(label, early=early), TemporaryDirectory() as td:
+                    root = Path(td)
+                    (root / "a.txt").write_text("OLD\n", encoding="utf-8")
+                    results = await _run_script(root, calls, early=early)
+                    out = results["r"]
+                    assert isinstance(out, dict)
+                    if "content" in out:
+                        self.assertIn("NEW", out["content"])
+                    else:
+                        self.assertEqual(out["files"], [str(root / "a.txt")])
+
+    async def test_parallel_batches_keep_read_after_write_with_early_dispatch(self) -> None:
+        for label, calls in _MUTATE_THEN_READ.items():
+            with self.subTest(label), TemporaryDirectory() as td:
+                root = Path(td)
+                (root / "a.txt").write_text("OLD\n", encoding="utf-8")
+                # A read before the write must still see the old text.
+                first = ToolCall(tool_use_id="r0", name="Read", arguments={"file_path": "a.txt"})
+                results = await _run_script(root, [first, *calls], early=True, max_parallel_tools=4)
+                self.assertIn("OLD", results["r0"]["content"])
+                out = results["r"]
+                if "content" in out:
+                    self.assertIn("NEW", out["content"])
+                else:
+                    self.assertEqual(out["files"], [str(root / "a.txt")])
+
+
+if __name__ == "__main__":
+    unittest.main()
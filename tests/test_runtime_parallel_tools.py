@@ -0,0 +1,155 @@
+import asyncio
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.events import ToolResult, ToolUse
+from openagentic_sdk.options import OpenAgenticOptions
+from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers.base import ToolCall
+from openagentic_sdk.sessions.store import FileSessionStore
+from openagentic_sdk.tools.base import Tool
+from openagentic_sdk.tools.registry import ToolAccess, ToolRegistry
+
+
+class Probe:
+    def __init__(self) -> None:
+        self.active = 0
+        self.max_active = 0
+        self.spans: dict[str, tuple[float, float]] = {}
+
+
+class ProbeTool(Tool):
+    def __init__(self, name: str, probe: Probe, *, read_only: bool = False, path_keys: tuple[str, ...] = (), delay_s: float = 0.05) -> None:
+        self.name = name
+        self.description = name
+        self.read_only = read_only
+        self.path_keys = path_keys
+        self.probe = probe
+        self.delay_s = delay_s
+
+    async def run(self, tool_input, ctx):
+        probe = self.probe
+        probe.active += 1
+        probe.max_active = max(probe.max_active, probe.active)
+        start = time.perf_counter()
+        # Later calls finish first: results must still come back in call order.
+        await asyncio.sleep(float(tool_input.get("delay", self.delay_s)))
+        probe.spans[str(tool_input["id"])] = (start, time.perf_counter())
+        probe.active -= 1
+        return {"id": tool_input["id"]}
+
+
+class BatchProvider:
+    name = "fake-stream"
+
+    def __init__(self, calls: list[ToolCall]) -> None:
+        self.calls = calls
+        self.inputs: list[list[dict]] = []
+
+    async def stream(self, *, model, input, tools=(), api_key=None, previous_response_id=None, store=True):
+        self.inputs.append(list(input))
+        if previous_response_id is None:
+            for tc in self.calls:
+                yield {"type": "tool_call", "tool_call": tc}
+            yield {"type": "done", "response_id": "resp_1"}
+            return
+        yield {"type": "text_delta", "delta": "ok"}
+        yield {"type": "done", "response_id": "resp_2"}
+
+
+def _call(i: int, name: str, **arguments) -> ToolCall:
+    return ToolCall(tool_use_id=f"c{i}", name=name, arguments={"id": f"c{i}", **arguments})
+
+
+class TestRuntimeParallelTools(unittest.IsolatedAsyncioTestCase):
+    async def _run(self, calls: list[ToolCall], *, max_parallel_tools: int = 4) -> tuple[Probe, BatchProvider, list[object]]:
+        probe = Probe()
+        tools = [
+            ProbeTool("Read", probe, read_only=True),
+            ProbeTool("Grep", probe, read_only=True),
+            ProbeTool("Write", probe, path_keys=("file_path", "filePath")),
+            ProbeTool("Bash", probe),
+        ]
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            provider = BatchProvider(calls)
+            options = OpenAgenticOptions(
+                provider=provider,
+                model="m",
+                api_key="x",
+                cwd=str(root),
+                tools=ToolRegistry(tools),
+                permission_gate=PermissionGate(permission_mode="bypass"),
+                session_store=FileSessionStore(root_dir=root),
+                max_parallel_tools=max_parallel_tools,
+            )
+            import openagentic_sdk
+
+            events = [e async for e in openagentic_sdk.query(prompt="hi", options=options)]
+        return probe, provider, events
+
+    def test_registry_access(self) -> None:
+        probe = Probe()
+        reg = ToolRegistry([ProbeTool("Read", probe, read_only=True), ProbeTool("Write", probe, path_keys=("file_path",)), ProbeTool("Bash", probe)])
+        self.assertEqual(reg.access("Read", {}), ToolAccess(read_only=True))
+        self.assertEqual(reg.access("Write", {"file_path": "a.txt"}), ToolAccess(paths=("a.txt",)))
+        self.assertTrue(reg.access("Write", {}).exclusive)
+        self.assertTrue(reg.access("Bash", {"command": "ls"}).exclusive)
+        self.assertTrue(reg.access("Missing", {}).exclusive)
+
+    async def test_reads_run_concurrently_and_report_in_call_order(self) -> None:
+        calls = [_call(i, "Read" if i < 5 else "Grep", delay=0.05 * (6 - i)) for i in range(1, 6)]
+        t0 = time.perf_counter()
+        probe, provider, events = await self._run(calls, max_parallel_tools=8)
+        elapsed = time.perf_counter() - t0
+
+        self.assertEqual(probe.max_active, 5)
+        # The slowest call (0.25s), not the sum of all five (0.75s).
+        self.assertLess(elapsed, 0.6)
+        order = [(type(e).__name__, e.tool_use_id) for e in events if isinstance(e, (ToolUse, ToolResult))]
+        self.assertEqual(order, [(kind, f"c{i}") for i in range(1, 6) for kind in ("ToolUse", "ToolResult")])
+        outputs = [item["call_id"] for item in provider.inputs[1] if item.get("type") == "function_call_output"]
+        self.assertEqual(outputs, [f"c{i}" for i in range(1, 6)])
+        self.assertEqual(events[-1].final_text, "ok")
+
+    async def test_limit_bounds_concurrency(self) -> None:
+        calls = [_call(i, "Read") for i in range(1, 7)]
+        probe, _, _ = await self._run(calls, max_parallel_tools=2)
+        self.assertEqual(probe.max_active, 2)
+
+        probe, _, _ = await self._run(calls, max_parallel_tools=1)
+        self.assertEqual(probe.max_active, 1)
+
+    async def test_writes_are_serialised_per_file(self) -> None:
+        calls = [
+            _call(1, "Write", file_path="a.txt"),
+            _call(2, "Write", file_path="b.txt"),
+            _call(3, "Write", filePath="./a.txt"),
+            _call(4, "Read", file_path="a.txt"),
+        ]
+        probe, _, events = await self._run(calls)
+        spans = probe.spans
+        # Different files overlap; the same file (however spelled) does not.
+        self.assertLess(spans["c2"][0], spans["c1"][1])
+        self.assertGreaterEqual(spans["c3"][0], spans["c1"][1])
+        # Reads wait for every earlier write.
+        self.assertGreaterEqual(spans["c4"][0], max(spans["c2"][1], spans["c3"][1]))
+        results = [e.tool_use_id for e in events if isinstance(e, ToolResult)]
+        self.assertEqual(results, ["c1", "c2", "c3", "c4"])
+
+    async def test_other_tools_run_alone(self) -> None:
+        calls = [_call(1, "Read"), _call(2, "Read"), _call(3, "Bash"), _call(4, "Read"), _call(5, "Read")]
+        probe, _, events = await self._run(calls)
+        spans = probe.spans
+        self.assertLess(spans["c2"][0], spans["c1"][1])
+        self.assertGreaterEqual(spans["c3"][0], max(spans["c1"][1], spans["c2"][1]))
+        self.assertGreaterEqual(min(spans["c4"][0], spans["c5"][0]), spans["c3"][1])
+        self.assertLess(spans["c5"][0], spans["c4"][1])
+        results = [e.tool_use_id for e in events if isinstance(e, ToolResult)]
+        self.assertEqual(results, ["c1", "c2", "c3", "c4", "c5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.events import StepTiming
+from openagentic_sdk.options import OpenAgenticOptions
+from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers.base import ToolCall
+from openagentic_sdk.sessions.store import FileSessionStore
+from openagentic_sdk.tools.registry import ToolRegistry
+
+
+class SleepyTool:
+    name = "Read"
+    description = "Read"
+
+    async def run(self, tool_input, ctx):
+        await asyncio.sleep(0.03)
+        return {"content": "x"}
+
+
+class SlowGate(PermissionGate):
+    async def approve(self, tool_name, tool_input, *, context):
+        await asyncio.sleep(0.02)
+        return await super().approve(tool_name, tool_input, context=context)
+
+
+class TimedProvider:
+    name = "fake-stream"
+
+    async def stream(self, *, model, input, tools=(), api_key=None, previous_response_id=None, store=True):
+        await asyncio.sleep(0.02)
+        if previous_response_id is None:
+            yield {"type": "tool_call", "tool_call": ToolCall(tool_use_id="c1", name="Read", arguments={"file_path": "a"})}
+            yield {"type": "done", "response_id": "resp_1"}
+            return
+        yield {"type": "text_delta", "delta": "ok"}
+        await asyncio.sleep(0.05)
+        yield {"type": "done", "response_id": "resp_2", "usage": {"output_tokens": 10}}
+
+
+class TestRuntimeStepTiming(unittest.IsolatedAsyncioTestCase):
+    async def test_each_step_records_its_phases(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            options = OpenAgenticOptions(
+                provider=TimedProvider(),
+                model="m",
+                api_key="x",
+                cwd=str(root),
+                tools=ToolRegistry([SleepyTool()]),
+                permission_gate=SlowGate(permission_mode="bypass"),
+                session_store=store,
+            )
+            import openagentic_sdk
+
+            events = [e async for e in openagentic_sdk.query(prompt="hi", options=options)]
+            timings = [e for e in events if isinstance(e, StepTiming)]
+            self.assertEqual([t.step for t in timings], [1, 2])
+            # Timings are part of the session log, right before the result.
+            stored = [e for e in store.read_events(events[-1].session_id) if e.type == "step.timing"]
+            self.assertEqual([(t.step, t.tool_ms) for t in stored], [(t.step, t.tool_ms) for t in timings])
+            self.assertEqual(events[-2], timings[-1])
+
+        tool_step, text_step = timings
+        self.assertGreaterEqual(tool_step.ttfb_ms, 15)
+        self.assertIsNone(tool_step.ttft_ms)
+        self.assertGreaterEqual(tool_step.permission_ms, 15)
+        # The gate's wait is not counted as tool time.
+        self.assertGreaterEqual(tool_step.tool_ms, 25)
+        self.assertLess(tool_step.tool_ms, tool_step.total_ms - tool_step.permission_ms)
+        self.assertIsNone(tool_step.output_tokens)
+
+        self.assertGreaterEqual(text_step.ttft_ms, 15)
+        self.assertGreaterEqual(text_step.stream_ms, text_step.ttft_ms + 40)
+        self.assertEqual((text_step.tool_ms, text_step.output_tokens), (0.0, 10))
+        self.assertAlmostEqual(text_step.tokens_per_s, 10 / (text_step.stream_ms / 1000.0), delta=0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import shutil
+import threading
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk.events import UserMessage
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+class TestSessionCatalog(unittest.TestCase):
+    def test_catalog_tracks_create_update_fork_delete(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            a = store.create_session(metadata={"title": "a"})
+            store.append_event(a, UserMessage(text="hi"))
+            time.sleep(0.002)
+            b = store.create_session(metadata={"title": "b"})
+            time.sleep(0.002)
+            child = store.fork_session(a)
+
+            self.assertEqual([r["session_id"] for r in store.list_sessions()], [child, b, a])
+            self.assertEqual([r["session_id"] for r in store.list_sessions(limit=2, offset=1)], [b, a])
+            self.assertEqual([r["session_id"] for r in store.list_sessions(parent_session_id=a)], [child])
+
+            store.update_metadata(b, patch={"title": "renamed"})
+            self.assertEqual(store.list_sessions(limit=2, offset=1)[0]["metadata"]["title"], "renamed")
+
+            store.delete_session(child)
+            self.assertEqual(store.list_sessions(parent_session_id=a), [])
+            self.assertEqual([r["session_id"] for r in store.list_sessions()], [b, a])
+
+    def test_listing_does_not_scan_session_directories(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sids = [store.create_session() for _ in range(5)]
+
+            fresh = FileSessionStore(root_dir=root)
+            with mock.patch.object(FileSessionStore, "_scan_meta_records", side_effect=AssertionError("scanned")):
+                with mock.patch.object(Path, "read_text", side_effect=AssertionError("meta.json read")):
+                    listed = fresh.list_sessions()
+            self.assertEqual(sorted(r["session_id"] for r in listed), sorted(sids))
+
+    def test_missing_catalog_is_rebuilt_from_disk(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            sessions = root / "sessions"
+            for i in range(3):
+                sid = f"{i:032x}"
+                (sessions / sid).mkdir(parents=True)
+                (sessions / sid / "meta.json").write_text(
+                    json.dumps({"session_id": sid, "created_at": float(i), "metadata": {}}), encoding="utf-8"
+                )
+            store = FileSessionStore(root_dir=root)
+            new = store.create_session()
+            self.assertEqual([r["session_id"] for r in store.list_sessions()], [new, f"{2:032x}", f"{1:032x}", f"{0:032x}"])
+            self.assertTrue((sessions / "catalog.jsonl").exists())
+
+    def test_other_store_instances_see_appends(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            s1 = FileSessionStore(root_dir=root)
+            s2 = FileSessionStore(root_dir=root)
+            self.assertEqual(s2.list_sessions(), [])
+            sid = s1.create_session()
+            self.assertEqual([r["session_id"] for r in s2.list_sessions()], [sid])
+            s2.delete_session(sid)
+            self.assertEqual(s1.list_sessions(), [])
+
+    def test_concurrent_store_instances_lose_no_sessions(self) -> None:
+        for per_store in (1, 150):
+            with self.subTest(per_store=per_store), TemporaryDirectory() as td:
+                root = Path(td)
+                stores = [FileSessionStore(root_dir=root) for _ in range(4)]
+                created: list[str] = []
+                barrier = threading.Barrier(len(stores))
+
+                def create(store: FileSessionStore) -> None:
+                    barrier.wait()
+                    for _ in range(per_store):
+                        created.append(store.create_session())
+
+                threads = [threading.Thread(target=create, args=(s,)) for s in stores]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                expected = sorted(created)
+                self.assertEqual(len(expected), 4 * per_store)
+                for store in [*stores, FileSessionStore(root_dir=root)]:
+                    self.assertEqual(sorted(r["session_id"] for r in store.list_sessions()), expected)
+                self.assertEqual([p.name for p in (root / "sessions").glob("*.tmp")], [])
+
+    def test_journal_is_compacted(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sid = store.create_session()
+            for i in range(200):
+                store.update_metadata(sid, patch={"n": i})
+            lines = (root / "sessions" / "catalog.jsonl").read_text(encoding="utf-8").splitlines()
+            self.assertLess(len(lines), 100)
+            self.assertEqual(FileSessionStore(root_dir=root).list_sessions()[0]["metadata"]["n"], 199)
+
+    def test_cli_reindex_recovers_from_out_of_band_changes(self) -> None:
+        from openagentic_cli.__main__ import main
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            keep = store.create_session()
+            gone = store.create_session()
+            shutil.rmtree(root / "sessions" / gone)
+            self.assertEqual(len(store.list_sessions()), 2)
+            self.assertEqual(main(["sessions", "reindex", "--session-root", str(root)]), 0)
+            self.assertEqual([r["session_id"] for r in store.list_sessions()], [keep])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk.events import AssistantMessage, UserMessage
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+class TestSessionEventIndex(unittest.TestCase):
+    def test_range_and_tail_reads(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sid = store.create_session()
+            for i in range(1, 21):
+                store.append_event(sid, UserMessage(text=f"u{i}"))
+
+            self.assertTrue((root / "sessions" / sid / "events.idx").exists())
+            got = store.read_events_range(sid, 5, 8)
+            self.assertEqual([e.seq for e in got], [5, 6, 7, 8])
+            self.assertEqual([getattr(e, "text") for e in got], ["u5", "u6", "u7", "u8"])
+            self.assertEqual([e.seq for e in store.read_events_range(sid, 19)], [19, 20])
+            self.assertEqual([e.seq for e in store.read_events_range(sid, None, 2)], [1, 2])
+            self.assertEqual(store.read_events_range(sid, 30, 40), [])
+            self.assertEqual([e.seq for e in store.tail(sid, 3)], [18, 19, 20])
+            self.assertEqual(len(store.tail(sid, 100)), 20)
+            self.assertEqual(store.tail(sid, 0), [])
+
+    def test_last_seq_does_not_reread_log(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sid = store.create_session()
+            for i in range(5):
+                store.append_event(sid, UserMessage(text=str(i)))
+
+            # A fresh store resumes seq from the persisted index, not by splitting the log.
+            fresh = FileSessionStore(root_dir=root)
+            with mock.patch.object(Path, "read_text", side_effect=AssertionError("log re-read")):
+                fresh.append_event(sid, AssistantMessage(text="a"))
+            self.assertEqual(fresh.tail(sid, 1)[0].seq, 6)
+
+    def test_index_is_built_for_legacy_logs_and_catches_up(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sid = store.create_session()
+            log = root / "sessions" / sid / "events.jsonl"
+            # Older logs: no seq fields and no sidecar index.
+            log.write_text(
+                "".join(json.dumps({"type": "user.message", "text": t}) + "\n" for t in ("a", "b", "c")),
+                encoding="utf-8",
+            )
+            self.assertEqual([getattr(e, "text") for e in store.read_events_range(sid, 2, 3)], ["b", "c"])
+
+            # Another writer appends behind our back; the index catches up from the tail.
+            with log.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"type": "user.message", "seq": 4, "text": "d"}) + "\n")
+            self.assertEqual([getattr(e, "text") for e in store.tail(sid, 1)], ["d"])
+
+            store.append_event(sid, UserMessage(text="e"))
+            self.assertEqual([e.seq for e in store.read_events_range(sid, 4)], [4, 5])
+
+    def test_index_rebuilds_when_log_shrinks(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root)
+            sid = store.create_session()
+            for i in range(4):
+                store.append_event(sid, UserMessage(text=str(i)))
+            log = root / "sessions" / sid / "events.jsonl"
+            lines = log.read_text(encoding="utf-8").splitlines(keepends=True)
+            log.write_text("".join(lines[:2]), encoding="utf-8")
+            self.assertEqual([e.seq for e in store.tail(sid, 5)], [1, 2])
+
+    def test_buffered_store_maintains_index(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, buffered=True, flush_interval_s=60.0)
+            sid = store.create_session()
+            for i in range(10):
+                store.append_event(sid, UserMessage(text=str(i)))
+            self.assertEqual([e.seq for e in store.read_events_range(sid, 3, 4)], [3, 4])
+            store.close()
+
+            fresh = FileSessionStore(root_dir=root)
+            self.assertEqual([e.seq for e in fresh.tail(sid, 2)], [9, 10])
+
+
+if __name__ == "__main__":
+    unittest.main()
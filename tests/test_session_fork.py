@@ -4,7 +4,8 @@ import unittest
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-from openagentic_sdk.events import AssistantMessage, UserMessage
+from openagentic_sdk.events import AssistantMessage, Result, SessionUndo, SystemInit, UserMessage
+from openagentic_sdk.sessions.rebuild import rebuild_messages
 from openagentic_sdk.sessions.store import FileSessionStore
 
 
@@ -27,6 +28,70 @@ class TestSessionFork(unittest.TestCase):
             self.assertEqual(md.get("parent_session_id"), parent)
             self.assertEqual(md.get("parent_head_seq"), 2)
 
+    def test_fork_is_copy_on_write(self) -> None:
+        with TemporaryDirectory() as td:
+            store = FileSessionStore(root_dir=Path(td))
+            parent = store.create_session()
+            store.append_event(parent, SystemInit(session_id=parent))
+            for i in range(5):
+                store.append_event(parent, UserMessage(text=f"u{i}"))
+                store.append_event(parent, AssistantMessage(text=f"a{i}"))
+            store.append_event(parent, Result(session_id=parent, final_text="a4"))
+            store.append_event(parent, SessionUndo())
+
+            child = store.fork_session(parent)
+            self.assertFalse((store.session_dir(child) / "events.jsonl").exists())
+            self.assertEqual(store.read_meta_record(child)["base"]["head_seq"], 13)
+
+            inherited = [e for e in store.read_events(parent) if e.type in ("user.message", "assistant.message")]
+            self.assertEqual(store.read_events(child), inherited)
+
+            # The child's own events follow the base head; later parent events stay invisible.
+            store.append_event(child, UserMessage(text="child"))
+            store.append_event(parent, UserMessage(text="parent later"))
+            child_events = store.read_events(child)
+            self.assertEqual([e.seq for e in child_events][-2:], [11, 14])
+            self.assertEqual(child_events[-1].text, "child")
+            self.assertEqual(store.read_events_range(child, 11, 14), child_events[-2:])
+            self.assertEqual(store.tail(child, 3), child_events[-3:])
+            self.assertEqual(store.read_window(child), child_events)
+            self.assertEqual(list(store.iter_events(child, types=["user.message"], after_seq=10)), [child_events[-1]])
+
+            # Forks of forks resolve the whole chain.
+            grandchild = store.fork_session(child, head_seq=11)
+            store.append_event(grandchild, AssistantMessage(text="gc"))
+            self.assertEqual(
+                [getattr(e, "text", "") for e in store.read_events(grandchild)],
+                ["u0", "a0", "u1", "a1", "u2", "a2", "u3", "a3", "u4", "a4", "gc"],
+            )
+
+    def test_deleting_parent_detaches_forks(self) -> None:
+        with TemporaryDirectory() as td:
+            store = FileSessionStore(root_dir=Path(td))
+            parent = store.create_session()
+            for i in range(3):
+                store.append_event(parent, UserMessage(text=f"u{i}"))
+                store.append_event(parent, AssistantMessage(text=f"a{i}"))
+            child = store.fork_session(parent, head_seq=4)
+            store.append_event(child, UserMessage(text="next"))
+            grandchild = store.fork_session(child)
+            before = store.read_events(child)
+            before_gc = store.read_events(grandchild)
+
+            store.delete_session(parent)
+            self.assertNotIn("base", store.read_meta_record(child))
+            self.assertEqual(store.read_events(child), before)
+            self.assertEqual(store.read_events(grandchild), before_gc)
+            self.assertEqual(
+                rebuild_messages(store.read_window(child), max_events=100, max_bytes=100_000),
+                rebuild_messages(before, max_events=100, max_bytes=100_000),
+            )
+            store.append_event(child, AssistantMessage(text="after"))
+            self.assertEqual(store.read_events(child)[-1].seq, 6)
+
+            # A fresh store instance (no cached state) sees the same history.
+            self.assertEqual(FileSessionStore(root_dir=Path(td)).read_events(child)[:-1], before)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk import serialization
+from openagentic_sdk.compaction import PRUNE_EVENT_FIELDS, PRUNE_EVENT_TYPES, select_tool_outputs_to_prune
+from openagentic_sdk.events import AssistantDelta, AssistantMessage, ToolResult, ToolUse, UserMessage
+from openagentic_sdk.options import CompactionOptions, OpenAgenticOptions
+from openagentic_sdk.runtime import AgentRuntime
+from openagentic_sdk.sessions.paths import events_path
+from openagentic_sdk.sessions.sqlite_store import SqliteSessionStore
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+class _MinimalStore:
+    """A custom store with only the two methods the runtime has always required."""
+
+    def __init__(self) -> None:
+        self.events: list = []
+
+    def read_events(self, session_id: str) -> list:
+        return list(self.events)
+
+    def append_event(self, session_id: str, event) -> None:
+        self.events.append(event)
+
+
+def _fill(store, sid: str, turns: int = 6) -> None:
+    for i in range(turns):
+        store.append_event(sid, UserMessage(text=f"u{i}"))
+        store.append_event(sid, AssistantDelta(text_delta="d"))
+        store.append_event(sid, ToolUse(tool_use_id=f"t{i}", name="Read", input={"file_path": f"f{i}"}))
+        store.append_event(sid, ToolResult(tool_use_id=f"t{i}", output={"content": "x" * 400}))
+        store.append_event(sid, AssistantMessage(text=f"a{i}", is_summary=(i == 2)))
+
+
+class TestIterEvents(unittest.TestCase):
+    def _check_store(self, store) -> None:
+        sid = store.create_session()
+        _fill(store, sid)
+        full = store.read_events(sid)
+        self.assertEqual(list(store.iter_events(sid)), full)
+
+        results = list(store.iter_events(sid, types=["tool.result"]))
+        self.assertEqual(results, [e for e in full if e.type == "tool.result"])
+
+        after = list(store.iter_events(sid, after_seq=12))
+        self.assertEqual(after, [e for e in full if e.seq > 12])
+
+        projected = list(store.iter_events(sid, types=("tool.use",), fields=("name",), after_seq=20))
+        self.assertTrue(projected)
+        for e in projected:
+            self.assertEqual(e.name, "Read")
+            self.assertGreater(e.seq, 20)
+            self.assertEqual(e.tool_use_id, "")  # not projected
+            self.assertIsNone(e.ts)
+
+        self.assertEqual(list(store.iter_events(sid, types=())), [])
+        self.assertEqual(list(store.iter_events("not-a-session")), [])
+
+    def test_file_store_with_segments(self) -> None:
+        with TemporaryDirectory() as td:
+            self._check_store(FileSessionStore(root_dir=Path(td), segment_max_bytes=600))
+
+    def test_file_store_without_segments(self) -> None:
+        with TemporaryDirectory() as td:
+            self._check_store(FileSessionStore(root_dir=Path(td)))
+
+    def test_sqlite_store(self) -> None:
+        with TemporaryDirectory() as td:
+            store = SqliteSessionStore(root_dir=Path(td))
+            try:
+                self._check_store(store)
+            finally:
+                store.close()
+
+    def test_filtered_lines_are_not_decoded(self) -> None:
+        with TemporaryDirectory() as td:
+            store = FileSessionStore(root_dir=Path(td))
+            sid = store.create_session()
+            _fill(store, sid)
+            real = serialization._loads
+            with mock.patch.object(serialization, "_loads", side_effect=real) as loads:
+                out = list(store.iter_events(sid, types=["user.message"]))
+            self.assertEqual(len(out), 6)
+            self.assertEqual(loads.call_count, 6)
+
+    def test_legacy_lines_without_seq(self) -> None:
+        with TemporaryDirectory() as td:
+            store = FileSessionStore(root_dir=Path(td))
+            sid = store.create_session()
+            lines = [
+                {"type": "user.message", "text": "old"},
+                {"text": "reordered", "type": "assistant.message"},
+            ]
+            events_path(Path(td), sid).write_text("".join(json.dumps(o) + "\n" for o in lines), encoding="utf-8")
+            store.append_event(sid, UserMessage(text="new"))
+            self.assertEqual([e.type for e in store.iter_events(sid, types=["assistant.message"])], ["assistant.message"])
+            self.assertEqual([getattr(e, "text", None) for e in store.iter_events(sid, after_seq=2)], ["new"])
+
+    def test_prune_projection_matches_full_events(self) -> None:
+        with TemporaryDirectory() as td:
+            store = FileSessionStore(root_dir=Path(td))
+            sid = store.create_session()
+            _fill(store, sid, turns=10)
+            compaction = CompactionOptions(prune=True, protect_tool_output_tokens=200, min_prune_tokens=0)
+            expected = select_tool_outputs_to_prune(events=store.read_events(sid), compaction=compaction)
+            projected = list(store.iter_events(sid, types=PRUNE_EVENT_TYPES, fields=PRUNE_EVENT_FIELDS))
+            self.assertTrue(expected)
+            self.assertEqual(select_tool_outputs_to_prune(events=projected, compaction=compaction), expected)
+
+    def test_prune_falls_back_to_read_events_for_custom_stores(self) -> None:
+        store = _MinimalStore()
+        _fill(store, "s1", turns=10)
+        compaction = CompactionOptions(prune=True, protect_tool_output_tokens=200, min_prune_tokens=0)
+        expected = select_tool_outputs_to_prune(events=list(store.events), compaction=compaction)
+        self.assertTrue(expected)
+        options = OpenAgenticOptions(provider=object(), model="fake", session_store=store, compaction=compaction)
+
+        async def prune() -> list:
+            runtime = AgentRuntime(options)
+            return [e async for e in runtime._maybe_prune_tool_outputs(store=store, session_id="s1", provider_protocol="legacy")]
+
+        pruned = asyncio.run(prune())
+        self.assertEqual([e.tool_use_id for e in pruned], expected)
+        self.assertEqual(store.events[-len(expected) :], pruned)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.events import AssistantDelta, AssistantMessage, ToolResult, ToolUse, UserMessage
+from openagentic_sdk.sessions.rebuild import rebuild_messages
+from openagentic_sdk.sessions.segments import _zstd_module, load_manifest
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+def _fill(store: FileSessionStore, sid: str, n: int, *, prefix: str = "m") -> None:
+    for i in range(n):
+        store.append_event(sid, UserMessage(text=f"{prefix}{i} " + "x" * 40))
+        store.append_event(sid, AssistantMessage(text=f"reply {prefix}{i}"))
+
+
+class TestSegmentedSessionStore(unittest.TestCase):
+    def test_rotation_seals_compressed_segments(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, segment_max_bytes=512)
+            sid = store.create_session()
+            _fill(store, sid, 20)
+
+            d = root / "sessions" / sid
+            segments = load_manifest(d / "segments.json")
+            self.assertGreater(len(segments), 1)
+            self.assertTrue(all((d / "segments" / s.file).name.endswith(".jsonl.gz") for s in segments))
+            self.assertLess((d / "events.jsonl").stat().st_size, 512)
+
+            events = store.read_events(sid)
+            self.assertEqual([e.seq for e in events], list(range(1, 41)))
+            self.assertEqual([e.seq for e in store.read_events_range(sid, 3, 35)], list(range(3, 36)))
+            self.assertEqual([e.seq for e in store.tail(sid, 25)], list(range(16, 41)))
+
+            fresh = FileSessionStore(root_dir=root, segment_max_bytes=512)
+            fresh.append_event(sid, UserMessage(text="next"))
+            self.assertEqual(fresh.tail(sid, 1)[0].seq, 41)
+
+    def test_buffered_writer_rotates(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, buffered=True, flush_interval_s=60.0, segment_max_bytes=400, segment_compression="none")
+            sid = store.create_session()
+            _fill(store, sid, 10)
+            self.assertTrue(load_manifest(root / "sessions" / sid / "segments.json"))
+            self.assertEqual([e.seq for e in store.read_events(sid)], list(range(1, 21)))
+            store.close()
+
+    def test_window_starts_at_latest_summary_segment(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, segment_max_bytes=400)
+            sid = store.create_session()
+            _fill(store, sid, 10, prefix="old")
+            store.append_event(sid, ToolUse(tool_use_id="t1", name="Read", input={}))
+            store.append_event(sid, AssistantMessage(text="summary so far", is_summary=True))
+            store.append_event(sid, ToolResult(tool_use_id="t1", output="late"))
+            _fill(store, sid, 10, prefix="new")
+
+            window = store.read_window(sid)
+            full = store.read_events(sid)
+            self.assertGreater(window[0].seq, 1)
+            self.assertEqual(window, full[len(full) - len(window) :])
+            for max_events, max_bytes in ((1000, 2_000_000), (5, 2_000_000), (1000, 200)):
+                self.assertEqual(
+                    rebuild_messages(window, max_events=max_events, max_bytes=max_bytes),
+                    rebuild_messages(full, max_events=max_events, max_bytes=max_bytes),
+                )
+
+            child = store.fork_session(sid)
+            child_texts = [getattr(e, "text", None) for e in store.read_events(child)]
+            self.assertIn("summary so far", child_texts)
+            self.assertNotIn("reply old0", child_texts)
+
+    def test_window_falls_back_when_head_moves_before_pivot(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, segment_max_bytes=300)
+            sid = store.create_session()
+            _fill(store, sid, 6)
+            store.append_event(sid, AssistantMessage(text="summary", is_summary=True))
+            _fill(store, sid, 6, prefix="n")
+            store.set_head(sid, head_seq=4)
+            self.assertEqual(store.read_window(sid), store.read_events(sid))
+
+            # Forking before the pivot also needs the full history.
+            child = store.fork_session(sid, head_seq=3)
+            self.assertEqual([getattr(e, "text", "")[:2] for e in store.read_events(child)], ["m0", "re", "m1"])
+
+    def test_interrupted_seal_does_not_duplicate_events(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, segment_max_bytes=300, segment_compression="none")
+            sid = store.create_session()
+            _fill(store, sid, 5)
+            d = root / "sessions" / sid
+            segments = load_manifest(d / "segments.json")
+            sealed = (d / "segments" / segments[-1].file).read_bytes()
+            live = d / "events.jsonl"
+            # Crash after the manifest was written but before the live log was truncated.
+            live.write_bytes(sealed + live.read_bytes())
+            (d / "events.idx").unlink(missing_ok=True)
+
+            fresh = FileSessionStore(root_dir=root, segment_max_bytes=300)
+            self.assertEqual([e.seq for e in fresh.read_events(sid)], list(range(1, 11)))
+
+    def test_strip_deltas_rewrites_sealed_segments(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, segment_max_bytes=300)
+            sid = store.create_session()
+            for i in range(12):
+                store.append_event(sid, AssistantDelta(text_delta=f"d{i}"))
+                store.append_event(sid, AssistantMessage(text=f"a{i}" + "y" * 30))
+            self.assertEqual(store.strip_deltas(sid), 12)
+            events = store.read_events(sid)
+            self.assertEqual([e.type for e in events], ["assistant.message"] * 12)
+            self.assertEqual([e.seq for e in events], list(range(2, 25, 2)))
+
+    def test_legacy_seq_less_lines_get_explicit_seqs_when_sealed(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, segment_max_bytes=200, segment_compression="none")
+            sid = store.create_session()
+            log = root / "sessions" / sid / "events.jsonl"
+            log.write_text("".join(json.dumps({"type": "user.message", "text": t}) + "\n" for t in "abc"), encoding="utf-8")
+            _fill(store, sid, 3)
+            self.assertEqual([e.seq for e in store.read_events(sid)], list(range(1, 10)))
+
+    def test_unknown_or_unavailable_codec_is_rejected(self) -> None:
+        with TemporaryDirectory() as td:
+            with self.assertRaises(ValueError):
+                FileSessionStore(root_dir=Path(td), segment_compression="lz4")
+            if _zstd_module() is None:
+                with self.assertRaises(RuntimeError):
+                    FileSessionStore(root_dir=Path(td), segment_max_bytes=1024, segment_compression="zstd")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.events import AssistantDelta, AssistantMessage, UserMessage
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+def _lines(p: Path) -> list[dict]:
+    if not p.exists():
+        return []
+    return [json.loads(ln) for ln in p.read_text(encoding="utf-8").splitlines() if ln.strip()]
+
+
+class TestBufferedSessionStore(unittest.TestCase):
+    def test_buffered_appends_are_batched_until_flush(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, buffered=True, flush_interval_s=60.0)
+            sid = store.create_session()
+            store.append_event(sid, UserMessage(text="hi"))
+            for i in range(10):
+                store.append_event(sid, AssistantDelta(text_delta=str(i)))
+            store.append_event(sid, AssistantMessage(text="0123456789"))
+
+            p = root / "sessions" / sid / "events.jsonl"
+            self.assertEqual(_lines(p), [])
+
+            store.flush(sid)
+            objs = _lines(p)
+            self.assertEqual([o["seq"] for o in objs], list(range(1, 13)))
+            transcript = _lines(root / "sessions" / sid / "transcript.jsonl")
+            self.assertEqual([t["role"] for t in transcript], ["user", "assistant"])
+            store.close()
+
+    def test_reads_see_pending_events(self) -> None:
+        with TemporaryDirectory() as td:
+            store = FileSessionStore(root_dir=Path(td), buffered=True, flush_interval_s=60.0)
+            sid = store.create_session()
+            store.append_event(sid, UserMessage(text="u1"))
+            store.checkpoint(sid, label="c1")
+            events = store.read_events(sid)
+            self.assertEqual([e.type for e in events], ["user.message", "session.checkpoint"])
+            self.assertEqual(getattr(events[1], "head_seq"), 1)
+            store.close()
+
+    def test_background_commit_and_byte_budget(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, buffered=True, flush_interval_s=0.01, durability="none")
+            sid = store.create_session()
+            store.append_event(sid, UserMessage(text="x"))
+            p = root / "sessions" / sid / "events.jsonl"
+            deadline = time.time() + 2.0
+            while time.time() < deadline and not p.exists():
+                time.sleep(0.01)
+            self.assertTrue(p.exists())
+            store.close()
+
+            store2 = FileSessionStore(root_dir=root, buffered=True, flush_interval_s=60.0, flush_max_bytes=1)
+            store2.append_event(sid, UserMessage(text="y"))
+            # Over budget: the batch was written synchronously by the appending thread.
+            store2.flush(sid)
+            self.assertEqual([o["seq"] for o in _lines(p)], [1, 2])
+            store2.close()
+
+    def test_writer_pool_evicts_idle_sessions(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, buffered=True, flush_interval_s=60.0, max_open_writers=1)
+            s1 = store.create_session()
+            s2 = store.create_session()
+            store.append_event(s1, UserMessage(text="a"))
+            store.append_event(s2, UserMessage(text="b"))
+            # s1's writer was evicted (and committed) to make room for s2.
+            self.assertEqual(len(_lines(root / "sessions" / s1 / "events.jsonl")), 1)
+            store.delete_session(s2)
+            self.assertFalse((root / "sessions" / s2).exists())
+            store.close()
+
+    def test_invalid_durability_is_rejected(self) -> None:
+        with TemporaryDirectory() as td:
+            with self.assertRaises(ValueError):
+                FileSessionStore(root_dir=Path(td), durability="sometimes")
+
+
+class _FakeProvider:
+    name = "fake"
+
+    async def complete(self, *, model, input, tools=(), api_key=None, previous_response_id=None, store=True):
+        from openagentic_sdk.providers.base import ModelOutput
+
+        _ = (model, input, tools, api_key, previous_response_id, store)
+        return ModelOutput(assistant_text="done", tool_calls=[], response_id="resp_1")
+
+
+class TestRuntimeFlushesBufferedStore(unittest.IsolatedAsyncioTestCase):
+    async def test_result_is_on_disk_when_yielded(self) -> None:
+        import openagentic_sdk
+        from openagentic_sdk.options import OpenAgenticOptions
+        from openagentic_sdk.permissions.gate import PermissionGate
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = FileSessionStore(root_dir=root, buffered=True, flush_interval_s=60.0)
+            options = OpenAgenticOptions(
+                provider=_FakeProvider(),
+                model="m",
+                cwd=str(root),
+                permission_gate=PermissionGate(permission_mode="bypass"),
+                session_store=store,
+            )
+            async for e in openagentic_sdk.query(prompt="hi", options=options):
+                if getattr(e, "type", None) == "result":
+                    objs = _lines(root / "sessions" / e.session_id / "events.jsonl")
+                    self.assertEqual(objs[-1]["type"], "result")
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
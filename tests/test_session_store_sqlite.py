@@ -0,0 +1,180 @@
+import json
+import sqlite3
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.events import AssistantDelta, AssistantMessage, UserMessage
+from openagentic_sdk.sessions.migrate import migrate_sessions
+from openagentic_sdk.sessions.rebuild import rebuild_messages
+from openagentic_sdk.sessions.sqlite_store import SqliteSessionStore
+from openagentic_sdk.sessions.store import FileSessionStore
+
+
+class TestSqliteSessionStore(unittest.TestCase):
+    def test_append_read_range_and_tail(self) -> None:
+        with TemporaryDirectory() as td:
+            store = SqliteSessionStore(root_dir=Path(td))
+            sid = store.create_session(metadata={"title": "t"})
+            for i in range(10):
+                store.append_event(sid, UserMessage(text=str(i)))
+            self.assertEqual([e.seq for e in store.read_events(sid)], list(range(1, 11)))
+            self.assertEqual([e.seq for e in store.read_events_range(sid, 4, 6)], [4, 5, 6])
+            self.assertEqual([e.seq for e in store.tail(sid, 3)], [8, 9, 10])
+            self.assertEqual(store.read_metadata(sid), {"title": "t"})
+            transcript = (Path(td) / "sessions" / sid / "transcript.jsonl").read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(transcript), 10)
+
+            mode = sqlite3.connect(str(Path(td) / "sessions.sqlite3")).execute("PRAGMA journal_mode").fetchone()[0]
+            self.assertEqual(mode, "wal")
+            store.close()
+
+    def test_timeline_fork_and_listing(self) -> None:
+        with TemporaryDirectory() as td:
+            store = SqliteSessionStore(root_dir=Path(td))
+            sid = store.create_session()
+            store.append_event(sid, UserMessage(text="a"))
+            store.append_event(sid, AssistantMessage(text="b"))
+            store.checkpoint(sid, label="c1")
+            store.set_head(sid, head_seq=1)
+            store.undo(sid)
+            store.redo(sid)
+            events = store.read_events(sid)
+            self.assertEqual(
+                [e.type for e in events[2:]],
+                ["session.checkpoint", "session.set_head", "session.undo", "session.redo"],
+            )
+            self.assertEqual(getattr(events[2], "head_seq"), 2)
+            self.assertEqual(rebuild_messages(events, max_events=10, max_bytes=10_000), [{"role": "user", "content": "a"}])
+
+            child = store.fork_session(sid, head_seq=1)
+            self.assertEqual([getattr(e, "text", None) for e in store.read_events(child)], ["a"])
+            self.assertEqual([r["session_id"] for r in store.list_sessions(parent_session_id=sid)], [child])
+            self.assertEqual([r["session_id"] for r in store.list_sessions()], [child, sid])
+            self.assertEqual([r["session_id"] for r in store.list_sessions(limit=1, offset=1)], [sid])
+
+            store.update_metadata(child, patch={"title": "renamed"})
+            self.assertEqual(store.read_metadata(child)["title"], "renamed")
+            store.delete_session(child)
+            self.assertEqual(store.read_events(child), [])
+            with self.assertRaises(FileNotFoundError):
+                store.delete_session(child)
+            store.close()
+
+    def test_concurrent_metadata_patches_are_not_lost(self) -> None:
+        with TemporaryDirectory() as td:
+            stores = [SqliteSessionStore(root_dir=Path(td)) for _ in range(2)]
+            sid = stores[0].create_session(metadata={"title": "t"})
+
+            def patch(store: SqliteSessionStore, worker: int) -> None:
+                for i in range(25):
+                    store.update_metadata(sid, patch={f"k{worker}_{i}": i})
+
+            threads = [threading.Thread(target=patch, args=(stores[w % 2], w)) for w in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            md = stores[1].read_metadata(sid)
+            self.assertEqual(len(md), 1 + 4 * 25)
+            for store in stores:
+                store.close()
+
+    def test_strip_deltas(self) -> None:
+        with TemporaryDirectory() as td:
+            store = SqliteSessionStore(root_dir=Path(td))
+            sid = store.create_session()
+            store.append_event(sid, AssistantDelta(text_delta="x"))
+            store.append_event(sid, AssistantMessage(text="x"))
+            self.assertEqual(store.strip_deltas(sid), 1)
+            self.assertEqual([(e.type, e.seq) for e in store.read_events(sid)], [("assistant.message", 2)])
+            store.close()
+
+
+class TestSessionStoreMigration(unittest.TestCase):
+    def test_round_trip_preserves_events_and_metadata(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            files = FileSessionStore(root_dir=root / "a")
+            parent = files.create_session(metadata={"title": "p"})
+            files.append_event(parent, UserMessage(text="hi"))
+            files.append_event(parent, AssistantMessage(text="yo"))
+            child = files.fork_session(parent)
+            (files.session_dir(parent) / "todos.json").write_text(json.dumps({"todos": []}), encoding="utf-8")
+
+            db = SqliteSessionStore(root_dir=root / "b")
+            self.assertEqual(sorted(migrate_sessions(files, db)), sorted([parent, child]))
+            self.assertEqual(migrate_sessions(files, db), [])
+            self.assertEqual(db.read_events(parent), files.read_events(parent))
+            # The copy-on-write base pointer is dropped: the child arrives materialized.
+            expected_child = {k: v for k, v in files.read_meta_record(child).items() if k != "base"}
+            self.assertEqual(db.read_meta_record(child), expected_child)
+            self.assertEqual(db.read_events(child), files.read_events(child))
+            self.assertEqual([r["session_id"] for r in db.list_sessions(parent_session_id=parent)], [child])
+            self.assertTrue((db.session_dir(parent) / "todos.json").exists())
+
+            back = FileSessionStore(root_dir=root / "c")
+            migrate_sessions(db, back)
+            self.assertEqual(back.read_events(parent), files.read_events(parent))
+            self.assertEqual(
+                (back.session_dir(parent) / "transcript.jsonl").read_text(encoding="utf-8"),
+                (files.session_dir(parent) / "transcript.jsonl").read_text(encoding="utf-8"),
+            )
+            back.append_event(parent, UserMessage(text="again"))
+            self.assertEqual(back.tail(parent, 1)[0].seq, 3)
+            db.close()
+
+    def test_cli_migrate(self) -> None:
+        from openagentic_cli.__main__ import main
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            files = FileSessionStore(root_dir=root)
+            sid = files.create_session()
+            files.append_event(sid, UserMessage(text="hi"))
+            self.assertEqual(main(["sessions", "migrate", "--to", "sqlite", "--session-root", str(root)]), 0)
+            db = SqliteSessionStore(root_dir=root)
+            self.assertEqual([e.type for e in db.read_events(sid)], ["user.message"])
+            db.close()
+
+
+class _FakeProvider:
+    name = "fake"
+
+    async def complete(self, *, model, messages, tools=(), api_key=None):
+        from openagentic_sdk.providers.base import ModelOutput
+
+        _ = (model, tools, api_key)
+        return ModelOutput(assistant_text=f"seen {len(messages)}", tool_calls=[])
+
+
+class TestRuntimeWithSqliteStore(unittest.IsolatedAsyncioTestCase):
+    async def test_query_and_resume(self) -> None:
+        import openagentic_sdk
+        from openagentic_sdk.options import OpenAgenticOptions
+        from openagentic_sdk.permissions.gate import PermissionGate
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            store = SqliteSessionStore(root_dir=root)
+            options = OpenAgenticOptions(
+                provider=_FakeProvider(),
+                model="m",
+                cwd=str(root),
+                permission_gate=PermissionGate(permission_mode="bypass"),
+                session_store=store,
+            )
+            first = [e async for e in openagentic_sdk.query(prompt="one", options=options)]
+            sid = first[-1].session_id
+            from dataclasses import replace
+
+            second = [e async for e in openagentic_sdk.query(prompt="two", options=replace(options, resume=sid))]
+            self.assertEqual(second[-1].session_id, sid)
+            texts = [getattr(e, "text", None) for e in store.read_events(sid) if e.type in ("user.message", "assistant.message")]
+            self.assertEqual(texts[:3], ["one", "seen 1", "two"])
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
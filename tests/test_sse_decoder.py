@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import random
+import time
+import unittest
+
+from openagentic_sdk.providers.sse import SseDecoder, SseEvent, iter_sse_events
+
+
+def _responses_stream(n: int) -> bytes:
+    """A Responses API stream shaped like a recorded one: created, many deltas, a tool call, completed."""
+
+    parts = [{"type": "response.created", "response": {"id": "resp_1", "status": "in_progress"}}]
+    parts.append({"type": "response.output_item.added", "output_index": 0, "item": {"id": "msg_1", "type": "message"}})
+    for i in range(n):
+        parts.append(
+            {
+                "type": "response.output_text.delta",
+                "item_id": "msg_1",
+                "output_index": 0,
+                "content_index": 0,
+                "delta": f"token{i} ",
+            }
+        )
+    parts.append(
+        {
+            "type": "response.output_item.added",
+            "output_index": 1,
+            "item": {"id": "fc_1", "type": "function_call", "call_id": "call_1", "name": "Read"},
+        }
+    )
+    parts.append({"type": "response.function_call_arguments.delta", "output_index": 1, "delta": '{"file_path":"a.txt"}'})
+    parts.append({"type": "response.completed", "response": {"id": "resp_1", "usage": {"total_tokens": n}}})
+    return b"".join(
+        f"event: {p['type']}\ndata: {json.dumps(p, separators=(',', ':'))}\n\n".encode("utf-8") for p in parts
+    )
+
+
+def _chat_completions_stream(n: int) -> bytes:
+    parts = []
+    for i in range(n):
+        parts.append(
+            {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 1700000000,
+                "model": "m",
+                "choices": [{"index": 0, "delta": {"content": f"token{i} "}, "finish_reason": None}],
+            }
+        )
+    body = b"".join(f"data: {json.dumps(p, separators=(',', ':'))}\r\n\r\n".encode("utf-8") for p in parts)
+    return body + b"data: [DONE]\r\n\r\n"
+
+
+def _legacy_events(chunks: list[bytes]) -> list[str]:
+    # The previous provider path: rebuild the buffer per line, decode each line, join `data:` lines.
+    def iter_lines():
+        buf = b""
+        for chunk in chunks:
+            buf += chunk
+            while True:
+                idx = buf.find(b"\n")
+                if idx < 0:
+                    break
+                line = buf[: idx + 1]
+                buf = buf[idx + 1 :]
+                yield line
+        if buf:
+            yield buf
+
+    out: list[str] = []
+    data: list[str] = []
+    for raw in iter_lines():
+        line = raw.decode("utf-8", errors="replace")
+        if line in ("\n", "\r\n"):
+            if data:
+                out.append("".join(data))
+                data = []
+            continue
+        if line.startswith("data:"):
+            data.append(line[len("data:") :].lstrip().rstrip("\r\n"))
+    if data:
+        out.append("".join(data))
+    return out
+
+
+def _split(raw: bytes, size: int) -> list[bytes]:
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+class TestSseDecoder(unittest.TestCase):
+    def test_fields_and_multiline_data(self) -> None:
+        raw = (
+            b"\xef\xbb\xbf: keep-alive comment\n"
+            b"retry: 3000\n"
+            b"event: update\n"
+            b"id: 7\n"
+            b"data: first\n"
+            b"data:second\n"
+            b"data:  third\n"
+            b"\n"
+            b"data: {\"x\":1}\r\n\r\n"
+            b"id\n"
+            b"event: ping\n"
+            b"\n"
+            b"data\rdata: last\r\r"
+            b"data: tail"
+        )
+        expected = [
+            SseEvent(data="first\nsecond\n third", event="update", id="7", retry=3000),
+            SseEvent(data='{"x":1}', id="7"),
+            SseEvent(data="\nlast", id=""),
+            SseEvent(data="tail", id=""),
+        ]
+        self.assertEqual(list(iter_sse_events([raw])), expected)
+        # Any chunking gives the same events, including splits inside `\r\n` and the BOM.
+        for size in (1, 2, 3, 7):
+            self.assertEqual(list(iter_sse_events(_split(raw, size))), expected, size)
+        self.assertEqual(expected[1].json(), {"x": 1})
+        self.assertIsNone(SseEvent(data="[DONE]").json())
+
+    def test_random_rechunking_matches_a_whole_buffer_parse(self) -> None:
+        self.assertEqual(list(iter_sse_events([b"data: z\rdata: y", b"\ndata: x\n\n"])), [SseEvent(data="z\ny\nx")])
+        self.assertEqual(list(iter_sse_events([b"\r:c", b"\ndata: x\n\n"])), [SseEvent(data="x")])
+        rng = random.Random(0)
+        pieces = [b"data: ", b"data: y", b"event: e", b"id: 1", b":c", b"x", b"\r", b"\n", b"\r\n", b"\xc3\xa9"]
+        for _ in range(1000):
+            raw = b"".join(rng.choice(pieces) for _ in range(rng.randint(1, 40)))
+            expected = list(iter_sse_events([raw]))
+            chunks: list[bytes] = []
+            while sum(map(len, chunks)) < len(raw):
+                start = sum(map(len, chunks))
+                chunks.append(raw[start : start + rng.randint(1, 12)])
+            self.assertEqual(list(iter_sse_events(chunks)), expected, chunks)
+
+    def test_accepts_bytearray_and_memoryview(self) -> None:
+        decoder = SseDecoder()
+        self.assertEqual(decoder.feed(bytearray(b"data: a\n")), [])
+        self.assertEqual(decoder.feed(memoryview(b"\ndata: b\n\n")), [SseEvent(data="a"), SseEvent(data="b")])
+        self.assertEqual(decoder.flush(), [])
+
+    def test_recorded_streams_match_legacy_parser(self) -> None:
+        for raw in (_responses_stream(50), _chat_completions_stream(50)):
+            for size in (1, 17, 4096, len(raw)):
+                chunks = _split(raw, size)
+                self.assertEqual([e.data for e in iter_sse_events(chunks)], _legacy_events(chunks))
+
+    def test_throughput_benchmark(self) -> None:
+        # One large chunk (a fast server or a buffered proxy) made the old line splitter quadratic.
+        for raw in (_responses_stream(4000), _chat_completions_stream(4000)):
+            for chunks in ([raw], _split(raw, 16 * 1024)):
+                t0 = time.perf_counter()
+                legacy = _legacy_events(chunks)
+                legacy_s = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                events = [e.json() for e in iter_sse_events(chunks)]
+                new_s = time.perf_counter() - t0
+                self.assertEqual(len(events), len(legacy))
+                if len(chunks) == 1:
+                    # The new decoder also decodes JSON and is still faster on a single large chunk.
+                    self.assertLess(new_s, legacy_s)
+
+
+if __name__ == "__main__":
+    unittest.main()
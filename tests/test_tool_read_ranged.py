@@ -0,0 +1,59 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk.tools import line_index
+from openagentic_sdk.tools.base import ToolContext
+from openagentic_sdk.tools.read import ReadTool
+
+
+def _numbered(lines: list[str], start: int) -> str:
+    return "\n".join(f"{i + 1}: {line}" for i, line in enumerate(lines, start=start))
+
+
+class TestReadToolRanged(unittest.TestCase):
+    def test_windows_beyond_max_bytes_are_reachable(self) -> None:
+        with TemporaryDirectory() as td:
+            p = Path(td) / "big.log"
+            p.write_text("".join(f"entry {i}\n" for i in range(300_000)), encoding="utf-8")
+            self.assertGreater(p.stat().st_size, 1 << 20)
+            ctx = ToolContext(cwd=td)
+            out = ReadTool().run_sync({"file_path": str(p), "offset": 250_001, "limit": 3}, ctx)
+            self.assertEqual(out["content"], "250001: entry 250000\n250002: entry 250001\n250003: entry 250002")
+            self.assertEqual((out["total_lines"], out["lines_returned"]), (300_000, 3))
+
+            out = ReadTool().run_sync({"file_path": str(p), "offset": 299_999}, ctx)
+            self.assertEqual(out["content"], "299999: entry 299998\n300000: entry 299999")
+
+            # A window stops at max_bytes of content.
+            out = ReadTool(max_bytes=40).run_sync({"file_path": str(p), "offset": 11, "limit": 100}, ctx)
+            self.assertEqual(out["lines_returned"], 5)
+
+            # Without offset/limit the first max_bytes are returned as before.
+            out = ReadTool(max_bytes=16).run_sync({"file_path": str(p)}, ctx)
+            self.assertEqual(out["content"], "entry 0\nentry 1\n")
+
+    def test_windows_match_splitlines_and_follow_rewrites(self) -> None:
+        text = "one\r\ntwo\rthree\x0bfour five\n\nsix\u0085seven\ufffd\neight"
+        with TemporaryDirectory() as td, mock.patch.object(line_index, "_BLOCK_BYTES", 4):
+            p = Path(td) / "mixed.txt"
+            p.write_bytes(text.encode("utf-8"))
+            ctx = ToolContext(cwd=td)
+            lines = text.splitlines()
+            for offset in range(1, len(lines) + 2):
+                for limit in (1, 2, 5):
+                    out = ReadTool().run_sync({"file_path": str(p), "offset": offset, "limit": limit}, ctx)
+                    self.assertEqual(out["content"], _numbered(lines[offset - 1 : offset - 1 + limit], offset - 1))
+                    self.assertEqual(out["total_lines"], len(lines))
+
+            # Same size, new mtime: the cached index is rebuilt.
+            p.write_bytes(text.replace("\r\n", "\n\n").encode("utf-8"))
+            os.utime(p, ns=(1, 1))
+            out = ReadTool().run_sync({"file_path": str(p), "offset": 1, "limit": 3}, ctx)
+            self.assertEqual(out["content"], "1: one\n2: \n3: two")
+
+
+if __name__ == "__main__":
+    unittest.main()
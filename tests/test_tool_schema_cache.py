@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk.options import OpenAgenticOptions
+from openagentic_sdk.permissions.gate import PermissionGate
+from openagentic_sdk.providers.base import ModelOutput, ToolCall
+from openagentic_sdk.sessions.store import FileSessionStore
+from openagentic_sdk.skills import index as skills_index
+from openagentic_sdk.tools import schema_cache
+from openagentic_sdk.tools.bash import BashTool
+from openagentic_sdk.tools.openai import tool_schemas_for_openai
+from openagentic_sdk.tools.openai_responses import tool_schemas_for_responses
+from openagentic_sdk.tools.read import ReadTool
+from openagentic_sdk.tools.registry import ToolRegistry
+from openagentic_sdk.tools.skill import SkillTool
+
+
+def _write_skill(root: Path, name: str, description: str) -> None:
+    d = root / ".claude" / "skills" / name
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "SKILL.md").write_text(f"---\nname: {name}\ndescription: {description}\n---\n\n# {name}\n", encoding="utf-8")
+
+
+class _TwoStepProvider:
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.tools: list = []
+
+    async def complete(self, *, model, messages, tools=(), api_key=None):
+        self.tools.append(tools)
+        if len(self.tools) == 1:
+            return ModelOutput(
+                assistant_text=None,
+                tool_calls=[ToolCall(tool_use_id="t1", name="Read", arguments={"file_path": "a.txt"})],
+                usage=None,
+            )
+        return ModelOutput(assistant_text="done", tool_calls=[], usage=None)
+
+
+class TestToolSchemaCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._old_home = os.environ.get("OPENAGENTIC_SDK_HOME")
+        self._td = TemporaryDirectory()
+        self.root = Path(self._td.name)
+        os.environ["OPENAGENTIC_SDK_HOME"] = str(self.root / ".home")
+        schema_cache.TOOL_SCHEMA_CACHE.clear()
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+        if self._old_home is None:
+            os.environ.pop("OPENAGENTIC_SDK_HOME", None)
+        else:
+            os.environ["OPENAGENTIC_SDK_HOME"] = self._old_home
+
+    def test_repeated_calls_are_memoised_and_byte_identical(self) -> None:
+        _write_skill(self.root, "alpha", "first")
+        registry = ToolRegistry([BashTool(), ReadTool()])
+        ctx = {"cwd": str(self.root), "project_dir": str(self.root)}
+        names = ["Bash", "Read", "Skill"]
+        with mock.patch.object(skills_index, "_index_skills", wraps=skills_index._index_skills) as parse:
+            first = tool_schemas_for_responses(names, registry=registry, context=ctx)
+            second = tool_schemas_for_responses(names, registry=registry, context=ctx)
+            tool_schemas_for_responses(names, registry=registry, context=ctx)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(schema_cache.TOOL_SCHEMA_CACHE.hits, 2)
+        self.assertTrue(all(a is b for a, b in zip(first, second)))
+        self.assertEqual(json.dumps(first), json.dumps(second))
+        self.assertIn("alpha", json.dumps(first))
+        # The openai (legacy) shape is cached separately.
+        self.assertEqual(tool_schemas_for_openai(names, registry=registry, context=ctx)[0]["type"], "function")
+
+    def test_invalidation(self) -> None:
+        _write_skill(self.root, "alpha", "first")
+        registry = ToolRegistry([BashTool()])
+        ctx = {"cwd": str(self.root)}
+        names = ["Bash", "Skill", "Read"]
+        base = tool_schemas_for_openai(names, registry=registry, context=ctx)
+        self.assertEqual([s["function"]["name"] for s in base], ["Bash", "Skill", "Read"])
+
+        # A new skill on disk.
+        _write_skill(self.root, "beta", "second")
+        self.assertIn("beta", json.dumps(tool_schemas_for_openai(names, registry=registry, context=ctx)))
+
+        # An edited skill (same directory entries, different SKILL.md).
+        p = self.root / ".claude" / "skills" / "alpha" / "SKILL.md"
+        p.write_text(p.read_text(encoding="utf-8").replace("first", "edited text"), encoding="utf-8")
+        self.assertIn("edited text", json.dumps(tool_schemas_for_openai(names, registry=registry, context=ctx)))
+
+        # A different cwd and a registry change.
+        other = tool_schemas_for_openai(["Bash"], registry=registry, context={"cwd": "/elsewhere"})
+        self.assertIn("/elsewhere", other[0]["function"]["description"])
+        bash = BashTool(max_output_lines=7)
+        registry.register(bash)
+        self.assertIn("7", tool_schemas_for_openai(["Bash"], registry=registry, context=ctx)[0]["function"]["description"])
+        self.assertEqual(schema_cache.TOOL_SCHEMA_CACHE.hits, 0)
+
+    def test_steps_of_a_turn_reuse_the_compiled_schemas(self) -> None:
+        import asyncio
+
+        import openagentic_sdk
+
+        (self.root / "a.txt").write_text("hi", encoding="utf-8")
+        provider = _TwoStepProvider()
+        options = OpenAgenticOptions(
+            provider=provider,
+            model="m",
+            api_key="x",
+            cwd=str(self.root),
+            tools=ToolRegistry([ReadTool(), SkillTool()]),
+            permission_gate=PermissionGate(permission_mode="bypass"),
+            session_store=FileSessionStore(root_dir=self.root),
+        )
+
+        async def run() -> None:
+            async for _ in openagentic_sdk.query(prompt="read", options=options):
+                pass
+
+        with mock.patch.object(schema_cache, "skills_fingerprint", wraps=schema_cache.skills_fingerprint) as fp:
+            asyncio.run(run())
+        self.assertEqual(len(provider.tools), 2)
+        self.assertIs(provider.tools[0][0], provider.tools[1][0])
+        # The skills on disk are checked once per turn, not once per step.
+        self.assertEqual(fp.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
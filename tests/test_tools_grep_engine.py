@@ -0,0 +1,109 @@
+import re
+import shutil
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.tools.base import ToolContext
+from openagentic_sdk.tools.grep import GrepTool
+from openagentic_sdk.tools.grep_engine import GrepQuery, grep_file
+from openagentic_sdk.tools.ignore import walk_files
+
+
+def _per_line(text: str, pattern: str, *, flags: int = 0, before: int = 0, after: int = 0) -> list[tuple]:
+    # The pre-engine behaviour: splitlines() and one regex search per line.
+    rx = re.compile(pattern, flags)
+    lines = text.splitlines()
+    out = []
+    for idx, line in enumerate(lines, start=1):
+        if rx.search(line):
+            out.append((idx, line, lines[max(0, idx - 1 - before) : idx - 1] if before else None, lines[idx : idx + after] if after else None))
+    return out
+
+
+class TestGrepEngine(unittest.TestCase):
+    def test_buffer_scan_matches_per_line_search(self) -> None:
+        text = "alpha\r\nbeta gamma\n\nalpha beta\nend$ alpha\nlast alpha"
+        cases = [("alpha", 0), ("alpha$", 0), ("^beta", 0), ("a\\s+b", 0), ("ALPHA", re.IGNORECASE), ("^$", 0), ("a\\nb", 0), ("end$", 0)]
+        with TemporaryDirectory() as td:
+            p = Path(td) / "f.txt"
+            p.write_bytes(text.encode("utf-8"))
+            for pattern, flags in cases:
+                q = GrepQuery(pattern=pattern, case_sensitive=not flags, before=2, after=1)
+                got = [(m.line, m.text, m.before_context, m.after_context) for m in grep_file(p, q)]
+                self.assertEqual(got, _per_line(text.replace("\r\n", "\n"), pattern, flags=flags, before=2, after=1), pattern)
+
+    def test_string_anchors_and_lookarounds_match_per_line(self) -> None:
+        text = "foo 1\nfoo 2\nbar foo"
+        cases = ["\\Afoo", "foo\\Z", "\\d\\Z", "foo(?!\\n)", "(?<=bar )foo", "(?<!\\n)foo", "(x)?(?(1)x|\\Afoo)"]
+        with TemporaryDirectory() as td:
+            p = Path(td) / "f.txt"
+            p.write_text(text, encoding="utf-8")
+            for pattern in cases:
+                got = [(m.line, m.text) for m in grep_file(p, GrepQuery(pattern=pattern))]
+                self.assertEqual(got, [(m[0], m[1]) for m in _per_line(text, pattern)], pattern)
+
+    def test_large_files_are_memory_mapped(self) -> None:
+        with TemporaryDirectory() as td:
+            p = Path(td) / "big.log"
+            body = "".join(f"line {i}\n" for i in range(200_000))
+            p.write_text(body + "needle here\ntail\n", encoding="utf-8")
+            self.assertGreater(p.stat().st_size, 1 << 20)
+            for pattern in ("needle", "need+le"):
+                [m] = grep_file(p, GrepQuery(pattern=pattern, after=1))
+                self.assertEqual((m.line, m.text, m.after_context), (200_001, "needle here", ["tail"]))
+
+    def test_walk_respects_ignore_rules_and_skips_binaries(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / ".git").mkdir()
+            (root / ".gitignore").write_text("*.log\n!keep.log\n/out/\n", encoding="utf-8")
+            for rel in ("a.py", "x.log", "keep.log", "out/o.py", "src/out/o.py", "node_modules/m.js", "src/gen/g.py", "src/s.py"):
+                (root / rel).parent.mkdir(parents=True, exist_ok=True)
+                (root / rel).write_text("hit\n", encoding="utf-8")
+            (root / "src" / ".gitignore").write_text("gen/\n", encoding="utf-8")
+            (root / "blob.bin").write_bytes(b"hit\0\x01")
+
+            rels = [rel for _, rel in walk_files(root)]
+            self.assertEqual(rels, [".gitignore", "a.py", "blob.bin", "keep.log", "src/.gitignore", "src/out/o.py", "src/s.py"])
+
+            out = GrepTool().run_sync({"query": "hit", "root": str(root), "mode": "files_with_matches"}, ToolContext(cwd=str(root)))
+            self.assertEqual(out["files"], [str(root / r) for r in ("a.py", "keep.log", "src/out/o.py", "src/s.py")])
+
+            # Inside a subdirectory, the repository's .gitignore still applies.
+            out = GrepTool().run_sync({"query": "hit", "root": str(root / "src"), "file_glob": "**/*.py"}, ToolContext(cwd=str(root)))
+            self.assertEqual([m["file_path"] for m in out["matches"]], [str(root / "src/out/o.py"), str(root / "src/s.py")])
+
+    def test_max_matches_truncates_in_file_order(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            for i in range(40):
+                (root / f"f{i:02d}.txt").write_text("x\n" * 5, encoding="utf-8")
+            tool = GrepTool(max_matches=12, workers=3)
+            out = tool.run_sync({"query": "x", "root": str(root)}, ToolContext(cwd=str(root)))
+            self.assertTrue(out["truncated"])
+            self.assertEqual([(Path(m["file_path"]).name, m["line"]) for m in out["matches"]][-3:], [("f01.txt", 5), ("f02.txt", 1), ("f02.txt", 2)])
+
+            out = GrepTool(workers=3).run_sync({"query": "x", "root": str(root)}, ToolContext(cwd=str(root)))
+            self.assertEqual((out["truncated"], out["total_matches"]), (False, 200))
+
+    @unittest.skipIf(shutil.which("rg") is None, "rg not installed")
+    def test_ripgrep_agrees_with_builtin_engine(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / ".hidden").write_text("one foo\n", encoding="utf-8")
+            (root / "a.txt").write_text("x\nfoo bar\ny\nfoo\n", encoding="utf-8")
+            (root / "node_modules").mkdir()
+            (root / "node_modules" / "m.js").write_text("foo\n", encoding="utf-8")
+            inp = {"query": "fo+", "root": str(root), "before_context": 1, "after_context": 1}
+            self.assertEqual(
+                GrepTool(use_ripgrep=True).run_sync(inp, ToolContext(cwd=str(root))),
+                GrepTool().run_sync(inp, ToolContext(cwd=str(root))),
+            )
+            # Python-only syntax: rg refuses it and the built-in engine answers instead.
+            out = GrepTool(use_ripgrep=True).run_sync({"query": "(?<=one )foo", "root": str(root)}, ToolContext(cwd=str(root)))
+            self.assertEqual(len(out["matches"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from openagentic_sdk.tools import trigram_index as trigram_mod
+from openagentic_sdk.tools.base import ToolContext
+from openagentic_sdk.tools.edit import EditTool
+from openagentic_sdk.tools.file_index import WorkspaceIndex
+from openagentic_sdk.tools.grep import GrepTool
+from openagentic_sdk.tools.grep_engine import GrepQuery
+from openagentic_sdk.tools.trigram_index import TrigramIndex, query_plan
+from openagentic_sdk.tools.write import WriteTool
+
+
+def _tri(s: str) -> int:
+    b = s.encode("utf-8")
+    return (b[0] << 16) | (b[1] << 8) | b[2]
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def test_query_plan_extracts_required_trigrams(self) -> None:
+        self.assertEqual(query_plan(GrepQuery(pattern="Foo")), _tri("foo"))
+        self.assertEqual(query_plan(GrepQuery(pattern="x?abc+")), _tri("abc"))
+        self.assertEqual(query_plan(GrepQuery(pattern="ab_+cd")), ("and", (_tri("ab_"), _tri("_cd"))))
+        self.assertEqual(query_plan(GrepQuery(pattern="(foo|bar)")), ("or", (_tri("foo"), _tri("bar"))))
+        self.assertEqual(query_plan(GrepQuery(pattern="ab\\s+cde")), _tri("cde"))
+        # Nothing every match must contain: scan everything.
+        for pattern in (".*", "ab", "(foo|\\w+)", "(abc)?", "[a-z]+\\d"):
+            self.assertIsNone(query_plan(GrepQuery(pattern=pattern)), pattern)
+        # IGNORECASE matches `k` against KELVIN SIGN, so it cannot be in a required trigram.
+        self.assertEqual(query_plan(GrepQuery(pattern="kelvin", case_sensitive=False)), _tri("elv"))
+
+    def test_grep_with_trigram_index_matches_a_full_scan_and_follows_edits(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(os.path.realpath(td))
+            for i in range(30):
+                (root / "src" / f"m{i:02d}.py").parent.mkdir(parents=True, exist_ok=True)
+                (root / "src" / f"m{i:02d}.py").write_text(f"def handler_{i}():\n    return 'Value {i * 7}'\n", encoding="utf-8")
+            (root / "blob.bin").write_bytes(b"handler\0")
+            ctx = ToolContext(cwd=str(root))
+            plain = GrepTool()
+            indexed = GrepTool(use_trigram_index=True)
+            for inp in (
+                {"query": "handler_1\\d"},
+                {"query": "VALUE 14", "case_sensitive": False},
+                {"query": "return '(Value 7|Value 21)'"},
+                {"query": "missing text"},
+                {"query": "\\d+", "mode": "files_with_matches"},
+            ):
+                self.assertEqual(indexed.run_sync(inp, ctx), plain.run_sync(inp, ctx), inp)
+            self.assertTrue((root / ".openagentic-sdk" / "trigrams.sqlite3").exists())
+
+            WriteTool().run_sync({"file_path": "src/new.py", "content": "needle_one\n"}, ctx)
+            EditTool().run_sync({"file_path": "src/m03.py", "old": "Value 21", "new": "needle_two"}, ctx)
+            os.remove(root / "src" / "m05.py")
+            out = indexed.run_sync({"query": "needle_\\w+", "mode": "files_with_matches"}, ctx)
+            self.assertEqual(out["files"], [str(root / "src/m03.py"), str(root / "src/new.py")])
+            out = indexed.run_sync({"query": "handler_5\\b", "mode": "files_with_matches"}, ctx)
+            self.assertEqual(out["files"], [])
+
+    def test_polling_workspace_sees_in_place_rewrites(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "a.txt").write_text("alpha\n", encoding="utf-8")
+            workspace = WorkspaceIndex(root, use_inotify=False, poll_interval_s=3600.0)
+            index = TrigramIndex(workspace)
+            try:
+                self.assertEqual(index.candidates(GrepQuery(pattern="alpha")), {"a.txt"})
+                self.assertEqual(index.sync(), 0)
+                (root / "a.txt").write_text("omega, longer\n", encoding="utf-8")
+                self.assertEqual(index.candidates(GrepQuery(pattern="alpha")), set())
+                self.assertEqual(index.candidates(GrepQuery(pattern="omega")), {"a.txt"})
+            finally:
+                index.close()
+                workspace.close()
+
+    def test_pending_rows_fold_and_dead_ids_compact(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            for i in range(4):
+                (root / f"f{i}.txt").write_text(f"common text {i}\n", encoding="utf-8")
+            workspace = WorkspaceIndex(root, use_inotify=False, poll_interval_s=0.0)
+            index = TrigramIndex(workspace)
+            try:
+                with mock.patch.object(trigram_mod, "_PENDING_FOLD_ROWS", 1), mock.patch.object(trigram_mod, "_MIN_DEAD_TO_COMPACT", 3):
+                    self.assertEqual(index.candidates(GrepQuery(pattern="common")), {f"f{i}.txt" for i in range(4)})
+                    os.remove(root / "f1.txt")
+                    for n in range(4):
+                        (root / "f0.txt").write_text(f"rewrite {n}" + "x" * n + "\n", encoding="utf-8")
+                        self.assertEqual(index.candidates(GrepQuery(pattern="common")), {"f2.txt", "f3.txt"})
+                        self.assertEqual(index.candidates(GrepQuery(pattern=f"rewrite {n}")), {"f0.txt"})
+                assert index._conn is not None
+                live = {row[0] for row in index._conn.execute("SELECT id FROM files")}
+                stored: set[int] = set()
+                for (blob,) in index._conn.execute("SELECT ids FROM postings"):
+                    stored.update(trigram_mod._unpack(blob))
+                # Five dead ids: compacted at the third, two left over since.
+                self.assertEqual(len(stored - live), 2)
+            finally:
+                index.close()
+                workspace.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
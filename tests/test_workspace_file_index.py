@@ -0,0 +1,149 @@
+import os
+import shutil
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openagentic_sdk.prompt_system import _glob_in_dir
+from openagentic_sdk.tools.base import ToolContext
+from openagentic_sdk.tools.file_index import WorkspaceIndex, workspace_index
+from openagentic_sdk.tools.glob import GlobTool
+from openagentic_sdk.tools.list_dir import ListTool
+from openagentic_sdk.tools.write import WriteTool
+
+
+def _tree(root: Path) -> None:
+    for rel in ("a/x.py", "a/b/y.py", "c.txt", "out.log", "node_modules/m/i.js"):
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(rel, encoding="utf-8")
+    (root / ".gitignore").write_text("*.log\nnode_modules/\n", encoding="utf-8")
+
+
+class TestWorkspaceFileIndex(unittest.TestCase):
+    def _check_fresh(self, index: WorkspaceIndex, root: Path, *, polling: bool = False) -> None:
+        self.assertEqual(index.glob("**/*.py"), ["a/b/y.py", "a/x.py"])
+        self.assertEqual(index.glob("*"), [".gitignore", "a", "c.txt"])
+        by_path = {e.path: e for e in index.entries(include_ignored=True, dirs=True)}
+        self.assertTrue(by_path["out.log"].ignored)
+        self.assertTrue(by_path["node_modules"].ignored)
+        self.assertNotIn("node_modules/m", by_path)
+        self.assertEqual(by_path["c.txt"].size, 5)
+
+        (root / "a" / "new.py").write_text("", encoding="utf-8")
+        shutil.rmtree(root / "a" / "b")
+        (root / "c.txt").write_text("longer text", encoding="utf-8")
+        self.assertEqual(index.glob("**/*.py"), ["a/new.py", "a/x.py"])
+        if polling:
+            # Rewriting a file leaves its directory's mtime alone; polling needs a hint.
+            index.note_change(root / "c.txt")
+        self.assertEqual({e.path: e.size for e in index.entries()}["c.txt"], 11)
+
+        os.rename(root / "a", root / "z")
+        self.assertEqual(index.glob("**/*.py"), ["z/new.py", "z/x.py"])
+
+        # Editing .gitignore re-evaluates what is ignored below it.
+        (root / ".gitignore").write_text("*.log\nnode_modules/\nz/\n", encoding="utf-8")
+        self.assertEqual(index.glob("**/*.py"), [])
+        self.assertEqual(index.glob("**/*.py", include_ignored=True, include_pruned=False), ["z/new.py", "z/x.py"])
+
+    def test_inotify_keeps_the_index_fresh(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            _tree(root)
+            index = WorkspaceIndex(root)
+            try:
+                if not index.watching:
+                    self.skipTest("inotify unavailable")
+                self._check_fresh(index, root)
+            finally:
+                index.close()
+
+    def test_polling_keeps_the_index_fresh(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            _tree(root)
+            index = WorkspaceIndex(root, use_inotify=False, poll_interval_s=0.0)
+            try:
+                self.assertFalse(index.watching)
+                self._check_fresh(index, root, polling=True)
+            finally:
+                index.close()
+
+    def test_note_change_refreshes_a_polling_index_immediately(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            _tree(root)
+            index = WorkspaceIndex(root, use_inotify=False, poll_interval_s=3600.0)
+            try:
+                self.assertEqual(index.glob("*.md"), [])
+                (root / "README.md").write_text("hi", encoding="utf-8")
+                self.assertEqual(index.glob("*.md"), [])
+                index.note_change(root / "README.md")
+                self.assertEqual(index.glob("*.md"), ["README.md"])
+            finally:
+                index.close()
+
+    def test_tools_query_the_shared_index(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(os.path.realpath(td))
+            _tree(root)
+            ctx = ToolContext(cwd=str(root))
+            self.assertIs(workspace_index(root), workspace_index(str(root) + "/"))
+
+            out = GlobTool().run_sync({"pattern": "**/*.py"}, ctx)
+            self.assertEqual(out["matches"], [str(root / "a/b/y.py"), str(root / "a/x.py")])
+            # Ignored directories the pattern names explicitly are globbed on disk.
+            out = GlobTool().run_sync({"pattern": "node_modules/**/*.js"}, ctx)
+            self.assertEqual(out["matches"], [str(root / "node_modules/m/i.js")])
+            # Ignored files are still found, as `Path.glob` finds them.
+            (root / ".gitignore").write_text("*.log\nnode_modules/\n.env\n", encoding="utf-8")
+            (root / ".env").write_text("KEY=1\n", encoding="utf-8")
+            for pattern, expected in (("*.log", [root / "out.log"]), (".env", [root / ".env"])):
+                out = GlobTool().run_sync({"pattern": pattern}, ctx)
+                self.assertEqual(out["matches"], [str(p) for p in expected], pattern)
+                self.assertEqual(out, GlobTool(use_index=False).run_sync({"pattern": pattern}, ctx), pattern)
+            self.assertEqual(workspace_index(root).glob("*.log", include_ignored=True), ["out.log"])
+
+            WriteTool().run_sync({"file_path": "a/w.py", "content": ""}, ctx)
+            out = GlobTool().run_sync({"pattern": "a/*.py", "root": str(root)}, ctx)
+            self.assertEqual(out["matches"], [str(root / "a/w.py"), str(root / "a/x.py")])
+
+            out = ListTool().run_sync({"path": "."}, ctx)
+            self.assertIn("y.py", out["output"])
+            self.assertNotIn("out.log", out["output"])
+            out = ListTool().run_sync({"path": "node_modules"}, ctx)
+            self.assertIn("i.js", out["output"])
+
+    def test_pruned_and_symlinked_directories_fall_back_to_the_disk(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(os.path.realpath(td))
+            for rel in ("main.py", "src/env/config.py", "tmp/a.py", "pkg/build/b.py", "docs/real/GUIDE.md", "tmp/NOTES.md"):
+                (root / rel).parent.mkdir(parents=True, exist_ok=True)
+                (root / rel).write_text(rel, encoding="utf-8")
+            (root / "linked").symlink_to(root / "docs" / "real", target_is_directory=True)
+            ctx = ToolContext(cwd=str(root))
+
+            # No .gitignore: nothing below tmp/, env/, build/ or linked/ is dropped.
+            for pattern in ("**/*.py", "*/*.md", "linked/*", "src/*/*.py"):
+                out = GlobTool().run_sync({"pattern": pattern}, ctx)
+                self.assertEqual(out, GlobTool(use_index=False).run_sync({"pattern": pattern}, ctx), pattern)
+            self.assertIn(str(root / "src/env/config.py"), GlobTool().run_sync({"pattern": "**/*.py"}, ctx)["matches"])
+            index = workspace_index(root)
+            self.assertIsNone(index.glob("**/*.py"))
+            # Patterns that cannot reach below a pruned directory stay on the index.
+            self.assertEqual(index.glob("*.py"), ["main.py"])
+            self.assertEqual(index.glob("src/*"), ["src/env"])
+            self.assertEqual(index.glob("**/*.py", include_pruned=False), ["main.py"])
+
+            # List keeps skipping `_IGNORE_PREFIXES` directories, with or without the index.
+            self.assertEqual(ListTool().run_sync({"path": "."}, ctx), ListTool(use_index=False).run_sync({"path": "."}, ctx))
+
+            # Instruction discovery follows symlinks and sees every directory.
+            found = _glob_in_dir(root, "*.md", root=root)
+            self.assertEqual(found, _glob_in_dir(root, "*.md"))
+            self.assertIn(root / "linked/GUIDE.md", found)
+            self.assertIn(root / "tmp/NOTES.md", found)
+
+
+if __name__ == "__main__":
+    unittest.main()